@@ -3,13 +3,17 @@
 Manages the lifecycle of RAGService, ChatManager and runtime config.
 Initialised once during FastAPI lifespan; routes obtain singletons via
 ``get_rag_service()`` / ``get_app_state()``.
+
+Config changes hot-swap the service graph: the new graph is built and warmed
+up off the request path, then swapped in atomically. Requests that already
+hold the old graph (e.g. in-flight SSE streams) finish on it.
 """
 
 from __future__ import annotations
 
 import threading
-from dataclasses import dataclass, field
-from typing import Any, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional, Tuple
 
 from backend.infrastructure.config import config
 from backend.infrastructure.logger import get_logger
@@ -39,6 +43,18 @@ class RuntimeConfig:
         self.enable_rerank = config.ENABLE_RERANK
         self.show_reasoning = config.DEEPSEEK_ENABLE_REASONING_DISPLAY
 
+    def service_key(self) -> tuple:
+        """Fields that shape the service graph (display-only fields excluded)."""
+        return (
+            self.selected_model,
+            self.llm_preset,
+            self.retrieval_strategy,
+            self.use_agentic_rag,
+            self.similarity_top_k,
+            self.similarity_threshold,
+            self.enable_rerank,
+        )
+
 
 @dataclass
 class AppState:
@@ -50,21 +66,49 @@ class AppState:
     runtime_config: RuntimeConfig = field(default_factory=RuntimeConfig)
     ready: bool = False
     error: Optional[str] = None
+    # Guards the (rag_service, chat_manager) swap only; held for an assignment.
     _lock: threading.Lock = field(default_factory=threading.Lock)
+    # Serializes rebuilds; never taken on the request path.
+    _rebuild_lock: threading.Lock = field(default_factory=threading.Lock)
+    _service_key: Optional[tuple] = None
 
     # ── service rebuild ──────────────────────────────
 
-    def rebuild_services(self) -> bool:
-        """Rebuild RAGService + ChatManager from current runtime_config."""
+    def services(self) -> Tuple[Optional[Any], Optional[Any]]:
+        """Return a consistent (rag_service, chat_manager) pair."""
         with self._lock:
-            return self._rebuild_services_inner()
+            return self.rag_service, self.chat_manager
+
+    def rebuild_services(self) -> bool:
+        """Rebuild RAGService + ChatManager from current runtime_config.
+
+        The new graph is built outside the swap lock, reusing chat sessions and
+        components whose config is unchanged, then swapped in atomically.
+        Concurrent rebuilds run one at a time; a rebuild whose config matches
+        the live graph is skipped.
+        """
+        with self._rebuild_lock:
+            rc = replace(self.runtime_config)  # snapshot: later PUTs trigger their own rebuild
+            key = rc.service_key()
+            if key == self._service_key and self.rag_service is not None:
+                logger.info("Service config unchanged, keeping current services")
+                return True
+
+            built = self._build_services(rc)
+            if built is None:
+                return False
+
+            with self._lock:
+                self.rag_service, self.chat_manager = built
+                self._service_key = key
+            logger.info("✅ Services swapped in", model=rc.selected_model, strategy=rc.retrieval_strategy)
+            return True
 
-    def _rebuild_services_inner(self) -> bool:
+    def _build_services(self, rc: RuntimeConfig) -> Optional[Tuple[Any, Any]]:
+        """Build and warm up a new (rag_service, chat_manager) pair; None on failure."""
         if self.init_result is None:
             logger.warning("init_result is None, cannot rebuild services")
-            return False
-
-        rc = self.runtime_config
+            return None
 
         from frontend.components.config_panel.models import LLM_PRESETS
 
@@ -113,6 +157,11 @@ class AppState:
                 max_tokens=max_tokens,
             )
 
+            previous = self.chat_manager
+            if previous is not None:
+                chat_manager.inherit_from(previous)
+            chat_manager.warm_up()
+
             rag_service = RAGService(
                 collection_name=collection_name,
                 enable_debug=False,
@@ -128,14 +177,12 @@ class AppState:
                 index_manager_provider=_get_shared_index_manager,
             )
 
-            self.rag_service = rag_service
-            self.chat_manager = chat_manager
-            logger.info("✅ Services rebuilt", model=rc.selected_model, strategy=rc.retrieval_strategy)
-            return True
+            logger.info("✅ Services built", model=rc.selected_model, strategy=rc.retrieval_strategy)
+            return rag_service, chat_manager
 
         except Exception as e:
             logger.error("❌ Service rebuild failed", error=str(e), exc_info=True)
-            return False
+            return None
 
 
 # ── module-level singleton ───────────────────────────
@@ -153,7 +200,8 @@ def get_app_state() -> AppState:
 def get_rag_service():
     """Return the current RAGService or raise if not ready."""
     state = get_app_state()
-    if not state.ready or state.rag_service is None:
+    rag_service, _ = state.services()
+    if not state.ready or rag_service is None:
         from fastapi import HTTPException
         raise HTTPException(status_code=503, detail="Service not ready")
-    return state.rag_service
+    return rag_service
@@ -62,9 +62,10 @@ async def lifespan(app: FastAPI):
 
     # ── shutdown ─────────────────────────────────────
     logger.info("🛑 FastAPI lifespan: shutting down")
-    if state.rag_service is not None:
+    rag_service, _ = state.services()
+    if rag_service is not None:
         try:
-            state.rag_service.close()
+            rag_service.close()
         except Exception:
             pass
 
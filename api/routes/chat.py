@@ -18,6 +18,7 @@ router = APIRouter(tags=["chat"])
 
 
 async def _chat_event_generator(
+    rag_service,
     message: str,
     session_id: str | None,
 ) -> AsyncIterator[dict]:
@@ -29,13 +30,10 @@ async def _chat_event_generator(
       - ``reasoning``: reasoning chain text (sent once, may be absent)
       - ``done``    : signals stream completion
       - ``error``   : error message
-    """
-    state = get_app_state()
-    rag_service = state.rag_service
-    if rag_service is None:
-        yield {"event": "error", "data": json.dumps({"message": "Service not ready"})}
-        return
 
+    ``rag_service`` is resolved once per request so a concurrent config
+    rebuild cannot swap the service graph mid-stream.
+    """
     try:
         async for chunk in rag_service.stream_chat(message, session_id=session_id):
             if not isinstance(chunk, dict):
@@ -93,10 +91,11 @@ async def _chat_event_generator(
 @router.post("/chat")
 async def chat(req: ChatRequest):
     state = get_app_state()
-    if not state.ready or state.rag_service is None:
+    rag_service, _ = state.services()
+    if not state.ready or rag_service is None:
         raise HTTPException(status_code=503, detail="Service not ready")
 
     return EventSourceResponse(
-        _chat_event_generator(req.message, req.session_id),
+        _chat_event_generator(rag_service, req.message, req.session_id),
         media_type="text/event-stream",
     )
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import APIRouter
 
 from api.deps import get_app_state
@@ -42,7 +44,8 @@ async def update_config(body: AppConfigUpdate):
 
     if changed and state.ready:
         logger.info("Config changed, rebuilding services", changes=body.model_dump(exclude_unset=True))
-        state.rebuild_services()
+        # Build off the event loop; other requests keep using the current services until the swap.
+        await asyncio.to_thread(state.rebuild_services)
 
     return await get_config()
 
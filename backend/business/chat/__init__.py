@@ -5,6 +5,7 @@
 - ChatTurn类：单轮对话数据模型
 - ChatSession类：对话会话数据模型，支持文件持久化
 - ChatManager类：对话管理器，管理对话会话和历史
+- ChatContext/ChatSessionPool类：按会话ID索引的会话上下文池（多用户并发对话）
 - 工具函数：会话文件读写和元数据查询
 
 执行流程：
@@ -18,11 +19,14 @@
 """
 
 from backend.business.chat.session import ChatTurn, ChatSession
+from backend.business.chat.context import ChatContext, ChatSessionPool
 from backend.business.chat.manager import ChatManager
 
 __all__ = [
     'ChatTurn',
     'ChatSession',
+    'ChatContext',
+    'ChatSessionPool',
     'ChatManager',
 ]
 
@@ -0,0 +1,233 @@
+"""
+对话管理 - 会话上下文模块：ChatContext和ChatSessionPool类
+
+主要功能：
+- ChatContext类：单个会话的轻量上下文（会话历史 + 对话记忆 + 会话锁）
+- ChatSessionPool类：按会话ID索引的上下文池，LRU + 空闲超时淘汰
+
+执行流程：
+1. 按会话ID获取上下文（不存在时创建）
+2. 持有会话锁执行一轮对话（同一会话串行，不同会话并发）
+3. 超出容量或空闲超时的会话被淘汰（正在对话或已被取出等待对话的会话不淘汰）
+
+特性：
+- 查询引擎、索引管理器、LLM 客户端由 ChatManager 共享，上下文只包含会话状态
+- 会话锁同时支持同步（with）与异步（async with）持有，异步等待不阻塞事件循环
+- 线程安全
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+from backend.infrastructure.logger import get_logger
+from backend.business.chat.session import ChatSession
+
+logger = get_logger('chat_manager')
+
+# 异步等待会话锁的轮询间隔（秒）
+_LOCK_POLL_INTERVAL = 0.01
+
+
+class ChatContext:
+    """单个会话的轻量上下文"""
+
+    def __init__(self, session: Optional[ChatSession] = None, memory_token_limit: int = 3000):
+        """初始化会话上下文
+
+        Args:
+            session: 会话（None 时新建）
+            memory_token_limit: 对话记忆token限制
+        """
+        self.session = session or ChatSession()
+        self._memory = None
+        self._memory_token_limit = memory_token_limit
+        self._lock = threading.Lock()
+        self._pins = 0  # 已取出、尚未结束对话的请求数（含等待会话锁的请求）
+        self._pin_lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    @property
+    def session_id(self) -> str:
+        return self.session.session_id
+
+    @property
+    def memory(self):
+        """获取对话记忆（延迟加载）"""
+        if self._memory is None:
+            from llama_index.core.memory import ChatMemoryBuffer
+            self._memory = ChatMemoryBuffer.from_defaults(token_limit=self._memory_token_limit)
+        return self._memory
+
+    @property
+    def in_use(self) -> bool:
+        """是否正在对话（持有会话锁，或已被取出等待会话锁）"""
+        return self._pins > 0 or self._lock.locked()
+
+    def pin(self) -> None:
+        """标记为使用中（取出后到获得会话锁之前不被淘汰）"""
+        with self._pin_lock:
+            self._pins += 1
+
+    def unpin(self) -> None:
+        """取消 pin() 的标记"""
+        with self._pin_lock:
+            self._pins = max(0, self._pins - 1)
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+
+    def reset(self) -> None:
+        """清空会话历史与对话记忆"""
+        self.session.clear_history()
+        if self._memory is not None:
+            self._memory.reset()
+
+    @contextmanager
+    def locked(self):
+        """同步持有会话锁"""
+        self._lock.acquire()
+        try:
+            yield self
+        finally:
+            self.touch()
+            self._lock.release()
+
+    @asynccontextmanager
+    async def alocked(self):
+        """异步持有会话锁（轮询等待，不阻塞事件循环，可跨事件循环使用）"""
+        while not self._lock.acquire(blocking=False):
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        try:
+            yield self
+        finally:
+            self.touch()
+            self._lock.release()
+
+
+class ChatSessionPool:
+    """按会话ID索引的会话上下文池"""
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        idle_ttl_seconds: float = 3600,
+        memory_token_limit: int = 3000,
+    ):
+        """初始化会话上下文池
+
+        Args:
+            max_sessions: 最多保留的会话数（超出时淘汰最久未使用的空闲会话）
+            idle_ttl_seconds: 空闲超时（秒），0 表示不按时间淘汰
+            memory_token_limit: 新建会话的对话记忆token限制
+        """
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.memory_token_limit = memory_token_limit
+        self._contexts: OrderedDict[str, ChatContext] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._contexts
+
+    def get(self, session_id: str, create: bool = True, pin: bool = False) -> Optional[ChatContext]:
+        """获取会话上下文
+
+        Args:
+            session_id: 会话ID
+            create: 不存在时是否创建
+            pin: 是否在池锁内标记为使用中（调用方用完后调用 unpin()）
+
+        Returns:
+            会话上下文，不存在且 create=False 时返回None
+        """
+        with self._lock:
+            context = self._contexts.get(session_id)
+            if context is not None:
+                self._contexts.move_to_end(session_id)
+                context.touch()
+                if pin:
+                    context.pin()
+                return context
+            if not create:
+                return None
+            context = ChatContext(ChatSession(session_id=session_id), self.memory_token_limit)
+            if pin:
+                context.pin()
+            self._add(context)
+            logger.debug(f"创建会话上下文: {session_id}（当前会话数: {len(self._contexts)}）")
+            return context
+
+    def new(self, session_id: Optional[str] = None, pin: bool = False) -> ChatContext:
+        """创建新的会话上下文（替换同ID的旧上下文）"""
+        context = ChatContext(ChatSession(session_id=session_id), self.memory_token_limit)
+        if pin:
+            context.pin()
+        with self._lock:
+            self._contexts.pop(context.session_id, None)
+            self._add(context)
+        return context
+
+    def put(self, context: ChatContext, pin: bool = False) -> None:
+        """放入已有的会话上下文（如被淘汰后重新使用的当前会话）"""
+        with self._lock:
+            self._contexts.pop(context.session_id, None)
+            context.touch()
+            if pin:
+                context.pin()
+            self._add(context)
+
+    def discard(self, session_id: str) -> bool:
+        """移除会话上下文"""
+        with self._lock:
+            return self._contexts.pop(session_id, None) is not None
+
+    def session_ids(self) -> List[str]:
+        """按最近使用顺序（旧 → 新）返回会话ID"""
+        with self._lock:
+            return list(self._contexts)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._contexts),
+                "in_use": sum(1 for c in self._contexts.values() if c.in_use),
+                "max_sessions": self.max_sessions,
+                "evictions": self.evictions,
+            }
+
+    def _add(self, context: ChatContext) -> None:
+        """加入上下文并淘汰（调用方持有锁）"""
+        self._contexts[context.session_id] = context
+        self._evict(keep=context.session_id)
+
+    def _evict(self, keep: str) -> None:
+        """淘汰空闲超时与超出容量的会话（正在对话的会话不淘汰）"""
+        if self.idle_ttl_seconds and self.idle_ttl_seconds > 0:
+            deadline = time.monotonic() - self.idle_ttl_seconds
+            expired = [
+                session_id for session_id, c in self._contexts.items()
+                if session_id != keep and not c.in_use and c.last_used < deadline
+            ]
+            for session_id in expired:
+                del self._contexts[session_id]
+            self.evictions += len(expired)
+
+        if len(self._contexts) <= self.max_sessions:
+            return
+        for session_id in list(self._contexts):
+            if len(self._contexts) <= self.max_sessions:
+                break
+            if session_id == keep or self._contexts[session_id].in_use:
+                continue
+            del self._contexts[session_id]
+            self.evictions += 1
@@ -6,6 +6,9 @@
 - start_session()：开始新会话
 - chat()：非流式对话（同步）
 - stream_chat()：流式对话（异步，使用真正的流式API）
+- chat()/stream_chat() 传入 session_id 时使用会话池中的对应会话，多个用户可并发对话；
+  未传 session_id 时使用当前会话（仅供 Streamlit 单用户界面，服务层总是传入会话ID）
+- inherit_from()/warm_up()：配置变更热替换时继承会话并复用配置未变的组件，后台预先创建查询引擎
 
 执行流程：
 1. 初始化对话管理器（连接索引管理器）
@@ -14,6 +17,8 @@
 
 特性：
 - 会话管理（仅内存，不持久化）
+- 会话池：各会话只保存历史与对话记忆，共享查询引擎、索引管理器和 LLM 客户端；
+  同一会话的对话串行执行，空闲会话按 LRU 和超时淘汰
 - 推理链支持
 - 复用ModularQueryEngine的丰富检索策略
 - 真正的流式输出支持（实时token输出，无模拟延迟）
@@ -36,6 +41,7 @@ from backend.infrastructure.config import config
 from backend.infrastructure.logger import get_logger
 from backend.business.rag_engine.formatting import ResponseFormatter
 from backend.business.chat.session import ChatSession
+from backend.business.chat.context import ChatContext, ChatSessionPool
 from backend.infrastructure.llms import (
     create_llm,
     create_deepseek_llm_for_query,  # 向后兼容
@@ -139,9 +145,12 @@ class ChatManager:
             llama_debug = LlamaDebugHandler(print_trace_on_end=True)
             Settings.callback_manager = CallbackManager([llama_debug])
 
-        # 延迟创建记忆缓冲区（避免导入 ChatMemoryBuffer 耗时 1.17s）
-        self._memory = None
-        self._memory_token_limit = memory_token_limit
+        # 会话上下文池（对话记忆延迟创建，避免导入 ChatMemoryBuffer 耗时 1.17s）
+        self.sessions = ChatSessionPool(
+            max_sessions=config.CHAT_MAX_SESSIONS,
+            idle_ttl_seconds=config.CHAT_SESSION_IDLE_TTL_SECONDS,
+            memory_token_limit=memory_token_limit,
+        )
 
         # 保存其他参数
         self.retrieval_strategy = retrieval_strategy
@@ -152,21 +161,50 @@ class ChatManager:
         # 延迟创建查询引擎
         self._query_engine = None
 
-        # 当前会话
-        self.current_session: Optional[ChatSession] = None
+        # 当前会话（未传 session_id 的调用使用，如 Streamlit 单用户界面）
+        self._current: Optional[ChatContext] = None
 
         logger.info("对话管理器初始化完成（延迟加载模式）")
 
+    @property
+    def current_session(self) -> Optional[ChatSession]:
+        """当前会话"""
+        return self._current.session if self._current is not None else None
+
+    @current_session.setter
+    def current_session(self, session: Optional[ChatSession]) -> None:
+        if session is None:
+            self._current = None
+            return
+        context = self.sessions.get(session.session_id)
+        context.session = session
+        self._current = context
+
     @property
     def memory(self):
-        """获取记忆缓冲区（延迟加载）"""
-        if self._memory is None:
-            from llama_index.core.memory import ChatMemoryBuffer
-            logger.debug("首次使用 memory，创建 ChatMemoryBuffer")
-            self._memory = ChatMemoryBuffer.from_defaults(
-                token_limit=self._memory_token_limit,
-            )
-        return self._memory
+        """获取当前会话的对话记忆（延迟加载）"""
+        return self._context().memory
+
+    def _context(self, session_id: Optional[str] = None, pin: bool = False) -> ChatContext:
+        """获取会话上下文
+
+        Args:
+            session_id: 会话ID（None 表示当前会话，不存在时开始新会话）
+            pin: 是否标记为使用中（获得会话锁前不被淘汰，调用方用完后调用 unpin()）
+        """
+        current = self._current
+        if session_id is None or (current is not None and current.session_id == session_id):
+            if current is None:
+                self._current = self.sessions.new(session_id, pin=pin)
+                logger.info(f"新会话开始: {self._current.session_id}")
+                return self._current
+            if current.session_id not in self.sessions:
+                # 当前会话被淘汰后重新使用，放回会话池
+                self.sessions.put(current, pin=pin)
+            elif pin:
+                current.pin()
+            return current
+        return self.sessions.get(session_id, pin=pin)
 
     def _get_index_manager(self):
         if self.index_manager is None and self._index_manager_provider:
@@ -238,19 +276,79 @@ class ChatManager:
                 logger.info(f"模块化查询引擎已创建（检索策略: {self.retrieval_strategy or config.RETRIEVAL_STRATEGY}）")
 
         return self._query_engine
+
+    def _llm_config(self) -> tuple:
+        """LLM 的构建配置（相同则可复用已创建的 LLM 客户端）"""
+        return (self._model_id, self.model, self.api_key, self._temperature, self._max_tokens)
+
+    def _engine_config(self) -> tuple:
+        """查询引擎的构建配置（相同则可复用已创建的查询引擎）"""
+        return (
+            self.use_agentic_rag,
+            self.model,
+            self.api_key,
+            self.similarity_top_k,
+            self.retrieval_strategy,
+            self.enable_rerank,
+            self.enable_debug,
+            self.engine_kwargs,
+        )
+
+    def inherit_from(self, previous: "ChatManager") -> None:
+        """从旧的对话管理器继承会话，并复用配置未变的组件（配置变更热替换时调用）
+
+        - 会话池与当前会话：配置变更不丢失对话历史，新旧管理器共享会话锁
+        - LLM 客户端：模型与生成参数相同时复用
+        - 查询引擎：构建配置与索引管理器都相同时复用（检索器、路由器、重排序器随之复用）
+
+        Args:
+            previous: 旧的对话管理器（仍可继续完成进行中的对话）
+        """
+        self.sessions = previous.sessions
+        self._current = previous._current
+
+        if self._llm is None and previous._llm is not None and previous._llm_config() == self._llm_config():
+            self._llm = previous._llm
+            logger.info("复用 LLM 客户端", model=self.model)
+
+        if (
+            self._query_engine is None
+            and previous._query_engine is not None
+            and previous._engine_config() == self._engine_config()
+            and previous.index_manager is not None
+            and previous.index_manager is self._get_index_manager()
+        ):
+            self._query_engine = previous._query_engine
+            logger.info("复用查询引擎", strategy=self.retrieval_strategy)
+
+    def warm_up(self) -> bool:
+        """预先创建查询引擎（延迟加载的组件在替换前完成初始化，首个请求不再等待）
+
+        Returns:
+            是否成功（失败时保持延迟加载，首次使用时重试）
+        """
+        try:
+            _ = self.query_engine
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ 查询引擎预热失败，首次使用时重试: {e}")
+            return False
     
-    def _format_history_text(self, max_turns: Optional[int] = None) -> str:
+    def _format_history_text(
+        self, max_turns: Optional[int] = None, context: Optional[ChatContext] = None
+    ) -> str:
         """格式化对话历史为文本（公共方法）
 
         Args:
             max_turns: 最大轮数，None表示使用self.max_history_turns
+            context: 会话上下文（None 表示当前会话）
 
         Returns:
             格式化的历史文本
         """
         from llama_index.core.llms import MessageRole
 
-        chat_history = self.memory.get_all()
+        chat_history = (context or self._context()).memory.get_all()
         if not chat_history:
             return ""
 
@@ -261,19 +359,24 @@ class ChatManager:
             history_text += f"{role}: {msg.content}\n"
         return history_text
     
-    def _condense_query_with_history(self, current_message: str) -> str:
+    def _condense_query_with_history(
+        self, current_message: str, context: Optional[ChatContext] = None
+    ) -> str:
         """将对话历史压缩为完整查询（智能策略：短历史不压缩）
 
         Args:
             current_message: 当前用户消息
+            context: 会话上下文（None 表示当前会话）
 
         Returns:
             压缩后的完整查询
         """
         from llama_index.core.llms import MessageRole
 
+        context = context or self._context()
+
         # 获取历史对话
-        chat_history = self.memory.get_all()
+        chat_history = context.memory.get_all()
 
         if not chat_history or len(chat_history) == 0:
             # 没有历史，直接返回当前消息
@@ -286,7 +389,7 @@ class ChatManager:
         if self.enable_smart_condense:
             if user_message_count <= 2:
                 # 短历史（≤2轮）：直接拼接，不调用LLM压缩
-                history_text = self._format_history_text(max_turns=4)
+                history_text = self._format_history_text(max_turns=4, context=context)
                 if history_text:
                     # 简单拼接：历史 + 当前问题
                     condensed_query = f"{history_text.strip()}\n用户: {current_message}"
@@ -294,14 +397,14 @@ class ChatManager:
                     return condensed_query
             elif user_message_count <= 4:
                 # 中等历史（3-4轮）：简单拼接，不压缩
-                history_text = self._format_history_text(max_turns=6)
+                history_text = self._format_history_text(max_turns=6, context=context)
                 if history_text:
                     condensed_query = f"{history_text.strip()}\n用户: {current_message}"
                     logger.debug(f"中等历史简单拼接（{user_message_count}轮）")
                     return condensed_query
         
         # 长历史（≥5轮）：使用LLM压缩
-        history_text = self._format_history_text(max_turns=self.max_history_turns)
+        history_text = self._format_history_text(max_turns=self.max_history_turns, context=context)
         
         condense_prompt = f"""基于以下对话历史和当前问题，生成一个完整的、自包含的查询。
 
@@ -325,7 +428,7 @@ class ChatManager:
         except Exception as e:
             logger.warning(f"查询压缩失败，使用简单拼接: {e}")
             # 降级策略：简单拼接
-            history_text = self._format_history_text(max_turns=4)
+            history_text = self._format_history_text(max_turns=4, context=context)
             if history_text:
                 return f"{history_text.strip()}\n用户: {current_message}"
             return current_message
@@ -347,16 +450,17 @@ class ChatManager:
         elif len(high_quality_sources) >= self.min_high_quality_sources:
             logger.info(f"检索质量良好（高质量结果: {len(high_quality_sources)}个，最高相似度: {max_score:.2f}）")
     
-    def _build_llm_prompt(self, message: str) -> str:
+    def _build_llm_prompt(self, message: str, context: Optional[ChatContext] = None) -> str:
         """构建纯LLM模式的prompt
         
         Args:
             message: 用户消息
+            context: 会话上下文（None 表示当前会话）
             
         Returns:
             构建的prompt
         """
-        history_text = self._format_history_text()
+        history_text = self._format_history_text(context=context)
         
         if history_text:
             return f"""基于以下对话历史回答用户问题。
@@ -374,17 +478,20 @@ class ChatManager:
 
 请用中文提供专业、深入的回答。"""
     
-    def _execute_rag_query(self, message: str) -> Tuple[str, List[dict], Optional[str]]:
+    def _execute_rag_query(
+        self, message: str, context: Optional[ChatContext] = None
+    ) -> Tuple[str, List[dict], Optional[str]]:
         """执行RAG模式查询
         
         Args:
             message: 用户消息
+            context: 会话上下文（None 表示当前会话）
             
         Returns:
             (答案, 引用来源, 推理链内容)
         """
         # 压缩对话历史+当前问题为完整查询
-        condensed_query = self._condense_query_with_history(message)
+        condensed_query = self._condense_query_with_history(message, context)
         
         # 使用ModularQueryEngine执行查询
         answer, sources, reasoning_content, _ = self.query_engine.query(condensed_query, collect_trace=False)
@@ -394,16 +501,19 @@ class ChatManager:
         
         return answer, sources, reasoning_content
     
-    def _execute_llm_query(self, message: str) -> Tuple[str, List[dict], Optional[str]]:
+    def _execute_llm_query(
+        self, message: str, context: Optional[ChatContext] = None
+    ) -> Tuple[str, List[dict], Optional[str]]:
         """执行纯LLM模式查询
         
         Args:
             message: 用户消息
+            context: 会话上下文（None 表示当前会话）
             
         Returns:
             (答案, 引用来源, 推理链内容)
         """
-        prompt = self._build_llm_prompt(message)
+        prompt = self._build_llm_prompt(message, context)
         response = self.llm.complete(prompt)
         answer = response.text.strip()
         answer = self.formatter.format(answer, None)
@@ -415,7 +525,8 @@ class ChatManager:
         message: str,
         answer: str,
         sources: List[dict],
-        reasoning_content: Optional[str]
+        reasoning_content: Optional[str],
+        context: Optional[ChatContext] = None,
     ) -> None:
         """更新对话记忆和会话上下文
 
@@ -424,19 +535,22 @@ class ChatManager:
             answer: AI回答
             sources: 引用来源
             reasoning_content: 推理链内容
+            context: 会话上下文（None 表示当前会话）
         """
         from llama_index.core.llms import ChatMessage, MessageRole
 
+        context = context or self._context()
+
         # 更新对话记忆
-        self.memory.put(ChatMessage(role=MessageRole.USER, content=message))
-        self.memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=answer))
+        context.memory.put(ChatMessage(role=MessageRole.USER, content=message))
+        context.memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=answer))
         
         # 添加到会话上下文
         store_reasoning = config.DEEPSEEK_STORE_REASONING if reasoning_content else False
         if store_reasoning:
-            self.current_session.add_turn(message, answer, sources, reasoning_content)
+            context.session.add_turn(message, answer, sources, reasoning_content)
         else:
-            self.current_session.add_turn(message, answer, sources)
+            context.session.add_turn(message, answer, sources)
         
         # 自动保存会话到文件
         self._save_session()
@@ -453,11 +567,10 @@ class ChatManager:
         return
     
     def start_session(self, session_id: Optional[str] = None) -> ChatSession:
-        """开始新会话"""
-        self.current_session = ChatSession(session_id=session_id)
-        self.memory.reset()
-        logger.info(f"新会话开始: {self.current_session.session_id}")
-        return self.current_session
+        """开始新会话（成为当前会话；同ID的旧会话被替换）"""
+        self._current = self.sessions.new(session_id)
+        logger.info(f"新会话开始: {self._current.session_id}")
+        return self._current.session
 
     def _iter_async_stream(self, async_iter):
         """Iterate an async generator from sync code."""
@@ -478,15 +591,16 @@ class ChatManager:
             loop.close()
             asyncio.set_event_loop(None)
     
-    def chat(self, message: str) -> tuple[str, List[dict], Optional[str]]:
+    def chat(self, message: str, session_id: Optional[str] = None) -> tuple[str, List[dict], Optional[str]]:
         """进行对话（使用ModularQueryEngine + 对话记忆）
         
+        Args:
+            message: 用户消息
+            session_id: 会话ID（None 表示当前会话）
+        
         Returns:
             (答案, 引用来源, 推理链内容)
         """
-        if self.current_session is None:
-            self.start_session()
-        
         try:
             logger.info(f"用户消息: {message}")
 
@@ -495,7 +609,7 @@ class ChatManager:
             reasoning_content: Optional[str] = None
             final_answer: Optional[str] = None
 
-            async_iter = self.stream_chat(message)
+            async_iter = self.stream_chat(message, session_id=session_id)
             for chunk in self._iter_async_stream(async_iter):
                 if not isinstance(chunk, dict):
                     continue
@@ -528,11 +642,16 @@ class ChatManager:
             raise
     
     
-    async def stream_chat(self, message: str):
+    async def stream_chat(self, message: str, session_id: Optional[str] = None):
         """异步流式对话（使用真正的流式API）
         
+        不同会话的对话并发执行；同一会话的对话持有会话锁串行执行，
+        保证对话历史按轮次顺序写入。会话从取出到本轮结束都标记为使用中，
+        等待会话锁期间不会被会话池淘汰。
+        
         Args:
             message: 用户消息
+            session_id: 会话ID（None 表示当前会话，不存在时开始新会话）
             
         Yields:
             dict: 流式响应字典，包含以下类型：
@@ -541,9 +660,16 @@ class ChatManager:
                 - 'type': 'reasoning', 'data': 推理链内容
                 - 'type': 'done', 'data': 完整答案和会话信息
         """
-        if self.current_session is None:
-            self.start_session()
-        
+        context = self._context(session_id, pin=True)
+        try:
+            async with context.alocked():
+                async for chunk in self._stream_chat_turn(message, context):
+                    yield chunk
+        finally:
+            context.unpin()
+    
+    async def _stream_chat_turn(self, message: str, context: ChatContext):
+        """在指定会话中执行一轮流式对话（调用方持有会话锁）"""
         try:
             logger.info(f"用户消息（流式）: {message}")
             
@@ -554,7 +680,10 @@ class ChatManager:
             # 执行流式查询
             if self.query_engine:
                 # RAG模式：使用流式查询
-                condensed_query = self._condense_query_with_history(message)
+                # 压缩历史可能调用 LLM，在线程中执行，不阻塞事件循环
+                condensed_query = await asyncio.to_thread(
+                    self._condense_query_with_history, message, context
+                )
                 
                 async for chunk in self.query_engine.stream_query(condensed_query):
                     if chunk['type'] == 'token':
@@ -580,10 +709,10 @@ class ChatManager:
                         return
             else:
                 # 纯LLM模式：使用流式完成
-                prompt = self._build_llm_prompt(message)
+                prompt = self._build_llm_prompt(message, context)
                 
-                # 使用 stream_complete 进行流式输出
-                for chunk in self.llm.stream_complete(prompt):
+                # 使用 astream_complete 进行流式输出（等待 token 时不阻塞事件循环）
+                async for chunk in await self.llm.astream_complete(prompt):
                     chunk_text = chunk.text if hasattr(chunk, 'text') else str(chunk)
                     if chunk_text:
                         full_answer += chunk_text
@@ -593,15 +722,15 @@ class ChatManager:
                 full_answer = self.formatter.format(full_answer, None)
             
             # 更新对话记忆和会话上下文
-            self._update_memory_and_session(message, full_answer, sources, reasoning_content)
+            self._update_memory_and_session(message, full_answer, sources, reasoning_content, context)
             
             # 返回完成事件
             yield {
                 'type': 'done',
                 'data': {
                     'answer': full_answer,
-                    'session_id': self.current_session.session_id if self.current_session else None,
-                    'turn_count': len(self.current_session.history) if self.current_session else 0,
+                    'session_id': context.session_id,
+                    'turn_count': len(context.session.history),
                 }
             }
             
@@ -619,8 +748,6 @@ class ChatManager:
     
     def reset_session(self):
         """重置当前会话"""
-        if self.current_session:
-            self.current_session.clear_history()
-        self.memory.reset()
+        self._context().reset()
         logger.info("会话已重置")
 
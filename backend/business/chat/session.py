@@ -15,6 +15,7 @@
 - 完整的元数据管理（仅内存，不持久化）
 """
 
+import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, asdict
@@ -97,8 +98,8 @@ class ChatSession:
     
     @staticmethod
     def _generate_session_id() -> str:
-        """生成会话ID"""
-        return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        """生成会话ID（时间 + 随机后缀，同一秒内创建的会话不会冲突）"""
+        return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     
     def add_turn(self, question: str, answer: str, sources: List[dict], reasoning_content: Optional[str] = None):
         """添加一轮对话
@@ -256,17 +256,13 @@ class RAGService:
         return _execute_chat(self.chat_manager, request, user_id)
     
     async def stream_chat(self, message: str, session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
-        """流式对话"""
+        """流式对话（未指定会话ID时创建新会话，会话ID在 done 事件中返回）"""
+        if not session_id:
+            session_id = self.chat_manager.sessions.new().session_id
         logger.info("开始流式对话", session_id=session_id, message=message[:50] if len(message) > 50 else message)
         
-        if session_id:
-            current_session = self.chat_manager.get_current_session()
-            if not current_session or current_session.session_id != session_id:
-                self.chat_manager.start_session(session_id=session_id)
-        elif not self.chat_manager.get_current_session():
-            self.chat_manager.start_session()
-        
-        async for chunk in self.chat_manager.stream_chat(message):
+        # 按会话ID使用会话池中的会话（不切换当前会话，多个会话可并发对话）
+        async for chunk in self.chat_manager.stream_chat(message, session_id=session_id):
             yield chunk
     
     def list_collections(self) -> list:
@@ -37,25 +37,19 @@ def execute_chat(
     )
     
     try:
-        # 确保会话存在
-        if request.session_id:
-            current_session = chat_manager.get_current_session()
-            if not current_session or current_session.session_id != request.session_id:
-                chat_manager.start_session(session_id=request.session_id)
-        elif not chat_manager.get_current_session():
-            chat_manager.start_session()
+        # 按会话ID使用会话池中的会话；未指定时创建新会话（不使用进程内共享的当前会话）
+        session_id = request.session_id or chat_manager.sessions.new().session_id
+        answer, sources, reasoning_content = chat_manager.chat(request.message, session_id=session_id)
         
-        # 执行对话
-        answer, sources, reasoning_content = chat_manager.chat(request.message)
-        
-        # 获取当前会话
-        session = chat_manager.get_current_session()
+        # 获取本次对话的会话
+        context = chat_manager.sessions.get(session_id, create=False)
+        session = context.session if context else None
         
         # 转换为响应格式
         response = ChatResponse(
             answer=answer,
             sources=sources,
-            session_id=session.session_id if session else None,
+            session_id=session_id,
             turn_count=len(session.history) if session else 0,
             metadata={
                 'user_id': user_id,
@@ -67,7 +61,7 @@ def execute_chat(
         logger.info(
             "对话成功",
             user_id=user_id,
-            session_id=session.session_id if session else None,
+            session_id=session_id,
             turn_count=response.turn_count
         )
         return response
@@ -12,6 +12,7 @@ RAG引擎模块 - 完整的RAG流程引擎
 - formatting/：响应格式化
 - routing/：查询路由
 - processing/：查询处理和执行
+- caching/：查询回答缓存
 - utils/：工具函数
 
 注意：为了优化启动时间，大部分导入已改为延迟导入。
@@ -85,6 +86,9 @@ def __getattr__(name):
     elif name == 'extract_sources_from_response':
         from backend.business.rag_engine.utils.utils import extract_sources_from_response
         return extract_sources_from_response
+    elif name in ('QueryResponseCache', 'get_response_cache', 'reset_response_cache'):
+        from backend.business.rag_engine import caching
+        return getattr(caching, name)
     raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 __all__ = [
@@ -111,6 +115,10 @@ __all__ = [
     'reset_query_processor',
     'execute_query',
     'create_postprocessors',
+    # 缓存
+    'QueryResponseCache',
+    'get_response_cache',
+    'reset_response_cache',
     # 工具函数
     'format_sources',
     'handle_fallback',
@@ -386,7 +386,10 @@ class AgenticQueryEngine:
         """
         # 当前版本：降级为非流式查询
         logger.warning("AgenticQueryEngine 暂不支持流式查询，降级为非流式")
-        answer, sources, reasoning_content, _ = self.query(question, collect_trace=False)
+        # 同步查询在线程中执行，不阻塞事件循环
+        answer, sources, reasoning_content, _ = await asyncio.to_thread(
+            self.query, question, collect_trace=False
+        )
         
         # 模拟流式输出
         for char in answer:
@@ -0,0 +1,54 @@
+"""
+RAG引擎缓存模块
+
+主要功能：
+- QueryResponseCache类：查询回答缓存（精确层 + 可选语义层）
+- get_response_cache() / set_response_cache() / reset_response_cache()：全局回答缓存
+- CachedRetriever类 / with_retrieval_cache()：检索结果缓存
+- QueryRewriteCache类 / get_query_cache()：查询改写缓存（可持久化，多实例/多进程共享）
+- LRUTTLCache类：线程安全的 LRU + TTL 内存缓存
+"""
+
+from backend.business.rag_engine.caching.lru import LRUTTLCache
+from backend.business.rag_engine.caching.query_cache import (
+    QueryRewriteCache,
+    get_query_cache,
+    reset_query_cache,
+    set_query_cache,
+)
+from backend.business.rag_engine.caching.response_cache import (
+    CacheLookup,
+    CachedResponse,
+    QueryResponseCache,
+    get_response_cache,
+    normalize_query,
+    reset_response_cache,
+    set_response_cache,
+)
+from backend.business.rag_engine.caching.retrieval_cache import (
+    CachedRetriever,
+    get_retrieval_cache,
+    reset_retrieval_cache,
+    set_retrieval_cache,
+    with_retrieval_cache,
+)
+
+__all__ = [
+    'CacheLookup',
+    'CachedResponse',
+    'CachedRetriever',
+    'LRUTTLCache',
+    'QueryResponseCache',
+    'QueryRewriteCache',
+    'get_query_cache',
+    'get_response_cache',
+    'get_retrieval_cache',
+    'normalize_query',
+    'reset_query_cache',
+    'reset_response_cache',
+    'reset_retrieval_cache',
+    'set_query_cache',
+    'set_response_cache',
+    'set_retrieval_cache',
+    'with_retrieval_cache',
+]
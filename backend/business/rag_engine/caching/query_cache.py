@@ -0,0 +1,273 @@
+"""
+RAG引擎缓存模块 - 查询改写缓存：意图理解 + 改写结果的共享缓存
+
+主要功能：
+- QueryRewriteCache类：内存 LRU + TTL，可选 SQLite 持久化（多进程共享）
+- make_rewrite_key()：由 (标准化问题, 命名空间) 计算缓存键
+- get_query_cache()：获取全局查询改写缓存（按配置延迟创建）
+
+执行流程：
+1. 先查内存层，未命中再查 SQLite（命中后提升到内存层）
+2. 写入时同时写内存层；persist=True 时写入 SQLite，超出容量按最近访问时间淘汰
+
+特性：
+- 所有 QueryProcessor 实例共享（ChatManager 重建不再丢失缓存）
+- SQLite WAL 模式，多个工作进程可共享同一缓存文件
+- 线程安全，命中/未命中计数
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.infrastructure.config import config
+from backend.infrastructure.logger import get_logger
+from backend.business.rag_engine.caching.lru import LRUTTLCache
+
+logger = get_logger('rag_engine.caching')
+
+# 淘汰时清理到容量上限的比例，避免每次写入都触发淘汰
+_EVICT_TARGET_RATIO = 0.9
+
+
+def make_rewrite_key(normalized_query: str, namespace: str = "") -> str:
+    """计算查询改写缓存键"""
+    return hashlib.sha256(f"{namespace}\x00{normalized_query}".encode('utf-8')).hexdigest()
+
+
+class QueryRewriteCache:
+    """查询改写缓存（内存 LRU + TTL，可选 SQLite 持久化）"""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: Optional[float] = None,
+        db_path: Optional[Path] = None,
+    ):
+        """初始化查询改写缓存
+
+        Args:
+            max_entries: 最大条目数（内存层与持久层各自的上限）
+            ttl_seconds: 条目有效期（秒，None 或 0 表示不过期）
+            db_path: SQLite 文件路径（None 表示仅内存）
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds) if ttl_seconds else None
+        self.db_path = Path(db_path) if db_path else None
+        self._memory = LRUTTLCache(max_entries=self.max_entries, ttl_seconds=self.ttl_seconds)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_entries = 0
+
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_rewrites ("
+                "key TEXT PRIMARY KEY, "
+                "value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_query_rewrites_last_access ON query_rewrites(last_access)"
+            )
+            self._conn.commit()
+            self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM query_rewrites").fetchone()[0]
+            logger.info(f"📦 查询改写缓存: {self.db_path} (已有 {self._disk_entries} 条)")
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created_at + self.ttl_seconds <= now
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存
+
+        Returns:
+            缓存的处理结果副本，未命中返回None
+        """
+        value = self._memory.get(key)
+        if value is not None:
+            with self._lock:
+                self._hits += 1
+            return dict(value)
+
+        if self._conn is not None:
+            now = time.time()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM query_rewrites WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._is_expired(row[1], now):
+                    self._conn.execute("UPDATE query_rewrites SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self._hits += 1
+                    self._disk_hits += 1
+                    value = json.loads(row[0])
+                else:
+                    if row is not None:
+                        self._conn.execute("DELETE FROM query_rewrites WHERE key = ?", (key,))
+                        self._conn.commit()
+                        self._disk_entries = max(0, self._disk_entries - 1)
+                    self._misses += 1
+            if value is not None:
+                self._memory.put(key, value)
+                return dict(value)
+            return None
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key: str, value: Dict[str, Any], persist: bool = True) -> None:
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 处理结果（需可 JSON 序列化才能持久化）
+            persist: 是否写入持久层
+        """
+        value = dict(value)
+        self._memory.put(key, value)
+        if not persist or self._conn is None:
+            return
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"查询改写结果无法序列化，仅缓存在内存: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            existed = self._conn.execute(
+                "SELECT 1 FROM query_rewrites WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_rewrites (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._conn.commit()
+            if not existed:
+                self._disk_entries += 1
+            if self._disk_entries > self.max_entries:
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """按最近访问时间淘汰到容量上限以下（调用方需持有锁）"""
+        target = int(self.max_entries * _EVICT_TARGET_RATIO)
+        self._conn.execute(
+            "DELETE FROM query_rewrites WHERE key IN ("
+            "SELECT key FROM query_rewrites ORDER BY last_access ASC LIMIT ?)",
+            (max(0, self._disk_entries - target),),
+        )
+        self._conn.commit()
+        self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM query_rewrites").fetchone()[0]
+        logger.debug(f"🧹 查询改写缓存淘汰后剩余 {self._disk_entries} 条")
+
+    def clear(self) -> None:
+        """清空缓存（包括持久层）与计数"""
+        self._memory.clear()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_rewrites")
+                self._conn.commit()
+            self._disk_entries = 0
+            self._hits = self._disk_hits = self._misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return max(len(self._memory), self._disk_entries)
+
+    def get_stats(self) -> dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "path": str(self.db_path) if self.db_path else None,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total > 0 else 0.0,
+            }
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+
+
+# ============================================================
+# 全局缓存实例
+# ============================================================
+
+_global_query_cache: Optional[QueryRewriteCache] = None
+_global_cache_initialized = False
+_global_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> Optional[QueryRewriteCache]:
+    """获取全局查询改写缓存（按配置延迟创建）
+
+    Returns:
+        QueryRewriteCache实例，未启用时返回None
+    """
+    global _global_query_cache, _global_cache_initialized
+
+    if _global_cache_initialized:
+        return _global_query_cache
+
+    with _global_cache_lock:
+        if _global_cache_initialized:
+            return _global_query_cache
+
+        if config.QUERY_CACHE_ENABLE:
+            db_path = config.QUERY_CACHE_PATH if config.QUERY_CACHE_PERSIST else None
+            try:
+                _global_query_cache = QueryRewriteCache(
+                    max_entries=config.QUERY_CACHE_MAX_ENTRIES,
+                    ttl_seconds=config.QUERY_CACHE_TTL_SECONDS,
+                    db_path=db_path,
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  查询改写缓存持久化初始化失败，仅使用内存缓存: {e}")
+                _global_query_cache = QueryRewriteCache(
+                    max_entries=config.QUERY_CACHE_MAX_ENTRIES,
+                    ttl_seconds=config.QUERY_CACHE_TTL_SECONDS,
+                )
+
+        _global_cache_initialized = True
+        return _global_query_cache
+
+
+def set_query_cache(cache: Optional[QueryRewriteCache]) -> None:
+    """设置全局查询改写缓存（None 表示各 QueryProcessor 使用私有内存缓存）"""
+    global _global_query_cache, _global_cache_initialized
+    with _global_cache_lock:
+        _global_query_cache = cache
+        _global_cache_initialized = True
+
+
+def reset_query_cache() -> None:
+    """关闭并重置全局查询改写缓存（下次使用时按配置重新创建）"""
+    global _global_query_cache, _global_cache_initialized
+    with _global_cache_lock:
+        if _global_query_cache is not None:
+            _global_query_cache.close()
+        _global_query_cache = None
+        _global_cache_initialized = False
@@ -0,0 +1,356 @@
+"""
+RAG引擎缓存模块 - 查询结果缓存：相同/相近问题直接复用已生成的回答
+
+主要功能：
+- QueryResponseCache类：回答缓存（精确层 + 可选语义层），LRU + TTL
+- normalize_query()：问题标准化（全角半角、大小写、空白、结尾标点）
+- get_response_cache()：获取全局回答缓存（按配置延迟创建）
+
+执行流程：
+1. lookup()：按 (标准化问题, 引擎配置) 精确查找；未命中且启用语义层时，
+   计算问题向量，在同一配置、同一 collection 版本的条目中找余弦距离最近的
+2. 未命中时由调用方完成完整查询，再通过 store() 写入（复用 lookup 时算好的向量）
+
+特性：
+- 引擎配置（策略、top_k、阈值、模型、collection 等）不同的查询互不命中
+- collection 版本变化时该配置下的全部条目失效
+- 命中/未命中/语义命中/失效/淘汰计数
+- 线程安全
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.infrastructure.config import config
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('rag_engine.caching')
+
+_TRAILING_PUNCTUATION = "?？!！。.,，;；:：~～ "
+
+
+def normalize_query(query: str) -> str:
+    """标准化问题文本（用作缓存键）
+
+    NFKC 统一全角/半角，转小写，合并空白，去掉结尾标点。
+    """
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(_TRAILING_PUNCTUATION)
+
+
+@dataclass
+class CachedResponse:
+    """缓存的回答"""
+    answer: str
+    sources: List[dict]
+    reasoning_content: Optional[str]
+    query: str
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class CacheLookup:
+    """一次缓存查找的结果（未命中时用于写回）"""
+    key: str
+    scope: str
+    version: str
+    normalized_query: str
+    response: Optional[CachedResponse] = None
+    tier: Optional[str] = None  # exact / semantic
+    similarity: Optional[float] = None
+    embedding: Optional[np.ndarray] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.response is not None
+
+
+@dataclass
+class _Entry:
+    response: CachedResponse
+    scope: str
+    version: str
+    expires_at: float
+    embedding: Optional[np.ndarray] = None
+
+
+class QueryResponseCache:
+    """查询回答缓存（LRU + TTL，可选语义层）"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600,
+        semantic_enable: bool = False,
+        semantic_max_distance: float = 0.05,
+    ):
+        """初始化回答缓存
+
+        Args:
+            max_entries: 最大条目数（超出后按LRU淘汰）
+            ttl_seconds: 条目有效期（秒）
+            semantic_enable: 是否启用语义层
+            semantic_max_distance: 语义命中的最大余弦距离（1 - 余弦相似度）
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.semantic_enable = semantic_enable
+        self.semantic_max_distance = float(semantic_max_distance)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._scope_versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_scope(**engine_config: Any) -> str:
+        """由引擎配置生成作用域（配置不同的查询互不命中）"""
+        return "|".join(f"{k}={engine_config[k]}" for k in sorted(engine_config))
+
+    @staticmethod
+    def _make_key(scope: str, normalized_query: str) -> str:
+        return hashlib.sha256(f"{scope}\x00{normalized_query}".encode('utf-8')).hexdigest()
+
+    def _check_version_locked(self, scope: str, version: str) -> None:
+        """collection 版本变化时清除该作用域下的全部条目（调用方需持有锁）"""
+        previous = self._scope_versions.get(scope)
+        if previous == version:
+            return
+        self._scope_versions[scope] = version
+        if previous is None:
+            return
+        stale = [k for k, e in self._entries.items() if e.scope == scope]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._invalidations += len(stale)
+            logger.info(f"🧹 collection已变化，回答缓存失效 {len(stale)} 条")
+
+    def _semantic_match_locked(
+        self, scope: str, version: str, embedding: np.ndarray, now: float
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """在同一作用域内找余弦相似度最高的条目（调用方需持有锁）"""
+        keys, vectors = [], []
+        for key, entry in self._entries.items():
+            if (entry.embedding is not None and entry.scope == scope
+                    and entry.version == version and entry.expires_at > now):
+                keys.append(key)
+                vectors.append(entry.embedding)
+        if not keys:
+            return None, None
+        similarities = np.stack(vectors) @ embedding
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if 1.0 - similarity <= self.semantic_max_distance:
+            return keys[best], similarity
+        return None, similarity
+
+    @staticmethod
+    def _normalize_vector(vector: Any) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(array))
+        if not array.size or norm == 0.0:
+            return None
+        return array / norm
+
+    def lookup(
+        self,
+        query: str,
+        scope: str,
+        version: str,
+        embed_func: Optional[Callable[[str], List[float]]] = None,
+    ) -> CacheLookup:
+        """查找缓存
+
+        Args:
+            query: 用户问题
+            scope: 引擎配置作用域（make_scope() 生成）
+            version: collection 当前版本
+            embed_func: 问题向量化函数（启用语义层时使用）
+
+        Returns:
+            CacheLookup（hit 为 True 时 response 为缓存的回答）
+        """
+        normalized = normalize_query(query)
+        key = self._make_key(scope, normalized)
+        result = CacheLookup(key=key, scope=scope, version=version, normalized_query=normalized)
+        now = time.time()
+
+        with self._lock:
+            self._check_version_locked(scope, version)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                result.response, result.tier, result.similarity = entry.response, "exact", 1.0
+                return result
+            has_candidates = self.semantic_enable and embed_func is not None and any(
+                e.embedding is not None and e.scope == scope for e in self._entries.values()
+            )
+
+        if self.semantic_enable and embed_func is not None:
+            try:
+                result.embedding = self._normalize_vector(embed_func(normalized))
+            except Exception as e:
+                logger.warning(f"⚠️  回答缓存语义层向量化失败，仅使用精确匹配: {e}")
+
+        with self._lock:
+            if has_candidates and result.embedding is not None:
+                match_key, similarity = self._semantic_match_locked(scope, version, result.embedding, now)
+                result.similarity = similarity
+                if match_key is not None:
+                    self._entries.move_to_end(match_key)
+                    self._hits += 1
+                    self._semantic_hits += 1
+                    result.response, result.tier = self._entries[match_key].response, "semantic"
+                    return result
+            self._misses += 1
+        return result
+
+    def store(
+        self,
+        lookup: CacheLookup,
+        answer: str,
+        sources: List[dict],
+        reasoning_content: Optional[str] = None,
+    ) -> None:
+        """写入查询结果
+
+        Args:
+            lookup: 未命中时 lookup() 的返回值
+            answer: 回答
+            sources: 引用来源
+            reasoning_content: 推理链内容
+        """
+        if not answer:
+            return
+        response = CachedResponse(
+            answer=answer,
+            sources=list(sources or []),
+            reasoning_content=reasoning_content,
+            query=lookup.normalized_query,
+        )
+        with self._lock:
+            # 查询期间 collection 已变化，结果可能基于旧数据，不写入
+            if self._scope_versions.get(lookup.scope, lookup.version) != lookup.version:
+                return
+            self._scope_versions[lookup.scope] = lookup.version
+            self._entries[lookup.key] = _Entry(
+                response=response,
+                scope=lookup.scope,
+                version=lookup.version,
+                expires_at=time.time() + self.ttl_seconds,
+                embedding=lookup.embedding,
+            )
+            self._entries.move_to_end(lookup.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self) -> int:
+        """清除全部条目（保留计数）
+
+        Returns:
+            清除的条目数
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._scope_versions.clear()
+            self._invalidations += count
+        return count
+
+    def clear(self) -> None:
+        """清空缓存与计数"""
+        with self._lock:
+            self._entries.clear()
+            self._scope_versions.clear()
+            self._hits = self._semantic_hits = self._misses = 0
+            self._invalidations = self._evictions = 0
+
+    def get_stats(self) -> dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / total if total > 0 else 0.0,
+            }
+
+
+# ============================================================
+# 全局缓存实例
+# ============================================================
+
+_global_response_cache: Optional[QueryResponseCache] = None
+_global_cache_initialized = False
+_global_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[QueryResponseCache]:
+    """获取全局回答缓存（按配置延迟创建）
+
+    Returns:
+        QueryResponseCache实例，未启用时返回None
+    """
+    global _global_response_cache, _global_cache_initialized
+
+    if _global_cache_initialized:
+        return _global_response_cache
+
+    with _global_cache_lock:
+        if _global_cache_initialized:
+            return _global_response_cache
+
+        if config.RESPONSE_CACHE_ENABLE:
+            _global_response_cache = QueryResponseCache(
+                max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl_seconds=config.RESPONSE_CACHE_TTL_SECONDS,
+                semantic_enable=config.RESPONSE_CACHE_SEMANTIC_ENABLE,
+                semantic_max_distance=config.RESPONSE_CACHE_SEMANTIC_MAX_DISTANCE,
+            )
+            logger.info(
+                f"📦 回答缓存已启用 (上限 {config.RESPONSE_CACHE_MAX_ENTRIES} 条, "
+                f"TTL {config.RESPONSE_CACHE_TTL_SECONDS}s, "
+                f"语义层 {'开启' if config.RESPONSE_CACHE_SEMANTIC_ENABLE else '关闭'})"
+            )
+
+        _global_cache_initialized = True
+        return _global_response_cache
+
+
+def set_response_cache(cache: Optional[QueryResponseCache]) -> None:
+    """设置全局回答缓存（None 表示禁用）"""
+    global _global_response_cache, _global_cache_initialized
+    with _global_cache_lock:
+        _global_response_cache = cache
+        _global_cache_initialized = True
+
+
+def reset_response_cache() -> None:
+    """重置全局回答缓存（下次使用时按配置重新创建）"""
+    global _global_response_cache, _global_cache_initialized
+    with _global_cache_lock:
+        _global_response_cache = None
+        _global_cache_initialized = False
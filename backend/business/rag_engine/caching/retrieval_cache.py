@@ -0,0 +1,204 @@
+"""
+RAG引擎缓存模块 - 检索结果缓存：相同子查询不再重复访问向量存储
+
+主要功能：
+- CachedRetriever类：包装 LlamaIndex 检索器，按 (策略, top_k, collection 版本, 查询文本) 缓存结果
+- with_retrieval_cache()：为检索器套上缓存（未启用时原样返回）
+- get_retrieval_cache()：获取全局检索结果缓存（按配置延迟创建）
+
+执行流程：
+1. 取检索器所属索引的 collection 版本（Chroma collection 或内存 docstore）
+2. 命中则返回缓存节点的副本，未命中则调用原检索器并写入缓存
+
+特性：
+- 全局共享：每次调用都新建检索器的场景（Agentic 工具、研究内核）也能命中
+- collection 写入/删除后版本变化，旧结果自然不再命中
+- 返回 NodeWithScore 副本，后处理器修改分数不影响缓存
+- 未识别的索引类型不缓存
+"""
+
+import threading
+from typing import Any, List, Optional, Tuple
+
+from llama_index.core.retrievers import BaseRetriever as LlamaBaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from backend.infrastructure.config import config
+from backend.infrastructure.indexer.utils.version import get_collection_version
+from backend.infrastructure.logger import get_logger
+from backend.business.rag_engine.caching.lru import LRUTTLCache
+
+logger = get_logger('rag_engine.caching')
+
+
+def get_index_version(index: Any) -> Optional[str]:
+    """获取 VectorStoreIndex 的数据版本
+
+    docstore 中有节点时（内存索引）使用 docstore 标识与节点数，否则使用 Chroma collection 版本。
+
+    Returns:
+        版本字符串，无法识别时返回None（不缓存）
+    """
+    docstore = getattr(index, 'docstore', None)
+    docs = getattr(docstore, 'docs', None) if docstore is not None else None
+    if docs:
+        return f"docstore:{id(docstore)}:{len(docs)}"
+
+    collection = getattr(getattr(index, 'vector_store', None), 'client', None)
+    if collection is None or not hasattr(collection, 'count'):
+        return None
+    return get_collection_version(collection, max_age=config.RETRIEVAL_CACHE_VERSION_CHECK_SECONDS)
+
+
+def _copy_nodes(nodes: List[NodeWithScore]) -> List[NodeWithScore]:
+    return [NodeWithScore(node=n.node, score=n.score) for n in nodes]
+
+
+class CachedRetriever(LlamaBaseRetriever):
+    """带结果缓存的检索器包装"""
+
+    def __init__(
+        self,
+        retriever: LlamaBaseRetriever,
+        index: Any,
+        strategy: str,
+        similarity_top_k: int,
+        cache: LRUTTLCache,
+    ):
+        """初始化缓存检索器
+
+        Args:
+            retriever: 原检索器
+            index: 检索器所属的 VectorStoreIndex（用于取 collection 版本）
+            strategy: 检索策略名称
+            similarity_top_k: Top-K值
+            cache: 结果缓存
+        """
+        self._retriever = retriever
+        self._index = index
+        self.strategy = strategy
+        self.similarity_top_k = similarity_top_k
+        self._cache = cache
+        super().__init__(callback_manager=getattr(retriever, 'callback_manager', None))
+
+    def __getattr__(self, name: str) -> Any:
+        retriever = self.__dict__.get('_retriever')
+        if retriever is None:
+            raise AttributeError(name)
+        return getattr(retriever, name)
+
+    @property
+    def retriever(self) -> LlamaBaseRetriever:
+        """原检索器"""
+        return self._retriever
+
+    def _cache_key(self, query_bundle: QueryBundle) -> Optional[Tuple]:
+        try:
+            version = get_index_version(self._index)
+        except Exception as e:
+            logger.debug(f"获取collection版本失败，不使用检索缓存: {e}")
+            return None
+        if version is None:
+            return None
+        query = " ".join(query_bundle.query_str.split())
+        return (self.strategy, self.similarity_top_k, version, query)
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        key = self._cache_key(query_bundle)
+        if key is None:
+            return self._retriever.retrieve(query_bundle)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.debug(f"检索缓存命中: {self.strategy} '{key[3][:30]}' ({len(cached)} 个节点)")
+            return _copy_nodes(cached)
+        nodes = self._retriever.retrieve(query_bundle)
+        self._cache.put(key, _copy_nodes(nodes))
+        return nodes
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        key = self._cache_key(query_bundle)
+        if key is None:
+            return await self._retriever.aretrieve(query_bundle)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return _copy_nodes(cached)
+        nodes = await self._retriever.aretrieve(query_bundle)
+        self._cache.put(key, _copy_nodes(nodes))
+        return nodes
+
+
+def with_retrieval_cache(
+    retriever: LlamaBaseRetriever,
+    index: Any,
+    strategy: str,
+    similarity_top_k: int,
+) -> LlamaBaseRetriever:
+    """为检索器套上全局检索结果缓存
+
+    Args:
+        retriever: 原检索器
+        index: 检索器所属的 VectorStoreIndex
+        strategy: 检索策略名称（不同策略互不命中）
+        similarity_top_k: Top-K值
+
+    Returns:
+        CachedRetriever，未启用缓存时返回原检索器
+    """
+    cache = get_retrieval_cache()
+    if cache is None or isinstance(retriever, CachedRetriever):
+        return retriever
+    return CachedRetriever(retriever, index, strategy, similarity_top_k, cache)
+
+
+# ============================================================
+# 全局缓存实例
+# ============================================================
+
+_global_retrieval_cache: Optional[LRUTTLCache] = None
+_global_cache_initialized = False
+_global_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> Optional[LRUTTLCache]:
+    """获取全局检索结果缓存（按配置延迟创建）
+
+    Returns:
+        LRUTTLCache实例，未启用时返回None
+    """
+    global _global_retrieval_cache, _global_cache_initialized
+
+    if _global_cache_initialized:
+        return _global_retrieval_cache
+
+    with _global_cache_lock:
+        if _global_cache_initialized:
+            return _global_retrieval_cache
+
+        if config.RETRIEVAL_CACHE_ENABLE:
+            _global_retrieval_cache = LRUTTLCache(
+                max_entries=config.RETRIEVAL_CACHE_MAX_ENTRIES,
+                ttl_seconds=config.RETRIEVAL_CACHE_TTL_SECONDS,
+            )
+            logger.info(
+                f"📦 检索结果缓存已启用 (上限 {config.RETRIEVAL_CACHE_MAX_ENTRIES} 条, "
+                f"TTL {config.RETRIEVAL_CACHE_TTL_SECONDS}s)"
+            )
+
+        _global_cache_initialized = True
+        return _global_retrieval_cache
+
+
+def set_retrieval_cache(cache: Optional[LRUTTLCache]) -> None:
+    """设置全局检索结果缓存（None 表示禁用）"""
+    global _global_retrieval_cache, _global_cache_initialized
+    with _global_cache_lock:
+        _global_retrieval_cache = cache
+        _global_cache_initialized = True
+
+
+def reset_retrieval_cache() -> None:
+    """重置全局检索结果缓存（下次使用时按配置重新创建）"""
+    global _global_retrieval_cache, _global_cache_initialized
+    with _global_cache_lock:
+        _global_retrieval_cache = None
+        _global_cache_initialized = False
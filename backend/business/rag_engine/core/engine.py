@@ -4,14 +4,20 @@ RAG引擎核心模块：ModularQueryEngine类实现
 主要功能：
 - ModularQueryEngine类：模块化查询引擎，支持vector、bm25、hybrid、grep、multi等策略
 - query()：执行查询，返回格式化的回答和引用来源
-- stream_query()：流式查询，实时返回答案token
+- stream_query()：流式查询，实时返回答案token（不阻塞事件循环）
+- query() 先查回答缓存（精确/语义），命中时跳过查询处理、检索、重排序和生成
+- 推测检索：查询改写（LLM）进行期间先用原始问题并行检索，改写几乎相同时直接使用结果
+- 多查询检索：对全部改写查询并行检索（批量计算查询向量），RRF 融合
 """
 
+import asyncio
 import time
 from typing import List, Optional, Tuple, Dict, Any
 from llama_index.core.query_engine import RetrieverQueryEngine
 
+from backend.infrastructure.config import config
 from backend.infrastructure.indexer import IndexManager
+from backend.infrastructure.indexer.utils.version import get_collection_version
 from backend.infrastructure.logger import get_logger
 from backend.business.rag_engine.formatting import ResponseFormatter
 from backend.infrastructure.observers.manager import ObserverManager
@@ -19,6 +25,7 @@ from backend.business.rag_engine.processing.execution import create_postprocesso
 from backend.business.rag_engine.processing.query_processor import QueryProcessor
 from backend.business.rag_engine.utils.utils import handle_fallback
 from backend.business.rag_engine.models import QueryContext, QueryResult, SourceModel
+from backend.business.rag_engine.caching import CacheLookup, QueryResponseCache, get_response_cache
 from backend.business.rag_engine.core.engine_setup import (
     load_engine_config,
     setup_observer_manager,
@@ -33,6 +40,16 @@ from backend.business.rag_engine.core.engine_execution import (
     execute_with_query_engine,
 )
 from backend.business.rag_engine.core.engine_streaming import execute_stream_query
+from backend.business.rag_engine.core.engine_speculative import (
+    PrefetchedRetriever,
+    PrefetchResult,
+    speculative_process_and_retrieve,
+)
+from backend.business.rag_engine.retrieval.multi_query import (
+    EMBEDDING_STRATEGIES,
+    multi_query_retrieve,
+    rewrite_queries,
+)
 
 logger = get_logger('rag_engine')
 
@@ -56,6 +73,7 @@ class ModularQueryEngine:
         enable_markdown_formatting: bool = True,
         observer_manager: Optional[ObserverManager] = None,
         enable_auto_routing: Optional[bool] = None,
+        enable_speculative_retrieval: Optional[bool] = None,
         **kwargs
     ):
         """初始化模块化查询引擎"""
@@ -75,7 +93,13 @@ class ModularQueryEngine:
         self.formatter = ResponseFormatter(enable_formatting=enable_markdown_formatting)
         self.observer_manager = setup_observer_manager(observer_manager)
         self.llm = setup_llm(api_key, model)
-        self.query_processor = QueryProcessor(llm=self.llm)
+        self.model_name = model or config.LLM_MODEL
+        self.enable_markdown_formatting = enable_markdown_formatting
+        self.enable_speculative_retrieval = (
+            enable_speculative_retrieval if enable_speculative_retrieval is not None
+            else config.SPECULATIVE_RETRIEVAL_ENABLE
+        )
+        self.query_processor = QueryProcessor(llm=self.llm, observer_manager=self.observer_manager)
         logger.info("查询处理器已初始化", note="标准化流程：意图理解+改写")
         
         # 初始化路由和检索组件
@@ -150,13 +174,143 @@ class ModularQueryEngine:
             query_processing_result
         )
     
+    def _resolve_retriever(
+        self,
+        query: str,
+        understanding: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, str]:
+        """解析查询使用的检索器（自动路由模式下按路由决策）"""
+        if self.enable_auto_routing and self.query_router:
+            if understanding:
+                return self.query_router.route_with_understanding(
+                    query, understanding=understanding, top_k=self.similarity_top_k
+                )
+            return self.query_router.route(query, top_k=self.similarity_top_k)
+        return self.retriever, self.retrieval_strategy
+    
+    def _multi_query_limit(self) -> int:
+        """多查询检索最多检索的改写查询数（1 表示只检索 final_query）"""
+        return max(1, config.MULTI_QUERY_MAX_QUERIES) if config.MULTI_QUERY_ENABLE else 1
+    
+    def _query_embed_model(self):
+        """批量计算改写查询向量使用的模型"""
+        return getattr(self.index_manager, 'embed_model', None)
+    
+    def _process_query(self, question: str) -> Tuple[Dict[str, Any], Optional[PrefetchResult]]:
+        """查询处理，并在查询引擎执行前完成检索（推测检索/多查询检索）
+        
+        Returns:
+            (查询处理结果, 已检索的节点（None 表示由查询引擎检索）)
+        """
+        if self.enable_speculative_retrieval:
+            prefetch = speculative_process_and_retrieve(
+                self.query_processor,
+                question,
+                self._resolve_retriever,
+                self.similarity_top_k,
+                similarity_threshold=config.SPECULATIVE_RETRIEVAL_SIMILARITY_THRESHOLD,
+                max_queries=self._multi_query_limit(),
+                embed_model=self._query_embed_model(),
+            )
+            return prefetch.processed, prefetch
+        
+        processed = self.query_processor.process(question)
+        queries = rewrite_queries(processed, self._multi_query_limit())
+        if len(queries) <= 1:
+            return processed, None
+        retriever, strategy = self._resolve_retriever(processed["final_query"], processed.get("understanding"))
+        if retriever is None:
+            return processed, None
+        nodes = multi_query_retrieve(
+            retriever,
+            queries,
+            self.similarity_top_k,
+            embed_model=self._query_embed_model() if strategy in EMBEDDING_STRATEGIES else None,
+        )
+        return processed, PrefetchResult(processed, nodes, strategy, "multi_query", queries=queries)
+    
+    def _response_cache_scope(self) -> str:
+        """回答缓存作用域：影响回答的引擎配置"""
+        return QueryResponseCache.make_scope(
+            collection=getattr(self.index_manager, 'collection_name', ''),
+            strategy=self.retrieval_strategy,
+            top_k=self.similarity_top_k,
+            cutoff=self.similarity_cutoff,
+            rerank=self.enable_rerank,
+            rerank_top_n=self.rerank_top_n,
+            reranker=self.reranker_type,
+            auto_routing=self.enable_auto_routing,
+            model=self.model_name,
+            markdown=self.enable_markdown_formatting,
+        )
+    
+    def _embed_for_cache(self, text: str) -> List[float]:
+        """回答缓存语义层使用的问题向量"""
+        return self.index_manager.embed_model.get_query_embedding(text)
+    
+    def _lookup_response_cache(
+        self,
+        cache: QueryResponseCache,
+        question: str,
+    ) -> Optional[CacheLookup]:
+        """查找回答缓存（失败时返回None，按未启用缓存处理）"""
+        try:
+            version = get_collection_version(
+                self.index_manager, max_age=config.RESPONSE_CACHE_VERSION_CHECK_SECONDS
+            )
+            return cache.lookup(
+                question,
+                self._response_cache_scope(),
+                version,
+                embed_func=self._embed_for_cache,
+            )
+        except Exception as e:
+            logger.warning("查询回答缓存失败，执行完整查询", error=str(e))
+            return None
+    
+    def _notify_cache_event(self, cache_lookup: CacheLookup) -> None:
+        """向观察器上报回答缓存命中情况"""
+        observer_manager = getattr(self, 'observer_manager', None)
+        if observer_manager is None or not hasattr(observer_manager, 'on_cache_event'):
+            return
+        try:
+            observer_manager.on_cache_event("response", cache_lookup.hit, tier=cache_lookup.tier)
+        except Exception as e:
+            logger.debug("上报回答缓存事件失败", error=str(e))
+    
     def query(
         self, 
         question: str, 
         collect_trace: bool = False
     ) -> Tuple[str, List[dict], Optional[str], Optional[Dict[str, Any]]]:
         """执行查询（兼容现有API）"""
-        processed = self.query_processor.process(question)
+        cache = get_response_cache()
+        cache_lookup = self._lookup_response_cache(cache, question) if cache is not None else None
+        if cache_lookup is not None:
+            self._notify_cache_event(cache_lookup)
+        if cache_lookup is not None and cache_lookup.hit:
+            cached = cache_lookup.response
+            logger.info(
+                "回答缓存命中",
+                tier=cache_lookup.tier,
+                similarity=round(cache_lookup.similarity or 0.0, 4),
+                query=question[:50] if len(question) > 50 else question,
+            )
+            trace_info = None
+            if collect_trace:
+                trace_info = {
+                    "original_query": question,
+                    "response_cache": {
+                        "hit": True,
+                        "tier": cache_lookup.tier,
+                        "similarity": cache_lookup.similarity,
+                        "cached_query": cached.query,
+                        "age_seconds": round(time.time() - cached.created_at, 1),
+                    },
+                }
+            return cached.answer, [dict(s) for s in cached.sources], cached.reasoning_content, trace_info
+        
+        processed, prefetch = self._process_query(question)
         final_query = processed["final_query"]
         understanding = processed.get("understanding")
         
@@ -167,7 +321,11 @@ class ModularQueryEngine:
             processing_method=processed['processing_method']
         )
         
-        query_engine, strategy_info = self._get_or_create_query_engine(final_query, understanding)
+        if prefetch is not None:
+            query_engine = self._create_query_engine_from_retriever(PrefetchedRetriever(prefetch.nodes))
+            strategy_info = f"策略={prefetch.strategy}, 原因=已预先检索（{prefetch.mode}）"
+        else:
+            query_engine, strategy_info = self._get_or_create_query_engine(final_query, understanding)
         logger.info("使用检索策略", strategy_info=strategy_info)
         
         answer, sources, reasoning_content, trace_info = self._execute_with_query_engine(
@@ -178,12 +336,19 @@ class ModularQueryEngine:
             trace_info["original_query"] = question
             trace_info["processed_query"] = final_query
             trace_info["query_processing"] = processed
+            if prefetch is not None:
+                trace_info["prefetched_retrieval"] = prefetch.to_trace()
         
         answer, fallback_reason = handle_fallback(answer, sources, question, self.llm, self.similarity_cutoff)
         
         if collect_trace and trace_info:
             trace_info['fallback_used'] = bool(fallback_reason)
             trace_info['fallback_reason'] = fallback_reason
+            trace_info['response_cache'] = {"hit": False}
+        
+        # 降级回答（无来源 / 相似度过低 / 空回答）不缓存：索引恢复后应重新检索
+        if cache_lookup is not None and not fallback_reason:
+            cache.store(cache_lookup, answer, sources, reasoning_content)
         
         return answer, sources, reasoning_content, trace_info
     
@@ -243,8 +408,9 @@ class ModularQueryEngine:
         Yields:
             dict: 流式响应字典
         """
-        # Step 1: 查询处理（标准化流程：意图理解+改写）
-        processed = self.query_processor.process(question)
+        # Step 1: 查询处理（标准化流程：意图理解+改写；启用时并行推测检索/多查询检索）
+        # 包含同步 LLM 调用与检索，在线程中执行，不阻塞事件循环
+        processed, prefetch = await asyncio.to_thread(self._process_query, question)
         final_query = processed["final_query"]
         understanding = processed.get("understanding")
         
@@ -267,15 +433,21 @@ class ModularQueryEngine:
 
         try:
             # 执行流式查询
+            retriever, query_router = self.retriever, self.query_router
+            enable_auto_routing, retrieval_strategy = self.enable_auto_routing, self.retrieval_strategy
+            if prefetch is not None:
+                # 已预先检索到节点，不再路由和检索
+                retriever, query_router = PrefetchedRetriever(prefetch.nodes), None
+                enable_auto_routing, retrieval_strategy = False, prefetch.strategy
             async for result in execute_stream_query(
                 self.llm,
                 self.formatter,
                 self.query_processor,
-                self.retriever,
+                retriever,
                 self.postprocessors,
-                self.query_router,
-                self.enable_auto_routing,
-                self.retrieval_strategy,
+                query_router,
+                enable_auto_routing,
+                retrieval_strategy,
                 self.similarity_top_k,
                 final_query,
                 understanding
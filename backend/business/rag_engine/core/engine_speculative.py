@@ -0,0 +1,160 @@
+"""
+RAG引擎推测检索模块：查询改写（LLM 调用）进行期间，先用原始问题并行检索
+
+主要功能：
+- PrefetchedRetriever类：返回已检索节点的检索器，交给查询引擎做后处理与生成
+- PrefetchResult类：查询引擎执行前已检索的节点及其来源
+- speculative_process_and_retrieve()：并行执行查询处理与原始问题检索，并决定如何使用推测结果
+- is_near_identical()：判断改写后的查询与原始问题是否几乎相同
+
+执行流程：
+1. 按原始问题解析检索器（自动路由模式下按规则路由，不调用LLM），提交推测检索
+2. 当前线程执行查询处理（意图理解 + 改写）
+3. 按改写结果解析最终检索器：
+   - 检索器相同且所有改写都与原问题几乎相同：直接使用推测结果（reused）
+   - 检索器相同但有不同的改写：并行检索这些改写，与推测结果 RRF 融合（fused）
+   - 检索器不同：丢弃推测结果，只检索改写后的查询（discarded）
+
+特性：
+- 改写查询的检索走多查询并行检索（批量计算查询向量）
+- 融合按 RRF 排序并保留最高原始分数，相似度过滤阈值仍然有效
+- 推测检索失败时退化为只检索改写后的查询
+- 推测检索与改写后检索都经过检索结果缓存
+"""
+
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from llama_index.core.retrievers import BaseRetriever as LlamaBaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from backend.infrastructure.logger import get_logger
+from backend.business.rag_engine.caching.response_cache import normalize_query
+from backend.business.rag_engine.retrieval.multi_query import (
+    EMBEDDING_STRATEGIES,
+    multi_query_retrieve,
+    rewrite_queries,
+)
+from backend.business.rag_engine.utils.executor import get_retrieval_executor
+
+logger = get_logger('rag_engine')
+
+# (查询, 意图理解) -> (检索器, 策略名称)
+RetrieverResolver = Callable[[str, Optional[Dict[str, Any]]], Tuple[Any, str]]
+
+
+class PrefetchedRetriever(LlamaBaseRetriever):
+    """返回已检索节点的检索器"""
+
+    native_async = True  # 不访问外部服务，aretrieve 不阻塞事件循环
+
+    def __init__(self, nodes: List[NodeWithScore]):
+        self._nodes = list(nodes)
+        super().__init__()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return [NodeWithScore(node=n.node, score=n.score) for n in self._nodes]
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return self._retrieve(query_bundle)
+
+
+@dataclass
+class PrefetchResult:
+    """查询引擎执行前已检索的节点（推测检索或多查询检索）"""
+    processed: Dict[str, Any]
+    nodes: List[NodeWithScore]
+    strategy: str
+    mode: str  # 推测检索："reused" | "fused" | "discarded" | "fallback"；未启用推测检索："multi_query"
+    similarity: Optional[float] = None  # final_query 与原始问题的字符相似度
+    queries: List[str] = field(default_factory=list)  # 推测检索之外实际检索的查询
+
+    def to_trace(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "similarity": round(self.similarity, 4) if self.similarity is not None else None,
+            "strategy": self.strategy,
+            "queries": list(self.queries),
+        }
+
+
+def is_near_identical(original: str, rewritten: str, threshold: float) -> Tuple[bool, float]:
+    """判断改写后的查询与原始问题是否几乎相同
+
+    Returns:
+        (是否几乎相同, 标准化后的字符相似度)
+    """
+    a, b = normalize_query(original), normalize_query(rewritten)
+    if a == b:
+        return True, 1.0
+    similarity = SequenceMatcher(None, a, b).ratio()
+    return similarity >= threshold, similarity
+
+
+def speculative_process_and_retrieve(
+    query_processor,
+    question: str,
+    resolve_retriever: RetrieverResolver,
+    similarity_top_k: int,
+    similarity_threshold: float = 0.9,
+    max_queries: int = 1,
+    embed_model: Any = None,
+) -> PrefetchResult:
+    """并行执行查询处理与原始问题检索
+
+    Args:
+        query_processor: 查询处理器
+        question: 原始问题
+        resolve_retriever: 按 (查询, 意图理解) 解析检索器的函数
+        similarity_top_k: 融合后保留的节点数
+        similarity_threshold: 视为几乎相同的字符相似度阈值
+        max_queries: 最多检索的改写查询数（1 表示只检索 final_query）
+        embed_model: 批量计算查询向量的模型（仅向量检索使用）
+
+    Returns:
+        PrefetchResult
+    """
+    speculative_retriever, speculative_strategy = resolve_retriever(question, None)
+    future: Optional[Future] = None
+    if speculative_retriever is not None:
+        future = get_retrieval_executor().submit(speculative_retriever.retrieve, question)
+
+    processed = query_processor.process(question)
+    final_query = processed["final_query"]
+    retriever, strategy = resolve_retriever(final_query, processed.get("understanding"))
+    _, similarity = is_near_identical(question, final_query, similarity_threshold)
+    queries = rewrite_queries(processed, max(1, max_queries))
+    embed_model = embed_model if strategy in EMBEDDING_STRATEGIES else None
+
+    speculative_nodes: Optional[List[NodeWithScore]] = None
+    if future is not None and retriever is speculative_retriever:
+        try:
+            speculative_nodes = list(future.result() or [])
+        except Exception as e:
+            logger.warning("推测检索失败，只检索改写后的查询", error=str(e))
+
+    if speculative_nodes is None:
+        mode = "discarded" if future is not None and retriever is not speculative_retriever else "fallback"
+        nodes = multi_query_retrieve(retriever, queries, similarity_top_k, embed_model) if retriever is not None else []
+        logger.info("推测检索未使用", mode=mode, strategy=strategy, speculative_strategy=speculative_strategy)
+        return PrefetchResult(processed, nodes, strategy, mode, similarity, queries)
+
+    # 与原问题几乎相同的改写由推测结果代替，不再检索
+    pending = [q for q in queries if not is_near_identical(question, q, similarity_threshold)[0]]
+    if not pending:
+        logger.info("推测检索结果直接使用", similarity=round(similarity, 4), nodes=len(speculative_nodes))
+        return PrefetchResult(processed, speculative_nodes, strategy, "reused", similarity)
+
+    nodes = multi_query_retrieve(
+        retriever, pending, similarity_top_k, embed_model, precomputed={question: speculative_nodes}
+    )
+    logger.info(
+        "推测检索结果已融合",
+        similarity=round(similarity, 4),
+        queries=len(pending),
+        original=len(speculative_nodes),
+        merged=len(nodes),
+    )
+    return PrefetchResult(processed, nodes, strategy, "fused", similarity, pending)
@@ -5,12 +5,21 @@ RAG引擎流式查询模块：处理流式查询逻辑
 - 流式查询执行
 - 实时 token 输出
 - 推理链提取
+
+特性：
+- 全程不阻塞事件循环：路由与同步检索在线程中执行，原生异步检索器直接 await
+- 后处理（重排序等CPU密集操作）在独立的全局线程池中执行
+- 生成使用 llm.astream_chat，单个 worker 可同时服务多个流式请求
 """
 
+import asyncio
 import time
-from typing import Dict, Any, Optional
+from functools import partial
+from typing import Dict, Any, List, Optional
 
 from backend.infrastructure.logger import get_logger
+from backend.business.rag_engine.retrieval.async_retrieve import aretrieve_nodes
+from backend.business.rag_engine.utils.executor import get_retrieval_executor
 from backend.business.rag_engine.formatting import ResponseFormatter
 from backend.infrastructure.llms.reasoning import extract_reasoning_from_stream_chunk
 from backend.infrastructure.llms import extract_reasoning_content
@@ -18,6 +27,16 @@ from backend.infrastructure.llms.message_builder import build_chat_messages
 
 logger = get_logger('rag_engine')
 
+# 后处理（重排序）使用独立线程池，避免占满检索线程池
+POSTPROCESS_EXECUTOR_NAME = "postprocess"
+
+
+def _apply_postprocessors(postprocessors, nodes_with_scores: List, query_str: str) -> List:
+    """依次执行后处理器（同步，在线程池中调用）"""
+    for postprocessor in postprocessors:
+        nodes_with_scores = postprocessor.postprocess_nodes(nodes_with_scores, query_str=query_str)
+    return nodes_with_scores
+
 
 async def execute_stream_query(
     llm,
@@ -55,15 +74,17 @@ async def execute_stream_query(
     strategy_info = ""
     
     if enable_auto_routing and query_router:
-        # 自动路由模式
+        # 自动路由模式（可能创建检索器，在线程中执行）
         if understanding:
-            actual_retriever, routing_decision = query_router.route_with_understanding(
+            actual_retriever, routing_decision = await asyncio.to_thread(
+                query_router.route_with_understanding,
                 final_query,
                 understanding=understanding,
                 top_k=similarity_top_k
             )
         else:
-            actual_retriever, routing_decision = query_router.route(
+            actual_retriever, routing_decision = await asyncio.to_thread(
+                query_router.route,
                 final_query,
                 top_k=similarity_top_k
             )
@@ -83,16 +104,15 @@ async def execute_stream_query(
     
     try:
         if actual_retriever:
-            # 执行检索
-            nodes_with_scores = actual_retriever.retrieve(final_query)
+            # 执行检索（不阻塞事件循环）
+            nodes_with_scores = await aretrieve_nodes(actual_retriever, final_query)
             
-            # 应用后处理
+            # 应用后处理（重排序为CPU密集操作，在独立线程池中执行）
             if postprocessors:
-                for postprocessor in postprocessors:
-                    nodes_with_scores = postprocessor.postprocess_nodes(
-                        nodes_with_scores,
-                        query_str=final_query
-                    )
+                nodes_with_scores = await asyncio.get_running_loop().run_in_executor(
+                    get_retrieval_executor(POSTPROCESS_EXECUTOR_NAME),
+                    partial(_apply_postprocessors, postprocessors, nodes_with_scores, final_query),
+                )
             
             # 转换为引用来源格式
             for i, node_with_score in enumerate(nodes_with_scores, 1):
@@ -138,8 +158,8 @@ async def execute_stream_query(
         
         logger.debug("🚀 开始直接流式调用 DeepSeek API")
         
-        # 直接调用 DeepSeek 的 stream_chat（绕过 LlamaIndex 缓冲）
-        for chunk in llm.stream_chat(messages):
+        # 直接调用 DeepSeek 的 astream_chat（绕过 LlamaIndex 缓冲，等待 token 时不阻塞事件循环）
+        async for chunk in await llm.astream_chat(messages):
             # 提取推理链内容（流式）
             chunk_reasoning = extract_reasoning_from_stream_chunk(chunk)
             if chunk_reasoning:
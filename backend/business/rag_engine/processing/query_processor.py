@@ -14,11 +14,13 @@ RAG引擎查询处理模块 - 查询处理器：统一处理意图理解和查
 特性：
 - 分层决策（简单查询不走LLM）
 - 一次LLM调用完成意图理解和改写
-- 缓存机制（LRU）
+- 共享缓存（LRU + TTL，按标准化问题寻址，LLM结果持久化到 SQLite，多实例/多进程共享）
+- 缓存命中情况通过观察器上报
 - 完整的错误处理和降级
 - 模板文件化：支持从文件加载模板，方便修改
 """
 
+import hashlib
 import json
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -26,6 +28,12 @@ from typing import Dict, Any, Optional, List
 from backend.infrastructure.config import config
 from backend.infrastructure.logger import get_logger
 from backend.infrastructure.llms import create_deepseek_llm_for_structure
+from backend.business.rag_engine.caching.query_cache import (
+    QueryRewriteCache,
+    get_query_cache,
+    make_rewrite_key,
+)
+from backend.business.rag_engine.caching.response_cache import normalize_query
 
 logger = get_logger('rag_engine.processing.query_processor')
 
@@ -84,7 +92,9 @@ class QueryProcessor:
         self, 
         llm=None, 
         domain_keywords: Optional[List[str]] = None,
-        template_path: Optional[str] = None
+        template_path: Optional[str] = None,
+        cache: Optional[QueryRewriteCache] = None,
+        observer_manager=None,
     ):
         """初始化查询处理器
         
@@ -92,17 +102,24 @@ class QueryProcessor:
             llm: LLM实例（可选，默认使用DeepSeek）
             domain_keywords: 领域关键词列表（可选）
             template_path: 模板文件路径（可选，默认使用 query_rewrite_template.txt）
+            cache: 查询改写缓存（可选，默认使用全局共享缓存；未启用时使用私有内存缓存）
+            observer_manager: 观察器管理器（可选，用于上报缓存命中）
         """
         self._llm = llm
         self._llm_initialized = False
         self.domain_keywords = domain_keywords or []
+        self.observer_manager = observer_manager
         
         # 加载模板
         self.template = self._load_template(template_path)
         
-        # 缓存（LRU，最多100个）
-        self._cache = {}
-        self._cache_size = 100
+        # 缓存（默认全局共享；未启用共享缓存时退化为私有内存LRU，最多100个）
+        if cache is None:
+            cache = get_query_cache()
+        self._owns_cache = cache is None
+        self._cache = cache if cache is not None else QueryRewriteCache(max_entries=100)
+        self._cache_epoch = 0
+        self._namespace = self._cache_namespace()
         
         template_source = "file" if template_path or self._template_file_exists() else "default"
         logger.info("查询处理器初始化完成", template_source=template_source)
@@ -238,11 +255,15 @@ class QueryProcessor:
             - processing_method: 处理方式（"simple" / "llm"）
         """
         # 检查缓存
-        if use_cache and query in self._cache:
-            logger.debug("使用缓存的处理结果", query=query[:50] if len(query) > 50 else query)
-            cached_result = self._cache[query].copy()
-            cached_result["from_cache"] = True
-            return cached_result
+        cache_key = self._cache_key(query, force_llm)
+        if use_cache:
+            cached_result = self._cache.get(cache_key)
+            self._notify_cache_event(cached_result is not None)
+            if cached_result is not None:
+                logger.debug("使用缓存的处理结果", query=query[:50] if len(query) > 50 else query)
+                cached_result["original_query"] = query
+                cached_result["from_cache"] = True
+                return cached_result
         
         # 初始化结果
         result = {
@@ -268,7 +289,7 @@ class QueryProcessor:
                 )
                 result["processing_method"] = "simple"
                 result["complexity"] = complexity
-                self._update_cache(query, result)
+                self._update_cache(cache_key, result)
                 return result
         
         # 复杂/中等查询：使用LLM处理
@@ -348,26 +369,57 @@ class QueryProcessor:
             result["processing_method"] = "llm_failed"
             result["final_query"] = query
         
-        # 更新缓存
-        self._update_cache(query, result)
+        # 更新缓存（LLM失败的降级结果不缓存，下次重试）
+        if result["processing_method"] != "llm_failed":
+            self._update_cache(cache_key, result)
         
         return result
     
-    def _update_cache(self, query: str, result: Dict[str, Any]):
-        """更新缓存（LRU策略）"""
-        if len(self._cache) >= self._cache_size:
-            # 移除最旧的（FIFO）
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
-        
-        # 创建缓存副本（移除from_cache标记）
+    def _cache_namespace(self) -> str:
+        """缓存命名空间：模板、领域关键词、模型变化时不复用旧结果"""
+        model = getattr(self._llm, 'model', None)
+        if not isinstance(model, str) or not model:
+            model = config.LLM_MODEL
+        raw = f"{model}\x00{','.join(self.domain_keywords)}\x00{self.template}"
+        if self._cache_epoch:
+            raw += f"\x00{self._cache_epoch}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+    
+    def _cache_key(self, query: str, force_llm: bool = False) -> str:
+        """缓存键：标准化问题 + 命名空间"""
+        namespace = self._namespace + ("|llm" if force_llm else "")
+        return make_rewrite_key(normalize_query(query), namespace)
+    
+    def _update_cache(self, cache_key: str, result: Dict[str, Any]):
+        """更新缓存（只有LLM结果写入持久层，简单查询只缓存在内存）"""
         cache_result = result.copy()
         cache_result.pop("from_cache", None)
-        self._cache[query] = cache_result
+        self._cache.put(cache_key, cache_result, persist=result.get("processing_method") == "llm")
+    
+    def _notify_cache_event(self, hit: bool) -> None:
+        """向观察器上报缓存命中情况"""
+        if self.observer_manager is None or not hasattr(self.observer_manager, 'on_cache_event'):
+            return
+        try:
+            self.observer_manager.on_cache_event("query_rewrite", hit)
+        except Exception as e:
+            logger.debug("上报查询改写缓存事件失败", error=str(e))
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        return self._cache.get_stats()
     
     def clear_cache(self):
-        """清空缓存"""
-        self._cache.clear()
+        """清空本实例的缓存
+
+        私有缓存直接清空；共享缓存只切换本实例的命名空间（与 reload_template 相同），
+        其他实例与持久层中的结果不受影响。需要清空全局缓存时调用 get_query_cache().clear()。
+        """
+        if self._owns_cache:
+            self._cache.clear()
+        else:
+            self._cache_epoch += 1
+            self._namespace = self._cache_namespace()
         logger.info("查询处理器缓存已清空")
     
     def reload_template(self, template_path: Optional[str] = None) -> None:
@@ -381,8 +433,8 @@ class QueryProcessor:
         
         if old_template != self.template:
             logger.info("查询改写模板已重新加载")
-            # 清空缓存，因为模板已更改
-            self.clear_cache()
+            # 模板已更改：切换命名空间，旧模板的结果不再命中
+            self._namespace = self._cache_namespace()
         else:
             logger.debug("模板未变化，无需重新加载")
 
@@ -0,0 +1,37 @@
+"""
+RAG引擎检索模块 - 异步检索：在事件循环中检索而不阻塞其他请求
+
+主要功能：
+- is_native_async()：判断检索器的 aretrieve 是否真正非阻塞
+- aretrieve_nodes()：异步检索（原生异步检索器直接 await，否则在线程中执行同步检索）
+
+特性：
+- LlamaIndex 默认的 _aretrieve 以及多数向量库的 aquery（如 Chroma）内部直接调用同步代码，
+  不能据此判断是否阻塞；检索器需通过 native_async 属性显式声明
+- 非原生异步的检索在线程中执行，事件循环可以继续处理其他流式请求
+"""
+
+import asyncio
+from typing import Any, List
+
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+
+def is_native_async(retriever: Any) -> bool:
+    """判断检索器的 aretrieve 是否真正非阻塞（检索器通过 native_async 属性声明）"""
+    return bool(getattr(retriever, 'native_async', False))
+
+
+async def aretrieve_nodes(retriever: Any, query: str | QueryBundle) -> List[NodeWithScore]:
+    """异步检索
+
+    Args:
+        retriever: 检索器
+        query: 查询文本或 QueryBundle
+
+    Returns:
+        检索到的节点列表
+    """
+    if is_native_async(retriever):
+        return list(await retriever.aretrieve(query) or [])
+    return list(await asyncio.to_thread(retriever.retrieve, query) or [])
@@ -1,5 +1,9 @@
 """
 RAG引擎检索模块 - 检索器工厂：检索器创建逻辑
+
+向量/BM25/混合检索器套上全局检索结果缓存（按 collection 版本失效）；
+多策略检索只缓存其中的向量/BM25 成员，融合结果（含 Grep 与超时后的部分合并）不缓存；
+Grep 检索基于本地文件，不经过缓存。
 """
 
 from typing import Optional, List, Any, Union, TYPE_CHECKING
@@ -9,7 +13,9 @@ from llama_index.core import VectorStoreIndex
 from backend.infrastructure.logger import get_logger
 from backend.infrastructure.config import config
 from backend.business.rag_engine.retrieval.strategies.grep import GrepRetriever
+from backend.business.rag_engine.retrieval.strategies.bm25 import BM25IndexRetriever
 from backend.business.rag_engine.retrieval.strategies.multi_strategy import MultiStrategyRetriever, BaseRetriever
+from backend.business.rag_engine.caching.retrieval_cache import with_retrieval_cache
 from backend.business.rag_engine.retrieval.adapters import (
     LlamaIndexRetrieverAdapter,
     MultiStrategyRetrieverAdapter,
@@ -30,6 +36,19 @@ def create_retriever(index: VectorStoreIndex, retrieval_strategy: str, similarit
     Returns:
         检索器实例（LlamaIndex检索器或MultiStrategyRetriever）
     """
+    if retrieval_strategy in ("grep", "multi"):
+        # multi 的融合结果依赖合并配置、本地文件与各策略是否按时完成，只在成员层缓存
+        return _create_retriever(index, retrieval_strategy, similarity_top_k)
+    return with_retrieval_cache(
+        _create_retriever(index, retrieval_strategy, similarity_top_k),
+        index,
+        retrieval_strategy,
+        similarity_top_k,
+    )
+
+
+def _create_retriever(index: VectorStoreIndex, retrieval_strategy: str, similarity_top_k: int) -> Union[Any, VectorIndexRetriever, QueryFusionRetriever]:
+    """创建检索器（不含缓存）"""
     match retrieval_strategy:
         case "multi":
             # 多策略检索
@@ -52,42 +71,15 @@ def create_retriever(index: VectorStoreIndex, retrieval_strategy: str, similarit
         
         case "bm25":
             logger.info("创建BM25检索器", strategy=retrieval_strategy, top_k=similarity_top_k)
-            try:
-                from llama_index.retrievers.bm25 import BM25Retriever
-            except ImportError:
-                logger.error("BM25Retriever未安装", error="请运行: pip install llama-index-retrievers-bm25")
-                raise ImportError(
-                    "BM25Retriever未安装。请运行: pip install llama-index-retrievers-bm25"
-                )
-            
-            nodes = list(index.docstore.docs.values())
-            
-            return BM25Retriever.from_defaults(
-                nodes=nodes,
-                similarity_top_k=similarity_top_k,
-            )
+            return BM25IndexRetriever.from_index(index, similarity_top_k=similarity_top_k)
         
         case "hybrid":
             logger.info("创建混合检索器", strategy=retrieval_strategy, top_k=similarity_top_k)
-            try:
-                from llama_index.retrievers.bm25 import BM25Retriever
-            except ImportError:
-                logger.warning("BM25未安装，降级为纯向量检索", strategy=retrieval_strategy)
-                return VectorIndexRetriever(
-                    index=index,
-                    similarity_top_k=similarity_top_k,
-                )
-            
             vector_retriever = VectorIndexRetriever(
                 index=index,
                 similarity_top_k=similarity_top_k,
             )
-            
-            nodes = list(index.docstore.docs.values())
-            bm25_retriever = BM25Retriever.from_defaults(
-                nodes=nodes,
-                similarity_top_k=similarity_top_k,
-            )
+            bm25_retriever = BM25IndexRetriever.from_index(index, similarity_top_k=similarity_top_k)
             
             return QueryFusionRetriever(
                 retrievers=[vector_retriever, bm25_retriever],
@@ -122,19 +114,14 @@ def _create_multi_strategy_retriever(index: VectorStoreIndex, similarity_top_k:
             index=index,
             similarity_top_k=similarity_top_k,
         )
+        # 成员检索器与单独的 vector/bm25 策略共用检索结果缓存
+        vector_retriever = with_retrieval_cache(vector_retriever, index, "vector", similarity_top_k)
         retrievers.append(LlamaIndexRetrieverAdapter(vector_retriever, "vector"))
     
     if "bm25" in enabled_strategies:
-        try:
-            from llama_index.retrievers.bm25 import BM25Retriever
-            nodes = list(index.docstore.docs.values())
-            bm25_retriever = BM25Retriever.from_defaults(
-                nodes=nodes,
-                similarity_top_k=similarity_top_k,
-            )
-            retrievers.append(LlamaIndexRetrieverAdapter(bm25_retriever, "bm25"))
-        except ImportError:
-            logger.warning("BM25Retriever未安装，跳过BM25策略", enabled_strategies=enabled_strategies)
+        bm25_retriever = BM25IndexRetriever.from_index(index, similarity_top_k=similarity_top_k)
+        bm25_retriever = with_retrieval_cache(bm25_retriever, index, "bm25", similarity_top_k)
+        retrievers.append(LlamaIndexRetrieverAdapter(bm25_retriever, "bm25"))
     
     if "grep" in enabled_strategies:
         grep_retriever = _create_grep_retriever()
@@ -146,6 +133,7 @@ def _create_multi_strategy_retriever(index: VectorStoreIndex, similarity_top_k:
             index=index,
             similarity_top_k=similarity_top_k,
         )
+        vector_retriever = with_retrieval_cache(vector_retriever, index, "vector", similarity_top_k)
         retrievers.append(LlamaIndexRetrieverAdapter(vector_retriever, "vector"))
     
     # 创建多策略检索器
@@ -154,6 +142,9 @@ def _create_multi_strategy_retriever(index: VectorStoreIndex, similarity_top_k:
         merge_strategy=config.MERGE_STRATEGY,
         weights=config.RETRIEVER_WEIGHTS,
         enable_deduplication=config.ENABLE_DEDUPLICATION,
+        timeout=config.MULTI_STRATEGY_TIMEOUT_SECONDS,
+        strategy_timeouts=config.MULTI_STRATEGY_STRATEGY_TIMEOUTS,
+        score_normalization=config.MULTI_STRATEGY_SCORE_NORMALIZATION,
     )
     
     # 返回适配器（因为MultiStrategyRetriever已经实现了BaseRetriever接口）
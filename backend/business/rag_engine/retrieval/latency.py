@@ -0,0 +1,114 @@
+"""
+RAG引擎检索模块 - 检索延迟统计：按策略记录延迟直方图
+
+主要功能：
+- LatencyHistogram类：固定分桶的延迟直方图（计数、均值、分位数估计、超时/失败次数）
+- record_latency()：记录一次策略检索的延迟与结果状态
+- get_latency_stats()：获取各策略的延迟统计
+- reset_latency_stats()：清空统计
+
+特性：
+- 线程安全，进程内全局共享（检索器实例重建不丢失统计）
+- 分位数按桶上界估计，内存占用固定
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+# 分桶上界（毫秒），最后一个桶为 +inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts: List[int] = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+        self.errors = 0
+
+    def record(self, latency_ms: float, status: str = STATUS_OK) -> None:
+        """记录一次延迟（超时的延迟按预算记录）"""
+        self.counts[bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        if status == STATUS_TIMEOUT:
+            self.timeouts += 1
+        elif status == STATUS_ERROR:
+            self.errors += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """估计分位数（返回所在桶的上界，最后一个桶返回最大值）"""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            cumulative += c
+            if cumulative >= target and c > 0:
+                return float(self.buckets_ms[i]) if i < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        buckets = {f"le_{b}ms": c for b, c in zip(self.buckets_ms, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "buckets": buckets,
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_lock = threading.Lock()
+
+
+def record_latency(strategy: str, latency_seconds: float, status: str = STATUS_OK) -> None:
+    """记录一次策略检索的延迟
+
+    Args:
+        strategy: 策略名称
+        latency_seconds: 延迟（秒）
+        status: "ok" | "timeout" | "error"
+    """
+    with _lock:
+        histogram = _histograms.get(strategy)
+        if histogram is None:
+            histogram = _histograms[strategy] = LatencyHistogram()
+        histogram.record(latency_seconds * 1000, status)
+
+
+def get_latency_stats(strategies: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """获取各策略的延迟统计
+
+    Args:
+        strategies: 只返回这些策略（None 表示全部）
+    """
+    with _lock:
+        return {
+            name: histogram.to_dict()
+            for name, histogram in _histograms.items()
+            if strategies is None or name in strategies
+        }
+
+
+def reset_latency_stats() -> None:
+    """清空延迟统计"""
+    with _lock:
+        _histograms.clear()
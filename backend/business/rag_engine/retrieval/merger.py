@@ -2,215 +2,266 @@
 RAG引擎检索模块 - 结果合并器：支持多种合并策略
 
 主要功能：
-- ResultMerger类：结果合并器，支持RRF、加权分数融合、简单拼接等策略
+- ResultMerger类：结果合并器，支持RRF、加权分数融合、CombSUM/CombMNZ、简单拼接等策略
 - merge()：合并多个检索策略的结果
 
 执行流程：
 1. 接收多个检索策略的结果
-2. 根据合并策略处理结果
-3. 去重和排序
-4. 返回Top-K合并结果
+2. 为所有候选节点分配唯一键（每个节点只计算一次），同一键即同一节点
+3. 根据合并策略用 NumPy 数组累加分数
+4. 部分排序选出Top-K（不对全部候选排序）
 
 特性：
 - Reciprocal Rank Fusion (RRF) - 倒数排名融合
-- Weighted Score Fusion - 加权分数融合
+- Weighted Score Fusion - 加权分数融合（取最大值）
+- CombSUM / CombMNZ - 各结果分数归一化（min-max / z-score）后加权求和，CombMNZ 再乘以命中次数
 - Simple Concatenation - 简单拼接
-- 去重和排序
+- 按节点键累加，结果天然去重，不再二次去重
+- 分数相同的节点按首次出现顺序排列
+- RRF 可保留各节点的最高原始分数（按融合排名排序，相似度过滤阈值仍然有效）
 """
 
 import hashlib
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 from llama_index.core.schema import NodeWithScore, TextNode
 
 from backend.infrastructure.logger import get_logger
 
 logger = get_logger('rag_engine.retrieval')
 
+SCORE_NORMALIZATIONS = ("min_max", "z_score", "none")
+
 
 class ResultMerger:
     """结果合并器
-    
+
     支持多种合并策略：
     1. Reciprocal Rank Fusion (RRF) - 倒数排名融合
     2. Weighted Score Fusion - 加权分数融合
-    3. Simple Concatenation - 简单拼接
+    3. CombSUM / CombMNZ - 归一化分数融合
+    4. Simple Concatenation - 简单拼接
     """
-    
+
     def __init__(
         self,
         strategy: str = "reciprocal_rank_fusion",
         weights: Optional[Dict[str, float]] = None,
         enable_deduplication: bool = True,
         rrf_k: int = 60,
+        keep_original_scores: bool = False,
+        score_normalization: str = "min_max",
     ):
         """初始化结果合并器
-        
+
         Args:
-            strategy: 合并策略（"reciprocal_rank_fusion" | "weighted_score" | "simple"）
+            strategy: 合并策略（"reciprocal_rank_fusion" | "weighted_score" | "comb_sum" | "comb_mnz" | "simple"）
             weights: 各检索器的权重（可选）
             enable_deduplication: 是否启用去重
             rrf_k: RRF算法的常数k（默认60）
+            keep_original_scores: RRF按融合分数排序，但返回节点在各结果中的最高原始分数
+            score_normalization: CombSUM/CombMNZ 的分数归一化方式（"min_max" | "z_score" | "none"）
         """
+        if score_normalization not in SCORE_NORMALIZATIONS:
+            raise ValueError(f"不支持的分数归一化方式: {score_normalization}，可选: {SCORE_NORMALIZATIONS}")
         self.strategy = strategy
         self.weights = weights or {}
         self.enable_deduplication = enable_deduplication
         self.rrf_k = rrf_k
-        
+        self.keep_original_scores = keep_original_scores
+        self.score_normalization = score_normalization
+
         logger.info(
             f"结果合并器初始化: "
             f"策略={strategy}, "
             f"去重={enable_deduplication}, "
             f"权重={weights}"
         )
-    
+
     def merge(
         self,
         results_dict: Dict[str, List[NodeWithScore]],
         top_k: int = 10,
     ) -> List[NodeWithScore]:
         """合并多个检索结果
-        
+
         Args:
             results_dict: {retriever_name: [NodeWithScore]}
             top_k: 返回Top-K结果
-            
+
         Returns:
             合并后的结果列表
         """
         if not results_dict:
             return []
-        
+
         # 根据策略合并
         match self.strategy:
             case "reciprocal_rank_fusion":
-                merged = self._reciprocal_rank_fusion(results_dict, top_k)
+                return self._reciprocal_rank_fusion(results_dict, top_k)
             case "weighted_score":
-                merged = self._weighted_score_fusion(results_dict, top_k)
+                return self._weighted_score_fusion(results_dict, top_k)
+            case "comb_sum":
+                return self._comb_fusion(results_dict, top_k, mnz=False)
+            case "comb_mnz":
+                return self._comb_fusion(results_dict, top_k, mnz=True)
             case _:
-                merged = self._simple_concatenation(results_dict, top_k)
-        
-        # 去重
-        if self.enable_deduplication:
-            merged = self._deduplicate(merged)
-        
-        return merged[:top_k]
-    
+                return self._simple_concatenation(results_dict, top_k)
+
+    def _intern(
+        self,
+        results_dict: Dict[str, List[NodeWithScore]],
+    ) -> Tuple[List[NodeWithScore], Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+        """为所有候选节点分配连续下标
+
+        Returns:
+            (按首次出现顺序排列的节点, {retriever_name: (节点下标数组, 原始分数数组，None 为 NaN)})
+        """
+        key_index: Dict[str, int] = {}
+        hashed_keys: Dict[int, str] = {}  # 没有node_id的节点对象只计算一次哈希
+        first_seen: List[NodeWithScore] = []
+        arrays = {}
+
+        for retriever_name, results in results_dict.items():
+            indices = []
+            for node_with_score in results:
+                node = node_with_score.node
+                key = node.node_id
+                if not key:
+                    key = hashed_keys.get(id(node))
+                    if key is None:
+                        key = hashed_keys[id(node)] = self._get_node_id(node)
+                index = key_index.setdefault(key, len(key_index))
+                if index == len(first_seen):
+                    first_seen.append(node_with_score)
+                indices.append(index)
+            scores = [np.nan if n.score is None else n.score for n in results]
+            arrays[retriever_name] = (
+                np.array(indices, dtype=np.intp),
+                np.array(scores, dtype=np.float64),
+            )
+
+        return first_seen, arrays
+
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """部分排序选出分数最高的 top_k 个下标（降序，同分按下标升序）"""
+        n = len(scores)
+        if top_k <= 0 or n == 0:
+            return np.empty(0, dtype=np.intp)
+        if top_k < n:
+            # 第 top_k 大的分数；大于它的全部入选，等于它的按下标补足
+            kth = np.partition(scores, n - top_k)[n - top_k]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)[: top_k - len(above)]
+            candidates = np.concatenate([above, ties])
+        else:
+            candidates = np.arange(n)
+        return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+    @staticmethod
+    def _build(nodes: List[NodeWithScore], order: np.ndarray, scores: np.ndarray) -> List[NodeWithScore]:
+        return [NodeWithScore(node=nodes[i].node, score=float(scores[i])) for i in order]
+
     def _reciprocal_rank_fusion(
         self,
         results_dict: Dict[str, List[NodeWithScore]],
         top_k: int,
     ) -> List[NodeWithScore]:
         """倒数排名融合（RRF）
-        
+
         公式：RRF_score = Σ(weight / (k + rank))
         k是常数（通常为60），rank是排名（从1开始）
         """
-        node_scores = {}  # {node_id: rrf_score}
-        node_map = {}  # {node_id: NodeWithScore}
-        
-        for retriever_name, results in results_dict.items():
+        nodes, arrays = self._intern(results_dict)
+        fused = np.zeros(len(nodes))
+        best = np.full(len(nodes), np.nan)
+
+        for retriever_name, (indices, scores) in arrays.items():
             weight = self.weights.get(retriever_name, 1.0)
-            
-            for rank, node_with_score in enumerate(results, start=1):
-                node_id = self._get_node_id(node_with_score.node)
-                
-                # 计算RRF分数
-                rrf_score = weight / (self.rrf_k + rank)
-                
-                if node_id in node_scores:
-                    node_scores[node_id] += rrf_score
-                else:
-                    node_scores[node_id] = rrf_score
-                    node_map[node_id] = node_with_score
-        
-        # 转换为NodeWithScore列表并排序
-        merged_nodes = []
-        for node_id, score in sorted(node_scores.items(), key=lambda x: x[1], reverse=True):
-            node_with_score = node_map[node_id]
-            # 使用合并后的分数创建新的NodeWithScore
-            merged_nodes.append(NodeWithScore(node=node_with_score.node, score=score))
-        
-        return merged_nodes
-    
+            ranks = np.arange(1, len(indices) + 1, dtype=np.float64)
+            np.add.at(fused, indices, weight / (self.rrf_k + ranks))
+            if self.keep_original_scores:
+                np.fmax.at(best, indices, scores)
+
+        order = self._top_k_indices(fused, top_k)
+        if self.keep_original_scores:
+            # 没有原始分数的节点保留融合分数
+            fused = np.where(np.isnan(best), fused, best)
+        return self._build(nodes, order, fused)
+
     def _weighted_score_fusion(
         self,
         results_dict: Dict[str, List[NodeWithScore]],
         top_k: int,
     ) -> List[NodeWithScore]:
-        """加权分数融合"""
-        node_scores = {}
-        node_map = {}
-        
-        for retriever_name, results in results_dict.items():
+        """加权分数融合（同一节点取各检索器加权分数的最大值）"""
+        nodes, arrays = self._intern(results_dict)
+        fused = np.full(len(nodes), -np.inf)
+
+        for retriever_name, (indices, scores) in arrays.items():
             weight = self.weights.get(retriever_name, 1.0)
-            
-            for node_with_score in results:
-                node_id = self._get_node_id(node_with_score.node)
-                weighted_score = node_with_score.score * weight
-                
-                if node_id in node_scores:
-                    # 取最大值（或其他策略）
-                    node_scores[node_id] = max(node_scores[node_id], weighted_score)
-                else:
-                    node_scores[node_id] = weighted_score
-                    node_map[node_id] = node_with_score
-        
-        # 排序并返回
-        merged_nodes = []
-        for node_id, score in sorted(node_scores.items(), key=lambda x: x[1], reverse=True):
-            node_with_score = node_map[node_id]
-            merged_nodes.append(NodeWithScore(node=node_with_score.node, score=score))
-        
-        return merged_nodes
-    
+            np.maximum.at(fused, indices, np.nan_to_num(scores) * weight)
+
+        return self._build(nodes, self._top_k_indices(fused, top_k), fused)
+
+    def _normalize(self, scores: np.ndarray) -> np.ndarray:
+        """归一化单个检索器的分数（缺失分数按0处理）"""
+        scores = np.nan_to_num(scores)
+        if self.score_normalization == "min_max":
+            low, high = scores.min(), scores.max()
+            return (scores - low) / (high - low) if high > low else np.ones_like(scores)
+        if self.score_normalization == "z_score":
+            std = scores.std()
+            return (scores - scores.mean()) / std if std > 0 else np.zeros_like(scores)
+        return scores
+
+    def _comb_fusion(
+        self,
+        results_dict: Dict[str, List[NodeWithScore]],
+        top_k: int,
+        mnz: bool,
+    ) -> List[NodeWithScore]:
+        """CombSUM / CombMNZ
+
+        CombSUM：Σ(weight × 归一化分数)
+        CombMNZ：CombSUM × 命中该节点的检索器数量
+        """
+        nodes, arrays = self._intern(results_dict)
+        fused = np.zeros(len(nodes))
+        hits = np.zeros(len(nodes))
+
+        for retriever_name, (indices, scores) in arrays.items():
+            if len(indices) == 0:
+                continue
+            weight = self.weights.get(retriever_name, 1.0)
+            np.add.at(fused, indices, self._normalize(scores) * weight)
+            # 同一检索器内重复出现的节点只计一次命中
+            hits[np.unique(indices)] += 1
+
+        if mnz:
+            fused = fused * hits
+        return self._build(nodes, self._top_k_indices(fused, top_k), fused)
+
     def _simple_concatenation(
         self,
         results_dict: Dict[str, List[NodeWithScore]],
         top_k: int,
     ) -> List[NodeWithScore]:
-        """简单拼接（按顺序合并）"""
-        all_nodes = []
-        
-        for results in results_dict.values():
-            all_nodes.extend(results)
-        
-        # 去重（基于节点ID）
-        seen = set()
-        unique_nodes = []
-        for node_with_score in all_nodes:
-            node_id = self._get_node_id(node_with_score.node)
-            if node_id not in seen:
-                seen.add(node_id)
-                unique_nodes.append(node_with_score)
-        
-        return unique_nodes
-    
-    def _deduplicate(self, nodes: List[NodeWithScore]) -> List[NodeWithScore]:
-        """去重（基于节点内容）"""
-        seen = set()
-        unique_nodes = []
-        
-        for node_with_score in nodes:
-            node_id = self._get_node_id(node_with_score.node)
-            if node_id not in seen:
-                seen.add(node_id)
-                unique_nodes.append(node_with_score)
-        
-        return unique_nodes
-    
+        """简单拼接（按顺序合并，基于节点ID去重）"""
+        nodes, _ = self._intern(results_dict)
+        return nodes[:top_k]
+
     def _get_node_id(self, node: TextNode) -> str:
         """获取节点的唯一ID
-        
-        基于节点内容和元数据生成hash
+
+        优先使用node_id，否则基于节点内容和元数据生成hash
         """
-        # 使用节点内容和关键元数据生成ID
+        if getattr(node, 'node_id', None):
+            return node.node_id
+
         content = node.text or ""
         metadata_str = str(node.metadata.get("file_path", ""))
-        
-        # 如果有node_id，优先使用
-        if hasattr(node, 'node_id') and node.node_id:
-            return node.node_id
-        
-        # 否则生成hash
         id_string = f"{content}|{metadata_str}"
         return hashlib.md5(id_string.encode('utf-8')).hexdigest()
@@ -0,0 +1,146 @@
+"""
+RAG引擎检索模块 - 多查询并行检索：对全部改写查询并行检索并融合
+
+主要功能：
+- unique_queries()：按标准化文本去重并限制查询数量
+- rewrite_queries()：从查询处理结果中取出待检索的改写查询
+- embed_queries()：一次批量计算多个查询的向量
+- multi_query_retrieve()：并行检索多个查询，RRF 融合并按节点ID去重
+
+执行流程：
+1. 改写查询去重，跳过已有结果的查询（如推测检索的原始问题）
+2. 向量检索时一次批量计算查询向量，随 QueryBundle 传给检索器
+3. 在全局检索线程池中并行检索
+4. 多个结果列表通过 ResultMerger RRF 融合（保留最高原始分数），按节点ID去重
+
+特性：
+- 只有一个结果列表时原样返回，不做融合
+- 批量计算向量失败时由检索器自行计算
+- 单个查询检索失败不影响其他查询的结果
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from backend.infrastructure.logger import get_logger
+from backend.business.rag_engine.caching.response_cache import normalize_query
+from backend.business.rag_engine.retrieval.merger import ResultMerger
+from backend.business.rag_engine.utils.executor import get_retrieval_executor
+
+logger = get_logger('rag_engine.retrieval')
+
+# 使用查询向量的检索策略（其他策略不需要预先计算向量）
+EMBEDDING_STRATEGIES = frozenset({"vector", "chunk"})
+
+_merger: Optional[ResultMerger] = None
+
+
+def _get_merger() -> ResultMerger:
+    global _merger
+    if _merger is None:
+        _merger = ResultMerger(strategy="reciprocal_rank_fusion", keep_original_scores=True)
+    return _merger
+
+
+def unique_queries(queries: Sequence[str], limit: Optional[int] = None) -> List[str]:
+    """按标准化文本去重（保持顺序）并限制数量"""
+    seen = set()
+    result = []
+    for query in queries:
+        if not isinstance(query, str) or not query.strip():
+            continue
+        key = normalize_query(query)
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append(query)
+        if limit is not None and len(result) >= limit:
+            break
+    return result
+
+
+def rewrite_queries(processed: Dict[str, Any], limit: Optional[int] = None) -> List[str]:
+    """从查询处理结果中取出待检索的改写查询（final_query 在前）"""
+    return unique_queries([processed["final_query"], *(processed.get("rewritten_queries") or [])], limit)
+
+
+def embed_queries(embed_model: Any, queries: List[str]) -> Optional[List[List[float]]]:
+    """一次批量计算查询向量
+
+    Returns:
+        与 queries 一一对应的向量列表，失败时返回None
+    """
+    if embed_model is None or not queries:
+        return None
+    try:
+        batch = getattr(embed_model, 'get_query_embeddings', None)
+        if callable(batch):
+            embeddings = batch(queries)
+        else:
+            embeddings = [embed_model.get_query_embedding(query) for query in queries]
+    except Exception as e:
+        logger.warning(f"批量计算查询向量失败，由检索器逐条计算: {e}")
+        return None
+    if not isinstance(embeddings, list) or len(embeddings) != len(queries):
+        return None
+    return embeddings
+
+
+def _retrieve_one(retriever: Any, query: str, embedding: Optional[List[float]] = None) -> List[NodeWithScore]:
+    return list(retriever.retrieve(QueryBundle(query_str=query, embedding=embedding)) or [])
+
+
+def multi_query_retrieve(
+    retriever: Any,
+    queries: Sequence[str],
+    similarity_top_k: int,
+    embed_model: Any = None,
+    precomputed: Optional[Dict[str, List[NodeWithScore]]] = None,
+) -> List[NodeWithScore]:
+    """并行检索多个查询并融合
+
+    Args:
+        retriever: 检索器（接受 QueryBundle）
+        queries: 待检索的查询（已去重）
+        similarity_top_k: 融合后保留的节点数
+        embed_model: 查询向量模型（None 表示由检索器自行计算）
+        precomputed: 已有的检索结果 {查询: 节点列表}，参与融合且不再检索
+
+    Returns:
+        融合后的节点列表
+
+    Raises:
+        所有查询都检索失败且没有已有结果时，抛出第一个检索异常
+    """
+    results: Dict[str, List[NodeWithScore]] = dict(precomputed or {})
+    pending = [query for query in queries if query not in results]
+    embeddings = embed_queries(embed_model, pending)
+
+    if len(pending) == 1 and not results:
+        return _retrieve_one(retriever, pending[0], embeddings[0] if embeddings else None)
+
+    executor = get_retrieval_executor()
+    futures = {
+        query: executor.submit(_retrieve_one, retriever, query, embeddings[i] if embeddings else None)
+        for i, query in enumerate(pending)
+    }
+    errors = []
+    for query, future in futures.items():
+        try:
+            results[query] = future.result()
+        except Exception as e:
+            logger.warning(f"查询检索失败，跳过该查询: '{query[:30]}' {e}")
+            errors.append(e)
+    if not results and errors:
+        raise errors[0]
+
+    if len(results) == 1:
+        return next(iter(results.values()))
+
+    merged = _get_merger().merge(results, top_k=similarity_top_k)
+    logger.info(
+        f"🔀 多查询检索完成: 查询数={len(results)}, "
+        f"各查询结果数={[len(nodes) for nodes in results.values()]}, 融合后={len(merged)}"
+    )
+    return merged
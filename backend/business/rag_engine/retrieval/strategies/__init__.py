@@ -3,11 +3,13 @@ RAG引擎检索模块 - 检索策略：提供多种检索策略的实现
 
 主要功能：
 - GrepRetriever类：基于grep的检索器
+- BM25IndexRetriever类：基于共享BM25索引的关键词检索器
 - MultiStrategyRetriever类：多策略检索器
 - FileLevelRetrievers类：文件级检索器
 """
 
 from backend.business.rag_engine.retrieval.strategies.grep import GrepRetriever
+from backend.business.rag_engine.retrieval.strategies.bm25 import BM25IndexRetriever
 from backend.business.rag_engine.retrieval.strategies.multi_strategy import MultiStrategyRetriever, BaseRetriever
 from backend.business.rag_engine.retrieval.strategies.file_level import (
     FilesViaContentRetriever,
@@ -16,6 +18,7 @@ from backend.business.rag_engine.retrieval.strategies.file_level import (
 
 __all__ = [
     'GrepRetriever',
+    'BM25IndexRetriever',
     'MultiStrategyRetriever',
     'BaseRetriever',
     'FilesViaContentRetriever',
@@ -0,0 +1,79 @@
+"""
+RAG引擎检索模块 - BM25检索策略：基于共享BM25索引的关键词检索
+
+主要功能：
+- BM25IndexRetriever类：LlamaIndex检索器接口，查询共享的 BM25Index
+- get_bm25_index_for()：按 VectorStoreIndex 的数据源获取共享 BM25 索引
+
+执行流程：
+1. 按数据源（Chroma collection 或内存 docstore）获取进程内共享的 BM25 索引
+2. 对查询分词，只遍历查询词项的倒排表计算 BM25 分数
+3. 将 Top-K 结果转换为 NodeWithScore
+
+特性：
+- 索引按 collection 单例共享、持久化，不再每次创建检索器时重建词项统计
+- Chroma 存储的节点不在 docstore 中，直接从 collection 构建语料
+- 中文友好分词（jieba 或 CJK 二元组）
+"""
+
+from typing import Any, List
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.retrievers import BaseRetriever as LlamaBaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+from backend.infrastructure.logger import get_logger
+from backend.infrastructure.text_index import get_bm25_index, get_docstore_bm25_index
+from backend.infrastructure.text_index.bm25_index import BM25Index
+
+logger = get_logger('rag_engine.retrieval')
+
+
+def get_bm25_index_for(index: VectorStoreIndex) -> BM25Index:
+    """获取 VectorStoreIndex 对应的共享 BM25 索引
+
+    docstore 中有节点时（内存索引）使用 docstore，否则使用向量存储背后的 Chroma collection。
+
+    Args:
+        index: VectorStoreIndex实例
+
+    Returns:
+        BM25Index 实例
+    """
+    docstore = index.docstore
+    if docstore.docs:
+        return get_docstore_bm25_index(docstore)
+
+    collection = getattr(index.vector_store, 'client', None)
+    if collection is None or not hasattr(collection, 'count'):
+        return get_docstore_bm25_index(docstore)
+    return get_bm25_index(collection)
+
+
+class BM25IndexRetriever(LlamaBaseRetriever):
+    """基于共享 BM25Index 的 LlamaIndex 检索器"""
+
+    def __init__(self, bm25_index: BM25Index, similarity_top_k: int = 10, **kwargs: Any):
+        """初始化BM25检索器
+
+        Args:
+            bm25_index: 共享的 BM25 索引
+            similarity_top_k: 返回Top-K结果
+        """
+        self.bm25_index = bm25_index
+        self.similarity_top_k = similarity_top_k
+        super().__init__(**kwargs)
+
+    @classmethod
+    def from_index(cls, index: VectorStoreIndex, similarity_top_k: int = 10) -> "BM25IndexRetriever":
+        """从 VectorStoreIndex 创建检索器（复用共享索引）"""
+        return cls(get_bm25_index_for(index), similarity_top_k=similarity_top_k)
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        """执行BM25检索"""
+        hits = self.bm25_index.search(query_bundle.query_str, top_k=self.similarity_top_k)
+        logger.debug("BM25检索完成", query=query_bundle.query_str[:50], result_count=len(hits))
+        return [
+            NodeWithScore(node=TextNode(id_=node_id, text=text, metadata=dict(metadata)), score=score)
+            for node_id, score, text, metadata in hits
+        ]
@@ -4,6 +4,12 @@ RAG引擎检索模块 - 文件级别检索策略：实现文件级别的检索
 实现文件级别的检索功能：
 - FilesViaContentRetriever: 宽泛主题查询（文件级别语义检索）
 - FilesViaMetadataRetriever: 文件名查询（文件级别元数据检索）
+
+文件名匹配使用按 collection 共享的文件级元数据索引（text_index.FileIndex，内存中回答
+子串/前缀查询），不再每次从 Chroma 拉取全部元数据；索引在后台构建完成前回退到直接查询 collection。
+
+宽泛主题查询优先检索文件级向量（每个文件一个池化向量），只对排名靠前的文件拉取 chunks；
+文件级向量不可用时回退为检索 similarity_top_k 个 chunks 后在本地按文件聚合。
 """
 
 from typing import List, Dict, Optional, Set, Union
@@ -11,6 +17,7 @@ from collections import defaultdict
 
 from llama_index.core.schema import NodeWithScore, QueryBundle
 
+from backend.infrastructure.config import config
 from backend.infrastructure.indexer import IndexManager
 from backend.infrastructure.logger import get_logger
 
@@ -114,7 +121,8 @@ class FilesViaContentRetriever:
     """文件级别内容检索器（宽泛主题查询）
     
     实现文件级别的语义检索：
-    1. 使用向量索引检索所有相关 chunks
+    1. 检索文件级向量得到 top_k 个候选文件，只检索这些文件的 chunks
+       （文件级向量不可用时，使用向量索引检索 similarity_top_k 个 chunks）
     2. 按文件路径分组
     3. 选择 top_k 个最相关的文件
     4. 从每个文件中选择 top_k 个最相关的 chunks
@@ -171,18 +179,19 @@ class FilesViaContentRetriever:
             logger.warning("查询为空，返回空结果")
             return []
         
+        # 支持字符串和 QueryBundle
+        if isinstance(query, str):
+            query_bundle = QueryBundle(query_str=query)
+        else:
+            query_bundle = query
+        
         try:
-            # Step 1: 使用向量索引检索所有相关 chunks
-            index = self.index_manager.get_index()
-            retriever = index.as_retriever(similarity_top_k=self.similarity_top_k)
-            
-            # 支持字符串和 QueryBundle
-            if isinstance(query, str):
-                query_bundle = QueryBundle(query_str=query)
-            else:
-                query_bundle = query
-            
-            all_nodes = retriever.retrieve(query_bundle)
+            # Step 1: 检索文件级向量，只拉取候选文件的 chunks（不可用时检索所有相关 chunks）
+            all_nodes = self._retrieve_via_file_vectors(query_bundle)
+            if all_nodes is None:
+                index = self.index_manager.get_index()
+                retriever = index.as_retriever(similarity_top_k=self.similarity_top_k)
+                all_nodes = retriever.retrieve(query_bundle)
             
             if not all_nodes:
                 logger.info(f"未找到相关结果: {query_str[:50]}")
@@ -234,6 +243,56 @@ class FilesViaContentRetriever:
         except Exception as e:
             logger.error(f"文件级别内容检索失败: {e}", exc_info=True)
             return []
+    
+    def _retrieve_via_file_vectors(self, query_bundle: QueryBundle) -> Optional[List[NodeWithScore]]:
+        """先检索文件级向量，再只检索候选文件的 chunks
+        
+        Args:
+            query_bundle: 查询
+            
+        Returns:
+            候选文件的 chunks；文件级向量未启用、不可用或检索失败时返回None（回退到 chunk 级聚合）
+        """
+        if not config.FILE_VECTORS_ENABLE:
+            return None
+        try:
+            from backend.infrastructure.indexer.utils.file_vectors import ensure_file_vectors, search_files
+            from llama_index.core.vector_stores.types import FilterOperator, MetadataFilter, MetadataFilters
+            
+            files = ensure_file_vectors(self.index_manager)
+            if files is None:
+                return None
+            
+            if query_bundle.embedding is None:
+                from backend.business.rag_engine.retrieval.multi_query import embed_queries
+                embeddings = embed_queries(
+                    getattr(self.index_manager, 'embed_model', None), [query_bundle.query_str]
+                )
+                if not embeddings:
+                    return None
+                query_bundle = QueryBundle(query_str=query_bundle.query_str, embedding=embeddings[0])
+            
+            top_files = search_files(files, query_bundle.embedding, self.top_k_files)
+            if not top_files:
+                return None
+            file_paths = [file_path for file_path, _ in top_files]
+            
+            # 每个候选文件预留 2 倍的 chunks，由后续聚合按文件截取
+            filters = MetadataFilters(filters=[
+                MetadataFilter(key="file_path", value=file_paths, operator=FilterOperator.IN)
+            ])
+            retriever = self.index_manager.get_index().as_retriever(
+                similarity_top_k=len(file_paths) * self.top_k_per_file * 2,
+                filters=filters,
+            )
+            nodes = retriever.retrieve(query_bundle)
+            logger.debug(
+                f"文件级向量检索: 候选文件={len(file_paths)}, chunks={len(nodes)}"
+            )
+            return nodes or None
+        except Exception as e:
+            logger.warning(f"文件级向量检索失败，回退到 chunk 级聚合: {e}")
+            return None
 
 
 class FilesViaMetadataRetriever:
@@ -332,27 +391,43 @@ class FilesViaMetadataRetriever:
             # 获取 Chroma collection
             chroma_collection = self.index_manager.chroma_collection
             
-            # 如果启用模糊匹配，需要查询所有数据然后过滤
-            if fuzzy_match:
-                # 获取所有数据的元数据
-                all_data = chroma_collection.get()
-                metadatas = all_data.get('metadatas', [])
-                ids = all_data.get('ids', [])
-                
-                # 匹配文件路径或文件名
-                for idx, metadata in enumerate(metadatas):
-                    if not metadata:
-                        continue
-                    
-                    file_path = metadata.get('file_path', '')
-                    file_name = metadata.get('file_name', '')
+            file_index = None
+            if config.FILE_INDEX_ENABLE:
+                # 文件级元数据索引（后台构建完成前为 None，回退到直接查询 collection）
+                from backend.infrastructure.text_index import get_file_index
+                file_index = get_file_index(chroma_collection)
+            
+            if file_index is not None:
+                # 内存中匹配路径/文件名
+                if fuzzy_match:
+                    matched_files = file_index.match_any(keywords)
+                else:
+                    matched_files = [k for k in keywords if file_index.get(k) is not None]
+            
+            # 如果启用模糊匹配，需要扫描全部元数据然后过滤
+            elif fuzzy_match:
+                # 只拉取元数据（不含文本与向量），分页扫描
+                from backend.infrastructure.text_index.file_index import COLLECTION_PAGE_SIZE, file_metadata
+                offset = 0
+                while True:
+                    page = chroma_collection.get(include=["metadatas"], limit=COLLECTION_PAGE_SIZE, offset=offset)
+                    metadatas = page.get('metadatas') or []
                     
-                    # 检查是否匹配任何关键词
-                    for keyword in keywords:
-                        if keyword.lower() in file_path.lower() or keyword.lower() in (file_name or '').lower():
-                            if file_path and file_path not in matched_files:
+                    # 匹配文件路径或文件名
+                    for metadata in metadatas:
+                        file_path, file_name, _ = file_metadata(metadata)
+                        if not file_path or file_path in matched_files:
+                            continue
+                        
+                        # 检查是否匹配任何关键词
+                        for keyword in keywords:
+                            if keyword.lower() in file_path.lower() or keyword.lower() in file_name.lower():
                                 matched_files.append(file_path)
-                            break
+                                break
+                    
+                    offset += len(metadatas)
+                    if len(metadatas) < COLLECTION_PAGE_SIZE:
+                        break
             
             else:
                 # 精确匹配：使用 ChromaDB 的 where 查询
@@ -387,6 +462,16 @@ class FilesViaMetadataRetriever:
             logger.error(f"元数据匹配失败: {e}", exc_info=True)
             return []
     
+    def _file_chunk_ids(self, file_path: str) -> List[str]:
+        """获取文件的向量ID（优先使用文件级元数据索引，索引未就绪时按元数据查询）"""
+        if config.FILE_INDEX_ENABLE:
+            from backend.infrastructure.text_index import get_file_index
+            file_index = get_file_index(self.index_manager.chroma_collection)
+            if file_index is not None:
+                return file_index.chunk_ids(file_path)
+        from backend.infrastructure.indexer.utils.ids import get_vector_ids_by_metadata
+        return get_vector_ids_by_metadata(self.index_manager, file_path)
+    
     def _retrieve_file_chunks(
         self,
         query: str,
@@ -405,7 +490,7 @@ class FilesViaMetadataRetriever:
         """
         try:
             # 获取该文件的所有向量ID
-            vector_ids = self.index_manager._get_vector_ids_by_metadata(file_path)
+            vector_ids = self._file_chunk_ids(file_path)
             
             if not vector_ids:
                 logger.debug(f"文件没有向量ID: {file_path}")
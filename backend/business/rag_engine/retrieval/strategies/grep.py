@@ -6,7 +6,7 @@ RAG引擎检索模块 - Grep检索策略：基于文本搜索的检索方式
 - retrieve()：执行grep检索，返回匹配的节点列表
 
 执行流程：
-1. 构建grep命令
+1. 查询进程内三元组索引（或构建grep命令）
 2. 执行文件系统搜索
 3. 解析搜索结果
 4. 构建NodeWithScore列表
@@ -15,7 +15,8 @@ RAG引擎检索模块 - Grep检索策略：基于文本搜索的检索方式
 特性：
 - 基于文本搜索
 - 支持正则表达式
-- 文件系统操作
+- 默认使用进程内三元组倒排索引剪枝候选文件，不再每次查询启动 grep 子进程
+- 索引在检索器创建时后台构建并定期后台对账，GitHub 同步检测到的变更增量更新；未就绪或失败时回退到 grep
 - 类似Cursor Cloud的grep方案
 """
 
@@ -25,13 +26,14 @@ from pathlib import Path
 from typing import List, Dict, Optional
 from llama_index.core.schema import NodeWithScore, TextNode
 
+from backend.business.rag_engine.retrieval.strategies.multi_strategy import BaseRetriever
 from backend.infrastructure.logger import get_logger
 from backend.infrastructure.config import config
 
 logger = get_logger('rag_engine.retrieval')
 
 
-class GrepRetriever:
+class GrepRetriever(BaseRetriever):
     """Grep检索器
     
     基于文本搜索的检索方式，支持正则表达式和文件系统操作
@@ -49,6 +51,7 @@ class GrepRetriever:
         case_sensitive: bool = False,
         max_results: int = 10,
         timeout: int = 5,
+        use_index: Optional[bool] = None,
     ):
         """初始化Grep检索器
         
@@ -58,7 +61,10 @@ class GrepRetriever:
             case_sensitive: 是否区分大小写
             max_results: 最大返回结果数
             timeout: 搜索超时时间（秒）
+            use_index: 是否使用进程内三元组索引（默认读取配置 GREP_USE_INDEX）
         """
+        super().__init__("grep")
+        
         if data_source_path:
             self.data_source_path = Path(data_source_path)
         else:
@@ -74,13 +80,17 @@ class GrepRetriever:
         self.case_sensitive = case_sensitive
         self.max_results = max_results
         self.timeout = timeout
+        self.use_index = config.GREP_USE_INDEX if use_index is None else use_index
+        if self.use_index:
+            self._prepare_index()
         
         logger.info(
             f"Grep检索器初始化: "
             f"路径={self.data_source_path}, "
             f"正则={enable_regex}, "
             f"大小写敏感={case_sensitive}, "
-            f"最大结果数={max_results}"
+            f"最大结果数={max_results}, "
+            f"索引={self.use_index}"
         )
     
     def retrieve(self, query: str, top_k: Optional[int] = None) -> List[NodeWithScore]:
@@ -120,6 +130,15 @@ class GrepRetriever:
         
         results = []
         
+        if self.use_index:
+            try:
+                indexed = self._index_search(pattern)
+                if indexed is not None:
+                    return indexed
+                logger.debug("文本索引构建中，本次使用grep")
+            except Exception as e:
+                logger.warning(f"文本索引查询失败，回退到grep: {e}")
+        
         # 跨平台支持：Windows使用Python实现，Linux/Mac使用grep
         if platform.system() == "Windows":
             results = self._grep_search_windows(pattern)
@@ -128,6 +147,29 @@ class GrepRetriever:
         
         return results
     
+    def _prepare_index(self) -> None:
+        """在后台构建数据源目录的三元组索引（失败时查询回退到grep）"""
+        try:
+            from backend.infrastructure.text_index import prepare_line_index
+            prepare_line_index(self.data_source_path)
+        except Exception as e:
+            logger.warning(f"文本索引后台构建启动失败: {e}")
+    
+    def _index_search(self, pattern: str) -> Optional[List[Dict]]:
+        """使用进程内三元组索引搜索（结果格式与grep相同，索引未就绪时返回 None）"""
+        from backend.infrastructure.text_index import get_line_index
+        
+        index = get_line_index(self.data_source_path, max_age=config.GREP_INDEX_REFRESH_SECONDS)
+        if index is None:
+            return None
+        return index.search(
+            pattern,
+            regex=self.enable_regex,
+            case_sensitive=self.case_sensitive,
+            max_results=self.max_results * 10,
+            timeout=self.timeout,
+        )
+    
     def _grep_search_unix(self, pattern: str) -> List[Dict]:
         """Unix/Linux系统使用grep命令"""
         results = []
@@ -7,27 +7,44 @@ RAG引擎检索模块 - 多策略检索：并行执行多种检索策略，然
 - retrieve()：执行多策略检索
 
 执行流程：
-1. 并行执行多种检索策略
-2. 收集各策略的检索结果
-3. 使用ResultMerger合并结果
+1. 在全局检索线程池中并行执行多种检索策略
+2. 按各策略的延迟预算收集结果，超时的策略不再等待
+3. 使用ResultMerger合并已完成策略的结果
 4. 返回合并后的结果
 
 特性：
-- 并行执行多种策略
+- 并行执行多种策略，线程池进程内长期复用
+- 按策略配置延迟预算，超时策略不参与合并（部分结果合并）
+- 超时策略的线程不会被中断：检索执行完毕前仍占用共享线程池的线程，
+  持续超时的慢策略会挤占其他请求的并发度，延迟预算应按策略的常规耗时设置
+- 按策略记录延迟直方图（get_latency_stats）
 - 结果合并机制
 - 可配置的策略权重
 - 完整的错误处理
 """
 
-import concurrent.futures
-from typing import List, Dict, Optional
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import List, Dict, Optional, Tuple
 from llama_index.core.schema import NodeWithScore
 
+from backend.business.rag_engine.retrieval.latency import (
+    STATUS_ERROR,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    get_latency_stats,
+    record_latency,
+)
 from backend.business.rag_engine.retrieval.merger import ResultMerger
+from backend.business.rag_engine.utils.executor import get_retrieval_executor
 from backend.infrastructure.logger import get_logger
 
 logger = get_logger('rag_engine.retrieval')
 
+# 多策略检索使用独立的线程池：外层多查询检索在默认线程池中等待本线程池的任务
+EXECUTOR_NAME = "multi_strategy"
+
 
 class BaseRetriever:
     """检索器基类（接口定义）
@@ -77,23 +94,36 @@ class MultiStrategyRetriever(BaseRetriever):
         merge_strategy: str = "reciprocal_rank_fusion",
         weights: Optional[Dict[str, float]] = None,
         enable_deduplication: bool = True,
-        max_workers: int = 4,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        strategy_timeouts: Optional[Dict[str, float]] = None,
+        score_normalization: str = "min_max",
     ):
         """初始化多策略检索器
         
         Args:
             retrievers: 检索器列表
-            merge_strategy: 合并策略（"reciprocal_rank_fusion" | "weighted_score" | "simple"）
+            merge_strategy: 合并策略（"reciprocal_rank_fusion" | "weighted_score" | "comb_sum" | "comb_mnz" | "simple"）
             weights: 各检索器的权重（可选）
             enable_deduplication: 是否启用去重
-            max_workers: 并行执行的最大线程数
+            max_workers: 已废弃，不再生效（线程来自按名称共享的全局检索线程池，大小由线程池统一决定）
+            timeout: 单个策略的默认延迟预算（秒），None 或 <=0 表示不限
+            strategy_timeouts: 按策略名称覆盖的延迟预算（秒）
+            score_normalization: CombSUM/CombMNZ 的分数归一化方式（"min_max" | "z_score" | "none"）
         """
         super().__init__("multi_strategy")
         self.retrievers = retrievers
         self.merge_strategy = merge_strategy
         self.weights = weights or {}
         self.enable_deduplication = enable_deduplication
-        self.max_workers = max_workers
+        if max_workers is not None:
+            warnings.warn(
+                "MultiStrategyRetriever 的 max_workers 参数已废弃且不生效：策略在共享的全局检索线程池中执行",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        self.timeout = timeout
+        self.strategy_timeouts = dict(strategy_timeouts or {})
         
         # 如果没有提供权重，为每个检索器设置默认权重
         if not self.weights:
@@ -104,6 +134,7 @@ class MultiStrategyRetriever(BaseRetriever):
             strategy=merge_strategy,
             weights=self.weights,
             enable_deduplication=enable_deduplication,
+            score_normalization=score_normalization,
         )
         
         retriever_names = [r.name for r in retrievers]
@@ -114,6 +145,7 @@ class MultiStrategyRetriever(BaseRetriever):
             f"合并策略={merge_strategy}, "
             f"权重分配={self.weights}, "
             f"去重={'启用' if enable_deduplication else '禁用'}, "
+            f"延迟预算={self._budgets()}, "
             f"原因=使用多策略并行检索，融合不同检索方法的优势以提升召回率"
         )
     
@@ -153,45 +185,95 @@ class MultiStrategyRetriever(BaseRetriever):
         
         return merged_results
     
+    def get_latency_stats(self) -> Dict[str, Dict]:
+        """获取各策略的延迟统计（计数、均值、p50/p95/p99、超时与失败次数、分桶）"""
+        return get_latency_stats([r.name for r in self.retrievers])
+    
+    def _budget(self, name: str) -> Optional[float]:
+        """获取策略的延迟预算（秒），None 表示不限"""
+        budget = self.strategy_timeouts.get(name, self.timeout)
+        return budget if budget and budget > 0 else None
+    
+    def _budgets(self) -> Dict[str, Optional[float]]:
+        return {r.name: self._budget(r.name) for r in self.retrievers}
+    
     def _parallel_retrieve(
         self,
         query: str,
         top_k: int,
     ) -> Dict[str, List[NodeWithScore]]:
-        """并行执行所有检索策略"""
+        """并行执行所有检索策略
+        
+        超过延迟预算的策略不再等待（线程继续执行直至结束，结果丢弃，延迟按预算记为超时），
+        只返回按时完成的策略的结果。已开始执行的超时任务无法取消，结束前一直占用共享线程池的线程
+        """
         all_results = {}
         
-        def retrieve_with_name(retriever: BaseRetriever):
-            """检索包装函数"""
+        def retrieve_with_name(retriever: BaseRetriever) -> Tuple[str, List[NodeWithScore], float, str]:
+            """检索包装函数（返回策略名称、结果、耗时、状态）"""
+            start = time.perf_counter()
             try:
                 results = retriever.retrieve(query, top_k=top_k)
-                logger.debug(
-                    f"  ✓ {retriever.name}策略检索完成: "
-                    f"结果数={len(results)}, "
-                    f"权重={self.weights.get(retriever.name, 1.0)}"
-                )
-                return retriever.name, results
             except Exception as e:
                 logger.warning(
                     f"  ✗ 检索器 {retriever.name} 失败: {e}, "
                     f"原因=检索过程中发生异常，将使用其他策略的结果"
                 )
-                return retriever.name, []
-        
-        # 使用线程池并行执行
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(retrieve_with_name, retriever): retriever.name
-                for retriever in self.retrievers
-            }
-            
-            for future in concurrent.futures.as_completed(futures):
+                return retriever.name, [], time.perf_counter() - start, STATUS_ERROR
+            elapsed = time.perf_counter() - start
+            logger.debug(
+                f"  ✓ {retriever.name}策略检索完成: "
+                f"结果数={len(results)}, "
+                f"耗时={elapsed * 1000:.1f}ms, "
+                f"权重={self.weights.get(retriever.name, 1.0)}"
+            )
+            return retriever.name, results, elapsed, STATUS_OK
+        
+        executor = get_retrieval_executor(EXECUTOR_NAME)
+        started = time.monotonic()
+        futures: Dict[Future, str] = {
+            executor.submit(retrieve_with_name, retriever): retriever.name
+            for retriever in self.retrievers
+        }
+        deadlines = {
+            future: started + budget
+            for future, name in futures.items()
+            if (budget := self._budget(name)) is not None
+        }
+        
+        pending = set(futures)
+        timed_out = []
+        while pending:
+            pending_deadlines = [deadlines[f] for f in pending if f in deadlines]
+            wait_timeout = (
+                max(0.0, min(pending_deadlines) - time.monotonic()) if pending_deadlines else None
+            )
+            done, pending = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
                 try:
-                    retriever_name, results = future.result()
+                    retriever_name, results, elapsed, status = future.result()
+                    record_latency(retriever_name, elapsed, status)
                     all_results[retriever_name] = results
                 except Exception as e:
                     retriever_name = futures[future]
                     logger.error(f"检索器 {retriever_name} 执行异常: {e}")
                     all_results[retriever_name] = []
+            
+            now = time.monotonic()
+            expired = {f for f in pending if f in deadlines and deadlines[f] <= now}
+            for future in expired:
+                future.cancel()
+                name = futures[future]
+                record_latency(name, self._budget(name), STATUS_TIMEOUT)
+                timed_out.append(name)
+            pending -= expired
+        
+        if timed_out:
+            logger.warning(
+                f"⏱️ 多策略检索部分策略超时: "
+                f"超时策略={timed_out}, "
+                f"已完成策略={list(all_results)}, "
+                f"原因=超过延迟预算，只合并已完成策略的结果"
+            )
         
         return all_results
@@ -11,6 +11,7 @@ from llama_index.core.schema import QueryBundle, NodeWithScore
 from backend.infrastructure.indexer import IndexManager
 from backend.infrastructure.logger import get_logger
 from backend.infrastructure.config import config
+from backend.business.rag_engine.caching.retrieval_cache import with_retrieval_cache
 from backend.business.rag_engine.retrieval.strategies.file_level import (
     FilesViaContentRetriever,
     FilesViaMetadataRetriever,
@@ -227,7 +228,10 @@ class QueryRouter:
         """获取chunk检索器"""
         if self._chunk_retriever is None:
             index = self.index_manager.get_index()
-            self._chunk_retriever = index.as_retriever(similarity_top_k=top_k)
+            # 与固定 vector 策略共用检索结果缓存
+            self._chunk_retriever = with_retrieval_cache(
+                index.as_retriever(similarity_top_k=top_k), index, "vector", top_k
+            )
         return self._chunk_retriever
     
     def _get_files_via_metadata_retriever(self, top_k: int):
@@ -8,10 +8,16 @@ from backend.business.rag_engine.utils.utils import (
     format_sources,
     extract_sources_from_response,
 )
+from backend.business.rag_engine.utils.executor import (
+    get_retrieval_executor,
+    shutdown_retrieval_executor,
+)
 
 __all__ = [
     'handle_fallback',
     'collect_trace_info',
     'format_sources',
     'extract_sources_from_response',
+    'get_retrieval_executor',
+    'shutdown_retrieval_executor',
 ]
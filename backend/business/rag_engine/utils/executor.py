@@ -0,0 +1,59 @@
+"""
+RAG引擎工具模块 - 检索线程池：推测检索、多查询检索、多策略检索共用的全局线程池
+
+主要功能：
+- get_retrieval_executor()：按名称获取全局检索线程池（延迟创建）
+- shutdown_retrieval_executor()：关闭全局检索线程池
+
+特性：
+- 进程内长期复用，避免每次查询创建和销毁线程池
+- 按名称区分线程池：外层任务（多查询）等待内层任务（多策略）时不会占满同一个线程池
+- 关闭后再次获取时重新创建
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('rag_engine')
+
+DEFAULT_POOL = "default"
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+
+def get_retrieval_executor(name: str = DEFAULT_POOL) -> ThreadPoolExecutor:
+    """获取全局检索线程池
+
+    Args:
+        name: 线程池名称（不同层级的任务使用不同线程池）
+
+    Returns:
+        ThreadPoolExecutor: 全局检索线程池
+    """
+    with _executor_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            max_workers = max(8, min(32, (os.cpu_count() or 1) * 4))
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"rag_{name}")
+            _executors[name] = executor
+            logger.debug(f"创建全局检索线程池: name={name}, max_workers={max_workers}")
+        return executor
+
+
+def shutdown_retrieval_executor(name: Optional[str] = None, wait: bool = True) -> None:
+    """关闭全局检索线程池
+
+    Args:
+        name: 线程池名称（None 表示全部）
+        wait: 是否等待正在执行的任务
+    """
+    with _executor_lock:
+        names = list(_executors) if name is None else [name]
+        executors = [_executors.pop(n) for n in names if n in _executors]
+    for executor in executors:
+        executor.shutdown(wait=wait)
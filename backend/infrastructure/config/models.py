@@ -82,12 +82,34 @@ class ModelConfig(BaseModel):
     llms: Optional[LLMModelsConfig] = None  # 多模型配置（可选）
 
 
+def _validate_vector_dtype(v: str) -> str:
+    """校验向量存储精度"""
+    v = str(v).lower()
+    if v not in ("float32", "float16", "int8"):
+        raise ValueError('向量存储精度必须为 float32 / float16 / int8')
+    return v
+
+
+class EmbeddingCacheConfig(BaseModel):
+    """Embedding向量缓存配置"""
+    enable: bool = True
+    max_size_mb: int = 512
+    dtype: str = "float32"  # 存储精度：float32（向量库写入全精度）；float16 / int8 需显式开启
+
+    @field_validator('dtype')
+    def validate_dtype(cls, v: str) -> str:
+        """验证存储精度"""
+        return _validate_vector_dtype(v)
+
+
 class EmbeddingConfig(BaseModel):
     """Embedding配置"""
     type: str
     api_url: Optional[str] = None
     batch_size: int = 10
     max_length: int = 512
+    request_batch_size: int = 32
+    cache: EmbeddingCacheConfig = EmbeddingCacheConfig()
 
 
 class DeepSeekConfig(BaseModel):
@@ -97,9 +119,25 @@ class DeepSeekConfig(BaseModel):
     json_output_enabled: bool = False
 
 
+class VectorReplicaConfig(BaseModel):
+    """向量集合本地只读副本配置"""
+    enable: bool = True  # 仅 cloud 后端生效
+    version_check_seconds: int = 30  # 与 collection 比对节点数的最小间隔
+    max_segments: int = 8  # 段数超过该值时合并
+    dtype: str = "float16"  # 检索矩阵的存储精度：float32 / float16 / int8
+    rescore_factor: int = 4  # 量化检索取 Top-K 的倍数作为候选，再以全精度向量重新打分
+
+    @field_validator('dtype')
+    def validate_dtype(cls, v: str) -> str:
+        """验证存储精度"""
+        return _validate_vector_dtype(v)
+
+
 class VectorStoreConfig(BaseModel):
     """向量存储配置"""
     collection_name: str = "default"
+    backend: str = "cloud"  # cloud / persistent / ephemeral（见 ChromaClientManager）
+    replica: VectorReplicaConfig = VectorReplicaConfig()
 
 
 class PathsConfig(BaseModel):
@@ -112,6 +150,10 @@ class PathsConfig(BaseModel):
     github_sync_state: str
     cache_state: str
     sessions: str = "./data/sessions"  # 会话持久化目录
+    embedding_cache: str = "./data/cache/embeddings.sqlite3"  # Embedding向量缓存
+    text_index: str = "./data/cache/text_index"  # Grep 三元组索引、BM25 索引与文件索引目录
+    vector_replica: str = "./data/cache/vector_replica"  # 向量集合本地只读副本目录
+    query_cache: str = "./data/cache/query_rewrite.sqlite3"  # 查询改写缓存
 
 
 class IndexConfig(BaseModel):
@@ -120,6 +162,9 @@ class IndexConfig(BaseModel):
     chunk_overlap: int
     similarity_top_k: int
     similarity_threshold: float
+    pipeline_enable: bool = True
+    pipeline_queue_size: int = 4
+    pipeline_embed_concurrency: int = 4
     
     @field_validator('chunk_overlap')
     def validate_overlap(cls, v: int, info) -> int:
@@ -149,9 +194,80 @@ class RerankerConfig(BaseModel):
 class MultiStrategyConfig(BaseModel):
     """多策略检索配置"""
     enabled_strategies: List[str]
-    merge_strategy: str = "reciprocal_rank_fusion"
+    merge_strategy: str = "reciprocal_rank_fusion"  # reciprocal_rank_fusion | weighted_score | comb_sum | comb_mnz | simple
+    score_normalization: str = "min_max"  # comb_sum/comb_mnz 的分数归一化：min_max | z_score | none
     retriever_weights: Dict[str, float]
     enable_deduplication: bool = True
+    timeout_seconds: float = 3.0  # 单个策略的默认延迟预算（秒），0 表示不限
+    strategy_timeouts: Dict[str, float] = {}  # 按策略覆盖延迟预算（秒）
+
+
+class GrepConfig(BaseModel):
+    """Grep检索配置"""
+    data_source_path: Optional[str] = None  # None 表示使用 paths.raw_data
+    enable_regex: bool = True
+    max_results: int = 10
+    use_index: bool = True  # 使用进程内三元组索引代替 grep 子进程
+    index_refresh_seconds: int = 60  # 后台与磁盘对账的最小间隔（0 表示仅依赖变更通知）
+
+
+class BM25Config(BaseModel):
+    """BM25检索配置"""
+    tokenizer: str = "auto"  # auto（安装 jieba 时使用 jieba）/ jieba / bigram（CJK 二元组）
+    version_check_seconds: int = 30  # 与 Chroma collection 比对节点数的最小间隔
+    rebuild_quiet_seconds: int = 120  # 本进程在该时间内有写入时，节点数不一致不触发重建
+    save_delay_seconds: float = 5.0  # 增量更新后延迟保存，期间的多次更新合并为一次写盘；0 表示立即保存
+
+
+class FileIndexConfig(BaseModel):
+    """文件级元数据索引配置"""
+    enable: bool = True  # 关闭时文件名检索分页扫描 collection 元数据
+    version_check_seconds: int = 30  # 与 Chroma collection 比对 chunk 数的最小间隔
+    save_delay_seconds: float = 5.0  # 增量更新后延迟保存，期间的多次更新合并为一次写盘；0 表示立即保存
+
+
+class FileVectorsConfig(BaseModel):
+    """文件级向量配置"""
+    enable: bool = True  # 关闭时宽泛主题查询检索 chunk 后在本地按文件聚合
+    version_check_seconds: int = 60  # 与文件索引比对文件数的最小间隔，不一致时后台重建
+
+
+class ResponseCacheConfig(BaseModel):
+    """查询回答缓存配置"""
+    enable: bool = True
+    max_entries: int = 512
+    ttl_seconds: int = 3600
+    semantic_enable: bool = False  # 语义层：问题向量与已缓存问题足够接近时复用回答
+    semantic_max_distance: float = 0.05  # 语义命中的最大余弦距离
+    version_check_seconds: int = 30  # 读取 collection 节点数（发现其他进程写入）的最小间隔
+
+
+class RetrievalCacheConfig(BaseModel):
+    """检索结果缓存配置"""
+    enable: bool = True
+    max_entries: int = 1024
+    ttl_seconds: int = 600
+    version_check_seconds: int = 30  # 读取 collection 节点数（发现其他进程写入）的最小间隔
+
+
+class QueryCacheConfig(BaseModel):
+    """查询改写缓存配置"""
+    enable: bool = True  # 所有 QueryProcessor 共享（关闭时各实例使用私有内存缓存）
+    max_entries: int = 2048
+    ttl_seconds: int = 86400
+    persist: bool = True  # 持久化到 SQLite（多进程共享，重启后保留）
+
+
+class SpeculativeRetrievalConfig(BaseModel):
+    """推测检索配置"""
+    enable: bool = True  # 查询改写进行期间先用原始问题检索
+    similarity_threshold: float = 0.9  # 改写与原问题的字符相似度不低于该值时直接使用推测结果
+
+
+class MultiQueryConfig(BaseModel):
+    """多查询检索配置"""
+    enable: bool = True  # 对全部改写查询并行检索并融合（关闭时只检索 final_query）
+    max_queries: int = 3
 
 
 class RAGConfig(BaseModel):
@@ -163,6 +279,15 @@ class RAGConfig(BaseModel):
     hybrid_alpha: float = 0.5
     enable_auto_routing: bool = True
     multi_strategy: MultiStrategyConfig
+    grep: GrepConfig = GrepConfig()
+    bm25: BM25Config = BM25Config()
+    file_index: FileIndexConfig = FileIndexConfig()
+    file_vectors: FileVectorsConfig = FileVectorsConfig()
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    retrieval_cache: RetrievalCacheConfig = RetrievalCacheConfig()
+    query_cache: QueryCacheConfig = QueryCacheConfig()
+    speculative_retrieval: SpeculativeRetrievalConfig = SpeculativeRetrievalConfig()
+    multi_query: MultiQueryConfig = MultiQueryConfig()
 
 
 class ModuleRegistryConfig(BaseModel):
@@ -183,6 +308,26 @@ class BatchProcessingConfig(BaseModel):
     index_max_batches: int = 0
 
 
+class ParsingConfig(BaseModel):
+    """文档解析配置"""
+    parallel_enable: bool = True
+    process_workers: int = 0  # 0 表示 CPU 核数（最多 8）
+    thread_workers: int = 8
+
+
+class StreamingImportConfig(BaseModel):
+    """流式导入配置"""
+    enable: bool = True
+    batch_files: int = 32
+    queue_size: int = 2
+
+
+class ChatSessionsConfig(BaseModel):
+    """对话会话池配置"""
+    max_sessions: int = 256
+    idle_ttl_seconds: float = 3600
+
+
 class LlamaDebugConfig(BaseModel):
     """LlamaDebug配置"""
     enable: bool = True  # 默认启用
@@ -248,6 +393,9 @@ class ConfigModel(BaseModel):
     rag: RAGConfig
     module_registry: ModuleRegistryConfig
     batch_processing: BatchProcessingConfig
+    parsing: ParsingConfig = ParsingConfig()
+    streaming_import: StreamingImportConfig = StreamingImportConfig()
+    chat_sessions: ChatSessionsConfig = ChatSessionsConfig()
     
     # 可观测性
     observability: ObservabilityConfig
@@ -46,6 +46,12 @@ class Config:
         'HF_OFFLINE_MODE': lambda m: m.huggingface.offline_mode,
         # 向量数据库配置
         'CHROMA_COLLECTION_NAME': lambda m: m.vector_store.collection_name,
+        'VECTOR_STORE_BACKEND': lambda m: (os.getenv("VECTOR_STORE_BACKEND") or m.vector_store.backend).lower(),
+        'VECTOR_REPLICA_ENABLE': lambda m: m.vector_store.replica.enable,
+        'VECTOR_REPLICA_VERSION_CHECK_SECONDS': lambda m: m.vector_store.replica.version_check_seconds,
+        'VECTOR_REPLICA_MAX_SEGMENTS': lambda m: m.vector_store.replica.max_segments,
+        'VECTOR_REPLICA_DTYPE': lambda m: m.vector_store.replica.dtype,
+        'VECTOR_REPLICA_RESCORE_FACTOR': lambda m: m.vector_store.replica.rescore_factor,
         # 缓存配置（已废弃：缓存管理器功能已移除，此配置不再使用）
         'ENABLE_CACHE': lambda m: m.cache.enable,
         # 索引配置
@@ -53,11 +59,18 @@ class Config:
         'CHUNK_OVERLAP': lambda m: m.index.chunk_overlap,
         'SIMILARITY_TOP_K': lambda m: m.index.similarity_top_k,
         'SIMILARITY_THRESHOLD': lambda m: m.index.similarity_threshold,
+        'INDEX_PIPELINE_ENABLE': lambda m: m.index.pipeline_enable,
+        'INDEX_PIPELINE_QUEUE_SIZE': lambda m: m.index.pipeline_queue_size,
+        'INDEX_PIPELINE_EMBED_CONCURRENCY': lambda m: m.index.pipeline_embed_concurrency,
         # Embedding配置
         'EMBEDDING_TYPE': lambda m: m.embedding.type,
         'EMBEDDING_API_URL': lambda m: m.embedding.api_url,
         'EMBED_BATCH_SIZE': lambda m: m.embedding.batch_size,
         'EMBED_MAX_LENGTH': lambda m: m.embedding.max_length,
+        'HF_REQUEST_BATCH_SIZE': lambda m: m.embedding.request_batch_size,
+        'EMBED_CACHE_ENABLE': lambda m: m.embedding.cache.enable,
+        'EMBED_CACHE_MAX_MB': lambda m: m.embedding.cache.max_size_mb,
+        'EMBED_CACHE_DTYPE': lambda m: m.embedding.cache.dtype,
         # 可观测性配置
         'ENABLE_DEBUG_HANDLER': lambda m: m.observability.llama_debug.enable,
         'DEBUG_PRINT_TRACE': lambda m: m.observability.llama_debug.print_trace,
@@ -74,6 +87,40 @@ class Config:
         'ENABLE_AUTO_ROUTING': lambda m: m.rag.enable_auto_routing,
         'MERGE_STRATEGY': lambda m: m.rag.multi_strategy.merge_strategy,
         'ENABLE_DEDUPLICATION': lambda m: m.rag.multi_strategy.enable_deduplication,
+        'MULTI_STRATEGY_TIMEOUT_SECONDS': lambda m: m.rag.multi_strategy.timeout_seconds,
+        'MULTI_STRATEGY_STRATEGY_TIMEOUTS': lambda m: m.rag.multi_strategy.strategy_timeouts,
+        'MULTI_STRATEGY_SCORE_NORMALIZATION': lambda m: m.rag.multi_strategy.score_normalization,
+        'GREP_ENABLE_REGEX': lambda m: m.rag.grep.enable_regex,
+        'GREP_MAX_RESULTS': lambda m: m.rag.grep.max_results,
+        'GREP_USE_INDEX': lambda m: m.rag.grep.use_index,
+        'GREP_INDEX_REFRESH_SECONDS': lambda m: m.rag.grep.index_refresh_seconds,
+        'BM25_TOKENIZER': lambda m: m.rag.bm25.tokenizer,
+        'BM25_VERSION_CHECK_SECONDS': lambda m: m.rag.bm25.version_check_seconds,
+        'BM25_REBUILD_QUIET_SECONDS': lambda m: m.rag.bm25.rebuild_quiet_seconds,
+        'BM25_SAVE_DELAY_SECONDS': lambda m: m.rag.bm25.save_delay_seconds,
+        'FILE_INDEX_ENABLE': lambda m: m.rag.file_index.enable,
+        'FILE_INDEX_VERSION_CHECK_SECONDS': lambda m: m.rag.file_index.version_check_seconds,
+        'FILE_INDEX_SAVE_DELAY_SECONDS': lambda m: m.rag.file_index.save_delay_seconds,
+        'FILE_VECTORS_ENABLE': lambda m: m.rag.file_vectors.enable,
+        'FILE_VECTORS_VERSION_CHECK_SECONDS': lambda m: m.rag.file_vectors.version_check_seconds,
+        'RESPONSE_CACHE_ENABLE': lambda m: m.rag.response_cache.enable,
+        'RESPONSE_CACHE_MAX_ENTRIES': lambda m: m.rag.response_cache.max_entries,
+        'RESPONSE_CACHE_TTL_SECONDS': lambda m: m.rag.response_cache.ttl_seconds,
+        'RESPONSE_CACHE_SEMANTIC_ENABLE': lambda m: m.rag.response_cache.semantic_enable,
+        'RESPONSE_CACHE_SEMANTIC_MAX_DISTANCE': lambda m: m.rag.response_cache.semantic_max_distance,
+        'RESPONSE_CACHE_VERSION_CHECK_SECONDS': lambda m: m.rag.response_cache.version_check_seconds,
+        'RETRIEVAL_CACHE_ENABLE': lambda m: m.rag.retrieval_cache.enable,
+        'RETRIEVAL_CACHE_MAX_ENTRIES': lambda m: m.rag.retrieval_cache.max_entries,
+        'RETRIEVAL_CACHE_TTL_SECONDS': lambda m: m.rag.retrieval_cache.ttl_seconds,
+        'RETRIEVAL_CACHE_VERSION_CHECK_SECONDS': lambda m: m.rag.retrieval_cache.version_check_seconds,
+        'QUERY_CACHE_ENABLE': lambda m: m.rag.query_cache.enable,
+        'QUERY_CACHE_MAX_ENTRIES': lambda m: m.rag.query_cache.max_entries,
+        'QUERY_CACHE_TTL_SECONDS': lambda m: m.rag.query_cache.ttl_seconds,
+        'QUERY_CACHE_PERSIST': lambda m: m.rag.query_cache.persist,
+        'SPECULATIVE_RETRIEVAL_ENABLE': lambda m: m.rag.speculative_retrieval.enable,
+        'SPECULATIVE_RETRIEVAL_SIMILARITY_THRESHOLD': lambda m: m.rag.speculative_retrieval.similarity_threshold,
+        'MULTI_QUERY_ENABLE': lambda m: m.rag.multi_query.enable,
+        'MULTI_QUERY_MAX_QUERIES': lambda m: m.rag.multi_query.max_queries,
         # 模块注册中心配置
         'AUTO_REGISTER_MODULES': lambda m: m.module_registry.auto_register_modules,
         # 批处理配置
@@ -84,6 +131,17 @@ class Config:
         'NODES_PER_BATCH': lambda m: m.batch_processing.nodes_per_batch,
         'TOKENS_PER_BATCH': lambda m: m.batch_processing.tokens_per_batch,
         'INDEX_MAX_BATCHES': lambda m: m.batch_processing.index_max_batches,
+        # 文档解析配置
+        'PARSE_PARALLEL_ENABLE': lambda m: m.parsing.parallel_enable,
+        'PARSE_PROCESS_WORKERS': lambda m: m.parsing.process_workers,
+        'PARSE_THREAD_WORKERS': lambda m: m.parsing.thread_workers,
+        # 流式导入配置
+        'STREAMING_IMPORT_ENABLE': lambda m: m.streaming_import.enable,
+        'STREAMING_IMPORT_BATCH_FILES': lambda m: m.streaming_import.batch_files,
+        'STREAMING_IMPORT_QUEUE_SIZE': lambda m: m.streaming_import.queue_size,
+        # 对话会话池配置
+        'CHAT_MAX_SESSIONS': lambda m: m.chat_sessions.max_sessions,
+        'CHAT_SESSION_IDLE_TTL_SECONDS': lambda m: m.chat_sessions.idle_ttl_seconds,
         # 应用配置
         'APP_TITLE': lambda m: m.app.title,
         'APP_PORT': lambda m: m.app.port,
@@ -133,6 +191,10 @@ class Config:
             'GITHUB_SYNC_STATE_PATH': 'github_sync_state',
             'CACHE_STATE_PATH': 'cache_state',  # 已废弃：缓存管理器功能已移除，此配置不再使用
             'SESSIONS_PATH': 'sessions',  # 会话持久化目录
+            'EMBEDDING_CACHE_PATH': 'embedding_cache',  # Embedding向量缓存
+            'TEXT_INDEX_PATH': 'text_index',  # Grep 三元组索引、BM25 索引与文件索引
+            'VECTOR_REPLICA_PATH': 'vector_replica',  # 向量集合本地只读副本
+            'QUERY_CACHE_PATH': 'query_cache',  # 查询改写缓存
         }
         
         if name in path_mapping:
@@ -149,6 +211,10 @@ class Config:
         if name == 'RETRIEVER_WEIGHTS':
             return self._model.rag.multi_strategy.retriever_weights
         
+        if name == 'GREP_DATA_SOURCE_PATH':
+            path_str = self._model.rag.grep.data_source_path
+            return str(self._resolve_path(path_str)) if path_str else None
+        
         if name == 'INDEX_STRATEGY':
             return self._model.batch_processing.index_strategy.lower()
         
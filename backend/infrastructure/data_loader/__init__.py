@@ -21,6 +21,7 @@
 - service.py: 服务层，统一导入接口和流程编排
 - source/: 数据源层（GitHub、本地文件）
 - parser.py + utils/: 解析层（文档解析、缓存、文件处理）
+- streaming.py: 流式导入流水线（按批扫描、解析、写入向量存储）
 - errors.py, processor.py: 错误处理、文本清理
 
 设计说明：
@@ -61,6 +62,9 @@ from backend.infrastructure.data_loader.github_sync import FileChange, GitHubSyn
 from backend.infrastructure.data_loader.progress import ImportStage, ImportProgressManager
 from backend.infrastructure.data_loader.github_preflight import check_repository, PreflightResult
 
+# 导出流式导入
+from backend.infrastructure.data_loader.streaming import StreamingImportPipeline, StreamingImportResult
+
 # 导出后台任务
 from backend.infrastructure.data_loader.import_task import ImportTask
 from backend.infrastructure.data_loader.sync_task import SyncTask
@@ -186,6 +190,9 @@ __all__ = [
     'ImportProgressManager',
     'check_repository',
     'PreflightResult',
+    # 流式导入
+    'StreamingImportPipeline',
+    'StreamingImportResult',
     # 后台任务
     'ImportTask',
     'SyncTask',
@@ -3,11 +3,13 @@
 
 主要功能：
 - 从数据源加载文档的核心流程
+- build_metadata_map()、clean_documents()：与流式导入共用的元数据映射和文本清理
 - 支持进度追踪和取消机制
 """
 
 import time
-from typing import List, Optional, TYPE_CHECKING
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 from llama_index.core.schema import Document as LlamaDocument
 
@@ -16,7 +18,7 @@ from backend.infrastructure.data_loader.processor import DocumentProcessor
 from backend.infrastructure.data_loader.models import ProgressReporter
 
 if TYPE_CHECKING:
-    from backend.infrastructure.data_loader.source import DataSource
+    from backend.infrastructure.data_loader.source import DataSource, SourceFile
     from backend.infrastructure.data_loader.progress import ImportProgressManager
 
 logger = get_logger('data_loader_service')
@@ -78,10 +80,7 @@ def load_documents_from_source(
             return []
         
         file_paths = [sf.path for sf in source_files]
-        metadata_map = {
-            sf.path: {**sf.metadata, 'source_type': sf.source_type}
-            for sf in source_files
-        }
+        metadata_map = build_metadata_map(source_files)
         
         progress_reporter.print_if_enabled("📄 正在解析文件...")
         
@@ -93,7 +92,8 @@ def load_documents_from_source(
         parser_start_time = time.time()
         documents = DocumentParser().parse_files(
             file_paths, metadata_map, clean=clean,
-            progress_callback=_create_progress_callback(progress_manager) if progress_manager else None
+            progress_callback=_create_progress_callback(progress_manager) if progress_manager else None,
+            cancel_check=progress_manager.check_cancelled if progress_manager else None,
         )
         parser_elapsed = time.time() - parser_start_time
         
@@ -117,15 +117,7 @@ def load_documents_from_source(
         
         clean_start_time = time.time()
         if clean:
-            processor = DocumentProcessor()
-            documents = [
-                LlamaDocument(
-                    text=processor.clean_text(doc.text),
-                    metadata=doc.metadata,
-                    id_=doc.id_
-                )
-                for doc in documents
-            ]
+            documents = clean_documents(documents)
         clean_elapsed = time.time() - clean_start_time if clean else 0.0
         
         total_elapsed = time.time() - total_start_time
@@ -147,6 +139,27 @@ def load_documents_from_source(
         return []
 
 
+def build_metadata_map(source_files: List["SourceFile"]) -> Dict[Path, Dict[str, Any]]:
+    """构建文件路径到元数据的映射（附加 source_type）"""
+    return {
+        sf.path: {**sf.metadata, 'source_type': sf.source_type}
+        for sf in source_files
+    }
+
+
+def clean_documents(documents: List[LlamaDocument]) -> List[LlamaDocument]:
+    """清理文档文本（保留元数据和文档ID）"""
+    processor = DocumentProcessor()
+    return [
+        LlamaDocument(
+            text=processor.clean_text(doc.text),
+            metadata=doc.metadata,
+            id_=doc.id_
+        )
+        for doc in documents
+    ]
+
+
 def _create_progress_callback(progress_manager: "ImportProgressManager"):
     """创建进度回调函数"""
     def callback(current: int, total: int, filename: str = ""):
@@ -4,7 +4,7 @@ GitHub同步管理 - 管理器核心模块：GitHubSyncManager类实现
 主要功能：
 - GitHubSyncManager类：GitHub同步管理器，负责管理GitHub仓库的同步状态，追踪文件变化，支持增量更新
 - get_file_hash()：获取文件哈希值
-- detect_changes()：检测文件变更
+- detect_changes()、detect_changes_from_hashes()：检测文件变更（并通知覆盖本地仓库的 Grep 文本索引）
 - update_repository_sync_state()：更新仓库同步状态
 
 执行流程：
@@ -22,7 +22,7 @@ GitHub同步管理 - 管理器核心模块：GitHubSyncManager类实现
 
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from llama_index.core.schema import Document as LlamaDocument
@@ -192,6 +192,28 @@ class GitHubSyncManager:
             branch: 分支名称
             current_documents: 当前从 GitHub 加载的文档列表
             
+        Returns:
+            FileChange 对象，包含新增、修改、删除的文件列表
+        """
+        # 构建当前文件的哈希映射（只存储哈希值，不存储内容）
+        current_file_hashes = self._build_file_hash_map(current_documents)
+        return self.detect_changes_from_hashes(owner, repo, branch, current_file_hashes)
+    
+    def detect_changes_from_hashes(
+        self,
+        owner: str,
+        repo: str,
+        branch: str,
+        current_file_hashes: Dict[str, str]
+    ) -> FileChange:
+        """根据文件哈希检测文件变更（流式导入时不保留文档，只保留哈希）
+        
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            branch: 分支名称
+            current_file_hashes: 当前文件路径到内容哈希的映射
+            
         Returns:
             FileChange 对象，包含新增、修改、删除的文件列表
         """
@@ -199,15 +221,13 @@ class GitHubSyncManager:
         repo_sync_state = self._get_repo_sync_state(owner, repo, branch)
         
         changes = FileChange()
-        
-        # 构建当前文件的哈希映射（只存储哈希值，不存储内容）
-        current_file_hashes = self._build_file_hash_map(current_documents)
         current_paths = set(current_file_hashes.keys())
         
         # 如果是首次索引，所有文件都是新增
         if not repo_sync_state:
             changes.added = list(current_paths)
             logger.info(f"首次索引仓库 {repo_key}，所有 {len(changes.added)} 个文件视为新增")
+            self._notify_text_index(owner, repo, branch, changes)
             return changes
         
         # 获取历史文件记录
@@ -233,8 +253,26 @@ class GitHubSyncManager:
             f"删除 {len(changes.deleted)} 个"
         )
         
+        self._notify_text_index(owner, repo, branch, changes)
         return changes
     
+    def _notify_text_index(self, owner: str, repo: str, branch: str, changes: FileChange) -> None:
+        """将文件变更分发给 Grep 文本索引（只有根目录包含本地仓库的索引会更新，失败不影响同步流程）"""
+        if not changes.has_changes():
+            return
+        try:
+            from backend.infrastructure.config import config
+            from backend.infrastructure.git.manager import build_repo_path
+            from backend.infrastructure.text_index import notify_file_changes
+            
+            repo_path = build_repo_path(config.GITHUB_REPOS_PATH, owner, repo, branch)
+            notify_file_changes(
+                changed=[repo_path / p for p in changes.added + changes.modified],
+                deleted=[repo_path / p for p in changes.deleted],
+            )
+        except Exception as e:
+            logger.warning(f"更新文本索引失败: {e}")
+    
     def _build_files_metadata(
         self,
         documents: List[LlamaDocument],
@@ -249,17 +287,40 @@ class GitHubSyncManager:
         Returns:
             文件元数据字典
         """
-        files_metadata = {}
+        return self._records_to_files_metadata(self.build_file_records(documents), vector_ids_map)
+    
+    @staticmethod
+    def build_file_records(documents: List[LlamaDocument]) -> Dict[str, Dict[str, Any]]:
+        """构建文件路径到 {hash, size} 的映射（流式导入按批累积）
+        
+        Args:
+            documents: 文档列表
+            
+        Returns:
+            文件记录字典
+        """
+        records = {}
         for doc in documents:
             file_path = doc.metadata.get("file_path", "")
             if file_path:
-                files_metadata[file_path] = {
-                    "hash": compute_hash(doc.text),
-                    "size": len(doc.text),
-                    "last_modified": datetime.now().isoformat(),
-                    "vector_ids": vector_ids_map.get(file_path, []) if vector_ids_map else []
-                }
-        return files_metadata
+                records[file_path] = {"hash": compute_hash(doc.text), "size": len(doc.text)}
+        return records
+    
+    @staticmethod
+    def _records_to_files_metadata(
+        file_records: Dict[str, Dict[str, Any]],
+        vector_ids_map: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, Dict]:
+        now = datetime.now().isoformat()
+        return {
+            file_path: {
+                "hash": record["hash"],
+                "size": record["size"],
+                "last_modified": now,
+                "vector_ids": vector_ids_map.get(file_path, []) if vector_ids_map else []
+            }
+            for file_path, record in file_records.items()
+        }
     
     def update_repository_sync_state(
         self,
@@ -268,7 +329,8 @@ class GitHubSyncManager:
         branch: str,
         documents: List[LlamaDocument],
         vector_ids_map: Optional[Dict[str, List[str]]] = None,
-        commit_sha: Optional[str] = None
+        commit_sha: Optional[str] = None,
+        file_records: Optional[Dict[str, Dict[str, Any]]] = None
     ):
         """更新仓库的同步状态
         
@@ -279,9 +341,13 @@ class GitHubSyncManager:
             documents: 文档列表
             vector_ids_map: 文件路径到向量ID列表的映射（可选）
             commit_sha: 提交哈希（可选）
+            file_records: 文件路径到 {hash, size} 的映射（可选，提供时代替 documents）
         """
         repo_key = self.get_repository_key(owner, repo, branch)
-        files_metadata = self._build_files_metadata(documents, vector_ids_map)
+        if file_records is not None:
+            files_metadata = self._records_to_files_metadata(file_records, vector_ids_map)
+        else:
+            files_metadata = self._build_files_metadata(documents, vector_ids_map)
         
         # 更新仓库同步状态
         self.sync_state["repositories"][repo_key] = {
@@ -366,6 +432,35 @@ class GitHubSyncManager:
         file_metadata = files.get(file_path, {})
         return file_metadata.get("vector_ids", [])
     
+    def get_unchanged_vector_ids(
+        self,
+        owner: str,
+        repo: str,
+        branch: str,
+        file_records: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, List[str]]:
+        """找出内容哈希与同步状态一致且已记录向量ID的文件（流式同步据此跳过分块与向量查询）
+
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            branch: 分支名称
+            file_records: 当前文件路径到 {hash, size} 的映射
+
+        Returns:
+            未变化文件的路径到向量ID列表的映射
+        """
+        files = self._get_repo_files(owner, repo, branch)
+        if not files:
+            return {}
+
+        unchanged = {}
+        for file_path, record in file_records.items():
+            stored = files.get(file_path)
+            if stored and stored.get("vector_ids") and stored.get("hash") == record.get("hash"):
+                unchanged[file_path] = stored["vector_ids"]
+        return unchanged
+
     def remove_repository(self, owner: str, repo: str, branch: str = "main"):
         """移除仓库的同步状态
         
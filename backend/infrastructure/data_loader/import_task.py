@@ -5,6 +5,7 @@
 - ImportTask: 后台导入任务类
 - 支持启动、取消、进度查询
 - 线程安全的状态管理
+- 流式导入（streaming_import.enable）：按批解析并写入，峰值内存与批大小成正比
 
 使用方式：
 1. task = ImportTask.start(owner, repo, branch, index_manager, github_sync_manager)
@@ -151,6 +152,11 @@ class ImportTask:
             if pm.check_cancelled():
                 return
             
+            from backend.infrastructure.config import config
+            if getattr(config, 'STREAMING_IMPORT_ENABLE', False):
+                self._run_streaming()
+                return
+            
             # 阶段 2: 克隆/同步仓库
             pm.start_stage(ImportStage.GIT_CLONE)
             
@@ -230,3 +236,70 @@ class ImportTask:
             self._error = error_msg
             logger.error(f"[ImportTask] 导入失败: {error_msg}")
             logger.debug(f"[ImportTask] 详细错误:\n{traceback.format_exc()}")
+    
+    def _run_streaming(self):
+        """流式导入：克隆后按批解析并写入向量存储（批次写入后即可检索）"""
+        from backend.infrastructure.data_loader.source import GitHubSource
+        from backend.infrastructure.data_loader.streaming import StreamingImportPipeline, delete_file_vectors
+        
+        pm = self.progress_manager
+        
+        # 阶段 2-3: 克隆仓库，流式解析、向量化、写入
+        source = GitHubSource(
+            owner=self.owner,
+            repo=self.repo,
+            branch=self.branch,
+            show_progress=False,
+            progress_manager=pm
+        )
+        result = StreamingImportPipeline(
+            self.index_manager, progress_manager=pm, github_sync_manager=self.github_sync_manager
+        ).run(source)
+        
+        # 克隆失败时数据源已标记失败
+        if pm.is_complete:
+            self._error = self._error or "仓库同步失败"
+            return
+        
+        if result.cancelled:
+            pm.check_cancelled()
+            return
+        
+        if not result.file_count:
+            pm.fail_import("未能加载任何文件")
+            self._error = "未能加载任何文件"
+            return
+        
+        self._documents_count = result.document_count
+        pm.log_info(f"加载了 {self._documents_count} 个文档")
+        
+        # 阶段 4: 保存状态（同时更新 Grep 文本索引、清理已删除文件的向量）
+        pm.log_info("保存同步状态...")
+        changes = self.github_sync_manager.detect_changes_from_hashes(
+            self.owner, self.repo, self.branch, result.file_hashes
+        )
+        if changes.deleted:
+            delete_file_vectors(
+                self.index_manager, self.github_sync_manager,
+                self.owner, self.repo, self.branch, changes.deleted
+            )
+        
+        self.github_sync_manager.update_repository_sync_state(
+            owner=self.owner,
+            repo=self.repo,
+            branch=self.branch,
+            documents=[],
+            vector_ids_map=result.vector_ids_map,
+            commit_sha=source.commit_sha,
+            file_records=result.file_records
+        )
+        
+        pm.complete_import(f"成功导入 {self._documents_count} 个文档")
+        
+        self._result = {
+            "success": True,
+            "documents_count": self._documents_count,
+            "commit_sha": source.commit_sha,
+        }
+        
+        logger.info(f"[ImportTask] 流式导入完成: {self.owner}/{self.repo}, {self._documents_count} 个文档")
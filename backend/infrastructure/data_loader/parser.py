@@ -2,47 +2,68 @@
 文档解析器 - 核心解析模块：DocumentParser类和主要解析逻辑
 
 主要功能：
-- DocumentParser类：统一文档解析器，使用SimpleDirectoryReader自动支持多种文件格式
-- parse_files()：解析文件列表，返回文档列表
+- DocumentParser类：统一文档解析器，使用SimpleDirectoryReader的读取器自动支持多种文件格式
+- parse_files()：解析文件列表，按输入顺序返回文档列表
+- iter_parse_files()：并行解析文件列表，文件解析完成即流式返回文档
 
 执行流程：
 1. 验证文件路径
-2. 使用SimpleDirectoryReader解析文件
-3. 应用元数据映射
-4. 返回文档列表
+2. 并行模式：PDF/DOCX 等提交到进程池，Markdown/文本提交到线程池
+3. 按完成顺序应用元数据映射、回调进度；parse_files() 收齐后按输入顺序排列，iter_parse_files() 立即返回
+4. 每完成一个文件或等待超时时检查取消标志；取消时设置 cancelled，parse_files() 返回空列表
 
 特性：
 - 自动支持多种文件格式
 - 元数据映射
+- 并行解析，进度回调契约 (current, total, filename) 不变
+- 支持取消（ImportProgressManager.check_cancelled）
 - 完整的错误处理
 """
 
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 
-from llama_index.core import SimpleDirectoryReader
 from llama_index.core.schema import Document as LlamaDocument
 
 from backend.infrastructure.logger import get_logger
 from backend.infrastructure.data_loader.utils.file_utils import validate_files, group_files_by_directory
-from backend.infrastructure.data_loader.utils.parse_utils import parse_single_file, parse_directory_files
+from backend.infrastructure.data_loader.utils.parse_utils import (
+    PROCESS_POOL_EXTENSIONS,
+    apply_metadata,
+    load_file_in_worker,
+    get_parse_process_pool,
+    get_parse_process_workers,
+    load_file,
+    parse_single_file,
+    parse_directory_files,
+    shutdown_parse_process_pool,
+)
 
 logger = get_logger('document_parser')
 
+# 并行解析时检查取消标志的最长间隔（秒）
+CANCEL_POLL_INTERVAL = 0.5
+
 
 class DocumentParser:
     """统一文档解析器
     
-    使用 SimpleDirectoryReader 自动支持多种文件格式
+    使用 SimpleDirectoryReader 的读取器自动支持多种文件格式
     """
+
+    # 最近一次并行解析是否被取消（取消时不返回部分结果）
+    cancelled: bool = False
     
     def parse_files(
         self,
         file_paths: List[Path],
         metadata_map: Optional[Dict[Path, Dict[str, Any]]] = None,
         clean: bool = True,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        cancel_check: Optional[Callable[[], bool]] = None,
     ) -> List[LlamaDocument]:
         """解析文件列表，返回文档列表
         
@@ -51,11 +72,15 @@ class DocumentParser:
             metadata_map: 文件路径到元数据的映射（可选）
             clean: 是否清理文本（暂不使用，保留接口）
             progress_callback: 进度回调函数 (current, total, filename) -> None
+            cancel_check: 取消检查函数，返回 True 时停止解析（并行模式）
             
         Returns:
-            文档列表
+            文档列表（与输入文件顺序一致；并行解析被取消时为空列表，且 cancelled 为 True）
         """
+        from backend.infrastructure.config import config
+
         start_time = time.time()
+        self.cancelled = False
         
         if not file_paths:
             logger.warning("[阶段1.3] 文件路径列表为空")
@@ -72,6 +97,18 @@ class DocumentParser:
                 return []
             
             logger.info(f"[阶段1.3] 有效文件数量: {len(valid_paths)}/{len(file_paths)}")
+
+            if getattr(config, 'PARSE_PARALLEL_ENABLE', False) and len(valid_paths) > 1:
+                parsed = dict(self._iter_parse_valid_files(
+                    valid_paths, metadata_map, progress_callback, cancel_check
+                ))
+                if self.cancelled:
+                    return []
+                documents = [doc for index in sorted(parsed) for doc in parsed[index]]
+                elapsed = time.time() - start_time
+                logger.info(f"[阶段1.3] 并行解析 {len(documents)}/{len(valid_paths)} 个文档 (耗时: {elapsed:.2f}s)")
+                return documents
+
             total_files = len(valid_paths)
             processed_count = 0
             
@@ -118,3 +155,92 @@ class DocumentParser:
         except Exception as e:
             logger.error(f"[阶段1.3] 解析文件失败: {e}", exc_info=True)
             return []
+
+    def iter_parse_files(
+        self,
+        file_paths: List[Path],
+        metadata_map: Optional[Dict[Path, Dict[str, Any]]] = None,
+        progress_callback: Optional[callable] = None,
+        cancel_check: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[LlamaDocument]:
+        """并行解析文件列表，按文件完成顺序流式返回文档
+
+        Args:
+            file_paths: 文件路径列表
+            metadata_map: 文件路径到元数据的映射（可选）
+            progress_callback: 进度回调函数 (current, total, filename) -> None
+            cancel_check: 取消检查函数，返回 True 时停止解析、丢弃未完成的文件并设置 cancelled
+
+        Yields:
+            解析得到的文档
+        """
+        self.cancelled = False
+        valid_paths = validate_files(file_paths)
+        if not valid_paths:
+            logger.warning("[阶段1.3] 没有有效的文件路径")
+            return
+        for _, documents in self._iter_parse_valid_files(valid_paths, metadata_map, progress_callback, cancel_check):
+            yield from documents
+
+    def _iter_parse_valid_files(
+        self,
+        valid_paths: List[Path],
+        metadata_map: Optional[Dict[Path, Dict[str, Any]]],
+        progress_callback: Optional[callable],
+        cancel_check: Optional[Callable[[], bool]],
+    ) -> Iterator[Tuple[int, List[LlamaDocument]]]:
+        """按完成顺序返回 (输入序号, 该文件的文档)；取消时设置 cancelled 并停止"""
+        from backend.infrastructure.config import config
+
+        self.cancelled = False
+        total_files = len(valid_paths)
+        heavy = [p for p in valid_paths if p.suffix.lower() in PROCESS_POOL_EXTENSIONS]
+        use_processes = len(heavy) > 1 and get_parse_process_workers() > 1
+        thread_workers = max(1, getattr(config, 'PARSE_THREAD_WORKERS', 8))
+
+        executor = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="doc_parse")
+        pending: Dict[Future, Tuple[int, Path]] = {}
+        try:
+            process_pool = get_parse_process_pool() if use_processes else None
+            for index, file_path in enumerate(valid_paths):
+                if process_pool is not None and file_path.suffix.lower() in PROCESS_POOL_EXTENSIONS:
+                    future = process_pool.submit(load_file_in_worker, str(file_path))
+                else:
+                    future = executor.submit(load_file, file_path)
+                pending[future] = (index, file_path)
+            logger.debug(
+                f"[阶段1.3] 并行解析: {len(heavy) if use_processes else 0} 个文件进程池, "
+                f"其余线程池 (threads={thread_workers})"
+            )
+
+            processed_count = 0
+            while pending:
+                done, _ = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if not done and cancel_check and cancel_check():
+                    self.cancelled = True
+                    logger.info(f"[阶段1.3] 解析已取消，丢弃 {len(pending)} 个未完成的文件")
+                    return
+                for future in done:
+                    if cancel_check and cancel_check():
+                        self.cancelled = True
+                        logger.info(f"[阶段1.3] 解析已取消，丢弃 {len(pending)} 个未完成的文件")
+                        return
+                    index, file_path = pending.pop(future)
+                    try:
+                        documents = future.result()
+                    except BrokenProcessPool as e:
+                        logger.warning(f"⚠️  解析进程池异常，改为进程内解析 {file_path}: {e}")
+                        shutdown_parse_process_pool()
+                        documents = parse_single_file(file_path)
+                    except Exception as e:
+                        logger.error(f"[阶段1.3] 解析文件失败 {file_path}: {e}")
+                        documents = []
+
+                    processed_count += 1
+                    if progress_callback:
+                        progress_callback(processed_count, total_files, file_path.name)
+                    yield index, apply_metadata(documents, file_path, metadata_map)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -230,6 +230,19 @@ class ImportProgressManager:
         
         self._notify_update()
     
+    def update_total(self, stage: ImportStage, total: int):
+        """更新阶段总数（流式导入时总数随文件扫描逐步确定）
+        
+        Args:
+            stage: 阶段
+            total: 当前已知的总数
+        """
+        with self._lock:
+            if stage in self._stage_progress:
+                self._stage_progress[stage].total = total
+        
+        self._notify_update()
+    
     def complete_stage(self, stage: ImportStage, message: Optional[str] = None):
         """完成一个阶段
         
@@ -4,7 +4,7 @@
 主要功能：
 - ImportResult类：导入结果数据类，包含文档列表、成功状态、统计信息等
 - ProgressReporter类：进度反馈器，用于显示导入进度
-- DataImportService类：数据导入服务，提供统一的导入接口
+- DataImportService类：数据导入服务，提供统一的导入接口（含流式导入到向量存储）
 
 执行流程：
 1. 初始化数据源（GitHub或本地文件）
@@ -33,6 +33,7 @@ from backend.infrastructure.data_loader.document_loader import load_documents_fr
 
 if TYPE_CHECKING:
     from backend.infrastructure.data_loader.source import DataSource
+    from backend.infrastructure.data_loader.streaming import StreamingImportResult
     from backend.infrastructure.data_loader.progress import ImportProgressManager
 
 logger = get_logger('data_loader_service')
@@ -171,6 +172,36 @@ class DataImportService:
                 warnings=warnings
             )
     
+    def stream_from_source(
+        self,
+        source: "DataSource",
+        index_manager,
+        clean: bool = True,
+        progress_manager: Optional["ImportProgressManager"] = None
+    ) -> "StreamingImportResult":
+        """从数据源流式导入到向量存储（不返回文档，峰值内存与批大小成正比）
+        
+        Args:
+            source: 数据源对象（GitHubSource, LocalFileSource）
+            index_manager: 索引服务（需提供 build_index）
+            clean: 是否清理文本
+            progress_manager: 进度管理器（可选）
+            
+        Returns:
+            StreamingImportResult: 文件哈希、向量ID映射和统计信息
+        """
+        from backend.infrastructure.data_loader.streaming import StreamingImportPipeline
+        
+        self.progress_reporter.report_stage("🌊", "流式导入: 扫描 → 解析 → 向量化 → 写入")
+        result = StreamingImportPipeline(
+            index_manager, progress_manager=progress_manager, clean=clean
+        ).run(source)
+        self.progress_reporter.report_success(
+            f"流式导入 {result.file_count} 个文件 / {result.document_count} 个文档 "
+            f"(耗时: {result.elapsed_time:.2f}s)"
+        )
+        return result
+    
     def import_from_directory(
         self,
         directory: str | Path,
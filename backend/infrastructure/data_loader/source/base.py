@@ -3,7 +3,7 @@
 
 主要功能：
 - SourceFile类：数据源文件信息数据类，包含路径、来源类型和元数据
-- DataSource类：数据源抽象基类，定义get_file_paths()抽象方法
+- DataSource类：数据源抽象基类，定义get_file_paths()抽象方法和 iter_file_paths() 流式接口
 
 执行流程：
 1. 子类实现get_file_paths()方法
@@ -19,7 +19,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 
 
 @dataclass
@@ -42,6 +42,14 @@ class DataSource(ABC):
         """
         pass
     
+    def iter_file_paths(self) -> Iterator[SourceFile]:
+        """逐个返回文件路径（流式导入使用，默认基于 get_file_paths()）
+        
+        Yields:
+            SourceFile
+        """
+        yield from self.get_file_paths()
+    
     @abstractmethod
     def get_source_metadata(self) -> Dict[str, Any]:
         """获取数据源的元数据
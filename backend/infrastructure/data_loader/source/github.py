@@ -4,6 +4,7 @@ GitHub数据源：从GitHub仓库获取文件路径
 主要功能：
 - GitHubSource类：GitHub仓库数据源，实现DataSource接口
 - get_file_paths()：从GitHub仓库获取文件路径列表，支持缓存和任务ID
+- iter_file_paths()：边遍历边返回文件路径（流式导入）
 
 执行流程：
 1. 初始化GitHub数据源（克隆或更新仓库）
@@ -20,7 +21,7 @@ GitHub数据源：从GitHub仓库获取文件路径
 
 import os
 from pathlib import Path
-from typing import List, Optional, TYPE_CHECKING
+from typing import Iterator, List, Optional, TYPE_CHECKING
 from backend.infrastructure.data_loader.source.base import DataSource, SourceFile
 from backend.infrastructure.logger import get_logger
 
@@ -48,7 +49,9 @@ class GitHubSource(DataSource):
         filter_directories: Optional[List[str]] = None,
         filter_file_extensions: Optional[List[str]] = None,
         show_progress: bool = True,
-        progress_manager: Optional["ImportProgressManager"] = None
+        progress_manager: Optional["ImportProgressManager"] = None,
+        repo_path: Optional[Path] = None,
+        commit_sha: Optional[str] = None
     ):
         """初始化 GitHub 数据源
         
@@ -60,6 +63,8 @@ class GitHubSource(DataSource):
             filter_file_extensions: 只包含指定扩展名的文件
             show_progress: 是否显示进度信息
             progress_manager: 进度管理器（可选）
+            repo_path: 已同步的本地仓库路径（提供时不再克隆/更新）
+            commit_sha: 已同步仓库的 commit SHA
         """
         self.owner = owner
         self.repo = repo
@@ -68,8 +73,8 @@ class GitHubSource(DataSource):
         self.filter_file_extensions = filter_file_extensions
         self.show_progress = show_progress
         self.progress_manager = progress_manager
-        self.repo_path: Optional[Path] = None
-        self.commit_sha: Optional[str] = None
+        self.repo_path: Optional[Path] = repo_path
+        self.commit_sha: Optional[str] = commit_sha
     
     def get_source_metadata(self) -> dict:
         """获取数据源的元数据"""
@@ -82,53 +87,92 @@ class GitHubSource(DataSource):
             'url': f"https://github.com/{self.owner}/{self.repo}/blob/{self.branch}"
         }
     
-    def get_file_paths(self) -> List[SourceFile]:
-        """获取 GitHub 仓库中的文件路径列表
+    def _prepare_repository(self) -> bool:
+        """克隆或更新仓库（已提供 repo_path 时跳过）
         
         Returns:
-            文件路径列表
+            仓库是否就绪
         """
         import time
-        start_time = time.time()
+        
+        if self.repo_path is not None:
+            return True
         
         if GitRepositoryManager is None:
             logger.error("[阶段1.2] GitRepositoryManager 未安装")
             if self.progress_manager:
                 self.progress_manager.fail_import("GitRepositoryManager 未安装")
-            return []
+            return False
+        
+        logger.info(f"[阶段1.2] 开始从 GitHub 获取文件: {self.owner}/{self.repo}@{self.branch}")
+        
+        # 开始 GIT_CLONE 阶段
+        if self.progress_manager:
+            from backend.infrastructure.data_loader.progress import ImportStage
+            self.progress_manager.start_stage(ImportStage.GIT_CLONE)
+        
+        git_manager = GitRepositoryManager(config.GITHUB_REPOS_PATH)
         
         try:
-            # 步骤 1: 克隆或更新仓库
-            logger.info(f"[阶段1.2] 开始从 GitHub 获取文件: {self.owner}/{self.repo}@{self.branch}")
+            git_start_time = time.time()
+            self.repo_path, self.commit_sha = git_manager.clone_or_update(
+                owner=self.owner,
+                repo=self.repo,
+                branch=self.branch
+            )
+            git_elapsed = time.time() - git_start_time
+            logger.info(f"[阶段1.2] 仓库同步完成: {self.repo_path} (Commit: {self.commit_sha[:8]}, 耗时: {git_elapsed:.2f}s)")
             
-            # 开始 GIT_CLONE 阶段
+            # 完成 GIT_CLONE 阶段
             if self.progress_manager:
-                from backend.infrastructure.data_loader.progress import ImportStage
-                self.progress_manager.start_stage(ImportStage.GIT_CLONE)
-            
-            git_manager = GitRepositoryManager(config.GITHUB_REPOS_PATH)
-            
-            try:
-                git_start_time = time.time()
-                self.repo_path, self.commit_sha = git_manager.clone_or_update(
-                    owner=self.owner,
-                    repo=self.repo,
-                    branch=self.branch
+                self.progress_manager.complete_stage(
+                    ImportStage.GIT_CLONE, 
+                    f"克隆完成 (Commit: {self.commit_sha[:8]})"
                 )
-                git_elapsed = time.time() - git_start_time
-                logger.info(f"[阶段1.2] 仓库同步完成: {self.repo_path} (Commit: {self.commit_sha[:8]}, 耗时: {git_elapsed:.2f}s)")
-                
-                # 完成 GIT_CLONE 阶段
-                if self.progress_manager:
-                    self.progress_manager.complete_stage(
-                        ImportStage.GIT_CLONE, 
-                        f"克隆完成 (Commit: {self.commit_sha[:8]})"
-                    )
-                
-            except RuntimeError as e:
-                logger.error(f"[阶段1.2] Git 操作失败: {e}", exc_info=True)
-                if self.progress_manager:
-                    self.progress_manager.fail_import(f"Git 操作失败: {str(e)}")
+            return True
+            
+        except RuntimeError as e:
+            logger.error(f"[阶段1.2] Git 操作失败: {e}", exc_info=True)
+            if self.progress_manager:
+                self.progress_manager.fail_import(f"Git 操作失败: {str(e)}")
+            return False
+    
+    def _to_source_file(self, file_path: Path, source_metadata: dict) -> Optional[SourceFile]:
+        """构建 SourceFile（被过滤器排除时返回 None）"""
+        # 构建相对于仓库根目录的相对路径
+        try:
+            relative_path = file_path.relative_to(self.repo_path)
+        except ValueError:
+            logger.warning(f"[阶段1.2] 无法构建相对路径: {file_path}")
+            return None
+        
+        # 应用过滤器
+        if not self._should_include_file(str(relative_path)):
+            return None
+        
+        return SourceFile(
+            path=file_path,
+            source_type='github',
+            metadata={
+                **source_metadata,
+                'file_path': str(relative_path),
+                'file_name': file_path.name,
+                'url': f"https://github.com/{self.owner}/{self.repo}/blob/{self.branch}/{relative_path}"
+            }
+        )
+    
+    def get_file_paths(self) -> List[SourceFile]:
+        """获取 GitHub 仓库中的文件路径列表
+        
+        Returns:
+            文件路径列表
+        """
+        import time
+        start_time = time.time()
+        
+        try:
+            # 步骤 1: 克隆或更新仓库
+            if not self._prepare_repository():
                 return []
             
             # 取消检查点
@@ -140,6 +184,7 @@ class GitHubSource(DataSource):
             
             # 开始 FILE_WALK 阶段
             if self.progress_manager:
+                from backend.infrastructure.data_loader.progress import ImportStage
                 self.progress_manager.start_stage(ImportStage.FILE_WALK)
             
             walk_start_time = time.time()
@@ -157,35 +202,14 @@ class GitHubSource(DataSource):
                 )
             
             # 步骤 3: 应用过滤器
-            source_files = []
             source_metadata = self.get_source_metadata()
             
             filter_start_time = time.time()
-            filtered_count = 0
-            
-            for file_path in all_files:
-                # 构建相对于仓库根目录的相对路径
-                try:
-                    relative_path = file_path.relative_to(self.repo_path)
-                except ValueError:
-                    logger.warning(f"[阶段1.2] 无法构建相对路径: {file_path}")
-                    continue
-                
-                # 应用过滤器
-                if not self._should_include_file(str(relative_path)):
-                    filtered_count += 1
-                    continue
-                
-                source_files.append(SourceFile(
-                    path=file_path,
-                    source_type='github',
-                    metadata={
-                        **source_metadata,
-                        'file_path': str(relative_path),
-                        'file_name': file_path.name,
-                        'url': f"https://github.com/{self.owner}/{self.repo}/blob/{self.branch}/{relative_path}"
-                    }
-                ))
+            source_files = [
+                sf for sf in (self._to_source_file(f, source_metadata) for f in all_files)
+                if sf is not None
+            ]
+            filtered_count = len(all_files) - len(source_files)
             
             filter_elapsed = time.time() - filter_start_time
             total_elapsed = time.time() - start_time
@@ -211,6 +235,24 @@ class GitHubSource(DataSource):
             logger.error(f"[阶段1.2] 获取 GitHub 文件路径失败: {e}", exc_info=True)
             return []
     
+    def iter_file_paths(self) -> Iterator[SourceFile]:
+        """边遍历仓库边返回文件（流式导入使用）
+        
+        Yields:
+            通过过滤器的 SourceFile
+        """
+        if not self._prepare_repository():
+            return
+        
+        if self.progress_manager and self.progress_manager.is_cancelled:
+            return
+        
+        source_metadata = self.get_source_metadata()
+        for file_path in self._iter_repository(self.repo_path):
+            source_file = self._to_source_file(file_path, source_metadata)
+            if source_file is not None:
+                yield source_file
+    
     def _walk_repository(self, repo_path: Path) -> List[Path]:
         """递归遍历仓库目录，返回所有文件路径
         
@@ -220,11 +262,22 @@ class GitHubSource(DataSource):
         Returns:
             文件路径列表
         """
-        files = []
+        return list(self._iter_repository(repo_path))
+    
+    def _iter_repository(self, repo_path: Path) -> Iterator[Path]:
+        """递归遍历仓库目录，逐个返回文件路径
+        
+        Args:
+            repo_path: 仓库根路径
+            
+        Yields:
+            文件路径
+        """
         excluded_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.pytest_cache'}
         excluded_exts = {'.pyc', '.pyo', '.lock', '.log'}
         
         dir_count = 0
+        file_count = 0
         skipped_file_count = 0
         
         for root, dirs, filenames in os.walk(repo_path):
@@ -247,18 +300,17 @@ class GitHubSource(DataSource):
                 
                 # 只包含文件，排除符号链接等
                 if file_path.is_file():
-                    files.append(file_path)
+                    file_count += 1
+                    yield file_path
                 else:
                     logger.debug(f"[阶段1.2] 跳过非文件路径: {file_path}")
         
         logger.debug(
             f"[阶段1.2] 目录遍历统计: "
             f"遍历目录数={dir_count}, "
-            f"找到文件数={len(files)}, "
+            f"找到文件数={file_count}, "
             f"跳过文件数={skipped_file_count}"
         )
-        
-        return files
     
     def _should_include_file(self, relative_path: str) -> bool:
         """判断文件是否应该被包含
@@ -0,0 +1,329 @@
+"""
+流式导入流水线：从文件扫描到向量存储按批流式执行
+
+主要功能：
+- StreamingImportPipeline类：扫描 → 过滤 → 解析 → 清理 → 分块 → 向量化 → 写入
+- StreamingImportResult类：流式导入结果（只保留文件哈希和向量ID，不保留文档）
+- delete_file_vectors()：删除仓库中已移除文件的向量
+
+执行流程：
+1. 后台线程边遍历数据源边按 batch_files 分批，批内并行解析、清理
+2. 解析好的批次放入有界队列（队列满时解析阻塞，形成背压）
+3. 调用方线程逐批计算文件哈希；提供同步管理器时，内容哈希与同步状态一致的文件沿用记录的向量ID
+4. 其余文件调用 build_index 分块、向量化并写入向量存储（同步管理器随之传入，逐文件保存向量ID状态）
+5. 每批写入后累积文件哈希与向量ID，批次文档随即释放
+
+特性：
+- 峰值内存与批大小成正比，而非仓库大小
+- 第一批写入后即可被检索，无需等待整个导入完成
+- 增量同步：未变化的文件不再分块，也不查询 Chroma
+- 断点续传：build_index 按确定性向量ID跳过已写入的文件，中断前写入的文件由同步状态直接确认
+- 进度写入 ImportProgressManager（VECTORIZE 阶段，总数随扫描逐步确定），支持取消
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from llama_index.core.schema import Document as LlamaDocument
+
+from backend.infrastructure.logger import get_logger
+from backend.infrastructure.data_loader.document_loader import build_metadata_map, clean_documents
+from backend.infrastructure.data_loader.github_sync.manager import GitHubSyncManager
+from backend.infrastructure.data_loader.parser import DocumentParser
+from backend.infrastructure.data_loader.progress import ImportStage
+
+if TYPE_CHECKING:
+    from backend.infrastructure.data_loader.source import DataSource, SourceFile
+    from backend.infrastructure.data_loader.progress import ImportProgressManager
+
+logger = get_logger('data_loader_service')
+
+# 队列结束标记
+_DONE = object()
+
+# 生产者等待队列空位时检查停止标志的间隔（秒）
+_PUT_POLL_INTERVAL = 0.5
+
+
+@dataclass
+class StreamingImportResult:
+    """流式导入结果"""
+    file_count: int = 0
+    document_count: int = 0
+    batch_count: int = 0
+    file_records: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    vector_ids_map: Dict[str, List[str]] = field(default_factory=dict)
+    cancelled: bool = False
+    elapsed_time: float = 0.0
+
+    @property
+    def file_hashes(self) -> Dict[str, str]:
+        """文件路径到内容哈希的映射"""
+        return {path: record["hash"] for path, record in self.file_records.items()}
+
+    def add_batch(
+        self,
+        documents: List[LlamaDocument],
+        vector_ids_map: Dict[str, List[str]],
+        file_records: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        """累积一批的文件记录与向量ID（file_records 未提供时由文档计算）"""
+        records = file_records if file_records is not None else GitHubSyncManager.build_file_records(documents)
+        self.file_records.update(records)
+        self.vector_ids_map.update(vector_ids_map)
+        self.file_count += len(records)
+        self.document_count += len(documents)
+        self.batch_count += 1
+
+
+class StreamingImportPipeline:
+    """流式导入流水线"""
+
+    def __init__(
+        self,
+        index_manager,
+        progress_manager: Optional["ImportProgressManager"] = None,
+        clean: bool = True,
+        batch_files: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        github_sync_manager: Optional[GitHubSyncManager] = None,
+    ):
+        """初始化流式导入流水线
+
+        Args:
+            index_manager: 索引服务（IndexService 或 IndexManager，需提供 build_index）
+            progress_manager: 进度管理器（可选）
+            clean: 是否清理文本
+            batch_files: 每批文件数（默认读取配置）
+            queue_size: 解析与写入之间缓冲的批次数（默认读取配置）
+            github_sync_manager: GitHub同步管理器（可选，提供时跳过内容未变化的文件并逐文件保存向量ID状态）
+        """
+        from backend.infrastructure.config import config
+
+        self.index_manager = index_manager
+        self.progress_manager = progress_manager
+        self.clean = clean
+        self.batch_files = max(1, batch_files or getattr(config, 'STREAMING_IMPORT_BATCH_FILES', 32))
+        self.queue_size = max(1, queue_size or getattr(config, 'STREAMING_IMPORT_QUEUE_SIZE', 2))
+        self.github_sync_manager = github_sync_manager
+        self._discovered = 0
+        self._walk_done = False
+
+    def _is_cancelled(self) -> bool:
+        return bool(self.progress_manager and self.progress_manager.is_cancelled)
+
+    def _walk(self, source: "DataSource") -> Iterator["SourceFile"]:
+        """遍历数据源，同步更新进度总数"""
+        for source_file in source.iter_file_paths():
+            self._discovered += 1
+            if self.progress_manager and self._discovered % self.batch_files == 0:
+                self.progress_manager.update_total(ImportStage.VECTORIZE, self._discovered)
+            yield source_file
+        self._walk_done = True
+        if self.progress_manager:
+            self.progress_manager.update_total(ImportStage.VECTORIZE, self._discovered)
+            self.progress_manager.log_info(f"扫描完成 ({self._discovered} 个文件)")
+
+    def _parse_batch(self, source_files: List["SourceFile"]) -> List[LlamaDocument]:
+        """批内并行解析并清理"""
+        parser = DocumentParser()
+        documents = list(parser.iter_parse_files(
+            [sf.path for sf in source_files],
+            build_metadata_map(source_files),
+            cancel_check=self._is_cancelled,
+        ))
+        if parser.cancelled:
+            return []  # 不写入被取消批次的部分文档
+        if self.clean and documents:
+            documents = clean_documents(documents)
+        return documents
+
+    def _split_unchanged(
+        self,
+        documents: List[LlamaDocument],
+        file_records: Dict[str, Dict[str, Any]],
+    ) -> Tuple[List[LlamaDocument], Dict[str, List[str]]]:
+        """按同步状态分出内容未变化的文件
+
+        Returns:
+            (需要写入的文档, 未变化文件的路径到已记录向量ID的映射)
+        """
+        if self.github_sync_manager is None:
+            return documents, {}
+
+        by_repo: Dict[Tuple[str, str, str], Dict[str, Dict[str, Any]]] = {}
+        for doc in documents:
+            repository = doc.metadata.get("repository", "")
+            file_path = doc.metadata.get("file_path", "")
+            if "/" not in repository or file_path not in file_records:
+                continue
+            owner, repo = repository.split("/", 1)
+            branch = doc.metadata.get("branch", "main")
+            by_repo.setdefault((owner, repo, branch), {})[file_path] = file_records[file_path]
+
+        unchanged: Dict[str, List[str]] = {}
+        for (owner, repo, branch), records in by_repo.items():
+            unchanged.update(self.github_sync_manager.get_unchanged_vector_ids(owner, repo, branch, records))
+        if not unchanged:
+            return documents, {}
+        return [d for d in documents if d.metadata.get("file_path", "") not in unchanged], unchanged
+
+    def iter_document_batches(self, source: "DataSource") -> Iterator[List[LlamaDocument]]:
+        """扫描 → 过滤 → 解析 → 清理，按批返回文档
+
+        解析在后台线程执行，最多缓冲 queue_size 个批次。
+
+        Args:
+            source: 数据源
+
+        Yields:
+            一批清理后的文档
+        """
+        buffer: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=_PUT_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                walker = self._walk(source)
+                while not stop.is_set() and not self._is_cancelled():
+                    source_files = list(islice(walker, self.batch_files))
+                    if not source_files:
+                        break
+                    documents = self._parse_batch(source_files)
+                    if documents and not put(documents):
+                        break
+            except Exception as e:
+                logger.error(f"[流式导入] 扫描/解析失败: {e}", exc_info=True)
+                put(e)
+            finally:
+                put(_DONE)
+
+        producer = threading.Thread(target=produce, name="streaming_import_parse", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join(timeout=5.0)
+
+    def run(
+        self,
+        source: "DataSource",
+        batch_callback: Optional[Callable[[StreamingImportResult], None]] = None,
+    ) -> StreamingImportResult:
+        """执行流式导入
+
+        Args:
+            source: 数据源
+            batch_callback: 每批写入后的回调（可选，参数为累积结果）
+
+        Returns:
+            StreamingImportResult
+        """
+        start_time = time.time()
+        result = StreamingImportResult()
+        pm = self.progress_manager
+        stage_started = False
+
+        for documents in self.iter_document_batches(source):
+            if self._is_cancelled():
+                break
+
+            # 仓库克隆等前置阶段在生产者线程中完成后才开始向量化阶段
+            if pm and not stage_started:
+                pm.start_stage(ImportStage.VECTORIZE, total=self._discovered)
+                stage_started = True
+
+            file_records = GitHubSyncManager.build_file_records(documents)
+            to_index, vector_ids_map = self._split_unchanged(documents, file_records)
+            if vector_ids_map:
+                logger.info(f"[流式导入] 跳过 {len(vector_ids_map)} 个内容未变化的文件")
+            if to_index:
+                if self.github_sync_manager is not None:
+                    _, written = self.index_manager.build_index(
+                        to_index, show_progress=False, github_sync_manager=self.github_sync_manager
+                    )
+                else:
+                    _, written = self.index_manager.build_index(to_index, show_progress=False)
+                vector_ids_map = {**vector_ids_map, **written}
+            result.add_batch(documents, vector_ids_map, file_records)
+            del documents, to_index
+
+            logger.info(
+                f"[流式导入] 第 {result.batch_count} 批写入完成: "
+                f"累计 {result.file_count} 个文件, {result.document_count} 个文档"
+            )
+            if pm:
+                total = f"{self._discovered}" if self._walk_done else f"{self._discovered}+"
+                pm.update_progress(result.file_count, f"已写入 {result.file_count}/{total} 个文件")
+            if batch_callback:
+                batch_callback(result)
+
+        result.cancelled = self._is_cancelled()
+        result.elapsed_time = time.time() - start_time
+        if pm and stage_started and not result.cancelled:
+            pm.complete_stage(
+                ImportStage.VECTORIZE,
+                f"写入完成 ({result.file_count} 个文件, {result.document_count} 个文档)"
+            )
+        logger.info(
+            f"[流式导入] 完成: 文件={result.file_count}, 文档={result.document_count}, "
+            f"批次={result.batch_count}, 取消={result.cancelled}, 耗时={result.elapsed_time:.2f}s"
+        )
+        return result
+
+
+def delete_file_vectors(
+    index_manager,
+    github_sync_manager: GitHubSyncManager,
+    owner: str,
+    repo: str,
+    branch: str,
+    file_paths: List[str],
+) -> int:
+    """按同步状态中记录的向量ID删除已不存在的文件的向量
+
+    Args:
+        index_manager: 索引服务（IndexService 或 IndexManager）
+        github_sync_manager: GitHub 同步管理器
+        owner: 仓库所有者
+        repo: 仓库名称
+        branch: 分支名称
+        file_paths: 已删除的文件路径列表
+
+    Returns:
+        删除的向量数
+    """
+    from backend.infrastructure.indexer.utils.ids import delete_vectors_by_ids
+
+    vector_ids = [
+        vector_id
+        for file_path in file_paths
+        for vector_id in github_sync_manager.get_file_vector_ids(owner, repo, branch, file_path)
+    ]
+    if not vector_ids:
+        return 0
+    manager = getattr(index_manager, 'manager', index_manager)
+    for i in range(0, len(vector_ids), 100):
+        delete_vectors_by_ids(manager, vector_ids[i:i + 100])
+    logger.info(f"[流式导入] 删除 {len(file_paths)} 个已移除文件的 {len(vector_ids)} 个向量")
+    return len(vector_ids)
@@ -7,6 +7,7 @@
 - SyncTask: 后台同步任务类
 - 支持启动、取消、进度查询
 - 线程安全的状态管理
+- 流式同步（streaming_import.enable）：按批解析写入，未变化文件按确定性向量ID跳过
 
 使用方式：
 1. task = SyncTask.start(owner, repo, branch, index_manager, github_sync_manager)
@@ -118,6 +119,11 @@ class SyncTask:
         pm = self.progress_manager
         
         try:
+            from backend.infrastructure.config import config
+            if getattr(config, 'STREAMING_IMPORT_ENABLE', False):
+                self._run_streaming()
+                return
+            
             # 阶段 1: 检查更新 (复用 GIT_CLONE 阶段表示同步)
             pm.start_stage(ImportStage.GIT_CLONE)
             pm.log_info(f"正在同步 {self.owner}/{self.repo}@{self.branch}...")
@@ -221,3 +227,85 @@ class SyncTask:
             self._error = error_msg
             logger.error(f"[SyncTask] 同步失败: {error_msg}")
             logger.debug(f"[SyncTask] 详细错误:\n{traceback.format_exc()}")
+    
+    def _run_streaming(self):
+        """流式同步：按批解析并写入，内容哈希未变化的文件直接跳过，修改文件的旧向量被替换"""
+        from backend.infrastructure.config import config
+        from backend.infrastructure.git import GitRepositoryManager
+        from backend.infrastructure.data_loader.source import GitHubSource
+        from backend.infrastructure.data_loader.streaming import StreamingImportPipeline, delete_file_vectors
+        
+        pm = self.progress_manager
+        
+        # 阶段 1: 检查更新 (复用 GIT_CLONE 阶段表示同步)
+        pm.start_stage(ImportStage.GIT_CLONE)
+        pm.log_info(f"正在同步 {self.owner}/{self.repo}@{self.branch}...")
+        
+        git_manager = GitRepositoryManager(config.GITHUB_REPOS_PATH)
+        repo_path, commit_sha = git_manager.clone_or_update(
+            owner=self.owner,
+            repo=self.repo,
+            branch=self.branch
+        )
+        pm.log_success(f"同步完成 (Commit: {commit_sha[:8]})")
+        pm.complete_stage(ImportStage.GIT_CLONE)
+        
+        old_sync_state = self.github_sync_manager.get_repository_sync_state(self.owner, self.repo, self.branch)
+        if old_sync_state and old_sync_state.get('last_commit_sha', '') == commit_sha:
+            self._has_changes = False
+            pm.complete_import("已是最新版本")
+            return
+        
+        # 检查取消
+        if pm.check_cancelled():
+            return
+        
+        # 阶段 2: 流式解析、向量化、写入
+        source = GitHubSource(
+            owner=self.owner,
+            repo=self.repo,
+            branch=self.branch,
+            show_progress=False,
+            progress_manager=pm,
+            repo_path=repo_path,
+            commit_sha=commit_sha
+        )
+        result = StreamingImportPipeline(
+            self.index_manager, progress_manager=pm, github_sync_manager=self.github_sync_manager
+        ).run(source)
+        
+        if result.cancelled:
+            pm.check_cancelled()
+            return
+        
+        # 阶段 3: 检测变更，删除已移除文件的向量
+        changes = self.github_sync_manager.detect_changes_from_hashes(
+            self.owner, self.repo, self.branch, result.file_hashes
+        )
+        self._has_changes = changes.has_changes()
+        self._changes_summary = changes.summary()
+        if self._has_changes:
+            pm.log_info(f"检测到变更: {self._changes_summary}")
+        if changes.deleted:
+            delete_file_vectors(
+                self.index_manager, self.github_sync_manager,
+                self.owner, self.repo, self.branch, changes.deleted
+            )
+        
+        # 阶段 4: 保存状态
+        pm.log_info("保存同步状态...")
+        self.github_sync_manager.update_repository_sync_state(
+            owner=self.owner,
+            repo=self.repo,
+            branch=self.branch,
+            documents=[],
+            vector_ids_map=result.vector_ids_map,
+            commit_sha=commit_sha,
+            file_records=result.file_records
+        )
+        
+        if self._has_changes:
+            pm.complete_import(f"同步完成！{self._changes_summary}")
+        else:
+            pm.complete_import("已是最新版本")
+        logger.info(f"[SyncTask] 流式同步完成: {self.owner}/{self.repo}")
@@ -3,7 +3,7 @@
 
 主要功能：
 - validate_files()、group_files_by_directory()：文件工具函数
-- parse_single_file()、parse_directory_files()：解析工具函数
+- parse_single_file()、parse_file_list()、parse_directory_files()：解析工具函数
 - match_documents_to_files()：文档匹配函数
 
 执行流程：
@@ -18,13 +18,20 @@
 """
 
 from backend.infrastructure.data_loader.utils.file_utils import validate_files, group_files_by_directory
-from backend.infrastructure.data_loader.utils.parse_utils import parse_single_file, parse_directory_files
+from backend.infrastructure.data_loader.utils.parse_utils import (
+    parse_single_file,
+    parse_file_list,
+    parse_directory_files,
+    shutdown_parse_process_pool,
+)
 from backend.infrastructure.data_loader.utils.matching import match_documents_to_files
 
 __all__ = [
     'validate_files',
     'group_files_by_directory',
     'parse_single_file',
+    'parse_file_list',
     'parse_directory_files',
+    'shutdown_parse_process_pool',
     'match_documents_to_files',
 ]
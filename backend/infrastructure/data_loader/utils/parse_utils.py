@@ -1,34 +1,158 @@
 """
-文档解析器 - 解析工具模块：单文件和目录解析逻辑
+文档解析器 - 解析工具模块：按文件精确解析
 
 主要功能：
+- load_file()：按扩展名分派到缓存的读取器，只读取指定文件
+- apply_metadata()：将元数据映射应用到文件的文档
 - parse_single_file()：解析单个文件，返回文档列表
-- parse_directory_files()：解析目录中的多个文件，返回文档列表
+- parse_file_list()：解析一组文件（CPU 密集型格式在进程池中并行解析）
+- parse_directory_files()：解析目录中的指定文件（兼容旧接口）
+- shutdown_parse_process_pool()：关闭解析进程池
 
 执行流程：
-1. 验证文件路径和类型
-2. 使用SimpleDirectoryReader解析文件
-3. 应用元数据映射
-4. 返回文档列表
+1. 按扩展名取得缓存的读取器（PDF/DOCX 等），纯文本直接读取
+2. 只读取请求的文件（不再加载整个目录后过滤）
+3. 多个 PDF/DOCX 等文件提交到进程池并行解析
+4. 应用元数据映射，按输入顺序返回文档列表
 
 特性：
-- 支持单文件和批量解析
-- 元数据映射支持
-- 完整的错误处理
-- 性能统计和日志记录
+- 增量同步只改动一个文件时，只解析这一个文件
+- 读取器按扩展名缓存，每个进程只实例化一次
+- 进程池懒创建并复用（spawn 方式，避免 fork 带走线程状态）
+- 进程池不可用时退化为进程内解析
 """
 
+import os
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Type
 
 from llama_index.core import SimpleDirectoryReader
+from llama_index.core.readers.base import BaseReader
+from llama_index.core.readers.file.base import default_file_metadata_func
 from llama_index.core.schema import Document as LlamaDocument
 
 from backend.infrastructure.logger import get_logger
 
 logger = get_logger('document_parser')
 
+# CPU 密集型格式：多个文件时在进程池中解析
+PROCESS_POOL_EXTENSIONS = frozenset({
+    '.pdf', '.docx', '.pptx', '.ppt', '.pptm', '.epub', '.hwp', '.xls', '.xlsx',
+})
+
+# 与 SimpleDirectoryReader 一致：这些元数据不参与向量化和 LLM 上下文
+_EXCLUDED_METADATA_KEYS = [
+    "file_name",
+    "file_type",
+    "file_size",
+    "creation_date",
+    "last_modified_date",
+    "last_accessed_date",
+]
+
+# 扩展名 → 读取器实例（每个进程一份）
+_file_extractor: Dict[str, BaseReader] = {}
+_extractor_lock = threading.Lock()
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _default_reader_classes() -> Dict[str, Type[BaseReader]]:
+    return SimpleDirectoryReader.supported_suffix_fn()
+
+
+def _get_file_extractor(suffix: str) -> Dict[str, BaseReader]:
+    """返回读取器映射，确保该扩展名的读取器已实例化"""
+    with _extractor_lock:
+        if suffix not in _file_extractor:
+            reader_cls = _default_reader_classes().get(suffix)
+            if reader_cls is not None:
+                _file_extractor[suffix] = reader_cls()
+    return _file_extractor
+
+
+def load_file(file_path: Path) -> List[LlamaDocument]:
+    """读取单个文件（不应用元数据映射）
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        文档列表（文档ID为文件路径，与 SimpleDirectoryReader(filename_as_id=True) 一致）
+    """
+    file_path = Path(file_path)
+    documents = SimpleDirectoryReader.load_file(
+        file_path,
+        file_metadata=default_file_metadata_func,
+        file_extractor=_get_file_extractor(file_path.suffix.lower()),
+        filename_as_id=True,
+        errors='ignore',
+    )
+    for doc in documents:
+        doc.excluded_embed_metadata_keys.extend(_EXCLUDED_METADATA_KEYS)
+        doc.excluded_llm_metadata_keys.extend(_EXCLUDED_METADATA_KEYS)
+    return documents
+
+
+def load_file_in_worker(file_path: str) -> List[LlamaDocument]:
+    """进程池入口（必须是模块级函数以便序列化）"""
+    return load_file(Path(file_path))
+
+
+def apply_metadata(
+    documents: List[LlamaDocument],
+    file_path: Path,
+    metadata_map: Optional[Dict[Path, Dict[str, Any]]],
+) -> List[LlamaDocument]:
+    """将 metadata_map 中该文件的元数据合并到文档（兼容规范化后的路径键）"""
+    if metadata_map:
+        metadata = metadata_map.get(file_path)
+        if metadata is None:
+            metadata = metadata_map.get(file_path.resolve())
+        if metadata:
+            for doc in documents:
+                doc.metadata.update(metadata)
+    return documents
+
+
+def get_parse_process_workers() -> int:
+    """解析进程数（配置为 0 时取 CPU 核数，最多 8）"""
+    from backend.infrastructure.config import config
+
+    workers = getattr(config, 'PARSE_PROCESS_WORKERS', 0)
+    return workers if workers > 0 else min(8, os.cpu_count() or 1)
+
+
+def get_parse_process_pool() -> ProcessPoolExecutor:
+    """获取（懒创建）解析进程池"""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            import multiprocessing
+            max_workers = get_parse_process_workers()
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.debug(f"创建解析进程池: max_workers={max_workers}")
+        return _process_pool
+
+
+def shutdown_parse_process_pool() -> None:
+    """关闭解析进程池"""
+    global _process_pool
+    with _pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
 def parse_single_file(
     file_path: Path,
@@ -44,40 +168,63 @@ def parse_single_file(
         文档列表
     """
     try:
-        dir_path = file_path.parent
-        file_name = file_path.name
-        
-        reader = SimpleDirectoryReader(
-            input_dir=str(dir_path),
-            recursive=False,
-            filename_as_id=True,
-            errors='ignore'
-        )
-        
-        documents = reader.load_data()
-        
-        # 过滤出目标文件
-        filtered_docs = []
-        for doc in documents:
-            doc_file_path = doc.metadata.get('file_path', '')
-            if Path(doc_file_path).name == file_name:
-                # 应用元数据
-                if metadata_map and file_path in metadata_map:
-                    doc.metadata.update(metadata_map[file_path])
-                filtered_docs.append(doc)
-        
-        return filtered_docs
+        return apply_metadata(load_file(file_path), file_path, metadata_map)
     except Exception as e:
         logger.error(f"[阶段1.3] 解析文件失败 {file_path}: {e}")
         return []
 
 
+def parse_file_list(
+    files: List[Path],
+    metadata_map: Optional[Dict[Path, Dict[str, Any]]] = None,
+    use_process_pool: bool = True,
+) -> List[LlamaDocument]:
+    """解析一组文件，按输入顺序返回文档
+
+    多于一个 CPU 密集型文件（PDF/DOCX 等）时提交到进程池，其余文件在当前进程解析。
+
+    Args:
+        files: 文件路径列表
+        metadata_map: 元数据映射
+        use_process_pool: 是否使用进程池
+
+    Returns:
+        文档列表
+    """
+    heavy = [f for f in files if f.suffix.lower() in PROCESS_POOL_EXTENSIONS]
+    parsed: Dict[Path, List[LlamaDocument]] = {}
+
+    if use_process_pool and len(heavy) > 1 and get_parse_process_workers() > 1:
+        try:
+            pool = get_parse_process_pool()
+            futures = {f: pool.submit(load_file_in_worker, str(f)) for f in heavy}
+            for file_path, future in futures.items():
+                try:
+                    parsed[file_path] = apply_metadata(future.result(), file_path, metadata_map)
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    logger.error(f"[阶段1.3] 解析文件失败 {file_path}: {e}")
+                    parsed[file_path] = []
+        except BrokenProcessPool as e:
+            logger.warning(f"⚠️  解析进程池异常，改为进程内解析: {e}")
+            shutdown_parse_process_pool()
+
+    documents: List[LlamaDocument] = []
+    for file_path in files:
+        docs = parsed.get(file_path)
+        if docs is None:
+            docs = parse_single_file(file_path, metadata_map)
+        documents.extend(docs)
+    return documents
+
+
 def parse_directory_files(
     dir_path: Path,
     files: List[Path],
     metadata_map: Optional[Dict[Path, Dict[str, Any]]] = None
 ) -> List[LlamaDocument]:
-    """解析目录中的文件
+    """解析目录中的指定文件（只读取 files，不加载目录中的其他文件）
     
     Args:
         dir_path: 目录路径
@@ -87,29 +234,11 @@ def parse_directory_files(
     Returns:
         文档列表
     """
-    from backend.infrastructure.data_loader.utils.matching import match_documents_to_files
-    
     try:
         dir_start_time = time.time()
         logger.debug(f"[阶段1.3] 解析目录: {dir_path} (包含 {len(files)} 个文件)")
         
-        # 获取文件扩展名列表
-        extensions = {f.suffix for f in files if f.suffix}
-        
-        # 使用 SimpleDirectoryReader 加载目录
-        reader = SimpleDirectoryReader(
-            input_dir=str(dir_path),
-            recursive=False,
-            required_exts=list(extensions) if extensions else None,
-            filename_as_id=True,
-            errors='ignore'
-        )
-        
-        dir_documents = reader.load_data()
-        logger.debug(f"[阶段1.3] SimpleDirectoryReader 返回 {len(dir_documents)} 个文档")
-        
-        # 匹配文档到文件
-        matched_docs = match_documents_to_files(dir_documents, files, dir_path, metadata_map)
+        matched_docs = parse_file_list(files, metadata_map)
         
         elapsed = time.time() - dir_start_time
         logger.debug(f"[阶段1.3] 目录解析完成: {len(matched_docs)} 个文档 (耗时: {elapsed:.2f}s)")
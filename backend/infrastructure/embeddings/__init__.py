@@ -7,6 +7,8 @@ Embedding模块：提供统一的向量化接口，支持本地模型和HF Infer
 - HFInferenceEmbedding类：Hugging Face Inference API适配器
 - create_embedding()：工厂函数，创建Embedding实例
 - 统一缓存管理：管理BaseEmbedding缓存
+- EmbeddingVectorCache：持久化的内容寻址向量缓存
+- quantize() / quantized_scores()：float16 / int8 紧凑向量存储与量化检索
 - 延迟导入支持，避免初始化时加载所有依赖
 
 执行流程：
@@ -31,6 +33,14 @@ __all__ = [
     'LocalEmbedding',
     'HFInferenceEmbedding',
     'create_embedding',
+    # 向量缓存
+    'EmbeddingVectorCache',
+    'get_vector_cache',
+    # 向量量化
+    'QUANTIZATION_DTYPES',
+    'quantize',
+    'dequantize',
+    'quantized_scores',
     # 统计相关
     'set_current_task_id',
     'finish_task',
@@ -53,6 +63,12 @@ def __getattr__(name: str) -> Any:
     elif name == 'create_embedding':
         from backend.infrastructure.embeddings.factory import create_embedding
         return create_embedding
+    elif name in ('EmbeddingVectorCache', 'get_vector_cache'):
+        from backend.infrastructure.embeddings import vector_cache
+        return getattr(vector_cache, name)
+    elif name in ('QUANTIZATION_DTYPES', 'quantize', 'dequantize', 'quantized_scores'):
+        from backend.infrastructure.embeddings import quantization
+        return getattr(quantization, name)
     elif name in ('set_current_task_id', 'finish_task', 'get_stats', 'get_task_stats'):
         from backend.infrastructure.embeddings import hf_stats
         return getattr(hf_stats, name)
@@ -4,7 +4,9 @@ Embedding基类：定义统一的向量化接口
 主要功能：
 - BaseEmbedding类：抽象基类，定义所有Embedding实现必须实现的接口
 - get_query_embedding()：生成查询向量
+- get_query_embeddings()：批量生成查询向量（默认逐条调用，子类可一次批量请求）
 - get_text_embeddings()：批量生成文本向量
+- aget_query_embedding() / aget_text_embeddings()：异步接口（默认在线程中执行同步实现，子类可原生实现）
 
 执行流程：
 1. 子类实现抽象方法
@@ -17,6 +19,7 @@ Embedding基类：定义统一的向量化接口
 - 支持单条和批量向量化
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
@@ -39,6 +42,17 @@ class BaseEmbedding(ABC):
         """
         pass
     
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """批量生成查询向量（默认逐条调用 get_query_embedding）
+        
+        Args:
+            queries: 查询文本列表
+            
+        Returns:
+            向量列表
+        """
+        return [self.get_query_embedding(query) for query in queries]
+    
     @abstractmethod
     def get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
         """批量生成文本向量
@@ -51,6 +65,28 @@ class BaseEmbedding(ABC):
         """
         pass
     
+    async def aget_query_embedding(self, query: str) -> List[float]:
+        """异步生成查询向量（默认在线程中执行同步实现）
+        
+        Args:
+            query: 查询文本
+            
+        Returns:
+            向量（浮点数列表）
+        """
+        return await asyncio.to_thread(self.get_query_embedding, query)
+    
+    async def aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """异步批量生成文本向量（默认在线程中执行同步实现）
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            向量列表
+        """
+        return await asyncio.to_thread(self.get_text_embeddings, texts)
+    
     @abstractmethod
     def get_embedding_dimension(self) -> int:
         """获取向量维度
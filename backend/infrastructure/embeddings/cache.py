@@ -2,7 +2,7 @@
 Embedding缓存管理模块
 
 主要功能：
-- 管理BaseEmbedding缓存
+- 管理BaseEmbedding缓存（模型实例；向量级缓存见 vector_cache.py）
 - 提供缓存查询、设置、清除功能
 - 提供状态查询功能
 
@@ -66,6 +66,7 @@ def get_embedding_status() -> dict:
             "cache_exists": bool,                # 本地缓存是否存在
             "offline_mode": bool,                # 是否离线模式
             "mirror": str,                       # 镜像地址
+            "vector_cache": Optional[dict],      # 向量缓存统计（未启用时为None）
         }
     """
     model_name = config.EMBEDDING_MODEL
@@ -78,6 +79,9 @@ def get_embedding_status() -> dict:
     
     base_embedding = get_global_embedding()
     
+    from backend.infrastructure.embeddings.vector_cache import get_vector_cache
+    vector_cache = get_vector_cache()
+    
     return {
         "base_embedding_loaded": base_embedding is not None,
         "model_name": model_name,
@@ -85,4 +89,5 @@ def get_embedding_status() -> dict:
         "cache_exists": cache_exists,
         "offline_mode": config.HF_OFFLINE_MODE,
         "mirror": config.HF_ENDPOINT if config.HF_ENDPOINT else "huggingface.co (官方)",
+        "vector_cache": vector_cache.get_stats() if vector_cache is not None else None,
     }
@@ -2,16 +2,23 @@
 Hugging Face Inference API 客户端
 
 主要功能：
-- 处理单个和批量 API 请求
+- 处理单个和批量 API 请求，同步请求共用一个 keep-alive 连接池（requests.Session）
+- 批量模式：一次请求发送多个文本（feature-extraction 接受列表输入）
+- 按负载字节数和 413/429 响应自适应调整批次大小
+- 异步模式：基于 httpx.AsyncClient 的原生异步请求，信号量限制并发；每个事件循环一个客户端，循环结束时关闭
 - 重试机制和错误处理
 - API 调用统计记录
 """
 
 import time
 import json
-from typing import List, Set
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
 from backend.infrastructure.logger import get_logger
@@ -21,6 +28,86 @@ from backend.infrastructure.embeddings.hf_stats import record_api_call
 
 logger = get_logger('hf_api_client')
 
+# 批量模式下单次请求的最大负载（字节），超过则拆分批次
+MAX_PAYLOAD_BYTES = 512 * 1024
+# 收紧负载上限时的下限（单个超长文本仍单独成批发送）
+MIN_PAYLOAD_BYTES = 16 * 1024
+# 批量模式下同时进行的请求数（也是连接池大小）
+MAX_CONCURRENT_REQUESTS = 5
+
+
+class AdaptiveBatchSizer:
+    """自适应批次大小控制器（AIMD：遇到 413/429 时批次大小与负载上限减半，连续成功后逐步恢复）"""
+    
+    def __init__(self, max_batch_size: int, max_payload_bytes: int = MAX_PAYLOAD_BYTES):
+        """初始化
+        
+        Args:
+            max_batch_size: 批次大小上限（配置值）
+            max_payload_bytes: 单次请求负载上限（字节）
+        """
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_payload_bytes = max_payload_bytes
+        self._batch_size = self.max_batch_size
+        self._payload_bytes = max_payload_bytes
+        self._success_streak = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def batch_size(self) -> int:
+        """当前批次大小"""
+        return self._batch_size
+    
+    @property
+    def payload_bytes(self) -> int:
+        """当前单次请求负载上限（字节）"""
+        return self._payload_bytes
+    
+    def shrink(self) -> None:
+        """批次过大或被限流：批次大小减半，同时收紧负载上限"""
+        with self._lock:
+            self._batch_size = max(1, self._batch_size // 2)
+            self._payload_bytes = max(min(MIN_PAYLOAD_BYTES, self.max_payload_bytes), self._payload_bytes // 2)
+            self._success_streak = 0
+    
+    def record_success(self) -> None:
+        """请求成功：连续成功若干次后逐步恢复批次大小与负载上限"""
+        with self._lock:
+            self._success_streak += 1
+            if self._success_streak < 3:
+                return
+            if self._batch_size < self.max_batch_size or self._payload_bytes < self.max_payload_bytes:
+                self._batch_size = min(self.max_batch_size, self._batch_size + max(1, self._batch_size // 4))
+                self._payload_bytes = min(self.max_payload_bytes, self._payload_bytes + self._payload_bytes // 4)
+                self._success_streak = 0
+    
+    def plan(self, texts: List[str]) -> List[List[str]]:
+        """按当前批次大小和负载字节数切分文本
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            批次列表（保持原顺序）
+        """
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_bytes = 0
+        batch_size = self._batch_size
+        payload_bytes = self._payload_bytes
+        
+        for text in texts:
+            text_bytes = len(text.encode('utf-8')) + 4  # JSON 引号与逗号
+            if current and (len(current) >= batch_size or current_bytes + text_bytes > payload_bytes):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(text)
+            current_bytes += text_bytes
+        
+        if current:
+            batches.append(current)
+        return batches
+
 
 class HFAPIClient:
     """Hugging Face Inference API 客户端"""
@@ -31,7 +118,8 @@ class HFAPIClient:
         headers: dict,
         model_name: str,
         closed: bool,
-        active_requests: Set[int]
+        active_requests: Set[int],
+        request_batch_size: int = 1,
     ):
         """初始化 API 客户端
         
@@ -41,12 +129,53 @@ class HFAPIClient:
             model_name: 模型名称
             closed: 是否已关闭
             active_requests: 活跃请求集合
+            request_batch_size: 单次请求的文本数上限（1 表示逐条请求）
         """
         self.api_url = api_url
         self.headers = headers
         self.model_name = model_name
         self._closed = closed
         self._active_requests = active_requests
+        self.request_batch_size = max(1, request_batch_size)
+        self._batch_sizer = AdaptiveBatchSizer(self.request_batch_size)
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        # 事件循环 → (httpx.AsyncClient, 循环结束时关闭客户端的异步生成器)
+        # httpx.AsyncClient 不能跨事件循环复用；asyncio.run() 每次使用新的事件循环
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[Any, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+    
+    @property
+    def batch_mode(self) -> bool:
+        """是否启用批量请求模式"""
+        return self.request_batch_size > 1
+    
+    def _get_session(self) -> requests.Session:
+        """获取复用 keep-alive 连接池的 Session（延迟创建）"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=MAX_CONCURRENT_REQUESTS,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+        return self._session
+    
+    def close(self) -> None:
+        """关闭连接池"""
+        with self._session_lock:
+            if self._session is not None:
+                try:
+                    self._session.close()
+                except Exception:
+                    pass
+                self._session = None
     
     def make_single_request(self, text: str, retry_count: int = 0) -> List[float]:
         """发起单个文本的 API 请求（带重试机制）
@@ -69,9 +198,8 @@ class HFAPIClient:
         
         request_start = time.time()
         try:
-            response = requests.post(
+            response = self._get_session().post(
                 self.api_url,
-                headers=self.headers,
                 json=payload,
                 timeout=30,
             )
@@ -113,7 +241,7 @@ class HFAPIClient:
                 raise RuntimeError(f"HF API 调用失败（已重试 {max_retries} 次）: {error_details}") from e
     
     def make_request(self, texts: List[str]) -> List[List[float]]:
-        """发起 API 请求（并行处理优化）
+        """发起 API 请求（批量模式或逐条并行模式）
         
         Args:
             texts: 文本列表
@@ -130,6 +258,9 @@ class HFAPIClient:
         if not texts:
             return []
         
+        if self.batch_mode:
+            return self.make_batched_request(texts)
+        
         total = len(texts)
         logger.debug(f"📤 HF Inference API 请求: 模型={self.model_name}, 文本数量={total}")
         
@@ -207,3 +338,341 @@ class HFAPIClient:
                 time_monitor.__exit__(None, None, None)
         finally:
             self._active_requests.discard(request_id)
+
+    
+    # ==================== 批量模式 ====================
+    
+    def _post_batch(self, texts: List[str]) -> List[List[float]]:
+        """发送一次批量请求（不含重试）
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            向量列表
+            
+        Raises:
+            requests.HTTPError: HTTP 错误（由调用方根据状态码处理）
+            ValueError: 响应格式与输入不匹配
+        """
+        response = self._get_session().post(
+            self.api_url,
+            json={"inputs": texts},
+            timeout=60,
+        )
+        response.raise_for_status()
+        return self._parse_batch_result(texts, response.json())
+    
+    @staticmethod
+    def _parse_batch_result(texts: List[str], result) -> List[List[float]]:
+        """解析批量响应为向量列表
+        
+        Args:
+            texts: 请求的文本列表
+            result: 响应 JSON
+            
+        Returns:
+            向量列表
+            
+        Raises:
+            ValueError: 响应格式与输入不匹配
+        """
+        # 单个文本时服务端可能返回一维向量
+        if len(texts) == 1 and isinstance(result, list) and result and not isinstance(result[0], list):
+            result = [result]
+        
+        if not isinstance(result, list) or len(result) != len(texts):
+            raise ValueError(
+                f"批量响应数量不匹配: 期望 {len(texts)} 个向量，"
+                f"实际 {len(result) if isinstance(result, list) else type(result).__name__}"
+            )
+        
+        embeddings = []
+        for item in result:
+            # token 级输出（未池化）时取平均
+            if item and isinstance(item[0], list):
+                dim = len(item[0])
+                item = [sum(token[i] for token in item) / len(item) for i in range(dim)]
+            embeddings.append([float(x) for x in item])
+        return embeddings
+    
+    def _embed_batch_with_retry(self, texts: List[str], max_retries: int = 3) -> List[List[float]]:
+        """发送批量请求，处理 413（拆分）、429（退避）和网络错误（重试）
+        
+        Args:
+            texts: 文本列表
+            max_retries: 最大重试次数
+            
+        Returns:
+            向量列表
+            
+        Raises:
+            RuntimeError: 重试耗尽或实例已关闭
+        """
+        for attempt in range(max_retries + 1):
+            if self._closed:
+                raise RuntimeError("HFInferenceEmbedding 实例已关闭，请求被取消")
+            
+            try:
+                embeddings = self._post_batch(texts)
+                self._batch_sizer.record_success()
+                return embeddings
+            except RequestException as e:
+                status = e.response.status_code if getattr(e, 'response', None) is not None else None
+                
+                if status == 413 and len(texts) > 1:
+                    # 负载过大：缩小批次，拆成两半分别请求
+                    self._batch_sizer.shrink()
+                    mid = len(texts) // 2
+                    logger.info(f"📉 HF API 负载过大(413)，批次拆分: {len(texts)} -> {mid}+{len(texts) - mid}")
+                    return (
+                        self._embed_batch_with_retry(texts[:mid], max_retries)
+                        + self._embed_batch_with_retry(texts[mid:], max_retries)
+                    )
+                
+                if attempt >= max_retries:
+                    error_details = f"HTTP {status}: {e.response.text[:200]}" if status else str(e)
+                    raise RuntimeError(f"HF API 批量调用失败（已重试 {max_retries} 次）: {error_details}") from e
+                
+                wait_time = (attempt + 1) * 1.0
+                if status == 429:
+                    # 被限流：缩小批次，优先遵循 Retry-After
+                    self._batch_sizer.shrink()
+                    retry_after = e.response.headers.get("Retry-After") if e.response is not None else None
+                    try:
+                        wait_time = max(wait_time, float(retry_after))
+                    except (TypeError, ValueError):
+                        wait_time = wait_time * 2
+                    logger.warning(f"⚠️  HF API 限流(429)，批次大小降为 {self._batch_sizer.batch_size}，{wait_time:.1f}秒后重试")
+                else:
+                    logger.warning(f"⚠️  批量请求失败，{wait_time:.1f}秒后重试 ({attempt + 1}/{max_retries}): {e}")
+                time.sleep(wait_time)
+            except (ValueError, json.JSONDecodeError) as e:
+                if attempt >= max_retries:
+                    raise RuntimeError(f"HF API 批量响应解析失败: {e}") from e
+                logger.warning(f"⚠️  批量响应解析失败，重试 ({attempt + 1}/{max_retries}): {e}")
+                time.sleep((attempt + 1) * 1.0)
+        
+        raise RuntimeError("HF API 批量调用失败")  # pragma: no cover
+    
+    def make_batched_request(self, texts: List[str]) -> List[List[float]]:
+        """批量模式：每次请求发送多个文本，多个批次并发
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            向量列表（与输入顺序一致）
+            
+        Raises:
+            RuntimeError: API 调用失败或实例已关闭
+        """
+        total = len(texts)
+        request_id = id(texts)
+        self._active_requests.add(request_id)
+        
+        batch_start = time.time()
+        payload_bytes = sum(len(t.encode('utf-8')) for t in texts)
+        request_count = 0
+        results: List[List[float]] = []
+        
+        try:
+            with TimeMonitor(
+                logger,
+                f"⏱️  HF API 批量调用: 已花费 {{elapsed}} 秒 (模型={self.model_name}, 文本数量={total})"
+            ):
+                executor = _get_or_create_executor()
+                offset = 0
+                
+                # 按波次提交：每波按当前批次大小切分，最多 MAX_CONCURRENT_REQUESTS 个请求并发
+                while offset < total:
+                    remaining = texts[offset:]
+                    batches = self._batch_sizer.plan(remaining)[:MAX_CONCURRENT_REQUESTS]
+                    futures = [executor.submit(self._embed_batch_with_retry, batch) for batch in batches]
+                    
+                    for batch, future in zip(batches, futures):
+                        results.extend(future.result(timeout=300))
+                        offset += len(batch)
+                    request_count += len(batches)
+                    
+                    if offset < total:
+                        logger.debug(f"   进度: {offset}/{total} (批次大小={self._batch_sizer.batch_size})")
+            
+            batch_elapsed = time.time() - batch_start
+            logger.info(
+                f"📥 批量请求完成: {total} 个文本, {request_count} 次请求, "
+                f"总耗时={batch_elapsed:.2f}s, 吞吐={total / batch_elapsed if batch_elapsed > 0 else 0:.1f} 文本/s"
+            )
+            record_api_call(
+                text_count=total,
+                elapsed_time=batch_elapsed,
+                request_count=request_count,
+                payload_bytes=payload_bytes,
+            )
+            return results
+        finally:
+            self._active_requests.discard(request_id)
+
+    
+    # ==================== 异步模式 ====================
+    
+    def _create_async_client(self):
+        """创建 httpx.AsyncClient（复用 keep-alive 连接）"""
+        import httpx
+        
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=60.0,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENT_REQUESTS,
+                max_keepalive_connections=MAX_CONCURRENT_REQUESTS,
+            ),
+        )
+    
+    async def _close_on_loop_exit(self, loop: asyncio.AbstractEventLoop, client: Any) -> AsyncIterator[None]:
+        """事件循环结束时关闭客户端
+        
+        异步生成器在首次迭代时登记到事件循环；asyncio.run() 关闭循环前会调用
+        shutdown_asyncgens() 结束它，finally 中的 aclose() 因此在客户端自己的循环上执行。
+        """
+        try:
+            yield
+        finally:
+            entry = self._async_clients.get(loop)
+            if entry is not None and entry[0] is client:
+                del self._async_clients[loop]
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+    
+    async def _get_async_client(self):
+        """获取当前事件循环上的 httpx.AsyncClient（每个循环延迟创建一个，循环结束时关闭）"""
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            client = self._create_async_client()
+            guard = self._close_on_loop_exit(loop, client)
+            await guard.__anext__()
+            entry = (client, guard)
+            self._async_clients[loop] = entry
+        return entry[0]
+    
+    async def aclose(self) -> None:
+        """关闭当前事件循环上的异步客户端"""
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            client, guard = entry
+            try:
+                await guard.aclose()
+            except Exception:
+                pass
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+    
+    async def _aembed_batch_with_retry(self, texts: List[str], max_retries: int = 3) -> List[List[float]]:
+        """异步发送批量请求，处理 413（拆分）、429（退避）和网络错误（重试）
+        
+        Args:
+            texts: 文本列表
+            max_retries: 最大重试次数
+            
+        Returns:
+            向量列表
+            
+        Raises:
+            RuntimeError: 重试耗尽或实例已关闭
+        """
+        import httpx
+        
+        for attempt in range(max_retries + 1):
+            if self._closed:
+                raise RuntimeError("HFInferenceEmbedding 实例已关闭，请求被取消")
+            
+            status = None
+            retry_after = None
+            try:
+                client = await self._get_async_client()
+                response = await client.post(self.api_url, json={"inputs": texts})
+                status = response.status_code
+                if status < 400:
+                    embeddings = self._parse_batch_result(texts, response.json())
+                    self._batch_sizer.record_success()
+                    return embeddings
+                retry_after = response.headers.get("Retry-After")
+                error = RuntimeError(f"HTTP {status}: {response.text[:200]}")
+            except (httpx.HTTPError, ValueError) as e:
+                error = e
+            
+            if status == 413 and len(texts) > 1:
+                self._batch_sizer.shrink()
+                mid = len(texts) // 2
+                logger.info(f"📉 HF API 负载过大(413)，批次拆分: {len(texts)} -> {mid}+{len(texts) - mid}")
+                first, second = await asyncio.gather(
+                    self._aembed_batch_with_retry(texts[:mid], max_retries),
+                    self._aembed_batch_with_retry(texts[mid:], max_retries),
+                )
+                return first + second
+            
+            if attempt >= max_retries:
+                raise RuntimeError(f"HF API 异步调用失败（已重试 {max_retries} 次）: {error}") from error
+            
+            wait_time = (attempt + 1) * 1.0
+            if status == 429:
+                self._batch_sizer.shrink()
+                try:
+                    wait_time = max(wait_time, float(retry_after))
+                except (TypeError, ValueError):
+                    wait_time = wait_time * 2
+                logger.warning(f"⚠️  HF API 限流(429)，批次大小降为 {self._batch_sizer.batch_size}，{wait_time:.1f}秒后重试")
+            else:
+                logger.warning(f"⚠️  异步请求失败，{wait_time:.1f}秒后重试 ({attempt + 1}/{max_retries}): {error}")
+            await asyncio.sleep(wait_time)
+        
+        raise RuntimeError("HF API 异步调用失败")  # pragma: no cover
+    
+    async def amake_request(self, texts: List[str]) -> List[List[float]]:
+        """异步发起 API 请求（原生异步 HTTP，信号量限制并发）
+        
+        批量模式下按自适应批次切分，逐条模式下每个请求一个文本。
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            向量列表（与输入顺序一致）
+            
+        Raises:
+            RuntimeError: API 调用失败或实例已关闭
+        """
+        if not texts:
+            return []
+        
+        request_id = id(texts)
+        self._active_requests.add(request_id)
+        start = time.time()
+        
+        try:
+            batches = self._batch_sizer.plan(texts) if self.batch_mode else [[t] for t in texts]
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+            
+            async def run(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    return await self._aembed_batch_with_retry(batch)
+            
+            batch_results = await asyncio.gather(*(run(batch) for batch in batches))
+            results = [embedding for batch in batch_results for embedding in batch]
+            
+            elapsed = time.time() - start
+            logger.debug(f"📥 异步请求完成: {len(texts)} 个文本, {len(batches)} 次请求, 耗时={elapsed:.2f}s")
+            record_api_call(
+                text_count=len(texts),
+                elapsed_time=elapsed,
+                request_count=len(batches),
+                payload_bytes=sum(len(t.encode('utf-8')) for t in texts),
+            )
+            return results
+        finally:
+            self._active_requests.discard(request_id)
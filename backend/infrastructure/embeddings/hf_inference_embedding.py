@@ -5,11 +5,13 @@ Hugging Face Inference API Embedding适配器：支持通过HF Inference Provide
 - HFInferenceEmbedding类：Hugging Face Inference API适配器，实现BaseEmbedding接口
 - get_query_embedding()：通过HF Inference API生成查询向量
 - get_text_embeddings()：通过HF Inference API批量生成文本向量
+- aget_text_embeddings()：原生异步（httpx）批量生成文本向量
 
 特性：
 - 使用直接HTTP请求（requests）调用HF Inference API，提高透明度和可调试性
 - 支持按量付费（PRO用户每月有$2.00免费额度）
 - 统一的错误处理和重试机制
+- 持久化向量缓存：相同文本不重复调用 API
 """
 
 import os
@@ -30,6 +32,7 @@ from backend.infrastructure.embeddings.hf_thread_pool import (
 )
 from backend.infrastructure.embeddings.hf_llama_adapter import create_llama_index_adapter
 from backend.infrastructure.embeddings.hf_api_client import HFAPIClient
+from backend.infrastructure.embeddings.vector_cache import acached_embed, cached_embed
 
 logger = get_logger('hf_inference_embedding')
 
@@ -45,12 +48,14 @@ class HFInferenceEmbedding(BaseEmbedding):
         self,
         model_name: str = "BAAI/bge-base-zh-v1.5",
         api_key: Optional[str] = None,
+        request_batch_size: Optional[int] = None,
     ):
         """初始化 HF Inference API Embedding
         
         Args:
             model_name: Hugging Face 模型名称（默认 BAAI/bge-base-zh-v1.5）
             api_key: Hugging Face API Token（从环境变量 HF_TOKEN 或配置读取）
+            request_batch_size: 单次请求的文本数上限（默认读取配置 HF_REQUEST_BATCH_SIZE，1 表示逐条请求）
         """
         self.model_name = model_name
         self._dimension: Optional[int] = None
@@ -82,7 +87,8 @@ class HFInferenceEmbedding(BaseEmbedding):
             headers=self.headers,
             model_name=self.model_name,
             closed=self._closed,
-            active_requests=self._active_requests
+            active_requests=self._active_requests,
+            request_batch_size=request_batch_size or getattr(config, 'HF_REQUEST_BATCH_SIZE', 1),
         )
         
         # 缓存已知模型维度，避免维度检测时额外 API 调用
@@ -117,11 +123,34 @@ class HFInferenceEmbedding(BaseEmbedding):
         embeddings = self.get_text_embeddings([query])
         return embeddings[0]
     
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """批量生成查询向量（一次 API 请求）"""
+        return self.get_text_embeddings(queries)
+    
     def get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
         """批量生成文本向量
         
-        支持批量处理，自动分批以避免单次请求过大。
-        由于 feature_extraction 一次只能处理一个文本，内部会逐个处理。
+        先查询持久化向量缓存，仅对未命中的文本调用 API。
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            向量列表，每个文本对应一个向量
+        """
+        if not texts:
+            return []
+        
+        # HF API 在服务端截断，没有本地 max_length，缓存键中记为 0
+        return cached_embed(self.model_name, 0, texts, self._embed_uncached)
+    
+    async def aget_query_embedding(self, query: str) -> List[float]:
+        """异步生成查询向量"""
+        embeddings = await self.aget_text_embeddings([query])
+        return embeddings[0]
+    
+    async def aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """异步批量生成文本向量（原生异步 HTTP，不占用线程池）
         
         Args:
             texts: 文本列表
@@ -132,6 +161,25 @@ class HFInferenceEmbedding(BaseEmbedding):
         if not texts:
             return []
         
+        return await acached_embed(self.model_name, 0, texts, self._aembed_uncached)
+    
+    async def _aembed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """异步调用 API 批量生成文本向量（不经过缓存）"""
+        self._api_client._closed = self._closed
+        return await self._api_client.amake_request(texts)
+    
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """调用 API 批量生成文本向量（不经过缓存）
+        
+        支持批量处理，自动分批以避免单次请求过大。
+        批量模式下每次 HTTP 请求携带多个文本（HF_REQUEST_BATCH_SIZE），否则逐个文本请求。
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            向量列表，每个文本对应一个向量
+        """
         # 分批处理，每批最多 100 个文本
         batch_size = 100
         total_batches = (len(texts) + batch_size - 1) // batch_size
@@ -190,6 +238,9 @@ class HFInferenceEmbedding(BaseEmbedding):
             if self._active_requests:
                 logger.warning(f"⚠️  仍有 {len(self._active_requests)} 个请求未完成，强制关闭")
         
+        # 关闭连接池
+        self._api_client.close()
+        
         # 清理引用
         self._active_requests.clear()
         logger.info(f"✅ HFInferenceEmbedding 实例已关闭: {self.model_name}")
@@ -3,14 +3,12 @@ Hugging Face Inference API LlamaIndex 适配器
 
 主要功能：
 - 创建 LlamaIndex 兼容的 Embedding 适配器
-- 提供同步和异步接口
+- 提供同步和异步接口（异步接口委托给实例的 aget_* 方法，HF 实现为原生异步 HTTP）
 """
 
-import asyncio
 from typing import List
 
 from backend.infrastructure.logger import get_logger
-from backend.infrastructure.embeddings.hf_thread_pool import _get_or_create_executor
 
 logger = get_logger('hf_llama_adapter')
 
@@ -18,8 +16,11 @@ logger = get_logger('hf_llama_adapter')
 def create_llama_index_adapter(embedding_instance):
     """创建 LlamaIndex 兼容的 Embedding 适配器
     
+    适配器的所有调用都委托给 embedding_instance 的公共方法，
+    因此会经过实例上的持久化向量缓存。
+    
     Args:
-        embedding_instance: HFInferenceEmbedding 实例
+        embedding_instance: BaseEmbedding 实例（HFInferenceEmbedding / LocalEmbedding）
         
     Returns:
         LlamaIndex兼容的适配器包装器（继承自LlamaIndex BaseEmbedding）
@@ -99,27 +100,25 @@ def create_llama_index_adapter(embedding_instance):
         
         async def _aget_query_embedding(self, query: str) -> List[float]:
             """生成查询向量（LlamaIndex接口，私有方法，异步）"""
-            executor = _get_or_create_executor()
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(executor, self._embedding.get_query_embedding, query)
+            return await self._embedding.aget_query_embedding(query)
         
         async def _aget_text_embedding(self, text: str) -> List[float]:
             """生成单个文本向量（LlamaIndex接口，私有方法，异步）"""
-            executor = _get_or_create_executor()
-            loop = asyncio.get_event_loop()
-            embeddings = await loop.run_in_executor(executor, self._embedding.get_text_embeddings, [text])
+            embeddings = await self._embedding.aget_text_embeddings([text])
             return embeddings[0] if embeddings else []
         
         async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
             """批量生成文本向量（LlamaIndex接口，私有方法，异步）"""
-            executor = _get_or_create_executor()
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(executor, self._embedding.get_text_embeddings, texts)
+            return await self._embedding.aget_text_embeddings(texts)
         
         def get_query_embedding(self, query: str) -> List[float]:
             """生成查询向量（公共方法，兼容LlamaIndex接口）"""
             return self._get_query_embedding(query)
         
+        def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+            """批量生成查询向量（委托给底层Embedding的批量接口）"""
+            return self._embedding.get_query_embeddings(queries)
+        
         def get_text_embedding(self, text: str) -> List[float]:
             """生成单个文本向量（公共方法，兼容LlamaIndex接口）"""
             return self._get_text_embedding(text)
@@ -57,13 +57,30 @@ class HFAPIStats:
     total_time: float = 0.0
     first_call_time: Optional[datetime] = None
     last_call_time: Optional[datetime] = None
+    request_count: int = 0
+    payload_bytes: int = 0
     
-    def record(self, text_count: int, elapsed_time: float) -> None:
-        """记录一次调用"""
+    def record(
+        self,
+        text_count: int,
+        elapsed_time: float,
+        request_count: Optional[int] = None,
+        payload_bytes: int = 0,
+    ) -> None:
+        """记录一次调用
+        
+        Args:
+            text_count: 文本数
+            elapsed_time: 耗时（秒）
+            request_count: 实际 HTTP 请求数（批量模式下一次调用包含多个请求；默认等于文本数）
+            payload_bytes: 请求负载字节数
+        """
         now = datetime.now()
         self.call_count += 1
         self.text_count += text_count
         self.total_time += elapsed_time
+        self.request_count += text_count if request_count is None else request_count
+        self.payload_bytes += payload_bytes
         self.last_call_time = now
         if self.first_call_time is None:
             self.first_call_time = now
@@ -75,6 +92,20 @@ class HFAPIStats:
         self.total_time = 0.0
         self.first_call_time = None
         self.last_call_time = None
+        self.request_count = 0
+        self.payload_bytes = 0
+    
+    def copy(self) -> 'HFAPIStats':
+        """返回统计副本"""
+        return HFAPIStats(
+            call_count=self.call_count,
+            text_count=self.text_count,
+            total_time=self.total_time,
+            first_call_time=self.first_call_time,
+            last_call_time=self.last_call_time,
+            request_count=self.request_count,
+            payload_bytes=self.payload_bytes,
+        )
     
     @property
     def avg_time_per_call(self) -> float:
@@ -85,6 +116,16 @@ class HFAPIStats:
     def avg_time_per_text(self) -> float:
         """平均每个文本耗时"""
         return self.total_time / self.text_count if self.text_count > 0 else 0.0
+    
+    @property
+    def texts_per_second(self) -> float:
+        """吞吐量（文本/秒）"""
+        return self.text_count / self.total_time if self.total_time > 0 else 0.0
+    
+    @property
+    def avg_texts_per_request(self) -> float:
+        """平均每个 HTTP 请求包含的文本数"""
+        return self.text_count / self.request_count if self.request_count > 0 else 0.0
 
 
 # ============================================================
@@ -164,16 +205,22 @@ class HFAPIStatsCollector:
         
         self._initialized = True
     
-    def record(self, text_count: int, elapsed_time: float) -> None:
+    def record(
+        self,
+        text_count: int,
+        elapsed_time: float,
+        request_count: Optional[int] = None,
+        payload_bytes: int = 0,
+    ) -> None:
         """记录一次 API 调用（不输出明细日志）"""
         task_id = get_current_task_id()
         
         with self._data_lock:
-            self._global_stats.record(text_count, elapsed_time)
+            self._global_stats.record(text_count, elapsed_time, request_count, payload_bytes)
             
             if task_id not in self._task_stats:
                 self._task_stats[task_id] = HFAPIStats()
-            self._task_stats[task_id].record(text_count, elapsed_time)
+            self._task_stats[task_id].record(text_count, elapsed_time, request_count, payload_bytes)
             
             if task_id != 'global':
                 self._active_tasks.add(task_id)
@@ -230,6 +277,10 @@ class HFAPIStatsCollector:
             f"│ 全局总计: {g.call_count:>4} 次调用 | {g.text_count:>6} 文本 | "
             f"{g.total_time:>7.1f}s | {g.avg_time_per_text:.2f}s/文本 │"
         )
+        lines.append(
+            f"│ 吞吐: {g.texts_per_second:>7.1f} 文本/s | {g.request_count:>5} 次请求 | "
+            f"{g.avg_texts_per_request:>5.1f} 文本/请求     │"
+        )
         
         # 活跃任务统计
         if self._active_tasks:
@@ -256,13 +307,7 @@ class HFAPIStatsCollector:
                 if stats.call_count > 0:  # 只有有调用时才输出
                     self._log_task_complete(task_id, stats)
                 
-                return HFAPIStats(
-                    call_count=stats.call_count,
-                    text_count=stats.text_count,
-                    total_time=stats.total_time,
-                    first_call_time=stats.first_call_time,
-                    last_call_time=stats.last_call_time,
-                )
+                return stats.copy()
             
             if not self._active_tasks:
                 self._timer_running = False
@@ -282,33 +327,20 @@ class HFAPIStatsCollector:
             f"  ────────────────────────────────────────────────────────────\n"
             f"  API调用: {stats.call_count} 次 | 文本数: {stats.text_count}\n"
             f"  API耗时: {stats.total_time:.2f}s | 平均: {stats.avg_time_per_text:.3f}s/文本{duration_str}\n"
+            f"  HTTP请求: {stats.request_count} 次 | 吞吐: {stats.texts_per_second:.1f} 文本/s\n"
             f"══════════════════════════════════════════════════════════════"
         )
     
     def get_global_stats(self) -> HFAPIStats:
         """获取全局统计（副本）"""
         with self._data_lock:
-            g = self._global_stats
-            return HFAPIStats(
-                call_count=g.call_count,
-                text_count=g.text_count,
-                total_time=g.total_time,
-                first_call_time=g.first_call_time,
-                last_call_time=g.last_call_time,
-            )
+            return self._global_stats.copy()
     
     def get_task_stats(self, task_id: str) -> Optional[HFAPIStats]:
         """获取指定任务的统计（副本）"""
         with self._data_lock:
             if task_id in self._task_stats:
-                s = self._task_stats[task_id]
-                return HFAPIStats(
-                    call_count=s.call_count,
-                    text_count=s.text_count,
-                    total_time=s.total_time,
-                    first_call_time=s.first_call_time,
-                    last_call_time=s.last_call_time,
-                )
+                return self._task_stats[task_id].copy()
         return None
     
     def shutdown(self) -> None:
@@ -328,9 +360,14 @@ def get_collector() -> HFAPIStatsCollector:
     return HFAPIStatsCollector()
 
 
-def record_api_call(text_count: int, elapsed_time: float) -> None:
+def record_api_call(
+    text_count: int,
+    elapsed_time: float,
+    request_count: Optional[int] = None,
+    payload_bytes: int = 0,
+) -> None:
     """记录一次 API 调用"""
-    get_collector().record(text_count, elapsed_time)
+    get_collector().record(text_count, elapsed_time, request_count, payload_bytes)
 
 
 def finish_task(task_id: str) -> Optional[HFAPIStats]:
@@ -16,6 +16,7 @@
 - 支持本地模型加载
 - GPU加速支持
 - 批量处理优化
+- 持久化向量缓存：相同文本不重复计算
 - 完整的错误处理
 """
 
@@ -24,6 +25,7 @@ from pathlib import Path
 from typing import List, Optional
 
 from backend.infrastructure.embeddings.base import BaseEmbedding
+from backend.infrastructure.embeddings.vector_cache import cached_embed, get_vector_cache
 from backend.infrastructure.config import config, get_gpu_device, is_gpu_available
 from backend.infrastructure.logger import get_logger
 
@@ -133,13 +135,44 @@ class LocalEmbedding(BaseEmbedding):
         logger.info(f"   批处理大小: {self.embed_batch_size}")
         logger.info(f"   最大长度: {self.max_length}")
     
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """一次模型调用编码多个查询（与 get_query_embedding 使用相同的查询指令）
+
+        HuggingFaceEmbedding 没有公开的批量查询接口，使用其 _embed(prompt_name="query")；
+        不可用（旧版本签名不同）时逐条编码。
+        """
+        embed = getattr(self._model, '_embed', None)
+        if embed is not None and len(texts) > 1:
+            try:
+                return [list(vector) for vector in embed(list(texts), prompt_name="query")]
+            except TypeError as e:
+                logger.debug(f"批量查询向量化不可用，逐条编码: {e}")
+        return [self._model.get_query_embedding(t) for t in texts]
+    
     def get_query_embedding(self, query: str) -> List[float]:
-        """生成查询向量"""
-        return self._model.get_query_embedding(query)
+        """生成查询向量（查询可能带指令前缀，使用独立的缓存命名空间）"""
+        embeddings = cached_embed(
+            self.model_name,
+            self.max_length,
+            [query],
+            self._embed_queries,
+            namespace="query",
+        )
+        return embeddings[0]
+    
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """批量生成查询向量（一次查询向量缓存，未命中的查询一次模型调用批量编码）"""
+        return cached_embed(
+            self.model_name,
+            self.max_length,
+            queries,
+            self._embed_queries,
+            namespace="query",
+        )
     
     def get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
         """批量生成文本向量"""
-        return self._model.get_text_embedding_batch(texts)
+        return cached_embed(self.model_name, self.max_length, texts, self._model.get_text_embedding_batch)
     
     def get_embedding_dimension(self) -> int:
         """获取向量维度"""
@@ -152,10 +185,15 @@ class LocalEmbedding(BaseEmbedding):
         return self.model_name
     
     def get_llama_index_embedding(self):
-        """获取底层LlamaIndex兼容的Embedding实例
+        """获取LlamaIndex兼容的Embedding实例
+        
+        启用向量缓存时返回经过缓存的适配器，否则直接返回底层模型。
         
         Returns:
-            HuggingFaceEmbedding: LlamaIndex兼容的Embedding实例
+            LlamaIndex兼容的Embedding实例
         """
+        if get_vector_cache() is not None:
+            from backend.infrastructure.embeddings.hf_llama_adapter import create_llama_index_adapter
+            return create_llama_index_adapter(self)
         return self._model
 
@@ -0,0 +1,134 @@
+"""
+向量量化模块：float16 / int8 紧凑存储与量化矩阵上的近似内积
+
+主要功能：
+- quantize() / dequantize()：向量矩阵与量化表示互转（int8 带逐向量缩放系数）
+- quantized_scores()：在量化矩阵上分块计算与查询向量的内积（近似分数）
+- encode_vector() / decode_vector()：单个向量与字节串互转（向量缓存使用）
+- bytes_per_vector()：各存储精度下每个向量占用的字节数
+
+执行流程：
+1. 写入时按存储精度量化：float16 直接转换；int8 以 max(|x|) / 127 为缩放系数逐向量量化
+2. 检索时在量化矩阵上计算近似分数，取 Top-K 的若干倍候选
+3. 调用方用全精度向量对候选重新打分（见 vector_replica.VectorReplica.search）
+
+特性：
+- float32：每维 4 字节；float16：每维 2 字节；int8：每维 1 字节 + 每向量 4 字节缩放系数
+- 分块反量化计算内积，临时内存与矩阵大小无关
+- 只依赖 numpy，可在配置加载前导入
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 支持的存储精度
+QUANTIZATION_DTYPES = ("float32", "float16", "int8")
+
+_NUMPY_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# int8 量化的最大绝对值（对称量化，不使用 -128）
+_INT8_MAX = 127
+
+# 分块反量化计算内积的行数（块缓冲区保持在 CPU 二级缓存内）
+_SCORE_BLOCK_ROWS = 256
+
+
+def check_dtype(dtype: str) -> str:
+    """校验并规范化存储精度名称
+
+    Raises:
+        ValueError: 不支持的存储精度
+    """
+    name = str(dtype).lower()
+    if name not in QUANTIZATION_DTYPES:
+        raise ValueError(f"不支持的向量存储精度: {dtype}（可用: {', '.join(QUANTIZATION_DTYPES)}）")
+    return name
+
+
+def numpy_dtype(dtype: str) -> np.dtype:
+    """存储精度对应的 numpy 类型"""
+    return np.dtype(_NUMPY_DTYPES[check_dtype(dtype)])
+
+
+def bytes_per_vector(dim: int, dtype: str) -> int:
+    """每个向量占用的字节数（int8 含 4 字节缩放系数）"""
+    dtype = check_dtype(dtype)
+    scale_bytes = 4 if dtype == "int8" else 0
+    return dim * numpy_dtype(dtype).itemsize + scale_bytes
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """量化向量矩阵
+
+    Args:
+        vectors: 向量矩阵（行 × 维度）
+        dtype: 存储精度
+
+    Returns:
+        (量化矩阵, 逐向量缩放系数)；缩放系数仅 int8 有，其余为 None
+    """
+    dtype = check_dtype(dtype)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+
+    scales = np.abs(vectors).max(axis=1) / _INT8_MAX if len(vectors) else np.zeros(0, dtype=np.float32)
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -_INT8_MAX, _INT8_MAX).astype(np.int8)
+    return codes, scales
+
+
+def dequantize(codes: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """还原为 float32 向量矩阵"""
+    vectors = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        vectors = vectors * np.asarray(scales, dtype=np.float32)[:, None]
+    return vectors
+
+
+def quantized_scores(codes: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+    """在量化矩阵上计算与查询向量的内积
+
+    Args:
+        codes: 量化矩阵（可为只读内存映射）
+        scales: 逐向量缩放系数（int8），其余精度为 None
+        query: float32 查询向量
+
+    Returns:
+        每行的近似内积（float32）
+    """
+    query = np.asarray(query, dtype=np.float32)
+    rows = len(codes)
+    if codes.dtype == np.float32:
+        return codes @ query
+    scores = np.empty(rows, dtype=np.float32)
+    buffer = np.empty((min(rows, _SCORE_BLOCK_ROWS), codes.shape[1]), dtype=np.float32)
+    for start in range(0, rows, _SCORE_BLOCK_ROWS):
+        end = min(start + _SCORE_BLOCK_ROWS, rows)
+        block = buffer[:end - start]
+        np.copyto(block, codes[start:end], casting='unsafe')
+        np.dot(block, query, out=scores[start:end])
+    if scales is not None:
+        scores *= scales
+    return scores
+
+
+def encode_vector(vector: Sequence[float], dtype: str) -> bytes:
+    """把单个向量编码为字节串（int8 为 4 字节缩放系数 + 量化值）"""
+    codes, scales = quantize(np.asarray([vector], dtype=np.float32), dtype)
+    blob = codes.tobytes()
+    if scales is not None:
+        blob = scales.tobytes() + blob
+    return blob
+
+
+def decode_vector(blob: bytes, dtype: str) -> List[float]:
+    """把 encode_vector() 的字节串还原为 float 列表"""
+    dtype = check_dtype(dtype)
+    if dtype == "int8":
+        scale = np.frombuffer(blob[:4], dtype=np.float32)
+        return dequantize(np.frombuffer(blob[4:], dtype=np.int8)[None, :], scale)[0].tolist()
+    return np.frombuffer(blob, dtype=numpy_dtype(dtype)).astype(np.float32).tolist()
@@ -0,0 +1,425 @@
+"""
+Embedding向量缓存模块：基于内容寻址的持久化向量缓存
+
+主要功能：
+- EmbeddingVectorCache类：SQLite持久化的向量缓存，键为 (模型名, max_length, sha256(文本))
+- cached_embed()：在任意向量化函数前透明地套一层缓存
+- acached_embed()：cached_embed 的异步版本
+- get_vector_cache()：获取全局向量缓存（按配置延迟创建）
+
+执行流程：
+1. 对输入文本计算内容哈希，批量查询缓存
+2. 仅对未命中的文本（去重后）调用底层模型
+3. 写回缓存，超出容量上限时按LRU淘汰
+
+特性：
+- 内容寻址：文本不变则向量不变，重新导入/增量同步无需重复向量化
+- LRU淘汰 + 容量上限
+- 线程安全，SQLite WAL 模式支持多进程共享
+- 存储精度可选 float32 / float16 / int8（见 quantization.py），每条记录保存自己的精度，切换后旧条目仍可读取
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.infrastructure.config import config
+from backend.infrastructure.embeddings.quantization import check_dtype, decode_vector, encode_vector
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('embedding_vector_cache')
+
+# 淘汰时清理到容量上限的比例，避免每次写入都触发淘汰
+_EVICT_TARGET_RATIO = 0.9
+
+
+def _make_key(model_name: str, max_length: int, namespace: str, text: str) -> str:
+    """计算缓存键：(模型名, max_length, 命名空间, sha256(文本))"""
+    text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"{model_name}|{max_length}|{namespace}|{text_hash}"
+
+
+class EmbeddingVectorCache:
+    """持久化的Embedding向量缓存（SQLite + LRU）"""
+
+    def __init__(self, db_path: Path, max_size_mb: int = 512, dtype: str = "float32"):
+        """初始化向量缓存
+
+        Args:
+            db_path: SQLite 数据库文件路径
+            max_size_mb: 缓存容量上限（MB，按向量字节数计算）
+            dtype: 新写入向量的存储精度（float32 / float16 / int8）
+        """
+        self.db_path = Path(db_path)
+        self.max_bytes = max(1, int(max_size_mb)) * 1024 * 1024
+        self.dtype = check_dtype(dtype)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, "
+            "vector BLOB NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "last_access REAL NOT NULL, "
+            "dtype TEXT NOT NULL DEFAULT 'float32')"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "dtype" not in columns:
+            # 旧版缓存（全部为 float32）
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+        self._total_bytes = int(row[0])
+
+        logger.info(
+            f"📦 Embedding向量缓存: {self.db_path} "
+            f"(已用 {self._total_bytes / 1024 / 1024:.1f}MB / 上限 {max_size_mb}MB, 存储精度 {self.dtype})"
+        )
+
+    def get_many(
+        self,
+        model_name: str,
+        max_length: int,
+        texts: List[str],
+        namespace: str = "text",
+    ) -> List[Optional[List[float]]]:
+        """批量查询缓存
+
+        Args:
+            model_name: 模型名称
+            max_length: 模型最大长度（截断长度不同则向量不同）
+            texts: 文本列表
+            namespace: 命名空间（如 "text"、"query"，区分带指令前缀的查询向量）
+
+        Returns:
+            与 texts 对齐的向量列表，未命中的位置为 None
+        """
+        if not texts:
+            return []
+
+        keys = [_make_key(model_name, max_length, namespace, t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            # SQLite 默认变量上限 999，分批查询
+            for i in range(0, len(unique_keys), 500):
+                batch = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector, dtype FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob, dtype in rows:
+                    found[key] = decode_vector(blob, dtype)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for r in results if r is not None)
+            self._hits += hits
+            self._misses += len(results) - hits
+
+        return results
+
+    def put_many(
+        self,
+        model_name: str,
+        max_length: int,
+        texts: List[str],
+        vectors: List[List[float]],
+        namespace: str = "text",
+    ) -> None:
+        """批量写入缓存
+
+        Args:
+            model_name: 模型名称
+            max_length: 模型最大长度
+            texts: 文本列表
+            vectors: 与 texts 对齐的向量列表
+            namespace: 命名空间
+        """
+        if not texts:
+            return
+
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = encode_vector(vector, self.dtype)
+            rows.append((_make_key(model_name, max_length, namespace, text), blob, len(blob), now, self.dtype))
+
+        with self._lock:
+            # 覆盖写入的条目不重复计入容量
+            keys = list(dict.fromkeys(row[0] for row in rows))
+            replaced = 0
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access, dtype) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._total_bytes += sum(row[2] for row in rows) - int(replaced)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """按 LRU 淘汰到容量上限以下（调用方需持有锁）"""
+        target = int(self.max_bytes * _EVICT_TARGET_RATIO)
+        evicted = 0
+
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, size FROM embeddings ORDER BY last_access ASC LIMIT 500"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+
+            to_delete = []
+            for key, size in rows:
+                to_delete.append((key,))
+                self._total_bytes -= size
+                if self._total_bytes <= target:
+                    break
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", to_delete)
+            evicted += len(to_delete)
+
+        self._conn.commit()
+        logger.debug(f"🧹 Embedding向量缓存LRU淘汰: {evicted} 条")
+
+    def get_stats(self) -> dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total = self._hits + self._misses
+            return {
+                "path": str(self.db_path),
+                "entries": entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "dtype": self.dtype,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total > 0 else 0.0,
+            }
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._total_bytes = 0
+            self._hits = 0
+            self._misses = 0
+        logger.info("🧹 Embedding向量缓存已清空")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+# ============================================================
+# 全局缓存实例
+# ============================================================
+
+_global_vector_cache: Optional[EmbeddingVectorCache] = None
+_global_cache_initialized = False
+_global_cache_lock = threading.Lock()
+
+
+def get_vector_cache() -> Optional[EmbeddingVectorCache]:
+    """获取全局向量缓存（按配置延迟创建）
+
+    Returns:
+        EmbeddingVectorCache实例，未启用或创建失败时返回None
+    """
+    global _global_vector_cache, _global_cache_initialized
+
+    if _global_cache_initialized:
+        return _global_vector_cache
+
+    with _global_cache_lock:
+        if _global_cache_initialized:
+            return _global_vector_cache
+
+        if config.EMBED_CACHE_ENABLE:
+            try:
+                _global_vector_cache = EmbeddingVectorCache(
+                    db_path=config.EMBEDDING_CACHE_PATH,
+                    max_size_mb=config.EMBED_CACHE_MAX_MB,
+                    dtype=config.EMBED_CACHE_DTYPE,
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  Embedding向量缓存初始化失败，将直接调用模型: {e}")
+                _global_vector_cache = None
+
+        _global_cache_initialized = True
+        return _global_vector_cache
+
+
+def set_vector_cache(cache: Optional[EmbeddingVectorCache]) -> None:
+    """设置全局向量缓存（None 表示禁用）"""
+    global _global_vector_cache, _global_cache_initialized
+    with _global_cache_lock:
+        _global_vector_cache = cache
+        _global_cache_initialized = True
+
+
+def reset_vector_cache() -> None:
+    """关闭并重置全局向量缓存（下次使用时按配置重新创建）"""
+    global _global_vector_cache, _global_cache_initialized
+    with _global_cache_lock:
+        if _global_vector_cache is not None:
+            _global_vector_cache.close()
+        _global_vector_cache = None
+        _global_cache_initialized = False
+
+
+def _lookup(
+    cache: EmbeddingVectorCache,
+    model_name: str,
+    max_length: int,
+    texts: List[str],
+    namespace: str,
+) -> Tuple[Optional[List[Optional[List[float]]]], List[str]]:
+    """查询缓存，返回 (命中结果, 去重后的未命中文本)；读取失败时命中结果为 None"""
+    try:
+        results = cache.get_many(model_name, max_length, texts, namespace)
+    except Exception as e:
+        logger.warning(f"⚠️  读取Embedding向量缓存失败，直接调用模型: {e}")
+        return None, texts
+
+    missing_texts = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+    return results, missing_texts
+
+
+def _merge(
+    cache: EmbeddingVectorCache,
+    model_name: str,
+    max_length: int,
+    texts: List[str],
+    results: List[Optional[List[float]]],
+    missing_texts: List[str],
+    computed: List[List[float]],
+    namespace: str,
+) -> List[List[float]]:
+    """写回新计算的向量，并与命中结果合并"""
+    computed_map = dict(zip(missing_texts, computed))
+
+    try:
+        cache.put_many(model_name, max_length, missing_texts, computed, namespace)
+    except Exception as e:
+        logger.warning(f"⚠️  写入Embedding向量缓存失败: {e}")
+
+    hit_count = len(texts) - sum(1 for r in results if r is None)
+    if hit_count:
+        logger.debug(f"Embedding缓存: 命中 {hit_count}/{len(texts)}，新计算 {len(missing_texts)} 个")
+
+    return [r if r is not None else computed_map[t] for t, r in zip(texts, results)]
+
+
+def cached_embed(
+    model_name: str,
+    max_length: int,
+    texts: List[str],
+    compute: Callable[[List[str]], List[List[float]]],
+    namespace: str = "text",
+) -> List[List[float]]:
+    """带缓存的批量向量化
+
+    只对缓存未命中的文本（去重后）调用 compute，结果写回缓存。
+
+    Args:
+        model_name: 模型名称
+        max_length: 模型最大长度
+        texts: 文本列表
+        compute: 实际的向量化函数
+        namespace: 命名空间
+
+    Returns:
+        与 texts 对齐的向量列表
+    """
+    if not texts:
+        return []
+
+    cache = get_vector_cache()
+    if cache is None:
+        return compute(texts)
+
+    results, missing_texts = _lookup(cache, model_name, max_length, texts, namespace)
+    if results is None:
+        return compute(texts)
+    if not missing_texts:
+        logger.debug(f"✅ Embedding缓存全部命中: {len(texts)} 个文本")
+        return results
+
+    computed = compute(missing_texts)
+    return _merge(cache, model_name, max_length, texts, results, missing_texts, computed, namespace)
+
+
+async def acached_embed(
+    model_name: str,
+    max_length: int,
+    texts: List[str],
+    acompute: Callable[[List[str]], Awaitable[List[List[float]]]],
+    namespace: str = "text",
+) -> List[List[float]]:
+    """带缓存的批量向量化（异步版本）
+
+    缓存读写为本地 SQLite 操作，直接在事件循环中执行；仅向量化调用是异步的。
+
+    Args:
+        model_name: 模型名称
+        max_length: 模型最大长度
+        texts: 文本列表
+        acompute: 实际的异步向量化函数
+        namespace: 命名空间
+
+    Returns:
+        与 texts 对齐的向量列表
+    """
+    if not texts:
+        return []
+
+    cache = get_vector_cache()
+    if cache is None:
+        return await acompute(texts)
+
+    results, missing_texts = _lookup(cache, model_name, max_length, texts, namespace)
+    if results is None:
+        return await acompute(texts)
+    if not missing_texts:
+        return results
+
+    computed = await acompute(missing_texts)
+    return _merge(cache, model_name, max_length, texts, results, missing_texts, computed, namespace)
@@ -15,9 +15,10 @@ Git仓库管理模块 - 向后兼容层：保持向后兼容的接口导出
 - 完整的错误处理
 """
 
-from backend.infrastructure.git.manager import GitRepositoryManager
+from backend.infrastructure.git.manager import GitRepositoryManager, build_repo_path
 
 __all__ = [
     'GitRepositoryManager',
+    'build_repo_path',
 ]
 
@@ -4,6 +4,7 @@ Git仓库管理 - 核心管理器模块：GitRepositoryManager类实现
 主要功能：
 - GitRepositoryManager类：Git仓库本地管理器，管理GitHub仓库的本地克隆和增量更新
 - get_repo_path()：获取仓库本地路径
+- build_repo_path()：按命名规则计算仓库本地路径（不依赖 git 环境检查）
 - clone_or_update()：克隆或更新仓库
 
 执行流程：
@@ -31,6 +32,21 @@ from backend.infrastructure.logger import get_logger
 logger = get_logger('git_repository_manager')
 
 
+def build_repo_path(repos_base_path: Path, owner: str, repo: str, branch: str) -> Path:
+    """按命名规则计算仓库本地路径
+    
+    Args:
+        repos_base_path: 本地仓库存储的基础目录
+        owner: 仓库所有者
+        repo: 仓库名称
+        branch: 分支名称
+        
+    Returns:
+        本地仓库路径
+    """
+    return Path(repos_base_path) / owner / f"{repo}_{branch}"
+
+
 class GitRepositoryManager:
     """Git 仓库本地管理器
     
@@ -84,8 +100,7 @@ class GitRepositoryManager:
         Returns:
             本地仓库路径
         """
-        repo_dir_name = f"{repo}_{branch}"
-        return self.repos_base_path / owner / repo_dir_name
+        return build_repo_path(self.repos_base_path, owner, repo, branch)
     
     def _build_clone_url(self, owner: str, repo: str) -> str:
         """构建克隆 URL（仅支持公开仓库）
@@ -11,7 +11,7 @@ from backend.infrastructure.config import config, get_gpu_device
 from backend.infrastructure.logger import get_logger
 from backend.infrastructure.indexer.build.normal import build_index_normal_mode
 from backend.infrastructure.indexer.build.filter import filter_vectorized_documents
-from backend.infrastructure.indexer.utils.ids import get_vector_ids_batch
+from backend.infrastructure.indexer.utils.ids import get_vector_ids_batch, notify_vector_changes
 
 if TYPE_CHECKING:
     from backend.infrastructure.data_loader.github_sync.manager import GitHubSyncManager
@@ -112,6 +112,14 @@ def build_index_method(
             f"总耗时={total_elapsed:.2f}s"
         )
         
+        # 新写入的向量与 add_documents 走同一通知入口：版本号、BM25、文件索引、文件向量与本地向量副本
+        # （已向量化文件不变，无需通知）
+        notify_vector_changes(
+            index_manager,
+            added_ids=[vector_id for vector_ids in new_vector_ids_map.values() for vector_id in vector_ids],
+        )
+        _flush_text_indexes()
+        
         # 合并向量ID映射（已向量化 + 新处理）
         all_vector_ids_map = {**already_vectorized_map, **new_vector_ids_map}
         
@@ -128,6 +136,15 @@ def build_index_method(
         raise
 
 
+def _flush_text_indexes() -> None:
+    """构建结束时保存增量更新后尚未落盘的 BM25 / 文件索引（每次构建写盘一次）"""
+    try:
+        from backend.infrastructure.text_index import flush_text_indexes
+        flush_text_indexes()
+    except Exception as e:
+        logger.warning(f"⚠️  保存文本索引失败（进程退出时重试）: {e}")
+
+
 def _save_vector_ids_middle_layer(
     github_sync_manager: "GitHubSyncManager",
     vector_ids_map: Dict[str, List[str]],
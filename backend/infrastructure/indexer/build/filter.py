@@ -1,12 +1,16 @@
 """
 文档过滤模块：过滤已向量化的文档，实现文档级断点续传
+
+判断依据为确定性节点ID：文件分块后应写入的向量ID全部存在于 Chroma 才算已向量化，
+写了一半的文件和内容已变化的文件都会被重新处理。
 """
 
 from typing import List, Tuple, Dict, Optional, TYPE_CHECKING
 
 from llama_index.core.schema import Document as LlamaDocument
 
-from backend.infrastructure.indexer.utils.ids import get_vector_ids_by_metadata
+from backend.infrastructure.indexer.utils.ids import delete_vectors_by_ids, get_vector_ids_batch
+from backend.infrastructure.indexer.utils.node_ids import expected_node_ids
 from backend.infrastructure.logger import get_logger
 
 if TYPE_CHECKING:
@@ -14,6 +18,9 @@ if TYPE_CHECKING:
 
 logger = get_logger('indexer')
 
+# 清理过期向量时每批删除的数量
+STALE_DELETE_BATCH_SIZE = 100
+
 
 def _extract_repo_info(doc: LlamaDocument) -> Tuple[str, str, str]:
     """从文档元数据中提取仓库信息
@@ -89,49 +96,58 @@ def filter_vectorized_documents(
         already_vectorized_map = {}  # 新增：已向量化文档的向量ID映射
         
         logger.info(f"🔍 开始检查 {len(documents)} 个文档的向量化状态...")
-        for idx, doc in enumerate(documents, 1):
-            file_path = doc.metadata.get("file_path", "")
-            if not file_path:
-                documents_to_process.append(doc)
-                continue
-            
-            # 添加进度日志（每10个文档或最后一个文档）
-            if idx % 10 == 0 or idx == len(documents):
-                logger.info(f"   检查进度: {idx}/{len(documents)}")
-            
-            try:
-                vector_ids = None
-                
-                # 优先使用github_sync_manager查询
-                if github_sync_manager:
-                    try:
-                        owner, repo, branch = _extract_repo_info(doc)
-                        if owner and repo:
-                            vector_ids = github_sync_manager.get_file_vector_ids(
-                                owner, repo, branch, file_path
-                            )
-                            if vector_ids:
-                                logger.debug(f"通过github_sync_manager找到向量ID [{file_path}]: {len(vector_ids)}个")
-                    except Exception as sync_error:
-                        logger.debug(f"github_sync_manager查询失败 [{file_path}]: {sync_error}，回退到Chroma查询")
-                
-                # 回退到Chroma查询
-                if not vector_ids:
-                    try:
-                        vector_ids = get_vector_ids_by_metadata(index_manager, file_path)
-                        if vector_ids:
-                            logger.debug(f"通过Chroma查询找到向量ID [{file_path}]: {len(vector_ids)}个")
-                    except Exception as chroma_error:
-                        logger.warning(f"Chroma查询失败 [{file_path}]: {chroma_error}")
-                
-                if vector_ids:
-                    already_vectorized_count += 1
-                    already_vectorized_map[file_path] = vector_ids  # 保存已向量化文档的向量ID
-                    logger.debug(f"文档已向量化，跳过: {file_path}")
+        
+        # 1. 只分块不向量化，计算每个文件应写入的确定性向量ID
+        expected_by_path = expected_node_ids(
+            index_manager, [doc for doc in documents if doc.metadata.get("file_path")]
+        )
+        
+        # 2. 同步状态记录的向量ID与期望一致时直接采信（本地状态，无网络往返）
+        vector_ids_by_path: Dict[str, List[str]] = {}
+        if github_sync_manager:
+            for doc in documents:
+                file_path = doc.metadata.get("file_path", "")
+                if not file_path or file_path not in expected_by_path:
+                    continue
+                try:
+                    owner, repo, branch = _extract_repo_info(doc)
+                    if owner and repo:
+                        stored_ids = github_sync_manager.get_file_vector_ids(
+                            owner, repo, branch, file_path
+                        )
+                        if stored_ids and sorted(stored_ids) == sorted(expected_by_path[file_path]):
+                            vector_ids_by_path[file_path] = expected_by_path[file_path]
+                except Exception as sync_error:
+                    logger.debug(f"github_sync_manager查询失败 [{file_path}]: {sync_error}，回退到Chroma查询")
+        
+        # 3. 其余文件批量查询Chroma中已有的向量ID（按块 $in 过滤，每块一次往返）
+        #    期望ID全部存在才算已向量化；不完整文件的已有向量和多余的旧向量一并清理后重新处理
+        unresolved_paths = [p for p in expected_by_path if p not in vector_ids_by_path]
+        if unresolved_paths:
+            existing_by_path = get_vector_ids_batch(index_manager, unresolved_paths)
+            stale_ids: List[str] = []
+            for file_path in unresolved_paths:
+                expected_ids = expected_by_path[file_path]
+                present_ids = existing_by_path.get(file_path, [])
+                if set(expected_ids) <= set(present_ids):
+                    vector_ids_by_path[file_path] = expected_ids
+                    stale_ids.extend(set(present_ids) - set(expected_ids))
                 else:
-                    documents_to_process.append(doc)
-            except Exception as check_error:
-                logger.warning(f"检查文档向量化状态失败 [{file_path}]: {check_error}，将处理该文档")
+                    stale_ids.extend(present_ids)
+            
+            if stale_ids:
+                logger.info(f"🧹 清理 {len(stale_ids)} 个不完整或过期的向量（将随文档重新写入）")
+                for i in range(0, len(stale_ids), STALE_DELETE_BATCH_SIZE):
+                    delete_vectors_by_ids(index_manager, stale_ids[i:i + STALE_DELETE_BATCH_SIZE])
+        
+        for doc in documents:
+            file_path = doc.metadata.get("file_path", "")
+            vector_ids = vector_ids_by_path.get(file_path) if file_path else None
+            if vector_ids:
+                already_vectorized_count += 1
+                already_vectorized_map[file_path] = vector_ids  # 保存已向量化文档的向量ID
+                logger.debug(f"文档已向量化，跳过: {file_path}")
+            else:
                 documents_to_process.append(doc)
         
         logger.info(
@@ -4,7 +4,8 @@
 优化点：
 1. 批量分块：一次性处理所有文档
 2. 批量插入：使用 insert_nodes() 批量插入
-3. 批量查询：合并向量ID查询减少网络请求
+3. 确定性节点ID：分块时即确定向量ID并按文件记录，写入后无需回查 Chroma
+4. 流水线（index.pipeline_enable）：分块、向量化、写入三阶段重叠执行，见 pipeline.py
 """
 
 import time
@@ -16,7 +17,8 @@ from llama_index.core.schema import Document as LlamaDocument
 
 from backend.infrastructure.config import config
 from backend.infrastructure.logger import get_logger
-from backend.infrastructure.indexer.utils.ids import get_vector_ids_with_retry
+from backend.infrastructure.indexer.utils.node_ids import NodeIdAssigner, create_node_parser
+from backend.infrastructure.indexer.build.pipeline import run_pipelined_build
 
 if TYPE_CHECKING:
     from backend.infrastructure.data_loader.github_sync.manager import GitHubSyncManager
@@ -46,49 +48,6 @@ def _collect_metadata(documents: List[LlamaDocument]) -> Dict[str, Dict]:
     return metadata_map
 
 
-def _batch_query_vector_ids(
-    index_manager,
-    documents: List[LlamaDocument],
-    show_progress: bool = True
-) -> Dict[str, List[str]]:
-    """批量查询向量ID
-    
-    Args:
-        index_manager: IndexManager实例
-        documents: 文档列表
-        show_progress: 是否显示进度
-        
-    Returns:
-        文件路径到向量ID列表的映射
-    """
-    vector_ids_map = {}
-    file_paths = [doc.metadata.get("file_path", "") for doc in documents if doc.metadata.get("file_path")]
-    
-    if not file_paths:
-        return vector_ids_map
-    
-    total = len(file_paths)
-    logger.info(f"[阶段2.3] 🔍 批量查询向量ID: {total} 个文件")
-    
-    # 批量查询，每 20 个一组
-    batch_size = 20
-    for i in range(0, total, batch_size):
-        batch_paths = file_paths[i:i + batch_size]
-        
-        for file_path in batch_paths:
-            try:
-                vector_ids = get_vector_ids_with_retry(index_manager, file_path)
-                vector_ids_map[file_path] = vector_ids
-            except Exception as e:
-                logger.warning(f"查询向量ID失败 [{file_path}]: {e}")
-                vector_ids_map[file_path] = []
-        
-        if show_progress and (i + batch_size) < total:
-            logger.debug(f"   向量ID查询进度: {min(i + batch_size, total)}/{total}")
-    
-    return vector_ids_map
-
-
 def build_index_normal_mode(
     index_manager,
     documents: List[LlamaDocument],
@@ -100,9 +59,9 @@ def build_index_normal_mode(
     
     优化后的流程：
     1. 批量收集元数据
-    2. 批量分块所有文档
+    2. 批量分块所有文档（流水线模式下与 3 重叠执行）
     3. 批量插入节点
-    4. 批量查询向量ID
+    4. 返回分块时记录的向量ID（确定性ID，无需回查）
     
     Args:
         index_manager: IndexManager实例
@@ -141,12 +100,9 @@ def build_index_normal_mode(
     metadata_map = _collect_metadata(documents)
     logger.debug(f"[阶段2.1] 元数据收集完成: {len(metadata_map)} 个文件 ({time.time() - metadata_start:.2f}s)")
     
-    # 初始化分块器
-    from llama_index.core.node_parser import SentenceSplitter
-    node_parser = SentenceSplitter(
-        chunk_size=index_manager.chunk_size,
-        chunk_overlap=index_manager.chunk_overlap
-    )
+    # 初始化分块器和节点ID分配器
+    node_parser = create_node_parser(index_manager)
+    id_assigner = NodeIdAssigner()
     
     logger.info(f"[阶段2.1]    分块参数: size={index_manager.chunk_size}, overlap={index_manager.chunk_overlap}")
     
@@ -158,14 +114,29 @@ def build_index_normal_mode(
         try:
             llama_embed_model = index_manager._get_llama_index_compatible_embedding()
             
-            if progress_callback:
-                # 有进度回调时：先分块再逐批插入（支持进度反馈）
-                from llama_index.core.node_parser import SentenceSplitter
-                node_parser_new = SentenceSplitter(
-                    chunk_size=index_manager.chunk_size,
-                    chunk_overlap=index_manager.chunk_overlap
+            if config.INDEX_PIPELINE_ENABLE:
+                index_manager._index = None
+                run_pipelined_build(
+                    index_manager,
+                    documents,
+                    node_parser,
+                    llama_embed_model,
+                    create_new=True,
+                    show_progress=show_progress,
+                    progress_callback=progress_callback,
+                    id_assigner=id_assigner,
                 )
-                all_nodes = node_parser_new.get_nodes_from_documents(documents, show_progress=show_progress)
+                if index_manager._index is None:
+                    # 没有产生任何节点时创建空索引
+                    index_manager._index = VectorStoreIndex(
+                        nodes=[],
+                        storage_context=index_manager.storage_context,
+                        embed_model=llama_embed_model,
+                    )
+            elif progress_callback:
+                # 有进度回调时：先分块再逐批插入（支持进度反馈）
+                all_nodes = node_parser.get_nodes_from_documents(documents, show_progress=show_progress)
+                id_assigner.assign(all_nodes)
                 total_nodes = len(all_nodes)
                 
                 logger.info(f"[阶段2.1] ✅ 分块完成: {total_nodes} 个节点")
@@ -211,9 +182,11 @@ def build_index_normal_mode(
                 # 最终回调确保 100%
                 progress_callback(total_nodes, total_nodes)
             else:
-                # 无进度回调时：使用原始方式（LlamaIndex 内部批量处理）
-                index_manager._index = VectorStoreIndex.from_documents(
-                    documents,
+                # 无进度回调时：一次性分块后交给 LlamaIndex 内部批量处理
+                all_nodes = node_parser.get_nodes_from_documents(documents, show_progress=show_progress)
+                id_assigner.assign(all_nodes)
+                index_manager._index = VectorStoreIndex(
+                    nodes=all_nodes,
                     storage_context=index_manager.storage_context,
                     embed_model=llama_embed_model,
                     show_progress=show_progress,
@@ -237,73 +210,86 @@ def build_index_normal_mode(
             if index_manager._index is None:
                 index_manager.get_index()
             
-            # 阶段2: 批量分块所有文档
-            chunk_start = time.time()
-            logger.info(f"[阶段2.1] 📄 批量分块 {total_docs} 个文档...")
-            
-            all_nodes = node_parser.get_nodes_from_documents(documents, show_progress=show_progress)
-            
-            chunk_elapsed = time.time() - chunk_start
-            logger.info(f"[阶段2.1] ✅ 分块完成: {len(all_nodes)} 个节点 (耗时: {chunk_elapsed:.2f}s)")
-            
-            # 阶段3: 批量插入节点
-            insert_start = time.time()
-            batch_size = config.EMBED_BATCH_SIZE * 5  # 增大批次大小
-            total_nodes = len(all_nodes)
-            
-            logger.info(f"[阶段2.2] 📤 批量插入 {total_nodes} 个节点...")
-            
-            # 使用 tqdm 显示进度
-            if show_progress:
-                pbar = tqdm(total=total_nodes, desc="插入节点", unit="node")
-            
-            # 进度回调更新间隔（每 10 个节点）
-            callback_interval = 10
-            processed_nodes = 0
-            
-            for i in range(0, total_nodes, batch_size):
-                batch_nodes = all_nodes[i:i + batch_size]
-                try:
-                    if hasattr(index_manager._index, 'insert_nodes'):
-                        index_manager._index.insert_nodes(batch_nodes)
-                    else:
-                        for node in batch_nodes:
-                            index_manager._index.insert(node)
-                    
-                    processed_nodes += len(batch_nodes)
-                    
-                    if show_progress:
-                        pbar.update(len(batch_nodes))
-                    
-                    # 调用进度回调
-                    if progress_callback:
-                        progress_callback(processed_nodes, total_nodes)
+            if config.INDEX_PIPELINE_ENABLE:
+                total_nodes = run_pipelined_build(
+                    index_manager,
+                    documents,
+                    node_parser,
+                    index_manager._get_llama_index_compatible_embedding(),
+                    create_new=False,
+                    show_progress=show_progress,
+                    progress_callback=progress_callback,
+                    id_assigner=id_assigner,
+                )
+            else:
+                # 阶段2: 批量分块所有文档
+                chunk_start = time.time()
+                logger.info(f"[阶段2.1] 📄 批量分块 {total_docs} 个文档...")
+                
+                all_nodes = node_parser.get_nodes_from_documents(documents, show_progress=show_progress)
+                id_assigner.assign(all_nodes)
+                
+                chunk_elapsed = time.time() - chunk_start
+                logger.info(f"[阶段2.1] ✅ 分块完成: {len(all_nodes)} 个节点 (耗时: {chunk_elapsed:.2f}s)")
+                
+                # 阶段3: 批量插入节点
+                insert_start = time.time()
+                batch_size = config.EMBED_BATCH_SIZE * 5  # 增大批次大小
+                total_nodes = len(all_nodes)
+                
+                logger.info(f"[阶段2.2] 📤 批量插入 {total_nodes} 个节点...")
+                
+                # 使用 tqdm 显示进度
+                if show_progress:
+                    pbar = tqdm(total=total_nodes, desc="插入节点", unit="node")
+                
+                # 进度回调更新间隔（每 10 个节点）
+                callback_interval = 10
+                processed_nodes = 0
+                
+                for i in range(0, total_nodes, batch_size):
+                    batch_nodes = all_nodes[i:i + batch_size]
+                    try:
+                        if hasattr(index_manager._index, 'insert_nodes'):
+                            index_manager._index.insert_nodes(batch_nodes)
+                        else:
+                            for node in batch_nodes:
+                                index_manager._index.insert(node)
                         
-                except Exception as insert_error:
-                    logger.warning(f"批次插入失败 (批次 {i//batch_size + 1}): {insert_error}")
-                    # 单个节点重试
-                    for node in batch_nodes:
-                        try:
-                            index_manager._index.insert(node)
-                            processed_nodes += 1
-                            if show_progress:
-                                pbar.update(1)
-                            # 单节点模式下，每 callback_interval 个节点回调一次
-                            if progress_callback and processed_nodes % callback_interval == 0:
-                                progress_callback(processed_nodes, total_nodes)
-                        except Exception:
-                            pass
-            
-            if show_progress:
-                pbar.close()
-            
-            # 最终回调确保 100%
-            if progress_callback:
-                progress_callback(total_nodes, total_nodes)
-            
-            insert_elapsed = time.time() - insert_start
-            logger.info(f"[阶段2.2] ✅ 插入完成 (耗时: {insert_elapsed:.2f}s)")
-            
+                        processed_nodes += len(batch_nodes)
+                        
+                        if show_progress:
+                            pbar.update(len(batch_nodes))
+                        
+                        # 调用进度回调
+                        if progress_callback:
+                            progress_callback(processed_nodes, total_nodes)
+                            
+                    except Exception as insert_error:
+                        logger.warning(f"批次插入失败 (批次 {i//batch_size + 1}): {insert_error}")
+                        # 单个节点重试
+                        for node in batch_nodes:
+                            try:
+                                index_manager._index.insert(node)
+                                processed_nodes += 1
+                                if show_progress:
+                                    pbar.update(1)
+                                # 单节点模式下，每 callback_interval 个节点回调一次
+                                if progress_callback and processed_nodes % callback_interval == 0:
+                                    progress_callback(processed_nodes, total_nodes)
+                            except Exception:
+                                id_assigner.discard([node.node_id])
+                
+                if show_progress:
+                    pbar.close()
+                
+                # 最终回调确保 100%
+                if progress_callback:
+                    progress_callback(total_nodes, total_nodes)
+                
+                insert_elapsed = time.time() - insert_start
+                logger.info(f"[阶段2.2] ✅ 插入完成 (耗时: {insert_elapsed:.2f}s)")
+                
             total_elapsed = time.time() - insert_start_time
             logger.info(f"[阶段2.2] ✅ 增量添加完成，共 {total_nodes} 个节点 (总耗时: {total_elapsed:.2f}s)")
             
@@ -311,7 +297,8 @@ def build_index_normal_mode(
             logger.error(f"[阶段2.1/2.2] ❌ 增量添加失败: {e}", exc_info=True)
             raise
     
-    # 阶段4: 批量查询向量ID
-    vector_ids_map = _batch_query_vector_ids(index_manager, documents, show_progress)
+    # 阶段4: 分块时已记录每个文件写入的向量ID（写入失败的节点已剔除）
+    vector_ids_map = id_assigner.ids_by_file
+    logger.info(f"[阶段2.3] ✅ 向量ID映射: {len(vector_ids_map)} 个文件，{sum(len(v) for v in vector_ids_map.values())} 个向量")
     
     return index_manager._index, vector_ids_map, metadata_map
@@ -0,0 +1,247 @@
+"""
+流水线构建模块：分块、向量化、写入三阶段重叠执行
+
+主要功能：
+- run_pipelined_build()：以异步流水线方式分块、向量化并写入节点（同步入口）
+
+执行流程：
+1. 分块阶段：按文档分组在线程中分块，分配确定性节点ID，凑满一批节点后放入分块队列
+2. 向量化阶段：多个协程从分块队列取批次，调用 aget_text_embedding_batch 生成向量
+3. 写入阶段：单个协程按批次写入向量存储（节点已带向量，insert_nodes 不再重复向量化）
+
+特性：
+- 有界队列：下游变慢时上游阻塞，内存占用与文档总数无关（背压）
+- 网络（向量化）、CPU（分块）、向量存储（写入）同时工作
+- 写入阶段串行，保证索引和 docstore 的一致性
+- 任一阶段失败时取消其余阶段并抛出异常
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, TypeVar, TYPE_CHECKING
+
+from tqdm import tqdm
+from llama_index.core import VectorStoreIndex
+from llama_index.core.schema import BaseNode, Document as LlamaDocument, MetadataMode
+
+from backend.infrastructure.config import config
+from backend.infrastructure.logger import get_logger
+
+if TYPE_CHECKING:
+    from backend.infrastructure.indexer.utils.node_ids import NodeIdAssigner
+
+logger = get_logger('indexer')
+
+T = TypeVar('T')
+
+# 分块阶段每次处理的文档数
+_DOC_GROUP_SIZE = 8
+
+
+@dataclass
+class _PipelineState:
+    """流水线运行状态（仅在事件循环线程中修改）"""
+    total_docs: int
+    chunked_docs: int = 0
+    chunked_nodes: int = 0
+    chunking_done: bool = False
+    processed_nodes: int = 0  # 已完成写入尝试的节点数（含写入失败的节点）
+    inserted_nodes: int = 0
+    active_embedders: int = 0
+
+    @property
+    def estimated_total(self) -> int:
+        """节点总数估计：分块完成前按已分块文档的平均节点数外推"""
+        if self.chunking_done or self.chunked_docs == 0:
+            return max(self.chunked_nodes, self.processed_nodes)
+        estimate = int(self.chunked_nodes * self.total_docs / self.chunked_docs)
+        return max(estimate, self.chunked_nodes, self.processed_nodes)
+
+
+def _run_sync(factory: Callable[[], Awaitable[T]]) -> T:
+    """在同步上下文中运行协程（当前线程已有事件循环时改在独立线程中运行）"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(factory())
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="index_pipeline") as executor:
+        return executor.submit(lambda: asyncio.run(factory())).result()
+
+
+def _insert_batch(index_manager, batch_nodes: List[BaseNode], embed_model, create_new: bool) -> List[str]:
+    """写入一批已向量化的节点（在线程中执行）
+
+    Args:
+        index_manager: IndexManager实例
+        batch_nodes: 节点列表（已设置 embedding）
+        embed_model: LlamaIndex 兼容的 Embedding 模型
+        create_new: 索引尚不存在时是否用本批节点创建
+
+    Returns:
+        写入失败的节点ID
+    """
+    if create_new and index_manager._index is None:
+        index_manager._index = VectorStoreIndex(
+            nodes=batch_nodes,
+            storage_context=index_manager.storage_context,
+            embed_model=embed_model,
+            show_progress=False,
+        )
+        return []
+
+    try:
+        index_manager._index.insert_nodes(batch_nodes)
+        return []
+    except Exception as insert_error:
+        if create_new:
+            raise
+        logger.warning(f"批次插入失败，逐个节点重试: {insert_error}")
+        failed = []
+        for node in batch_nodes:
+            try:
+                index_manager._index.insert_nodes([node])
+            except Exception:
+                failed.append(node.node_id)
+        return failed
+
+
+async def _run_pipeline(
+    index_manager,
+    documents: List[LlamaDocument],
+    node_parser,
+    embed_model,
+    create_new: bool,
+    show_progress: bool,
+    progress_callback: Optional[Callable[[int, int], None]],
+    id_assigner: Optional["NodeIdAssigner"],
+) -> _PipelineState:
+    """流水线主体"""
+    batch_size = config.EMBED_BATCH_SIZE * 5
+    queue_size = max(1, config.INDEX_PIPELINE_QUEUE_SIZE)
+    concurrency = max(1, config.INDEX_PIPELINE_EMBED_CONCURRENCY)
+
+    chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    insert_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    state = _PipelineState(total_docs=len(documents), active_embedders=concurrency)
+    pbar = tqdm(total=0, desc="插入节点", unit="node") if show_progress else None
+
+    async def chunk_stage() -> None:
+        buffer: List[BaseNode] = []
+        for i in range(0, len(documents), _DOC_GROUP_SIZE):
+            group = documents[i:i + _DOC_GROUP_SIZE]
+            nodes = await asyncio.to_thread(node_parser.get_nodes_from_documents, group)
+            if id_assigner is not None:
+                id_assigner.assign(nodes)
+            state.chunked_docs += len(group)
+            state.chunked_nodes += len(nodes)
+            buffer.extend(nodes)
+            while len(buffer) >= batch_size:
+                await chunk_queue.put(buffer[:batch_size])
+                buffer = buffer[batch_size:]
+        if buffer:
+            await chunk_queue.put(buffer)
+        state.chunking_done = True
+        logger.info(f"[阶段2.1] ✅ 分块完成: {state.chunked_nodes} 个节点")
+        for _ in range(concurrency):
+            await chunk_queue.put(None)
+
+    async def embed_stage() -> None:
+        while True:
+            batch_nodes = await chunk_queue.get()
+            if batch_nodes is None:
+                break
+            texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch_nodes]
+            embeddings = await embed_model.aget_text_embedding_batch(texts)
+            for node, embedding in zip(batch_nodes, embeddings):
+                node.embedding = embedding
+            await insert_queue.put(batch_nodes)
+
+        state.active_embedders -= 1
+        if state.active_embedders == 0:
+            await insert_queue.put(None)
+
+    async def insert_stage() -> None:
+        while True:
+            batch_nodes = await insert_queue.get()
+            if batch_nodes is None:
+                break
+            failed = await asyncio.to_thread(_insert_batch, index_manager, batch_nodes, embed_model, create_new)
+            if failed and id_assigner is not None:
+                id_assigner.discard(failed)
+            state.processed_nodes += len(batch_nodes)
+            state.inserted_nodes += len(batch_nodes) - len(failed)
+
+            total = state.estimated_total
+            if pbar is not None:
+                pbar.total = total
+                pbar.update(len(batch_nodes))
+            if progress_callback:
+                progress_callback(state.processed_nodes, total)
+
+    stages = [asyncio.create_task(chunk_stage())]
+    stages += [asyncio.create_task(embed_stage()) for _ in range(concurrency)]
+    stages.append(asyncio.create_task(insert_stage()))
+
+    try:
+        await asyncio.gather(*stages)
+    except BaseException:
+        for task in stages:
+            task.cancel()
+        await asyncio.gather(*stages, return_exceptions=True)
+        raise
+    finally:
+        if pbar is not None:
+            pbar.close()
+
+    return state
+
+
+def run_pipelined_build(
+    index_manager,
+    documents: List[LlamaDocument],
+    node_parser,
+    embed_model,
+    create_new: bool = False,
+    show_progress: bool = True,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    id_assigner: Optional["NodeIdAssigner"] = None,
+) -> int:
+    """以流水线方式分块、向量化并写入节点
+
+    Args:
+        index_manager: IndexManager实例（create_new=False 时 _index 必须已存在）
+        documents: 文档列表
+        node_parser: 分块器
+        embed_model: LlamaIndex 兼容的 Embedding 模型
+        create_new: 是否用第一批节点创建新索引
+        show_progress: 是否显示进度条
+        progress_callback: 进度回调函数，签名 (current, total) -> None；
+            分块完成前 total 为估计值
+        id_assigner: 节点ID分配器（分块后分配确定性ID，并记录每个文件写入的向量ID）
+
+    Returns:
+        写入成功的节点数（不含逐个重试后仍失败的节点）
+    """
+    start = time.time()
+    logger.info(
+        f"[阶段2.2] 🚀 流水线构建: {len(documents)} 个文档 "
+        f"(队列={config.INDEX_PIPELINE_QUEUE_SIZE}, 向量化并发={config.INDEX_PIPELINE_EMBED_CONCURRENCY})"
+    )
+
+    state = _run_sync(lambda: _run_pipeline(
+        index_manager, documents, node_parser, embed_model,
+        create_new, show_progress, progress_callback, id_assigner,
+    ))
+
+    # 最终回调确保 100%
+    if progress_callback:
+        progress_callback(state.processed_nodes, state.processed_nodes)
+
+    failed = state.processed_nodes - state.inserted_nodes
+    if failed:
+        logger.warning(f"[阶段2.2] ⚠️  {failed} 个节点写入失败")
+    logger.info(f"[阶段2.2] ✅ 流水线构建完成: {state.inserted_nodes} 个节点 (耗时: {time.time() - start:.2f}s)")
+    return state.inserted_nodes
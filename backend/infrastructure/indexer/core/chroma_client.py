@@ -1,21 +1,30 @@
 """
-Chroma客户端管理器：全局单例，复用CloudClient连接
+Chroma客户端管理器：全局单例，按配置选择向量库后端并复用连接
 
 主要功能：
-- ChromaClientManager类：管理Chroma CloudClient的全局单例
-- get_client()：获取或创建CloudClient实例
+- ChromaClientManager类：管理 Chroma 客户端的全局单例
+- get_client()：按 vector_store.backend 获取或创建客户端实例
 - get_collection()：获取或创建Collection实例
+- register_backend()：注册自定义后端（客户端工厂）
+
+内置后端：
+- cloud：chromadb.CloudClient（Chroma Cloud，凭证来自环境变量）
+- persistent：chromadb.PersistentClient（本地嵌入式，进程内检索，可离线使用）
+- ephemeral：chromadb.EphemeralClient（进程内存，测试与 CI 使用）
 
 特性：
+- 各后端提供相同的 Collection 接口（元数据过滤、按ID删除、upsert、query），索引器无需区分
 - 延迟初始化：首次使用时连接
 - 全局复用：避免重复创建连接
 - 线程安全：使用锁保护
 """
 
 import threading
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Dict, Optional
 
 import chromadb
+from chromadb.api import ClientAPI
 from chromadb.api.models.Collection import Collection
 
 from backend.infrastructure.config import config
@@ -24,25 +33,111 @@ from backend.infrastructure.logger import get_logger
 logger = get_logger('chroma_client')
 
 
+def _create_cloud_client() -> ClientAPI:
+    """创建 Chroma Cloud 客户端
+    
+    Raises:
+        ValueError: 配置不完整或 Tenant 不匹配
+    """
+    # 验证配置
+    if not config.CHROMA_CLOUD_API_KEY or not config.CHROMA_CLOUD_DATABASE:
+        raise ValueError(
+            "Chroma Cloud 配置不完整，请设置以下环境变量：\n"
+            "- CHROMA_CLOUD_API_KEY\n"
+            "- CHROMA_CLOUD_DATABASE\n"
+            "或设置 VECTOR_STORE_BACKEND=persistent 使用本地向量库"
+        )
+    
+    tenant = config.CHROMA_CLOUD_TENANT
+    if not tenant or tenant == "your_chroma_cloud_tenant_here":
+        logger.warning("⚠️  CHROMA_CLOUD_TENANT 未设置或为模板值，将尝试自动检测...")
+        tenant = None
+    
+    try:
+        if tenant:
+            return chromadb.CloudClient(
+                api_key=config.CHROMA_CLOUD_API_KEY,
+                tenant=tenant,
+                database=config.CHROMA_CLOUD_DATABASE
+            )
+        return chromadb.CloudClient(
+            api_key=config.CHROMA_CLOUD_API_KEY,
+            database=config.CHROMA_CLOUD_DATABASE
+        )
+    except chromadb.errors.ChromaAuthError as e:
+        error_msg = str(e)
+        if "does not match" in error_msg and "from the server" in error_msg:
+            import re
+            tenant_match = re.search(r'does not match ([a-f0-9\-]+) from the server', error_msg)
+            if tenant_match:
+                correct_tenant = tenant_match.group(1)
+                logger.error(f"❌ Chroma Cloud Tenant 配置错误")
+                logger.error(f"   当前配置: {config.CHROMA_CLOUD_TENANT}")
+                logger.error(f"   服务器返回的正确 Tenant: {correct_tenant}")
+                raise ValueError(
+                    f"Chroma Cloud Tenant 配置不匹配！\n"
+                    f"当前配置: {config.CHROMA_CLOUD_TENANT}\n"
+                    f"服务器返回的正确 Tenant: {correct_tenant}\n\n"
+                    f"请在 .env 文件中更新配置：\n"
+                    f"CHROMA_CLOUD_TENANT={correct_tenant}"
+                )
+        raise
+
+
+def _create_persistent_client() -> ClientAPI:
+    """创建本地嵌入式客户端（数据存于 paths.vector_store）"""
+    path = Path(config.VECTOR_STORE_PATH)
+    path.mkdir(parents=True, exist_ok=True)
+    logger.info(f"📁 本地向量库目录: {path}")
+    return chromadb.PersistentClient(path=str(path))
+
+
+def _create_ephemeral_client() -> ClientAPI:
+    """创建进程内存客户端（进程退出后数据丢失）"""
+    return chromadb.EphemeralClient()
+
+
 class ChromaClientManager:
-    """Chroma CloudClient 全局单例管理器
+    """Chroma 客户端全局单例管理器
     
-    复用连接，减少握手延迟。首次调用时初始化连接。
+    复用连接，减少握手延迟。首次调用时按 vector_store.backend 初始化客户端。
     """
     
-    _lock = threading.Lock()
-    _client: Optional[chromadb.CloudClient] = None
+    _lock = threading.RLock()
+    _client: Optional[ClientAPI] = None
+    _backend: Optional[str] = None
     _collections: dict[str, Collection] = {}
+    _backends: Dict[str, Callable[[], ClientAPI]] = {
+        "cloud": _create_cloud_client,
+        "persistent": _create_persistent_client,
+        "ephemeral": _create_ephemeral_client,
+    }
     
     @classmethod
-    def get_client(cls) -> chromadb.CloudClient:
-        """获取全局 CloudClient 实例
+    def register_backend(cls, name: str, factory: Callable[[], ClientAPI]) -> None:
+        """注册向量库后端
+        
+        Args:
+            name: 后端名称（vector_store.backend 的取值）
+            factory: 客户端工厂，返回提供 Chroma ClientAPI 接口的客户端
+        """
+        with cls._lock:
+            cls._backends[name.lower()] = factory
+    
+    @classmethod
+    def available_backends(cls) -> list[str]:
+        """已注册的后端名称"""
+        return sorted(cls._backends)
+    
+    @classmethod
+    def get_client(cls) -> ClientAPI:
+        """获取全局客户端实例
         
         Returns:
-            chromadb.CloudClient: 全局单例客户端
+            ClientAPI: 全局单例客户端
             
         Raises:
-            ValueError: 配置不完整
+            ValueError: 后端未注册或配置不完整
             Exception: 连接失败
         """
         if cls._client is not None:
@@ -53,58 +148,22 @@ class ChromaClientManager:
             if cls._client is not None:
                 return cls._client
             
-            logger.info("🗄️  初始化 Chroma Cloud 客户端（全局单例）")
-            
-            # 验证配置
-            if not config.CHROMA_CLOUD_API_KEY or not config.CHROMA_CLOUD_DATABASE:
+            backend = config.VECTOR_STORE_BACKEND
+            factory = cls._backends.get(backend)
+            if factory is None:
                 raise ValueError(
-                    "Chroma Cloud 配置不完整，请设置以下环境变量：\n"
-                    "- CHROMA_CLOUD_API_KEY\n"
-                    "- CHROMA_CLOUD_DATABASE"
+                    f"未知的向量库后端: {backend}，可选: {', '.join(sorted(cls._backends))}"
                 )
             
-            tenant = config.CHROMA_CLOUD_TENANT
-            if not tenant or tenant == "your_chroma_cloud_tenant_here":
-                logger.warning("⚠️  CHROMA_CLOUD_TENANT 未设置或为模板值，将尝试自动检测...")
-                tenant = None
-            
+            logger.info(f"🗄️  初始化 Chroma 客户端（后端: {backend}，全局单例）")
             try:
-                if tenant:
-                    cls._client = chromadb.CloudClient(
-                        api_key=config.CHROMA_CLOUD_API_KEY,
-                        tenant=tenant,
-                        database=config.CHROMA_CLOUD_DATABASE
-                    )
-                else:
-                    cls._client = chromadb.CloudClient(
-                        api_key=config.CHROMA_CLOUD_API_KEY,
-                        database=config.CHROMA_CLOUD_DATABASE
-                    )
-                
-                logger.info("✅ Chroma Cloud 客户端初始化成功（全局单例）")
-                return cls._client
-                
-            except chromadb.errors.ChromaAuthError as e:
-                error_msg = str(e)
-                if "does not match" in error_msg and "from the server" in error_msg:
-                    import re
-                    tenant_match = re.search(r'does not match ([a-f0-9\-]+) from the server', error_msg)
-                    if tenant_match:
-                        correct_tenant = tenant_match.group(1)
-                        logger.error(f"❌ Chroma Cloud Tenant 配置错误")
-                        logger.error(f"   当前配置: {config.CHROMA_CLOUD_TENANT}")
-                        logger.error(f"   服务器返回的正确 Tenant: {correct_tenant}")
-                        raise ValueError(
-                            f"Chroma Cloud Tenant 配置不匹配！\n"
-                            f"当前配置: {config.CHROMA_CLOUD_TENANT}\n"
-                            f"服务器返回的正确 Tenant: {correct_tenant}\n\n"
-                            f"请在 .env 文件中更新配置：\n"
-                            f"CHROMA_CLOUD_TENANT={correct_tenant}"
-                        )
-                raise
+                cls._client = factory()
             except Exception as e:
-                logger.error(f"❌ Chroma Cloud 客户端初始化失败: {e}")
+                logger.error(f"❌ Chroma 客户端初始化失败（后端: {backend}）: {e}")
                 raise
+            cls._backend = backend
+            logger.info(f"✅ Chroma 客户端初始化成功（后端: {backend}，全局单例）")
+            return cls._client
     
     @classmethod
     def get_collection(cls, collection_name: str) -> Collection:
@@ -140,11 +199,18 @@ class ChromaClientManager:
                 logger.error(f"❌ 创建 Collection 失败: {e}")
                 raise
     
+    @classmethod
+    def invalidate_collection(cls, collection_name: str) -> None:
+        """移除缓存的 Collection 实例（collection 被删除重建后调用）"""
+        with cls._lock:
+            cls._collections.pop(collection_name, None)
+    
     @classmethod
     def reset(cls) -> None:
         """重置客户端（用于测试或重新连接）"""
         with cls._lock:
             cls._client = None
+            cls._backend = None
             cls._collections.clear()
             logger.info("🔄 Chroma 客户端已重置")
     
@@ -152,10 +218,20 @@ class ChromaClientManager:
     def is_initialized(cls) -> bool:
         """检查客户端是否已初始化"""
         return cls._client is not None
+    
+    @classmethod
+    def is_shared_client(cls, client: object) -> bool:
+        """是否为全局单例客户端（由管理器持有，不应被单个索引管理器关闭）"""
+        return client is not None and client is cls._client
+    
+    @classmethod
+    def get_backend(cls) -> Optional[str]:
+        """当前客户端的后端名称（未初始化时为None）"""
+        return cls._backend
 
 
 # 便捷函数
-def get_chroma_client() -> chromadb.CloudClient:
+def get_chroma_client() -> ClientAPI:
     """获取全局 Chroma 客户端"""
     return ChromaClientManager.get_client()
 
@@ -7,7 +7,6 @@ from typing import List, Optional, Tuple, Dict, Callable, TYPE_CHECKING
 
 from llama_index.core import VectorStoreIndex, StorageContext
 from llama_index.core.schema import Document as LlamaDocument
-from llama_index.vector_stores.chroma import ChromaVectorStore
 
 from backend.infrastructure.config import config
 from backend.infrastructure.logger import get_logger
@@ -17,9 +16,11 @@ from backend.infrastructure.indexer.utils.info import print_database_info
 from backend.infrastructure.indexer.utils.dimension import ensure_collection_dimension_match
 from backend.infrastructure.indexer.utils.stats import get_stats
 from backend.infrastructure.indexer.utils.cleanup import clear_index, clear_collection_cache
+from backend.infrastructure.indexer.utils.version import bump_collection_version
 from backend.infrastructure.indexer.utils.incremental import incremental_update
 from backend.infrastructure.indexer.utils.lifecycle import close
 from backend.infrastructure.indexer.build.builder import build_index_method
+from backend.infrastructure.vector_replica.vector_store import create_vector_store
 
 if TYPE_CHECKING:
     from backend.infrastructure.data_loader.github_sync.manager import GitHubSyncManager
@@ -47,7 +48,7 @@ class IndexManager:
         self.chunk_size = chunk_size or config.CHUNK_SIZE
         self.chunk_overlap = chunk_overlap or config.CHUNK_OVERLAP
         
-        # 注意：Chroma Cloud模式不需要本地目录，persist_dir参数保留用于向后兼容但不再使用
+        # 注意：本地向量库目录由 paths.vector_store 配置（vector_store.backend=persistent），persist_dir参数保留用于向后兼容但不再使用
         self.persist_dir = persist_dir
         
         # 保存统一的Embedding实例
@@ -92,7 +93,7 @@ class IndexManager:
         )
         
         # 创建向量存储
-        self.vector_store = ChromaVectorStore(chroma_collection=self.chroma_collection)
+        self.vector_store = create_vector_store(self.chroma_collection)
         
         # 创建存储上下文
         self.storage_context = StorageContext.from_defaults(
@@ -122,7 +123,10 @@ class IndexManager:
         Returns:
             (索引, 向量ID映射)
         """
-        return build_index_method(self, documents, show_progress, github_sync_manager, progress_callback)
+        try:
+            return build_index_method(self, documents, show_progress, github_sync_manager, progress_callback)
+        finally:
+            bump_collection_version(self)
     
     def get_embedding_instance(self) -> Optional[BaseEmbedding]:
         """获取统一的Embedding实例"""
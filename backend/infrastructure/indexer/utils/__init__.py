@@ -19,6 +19,7 @@ from backend.infrastructure.indexer.utils.ids import (
     delete_vectors_by_ids
 )
 from backend.infrastructure.indexer.utils.documents import add_documents
+from backend.infrastructure.indexer.utils.version import bump_collection_version, get_collection_version
 
 __all__ = [
     # 工具函数
@@ -36,4 +37,6 @@ __all__ = [
     'get_vector_ids_batch',
     'delete_vectors_by_ids',
     'add_documents',
+    'bump_collection_version',
+    'get_collection_version',
 ]
@@ -4,10 +4,14 @@
 
 from typing import TYPE_CHECKING
 
-from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.core import StorageContext
 
 from backend.infrastructure.logger import get_logger
+from backend.infrastructure.indexer.core.chroma_client import ChromaClientManager
+from backend.infrastructure.indexer.utils.version import bump_collection_version
+from backend.infrastructure.indexer.utils.file_vectors import clear_file_vectors
+from backend.infrastructure.vector_replica.registry import clear_vector_replica
+from backend.infrastructure.vector_replica.vector_store import create_vector_store
 
 if TYPE_CHECKING:
     from backend.infrastructure.indexer.core.manager import IndexManager
@@ -22,18 +26,24 @@ def clear_index(index_manager: "IndexManager") -> None:
         index_manager.chroma_client.delete_collection(name=index_manager.collection_name)
         logger.info(f"✅ 已删除集合: {index_manager.collection_name}")
         
-        # 重新创建集合
+        # 重新创建集合（丢弃全局缓存中已删除的 Collection 实例）
+        ChromaClientManager.invalidate_collection(index_manager.collection_name)
         index_manager.chroma_collection = index_manager.chroma_client.get_or_create_collection(
-            name=index_manager.collection_name
+            name=index_manager.collection_name,
+            metadata={"hnsw:space": "cosine"}
         )
         
-        index_manager.vector_store = ChromaVectorStore(chroma_collection=index_manager.chroma_collection)
+        index_manager.vector_store = create_vector_store(index_manager.chroma_collection)
         index_manager.storage_context = StorageContext.from_defaults(
             vector_store=index_manager.vector_store
         )
         
+        clear_file_vectors(index_manager)
+        clear_vector_replica(index_manager.collection_name)
+        
         # 重置索引
         index_manager._index = None
+        bump_collection_version(index_manager)
         logger.info("✅ 索引已清空")
         
     except Exception as e:
@@ -96,6 +106,9 @@ def clear_collection_cache(index_manager: "IndexManager") -> None:
         if remaining_count == 0:
             logger.info(f"✅ 成功清除collection '{index_manager.collection_name}' 中的所有 {deleted_count} 个向量")
             index_manager._index = None
+            clear_file_vectors(index_manager)
+            clear_vector_replica(index_manager.collection_name)
+            bump_collection_version(index_manager)
             logger.info("✅ 索引对象已重置")
         else:
             error_msg = f"清除collection失败，仍有 {remaining_count} 个向量未被清除"
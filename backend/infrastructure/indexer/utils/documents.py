@@ -6,7 +6,8 @@ from typing import List, Dict, Tuple
 
 from llama_index.core.schema import Document as LlamaDocument
 
-from backend.infrastructure.indexer.utils.ids import get_vector_ids_batch
+from backend.infrastructure.indexer.utils.ids import notify_vector_changes
+from backend.infrastructure.indexer.utils.node_ids import NodeIdAssigner, create_node_parser
 from backend.infrastructure.logger import get_logger
 
 logger = get_logger('indexer')
@@ -15,6 +16,8 @@ logger = get_logger('indexer')
 def add_documents(index_manager, documents: List[LlamaDocument]) -> Tuple[int, Dict[str, List[str]]]:
     """批量添加文档到索引（优化：使用批量插入）
     
+    分块时分配确定性节点ID，向量ID直接取自分块结果，无需写入后回查 Chroma。
+    
     Args:
         documents: 文档列表
         
@@ -24,42 +27,36 @@ def add_documents(index_manager, documents: List[LlamaDocument]) -> Tuple[int, D
     if not documents:
         return 0, {}
     
+    id_assigner = NodeIdAssigner()
     try:
-        # 优先尝试使用insert_ref_docs批量插入
+        node_parser = create_node_parser(index_manager)
+        all_nodes = id_assigner.assign(node_parser.get_nodes_from_documents(documents))
+        
         try:
-            # 尝试不带参数调用（新版本 LlamaIndex 不支持 show_progress）
-            try:
-                index_manager._index.insert_ref_docs(documents, show_progress=False)
-            except TypeError:
-                index_manager._index.insert_ref_docs(documents)
-            count = len(documents)
-        except AttributeError:
-            # 使用节点批量插入
-            from llama_index.core.node_parser import SentenceSplitter
-            node_parser = SentenceSplitter(
-                chunk_size=index_manager.chunk_size,
-                chunk_overlap=index_manager.chunk_overlap
-            )
-            all_nodes = node_parser.get_nodes_from_documents(documents)
-            for node in all_nodes:
-                index_manager._index.insert(node)
+            index_manager._index.insert_nodes(all_nodes)
             count = len(documents)
         except Exception as e:
-            logger.warning(f"[阶段2.3] 批量插入失败，回退到逐个插入: {e}")
+            logger.warning(f"[阶段2.3] 批量插入失败，回退到逐个文档插入: {e}")
+            nodes_by_doc: Dict[str, List] = {}
+            for node in all_nodes:
+                nodes_by_doc.setdefault(node.ref_doc_id, []).append(node)
             count = 0
             for doc in documents:
+                doc_nodes = nodes_by_doc.get(doc.doc_id, [])
                 try:
-                    index_manager._index.insert(doc)
+                    index_manager._index.insert_nodes(doc_nodes)
                     count += 1
                 except Exception as insert_error:
+                    id_assigner.discard(node.node_id for node in doc_nodes)
                     logger.warning(f"[阶段2.3] ⚠️  添加文档失败 [{doc.metadata.get('file_path', 'unknown')}]: {insert_error}")
     except Exception as e:
         logger.error(f"[阶段2.3] ❌ 批量添加文档失败: {e}")
         return 0, {}
     
-    # 批量查询向量ID映射
-    file_paths = [doc.metadata.get("file_path", "") for doc in documents 
-                 if doc.metadata.get("file_path")]
-    vector_ids_map = get_vector_ids_batch(index_manager, file_paths)
+    vector_ids_map = id_assigner.ids_by_file
+    notify_vector_changes(
+        index_manager,
+        added_ids=[vid for ids in vector_ids_map.values() for vid in ids],
+    )
     
     return count, vector_ids_map
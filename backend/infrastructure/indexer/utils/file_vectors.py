@@ -0,0 +1,497 @@
+"""
+文件级向量模块：每个文件一个池化向量，存于独立的 Chroma collection
+
+主要功能：
+- pool_embeddings()：chunk 向量逐个归一化后取平均再归一化（文件的质心方向）
+- update_file_vectors()：按文件路径从 chunk collection 拉取向量，重算并写入文件向量
+- rebuild_file_vectors()：分页扫描 chunk collection 全量重建文件向量
+- reconcile_file_vectors()：与文件索引比对文件路径与 chunk 签名，只重算缺失、多余或内容已变的文件
+- search_files()：按查询向量检索最相关的文件
+- sync_file_vectors() / ensure_file_vectors() / clear_file_vectors()：面向 IndexManager 的维护入口
+
+执行流程：
+1. 向量写入/删除后，按受影响的文件路径增量重算文件向量（文件没有 chunk 时删除；
+   写入通知已拉取全部 chunk 的文件直接复用其向量）
+2. 检索前按 version_check_seconds 限频比对文件向量数与文件索引的文件数
+3. 不一致时在后台线程对账：只重算缺失/多余的文件（文件向量为空时全量重建），完成前检索回退到 chunk 级聚合
+4. 文件数一致但文件索引是新加载/重建的实例时，在后台按 chunk 签名校验一次，
+   重算漏掉增量通知而内容已变的文件（校验期间照常使用文件向量）
+
+特性：
+- 文件向量 collection 名为 "<chunk collection>__files"，使用余弦距离
+- 文件向量ID为文件路径的哈希，元数据包含 file_path / file_name / repository / chunk_count / chunk_signature
+- chunk ID 由内容哈希生成，chunk_signature（排序后 chunk ID 的哈希）随文件内容变化
+- 只拉取向量与元数据，不拉取文本
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from backend.infrastructure.config import config
+from backend.infrastructure.logger import get_logger
+from backend.infrastructure.text_index.file_index import COLLECTION_PAGE_SIZE, file_metadata
+
+if TYPE_CHECKING:
+    from backend.infrastructure.indexer.core.manager import IndexManager
+
+logger = get_logger('indexer')
+
+FILE_COLLECTION_SUFFIX = "__files"
+
+# 增量更新时单次 $in 查询包含的文件路径数
+FILE_FETCH_BATCH_SIZE = 50
+
+_lock = threading.Lock()
+_collections: Dict[str, Tuple[Any, Any]] = {}  # 文件向量 collection 名称 → (chroma client, collection)
+_checked: Dict[str, float] = {}
+_rebuilding: Set[str] = set()
+_verified: Dict[str, Any] = {}  # 文件向量 collection 名称 → 最近一次按签名对账所用的文件索引
+
+
+def file_collection_name(collection_name: str) -> str:
+    """chunk collection 对应的文件向量 collection 名称"""
+    return f"{collection_name}{FILE_COLLECTION_SUFFIX}"
+
+
+def file_vector_id(file_path: str) -> str:
+    """文件向量ID（文件路径的哈希）"""
+    return hashlib.sha1(file_path.encode('utf-8')).hexdigest()
+
+
+def chunk_signature(chunk_ids: Iterable[str]) -> str:
+    """文件内容签名（排序后 chunk ID 的哈希；chunk ID 由内容生成，内容变化签名随之变化）"""
+    return hashlib.sha1("\n".join(sorted(chunk_ids)).encode('utf-8')).hexdigest()
+
+
+def pool_embeddings(embeddings: Any) -> Optional[np.ndarray]:
+    """池化 chunk 向量：逐个归一化后取平均再归一化
+
+    Returns:
+        单位向量（没有有效向量时返回None）
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2 or not len(matrix):
+        return None
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return _normalize((matrix / np.where(norms > 0, norms, 1.0)).sum(axis=0))
+
+
+def _normalize(vector: np.ndarray) -> Optional[np.ndarray]:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else None
+
+
+class _FileAccumulator:
+    """按文件累加归一化后的 chunk 向量"""
+
+    def __init__(self):
+        self.sums: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, int] = {}
+        self.info: Dict[str, Tuple[str, str]] = {}
+        self.chunk_ids: Dict[str, List[str]] = {}
+
+    def add_records(self, records: Dict[str, Any]) -> None:
+        """累加 collection.get(include=["embeddings", "metadatas"]) 的结果"""
+        embeddings = records.get("embeddings")
+        if embeddings is None or not len(embeddings):
+            return
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms > 0, norms, 1.0)
+        metadatas = records.get("metadatas") or [None] * len(matrix)
+        ids = records.get("ids") or [None] * len(matrix)
+        for chunk_id, vector, metadata in zip(ids, matrix, metadatas):
+            file_path, file_name, repository = file_metadata(metadata)
+            if not file_path:
+                continue
+            if file_path in self.sums:
+                self.sums[file_path] += vector
+                self.counts[file_path] += 1
+            else:
+                self.sums[file_path] = vector.copy()
+                self.counts[file_path] = 1
+                self.info[file_path] = (file_name, repository)
+                self.chunk_ids[file_path] = []
+            if chunk_id:
+                self.chunk_ids[file_path].append(chunk_id)
+
+    def restrict(self, file_paths: Set[str]) -> None:
+        """只保留指定文件的累加结果"""
+        for file_path in [p for p in self.sums if p not in file_paths]:
+            del self.sums[file_path]
+            del self.counts[file_path]
+            self.info.pop(file_path, None)
+            self.chunk_ids.pop(file_path, None)
+
+    def upsert_into(self, files: Any) -> int:
+        """写入文件向量 collection
+
+        Returns:
+            写入的文件数
+        """
+        ids, embeddings, metadatas = [], [], []
+        for file_path, total in self.sums.items():
+            vector = _normalize(total)
+            if vector is None:
+                continue
+            file_name, repository = self.info[file_path]
+            ids.append(file_vector_id(file_path))
+            embeddings.append(vector.tolist())
+            metadatas.append({
+                "file_path": file_path,
+                "file_name": file_name,
+                "repository": repository,
+                "chunk_count": self.counts[file_path],
+                "chunk_signature": chunk_signature(self.chunk_ids[file_path]),
+            })
+        for i in range(0, len(ids), COLLECTION_PAGE_SIZE):
+            files.upsert(
+                ids=ids[i:i + COLLECTION_PAGE_SIZE],
+                embeddings=embeddings[i:i + COLLECTION_PAGE_SIZE],
+                metadatas=metadatas[i:i + COLLECTION_PAGE_SIZE],
+            )
+        return len(ids)
+
+
+def update_file_vectors(
+    chunks: Any,
+    files: Any,
+    file_paths: Iterable[str],
+    records: Optional[Dict[str, Any]] = None,
+    chunk_counts: Optional[Dict[str, int]] = None,
+) -> int:
+    """重算指定文件的文件向量（文件已没有 chunk 时删除其文件向量）
+
+    提供 records 与 chunk_counts 时，records 已包含全部 chunk 的文件（新文件或整体重写的文件）
+    直接用其中的向量池化，只为其余文件按路径拉取。
+
+    Args:
+        chunks: chunk collection
+        files: 文件向量 collection
+        file_paths: 文件路径
+        records: 新增 chunk 的 collection.get() 结果（含 embeddings / metadatas，可选）
+        chunk_counts: 文件路径 → 文件当前的 chunk 数（可选，来自文件索引）
+
+    Returns:
+        写入的文件数
+    """
+    paths = sorted({p for p in file_paths if p})
+    if not paths:
+        return 0
+
+    accumulator = _FileAccumulator()
+    fetch = paths
+    if records is not None and chunk_counts is not None:
+        accumulator.add_records(records)
+        complete = {p for p in paths if accumulator.counts.get(p, 0) == chunk_counts.get(p, -1)}
+        accumulator.restrict(complete)
+        fetch = [p for p in paths if p not in complete]
+    for i in range(0, len(fetch), FILE_FETCH_BATCH_SIZE):
+        batch = fetch[i:i + FILE_FETCH_BATCH_SIZE]
+        accumulator.add_records(chunks.get(
+            where={"file_path": {"$in": batch}},
+            include=["embeddings", "metadatas"],
+        ))
+
+    written = accumulator.upsert_into(files)
+    missing = [file_vector_id(p) for p in paths if p not in accumulator.sums]
+    if missing:
+        files.delete(ids=missing)
+    return written
+
+
+def rebuild_file_vectors(chunks: Any, files: Any) -> int:
+    """分页扫描 chunk collection 全量重建文件向量（删除已不存在的文件）
+
+    Returns:
+        文件向量数
+    """
+    accumulator = _FileAccumulator()
+    offset = 0
+    while True:
+        page = chunks.get(include=["embeddings", "metadatas"], limit=COLLECTION_PAGE_SIZE, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        accumulator.add_records(page)
+        offset += len(ids)
+        if len(ids) < COLLECTION_PAGE_SIZE:
+            break
+
+    written = accumulator.upsert_into(files)
+    keep = {file_vector_id(p) for p in accumulator.sums}
+    _delete_ids(files, [i for i in stored_file_paths(files) if i not in keep])
+    return written
+
+
+def stored_file_metadata(files: Any) -> Dict[str, Dict[str, Any]]:
+    """分页读取文件向量 collection 的 ID 与元数据（不拉取向量）
+
+    Returns:
+        文件向量ID → 元数据（缺少元数据时为空字典）
+    """
+    stored: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    while True:
+        page = files.get(include=["metadatas"], limit=COLLECTION_PAGE_SIZE, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        for vector_id, metadata in zip(ids, page.get("metadatas") or [None] * len(ids)):
+            stored[vector_id] = metadata or {}
+        offset += len(ids)
+        if len(ids) < COLLECTION_PAGE_SIZE:
+            break
+    return stored
+
+
+def stored_file_paths(files: Any) -> Dict[str, str]:
+    """分页读取文件向量 collection 的 ID 与文件路径（不拉取向量）
+
+    Returns:
+        文件向量ID → 文件路径（元数据缺少路径时为空串）
+    """
+    return {i: m.get("file_path") or "" for i, m in stored_file_metadata(files).items()}
+
+
+def _delete_ids(files: Any, ids: List[str]) -> None:
+    for i in range(0, len(ids), COLLECTION_PAGE_SIZE):
+        files.delete(ids=ids[i:i + COLLECTION_PAGE_SIZE])
+
+
+def _is_stale(metadata: Dict[str, Any], chunk_ids: List[str]) -> bool:
+    """文件向量的 chunk 数或 chunk 签名与文件索引不一致"""
+    if metadata.get("chunk_count") != len(chunk_ids):
+        return True
+    signature = metadata.get("chunk_signature")
+    # 旧版本写入的文件向量没有签名，只比对 chunk 数
+    return signature is not None and signature != chunk_signature(chunk_ids)
+
+
+def reconcile_file_vectors(
+    chunks: Any,
+    files: Any,
+    expected_paths: Iterable[str],
+    expected_chunks: Optional[Dict[str, List[str]]] = None,
+) -> int:
+    """与文件索引对账，只重算缺失、多余或内容已变的文件
+
+    Args:
+        chunks: chunk collection
+        files: 文件向量 collection
+        expected_paths: 文件索引中的文件路径
+        expected_chunks: 文件路径 → 文件索引中的 chunk ID（可选；提供时同时比对 chunk 数与 chunk 签名，
+            重算漏掉增量通知而内容已变的文件）
+
+    Returns:
+        重算的文件数
+    """
+    stored = stored_file_metadata(files)
+    paths = {i: m.get("file_path") or "" for i, m in stored.items()}
+    expected = set(expected_paths)
+    present = set(paths.values())
+    # 缺少路径或 ID 与路径不对应的记录无法按文件重算，直接删除
+    _delete_ids(files, [i for i, p in paths.items() if not p or i != file_vector_id(p)])
+    changed = (expected - present) | (present - expected - {""})
+    if expected_chunks is not None:
+        changed |= {
+            p for i, p in paths.items()
+            if p in expected_chunks and i == file_vector_id(p) and _is_stale(stored[i], expected_chunks[p])
+        }
+    update_file_vectors(chunks, files, changed)
+    return len(changed)
+
+
+def search_files(files: Any, query_embedding: List[float], top_k: int) -> List[Tuple[str, float]]:
+    """按查询向量检索文件
+
+    Returns:
+        (文件路径, 相似度) 列表，按相似度降序
+    """
+    if top_k <= 0:
+        return []
+    result = files.query(
+        query_embeddings=[list(query_embedding)],
+        n_results=top_k,
+        include=["metadatas", "distances"],
+    )
+    metadatas = (result.get("metadatas") or [[]])[0] or []
+    distances = (result.get("distances") or [[]])[0] or []
+    return [
+        (metadata["file_path"], 1.0 - float(distance))
+        for metadata, distance in zip(metadatas, distances)
+        if metadata and metadata.get("file_path")
+    ]
+
+
+# ----------------------------------------------------------------------
+# IndexManager 入口
+# ----------------------------------------------------------------------
+
+def get_file_collection(index_manager: "IndexManager") -> Any:
+    """获取（必要时创建）IndexManager 对应的文件向量 collection"""
+    name = file_collection_name(index_manager.collection_name)
+    client = index_manager.chroma_client
+    with _lock:
+        cached = _collections.get(name)
+        if cached is not None and cached[0] is client:
+            return cached[1]
+    files = client.get_or_create_collection(name=name, metadata={"hnsw:space": "cosine"})
+    with _lock:
+        _collections[name] = (client, files)
+    return files
+
+
+def sync_file_vectors(
+    index_manager: "IndexManager",
+    file_paths: Iterable[str],
+    records: Optional[Dict[str, Any]] = None,
+    chunk_counts: Optional[Dict[str, int]] = None,
+) -> None:
+    """向量写入/删除后增量更新文件向量（失败只记录日志，由下次检查重建）
+
+    records / chunk_counts 见 update_file_vectors()：写入通知已拉取的新增 chunk 向量直接复用。
+    """
+    if not config.FILE_VECTORS_ENABLE:
+        return
+    paths = set(file_paths)
+    if not paths:
+        return
+    try:
+        start = time.time()
+        written = update_file_vectors(
+            index_manager.chroma_collection, get_file_collection(index_manager), paths,
+            records=records, chunk_counts=chunk_counts,
+        )
+        logger.debug(f"文件向量增量更新: {len(paths)} 个文件（写入 {written} 个），耗时 {time.time() - start:.2f}s")
+    except Exception as e:
+        logger.warning(f"⚠️  文件向量增量更新失败（将在下次检查时重建）: {e}")
+
+
+def _rebuild_in_background(index_manager: "IndexManager", files: Any, name: str) -> None:
+    try:
+        start = time.time()
+        if files.count() == 0:
+            written = rebuild_file_vectors(index_manager.chroma_collection, files)
+            logger.info(f"🗂️  文件向量已重建: {name} ({written} 个文件, 耗时 {time.time() - start:.2f}s)")
+            return
+        from backend.infrastructure.text_index import get_file_index
+        file_index = get_file_index(index_manager.chroma_collection)
+        if file_index is None:
+            written = rebuild_file_vectors(index_manager.chroma_collection, files)
+            logger.info(f"🗂️  文件向量已重建: {name} ({written} 个文件, 耗时 {time.time() - start:.2f}s)")
+            return
+        changed = _reconcile_with_file_index(index_manager, files, file_index, name)
+        logger.info(f"🗂️  文件向量已对账: {name} (重算 {changed} 个文件, 耗时 {time.time() - start:.2f}s)")
+    except Exception as e:
+        logger.warning(f"⚠️  文件向量重建失败: {e}")
+    finally:
+        with _lock:
+            _rebuilding.discard(name)
+            _checked.pop(name, None)
+
+
+def _reconcile_with_file_index(index_manager: "IndexManager", files: Any, file_index: Any, name: str) -> int:
+    paths = file_index.file_paths()
+    expected_chunks = {p: file_index.chunk_ids(p) for p in paths}
+    changed = reconcile_file_vectors(index_manager.chroma_collection, files, paths, expected_chunks)
+    with _lock:
+        _verified[name] = file_index
+    return changed
+
+
+def _verify_in_background(index_manager: "IndexManager", files: Any, file_index: Any, name: str) -> None:
+    try:
+        start = time.time()
+        changed = _reconcile_with_file_index(index_manager, files, file_index, name)
+        if changed:
+            logger.info(f"🗂️  文件向量已按 chunk 签名校验: {name} (重算 {changed} 个文件, 耗时 {time.time() - start:.2f}s)")
+    except Exception as e:
+        with _lock:
+            if _verified.get(name) is file_index:
+                _verified.pop(name, None)
+        logger.warning(f"⚠️  文件向量校验失败: {e}")
+
+
+def _start(target: Any, args: Tuple[Any, ...], name: str, background: bool) -> None:
+    if not background:
+        target(*args)
+        return
+    threading.Thread(target=target, args=args, name=f"file-vectors-{name}", daemon=True).start()
+
+
+def ensure_file_vectors(index_manager: "IndexManager", background: bool = True) -> Optional[Any]:
+    """检查文件向量是否与 chunk collection 一致
+
+    按 version_check_seconds 限频，将文件向量数与文件索引的文件数比对；
+    不一致时只重算缺失或多余的文件，文件向量为空时全量重建（默认在后台线程进行）。
+    文件数一致时，对每个新加载/重建的文件索引实例按 chunk 签名校验一次，期间照常返回文件向量。
+
+    Args:
+        index_manager: IndexManager实例
+        background: 是否在后台线程重建
+
+    Returns:
+        可用于检索的文件向量 collection（未启用、正在重建或为空时返回None）
+    """
+    if not config.FILE_VECTORS_ENABLE:
+        return None
+    files = get_file_collection(index_manager)
+    name = files.name
+    now = time.time()
+    with _lock:
+        if name in _rebuilding:
+            return None
+        if now - _checked.get(name, 0.0) < config.FILE_VECTORS_VERSION_CHECK_SECONDS:
+            return files
+
+    from backend.infrastructure.text_index import get_file_index
+    file_index = get_file_index(index_manager.chroma_collection)
+    if file_index is None:
+        # 文件索引在后台构建中，无法比对，本次回退到 chunk 级聚合
+        return None
+    expected = file_index.file_count
+    if files.count() == expected:
+        with _lock:
+            _checked[name] = now
+            verify = bool(expected) and _verified.get(name) is not file_index
+            if verify:
+                _verified[name] = file_index
+        if verify:
+            _start(_verify_in_background, (index_manager, files, file_index, name), name, background)
+        return files if expected else None
+
+    with _lock:
+        if name in _rebuilding:
+            return None
+        _rebuilding.add(name)
+    logger.info(f"🗂️  文件向量与文件索引不一致，开始对账: {name}（文件数 {files.count()} → {expected}）")
+    _start(_rebuild_in_background, (index_manager, files, name), name, background)
+    return None if background else files
+
+
+def clear_file_vectors(index_manager: "IndexManager") -> None:
+    """删除文件向量 collection（清空索引时调用）"""
+    name = file_collection_name(index_manager.collection_name)
+    with _lock:
+        _collections.pop(name, None)
+        _checked.pop(name, None)
+        _verified.pop(name, None)
+    try:
+        index_manager.chroma_client.delete_collection(name=name)
+        logger.info(f"✅ 已删除文件向量集合: {name}")
+    except Exception as e:
+        logger.debug(f"文件向量集合不存在或删除失败: {name}: {e}")
+
+
+def reset_file_vectors() -> None:
+    """清空模块状态（测试用）"""
+    with _lock:
+        _collections.clear()
+        _checked.clear()
+        _rebuilding.clear()
+        _verified.clear()
@@ -1,9 +1,9 @@
 """
-向量ID管理模块：向量ID查询和删除
+向量ID管理模块：向量ID查询和删除，写入/删除后通知下游索引
 """
 
 import time
-from typing import List, Dict, TYPE_CHECKING
+from typing import Any, Iterable, List, Dict, TYPE_CHECKING
 
 from backend.infrastructure.logger import get_logger
 
@@ -12,6 +12,15 @@ if TYPE_CHECKING:
 
 logger = get_logger('indexer')
 
+# 单次 $in 查询包含的文件路径数（控制过滤条件大小）
+VECTOR_ID_QUERY_CHUNK_SIZE = 100
+
+# 按ID拉取节点时单次 get 的ID数
+VECTOR_FETCH_BATCH_SIZE = 200
+
+# 写入通知每组拉取并分发给下游索引的节点数（控制单次驻留内存的向量数）
+NOTIFY_GROUP_SIZE = 1000
+
 
 def get_vector_ids_by_metadata(index_manager: "IndexManager", file_path: str) -> List[str]:
     """通过文件路径查询对应的向量ID列表
@@ -40,51 +49,82 @@ def get_vector_ids_by_metadata(index_manager: "IndexManager", file_path: str) ->
         return []
 
 
-def get_vector_ids_batch(index_manager: "IndexManager", file_paths: List[str]) -> Dict[str, List[str]]:
-    """批量查询向量ID映射（优化：减少查询次数）
+def _query_vector_ids_chunk(index_manager: "IndexManager", file_paths: List[str]) -> Dict[str, List[str]]:
+    """单次往返查询一组文件路径的向量ID（$in 过滤，只取元数据）"""
+    if len(file_paths) == 1:
+        where = {"file_path": file_paths[0]}
+    else:
+        where = {"file_path": {"$in": file_paths}}
+    results = index_manager.chroma_collection.get(where=where, include=["metadatas"])
+    
+    vector_ids_map: Dict[str, List[str]] = {}
+    ids = (results or {}).get('ids') or []
+    metadatas = (results or {}).get('metadatas') or []
+    for vector_id, metadata in zip(ids, metadatas):
+        file_path = (metadata or {}).get("file_path")
+        if file_path:
+            vector_ids_map.setdefault(file_path, []).append(vector_id)
+    return vector_ids_map
+
+
+def get_vector_ids_batch(
+    index_manager: "IndexManager",
+    file_paths: List[str],
+    retries: int = 0,
+    retry_delay: float = 0.1,
+) -> Dict[str, List[str]]:
+    """批量查询向量ID映射（每 VECTOR_ID_QUERY_CHUNK_SIZE 个路径一次往返）
     
     Args:
         index_manager: IndexManager实例
         file_paths: 文件路径列表
+        retries: 未查到向量ID的路径整体重试的轮数（写入后立即查询时可能尚不可见）
+        retry_delay: 重试基础延迟（秒），按轮次递增
         
     Returns:
-        文件路径到向量ID列表的映射字典
+        文件路径到向量ID列表的映射字典（未查到的路径不包含在内）
     """
     if not file_paths:
         return {}
     
-    # 去重
-    unique_paths = list(set(file_paths))
-    vector_ids_map = {}
+    # 去重（保持顺序）
+    unique_paths = list(dict.fromkeys(p for p in file_paths if p))
+    vector_ids_map: Dict[str, List[str]] = {}
+    pending = unique_paths
+    round_trips = 0
     
-    try:
-        batch_size = 50  # 每批查询50个文件路径
-        total_results = 0
-        
-        for i in range(0, len(unique_paths), batch_size):
-            batch_paths = unique_paths[i:i+batch_size]
-            for file_path in batch_paths:
-                vector_ids = get_vector_ids_by_metadata(index_manager, file_path)
-                if vector_ids:
-                    vector_ids_map[file_path] = vector_ids
-                    total_results += len(vector_ids)
-        
-        logger.debug(
-            f"批量查询向量ID: "
-            f"输入{len(file_paths)}个路径(去重后{len(unique_paths)}个), "
-            f"找到{len(vector_ids_map)}个文件, "
-            f"共{total_results}个向量"
-        )
-    except Exception as e:
-        logger.error(f"批量查询向量ID失败: {e}")
-        for file_path in unique_paths:
+    for attempt in range(retries + 1):
+        missing = []
+        for i in range(0, len(pending), VECTOR_ID_QUERY_CHUNK_SIZE):
+            chunk = pending[i:i + VECTOR_ID_QUERY_CHUNK_SIZE]
             try:
-                vector_ids = get_vector_ids_by_metadata(index_manager, file_path)
-                if vector_ids:
-                    vector_ids_map[file_path] = vector_ids
-            except Exception as query_error:
-                logger.warning(f"查询单个向量ID失败 [{file_path}]: {query_error}")
+                found = _query_vector_ids_chunk(index_manager, chunk)
+                round_trips += 1
+            except Exception as e:
+                logger.warning(f"批量查询向量ID失败，回退到逐个查询 ({len(chunk)} 个路径): {e}")
+                found = {}
+                for file_path in chunk:
+                    vector_ids = get_vector_ids_by_metadata(index_manager, file_path)
+                    round_trips += 1
+                    if vector_ids:
+                        found[file_path] = vector_ids
+            vector_ids_map.update(found)
+            missing.extend(p for p in chunk if p not in found)
+        
+        pending = missing
+        if not pending or attempt == retries:
+            break
+        delay = retry_delay * (attempt + 1)
+        logger.debug(f"{len(pending)} 个文件未查到向量ID，等待 {delay:.2f}s 后重试 (尝试 {attempt + 1}/{retries})")
+        time.sleep(delay)
     
+    logger.debug(
+        f"批量查询向量ID: "
+        f"输入{len(file_paths)}个路径(去重后{len(unique_paths)}个), "
+        f"找到{len(vector_ids_map)}个文件, "
+        f"共{sum(len(v) for v in vector_ids_map.values())}个向量, "
+        f"查询{round_trips}次"
+    )
     return vector_ids_map
 
 
@@ -145,3 +185,99 @@ def delete_vectors_by_ids(index_manager: "IndexManager", vector_ids: List[str])
     except Exception as e:
         logger.warning(f"⚠️  删除向量失败: {e}")
         raise
+    
+    notify_vector_changes(index_manager, deleted_ids=vector_ids)
+
+
+def fetch_records_by_ids(collection: Any, ids: List[str], include: List[str]) -> Dict[str, List[Any]]:
+    """按ID分批拉取节点，合并为一份 collection.get() 格式的结果
+    
+    Args:
+        collection: Chroma collection
+        ids: 节点ID列表
+        include: 需要的字段（documents / metadatas / embeddings）
+        
+    Returns:
+        {"ids": [...], <字段>: [...]}，不存在的ID不出现在结果中
+    """
+    records: Dict[str, List[Any]] = {"ids": [], **{key: [] for key in include}}
+    for i in range(0, len(ids), VECTOR_FETCH_BATCH_SIZE):
+        page = collection.get(ids=ids[i:i + VECTOR_FETCH_BATCH_SIZE], include=include)
+        page_ids = list(page.get("ids") or [])
+        records["ids"].extend(page_ids)
+        for key in include:
+            values = page.get(key)
+            records[key].extend(values if values is not None else [None] * len(page_ids))
+    return records
+
+
+def _notify_include() -> List[str]:
+    """下游索引需要的字段：BM25 需要文本，文件索引需要元数据，副本与文件向量需要向量"""
+    from backend.infrastructure.config import config
+    from backend.infrastructure.vector_replica.registry import replica_enabled
+    include = ["documents", "metadatas"]
+    if replica_enabled() or config.FILE_VECTORS_ENABLE:
+        include.append("embeddings")
+    return include
+
+
+def notify_vector_changes(
+    index_manager: "IndexManager",
+    added_ids: Iterable[str] = (),
+    deleted_ids: Iterable[str] = (),
+) -> None:
+    """将向量写入/删除同步到版本号与collection的下游索引（失败不影响向量操作）
+    
+    新增节点按组从 Chroma 拉取一次（文本、元数据与向量），同一份结果分发给
+    BM25索引、本地向量副本、文件索引与文件向量，不再由各下游分别按ID读取。
+    
+    Args:
+        index_manager: IndexManager实例
+        added_ids: 新写入的向量ID
+        deleted_ids: 已删除的向量ID
+    """
+    from backend.infrastructure.indexer.utils.version import bump_collection_version
+    bump_collection_version(index_manager)
+    
+    added_ids = list(dict.fromkeys(added_ids))
+    deleted_ids = list(deleted_ids)
+    if not added_ids and not deleted_ids:
+        return
+    
+    for start in range(0, max(len(added_ids), 1), NOTIFY_GROUP_SIZE):
+        group = added_ids[start:start + NOTIFY_GROUP_SIZE]
+        try:
+            records = fetch_records_by_ids(index_manager.chroma_collection, group, _notify_include())
+        except Exception as e:
+            logger.warning(f"⚠️  拉取新增向量失败，下游索引将在检索时重建: {e}")
+            return
+        # 删除只需通知一次，随第一组下发
+        _notify_sinks(index_manager, records, deleted_ids if start == 0 else [])
+
+
+def _notify_sinks(index_manager: "IndexManager", records: Dict[str, List[Any]], deleted_ids: List[str]) -> None:
+    """把同一份新增记录与删除ID分发给各下游索引"""
+    collection = index_manager.chroma_collection
+    added_ids = records["ids"]
+    if not added_ids and not deleted_ids:
+        return
+    try:
+        from backend.infrastructure.text_index import notify_bm25_changes
+        notify_bm25_changes(collection, added_ids=added_ids, deleted_ids=deleted_ids, records=records)
+    except Exception as e:
+        logger.warning(f"⚠️  BM25索引增量更新失败（将在下次检索时重建）: {e}")
+    try:
+        from backend.infrastructure.vector_replica import notify_vector_replica_changes
+        notify_vector_replica_changes(collection, added_ids=added_ids, deleted_ids=deleted_ids, records=records)
+    except Exception as e:
+        logger.warning(f"⚠️  向量副本增量同步失败（检索时回退到 Chroma 并重建）: {e}")
+    try:
+        from backend.infrastructure.text_index import notify_file_index_changes
+        chunk_counts = notify_file_index_changes(
+            collection, added_ids=added_ids, deleted_ids=deleted_ids, records=records
+        )
+    except Exception as e:
+        logger.warning(f"⚠️  文件索引增量更新失败（将在下次检索时重建）: {e}")
+        return
+    from backend.infrastructure.indexer.utils.file_vectors import sync_file_vectors
+    sync_file_vectors(index_manager, list(chunk_counts), records=records, chunk_counts=chunk_counts)
@@ -5,6 +5,7 @@
 from typing import TYPE_CHECKING
 
 from backend.infrastructure.logger import get_logger
+from backend.infrastructure.indexer.core.chroma_client import ChromaClientManager
 
 if TYPE_CHECKING:
     from backend.infrastructure.indexer.core.manager import IndexManager
@@ -26,8 +27,12 @@ def close(index_manager: "IndexManager") -> None:
             try:
                 client = index_manager.chroma_client
                 
+                # 全局单例客户端由 ChromaClientManager 持有并被其他索引管理器共享，只释放引用
+                # （嵌入式后端关闭客户端会停止整个进程内的向量库）
+                if ChromaClientManager.is_shared_client(client):
+                    logger.info("✅ Chroma客户端为全局单例，保留连接")
                 # 方法1: 尝试调用 close() 方法
-                if hasattr(client, 'close'):
+                elif hasattr(client, 'close'):
                     client.close()
                     logger.info("✅ Chroma客户端已通过 close() 方法关闭")
                 # 方法2: 尝试调用 reset() 方法
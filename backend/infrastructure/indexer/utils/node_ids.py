@@ -0,0 +1,128 @@
+"""
+节点ID模块：分块时生成确定性的节点（向量）ID
+
+主要功能：
+- compute_node_id()：由 (仓库, 文件路径, 分块序号, 分块内容哈希) 计算节点ID
+- NodeIdAssigner类：为分块器输出的节点分配确定性ID，并按源文件记录写入的向量ID
+- create_node_parser()：按 IndexManager 的分块参数创建分块器
+- expected_node_ids()：只分块不向量化，计算文档应写入的向量ID（断点续传校验）
+
+特性：
+- 同一文件同一内容重复索引得到相同ID，写入即幂等，断点续传可精确判断
+- 向量ID在写入前已知，无需写入后再回查 Chroma
+- 分块序号按文件连续计数（同一文件拆成多个 Document 时仍连续）
+- 重写ID时同步修正节点间的 PREVIOUS/NEXT/PARENT/CHILD 关系
+"""
+
+import hashlib
+import uuid
+from typing import Dict, Iterable, List
+
+from llama_index.core.schema import BaseNode, MetadataMode, NodeRelationship
+
+# 节点ID命名空间（固定值，改变会使所有已有向量ID失效）
+NODE_ID_NAMESPACE = uuid.UUID("6f2c9a4e-3b1d-5e8f-9a7c-2d4b6e8f0a1c")
+
+
+def compute_node_id(repository: str, file_path: str, ordinal: int, content: str) -> str:
+    """计算确定性节点ID
+
+    Args:
+        repository: 仓库标识（owner/repo@branch，本地文件为空串）
+        file_path: 文件路径
+        ordinal: 分块在文件内的序号
+        content: 分块文本
+
+    Returns:
+        UUID 格式的节点ID
+    """
+    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    return str(uuid.uuid5(NODE_ID_NAMESPACE, f"{repository}\x00{file_path}\x00{ordinal}\x00{content_hash}"))
+
+
+def _repository_key(metadata: Dict) -> str:
+    repository = metadata.get("repository", "")
+    if not repository:
+        owner, repo = metadata.get("owner", ""), metadata.get("repo", "")
+        repository = f"{owner}/{repo}" if owner and repo else ""
+    return f"{repository}@{metadata.get('branch', 'main')}" if repository else ""
+
+
+class NodeIdAssigner:
+    """为节点分配确定性ID并按源文件记录向量ID
+
+    同一次构建中多次调用 assign() 时，分块序号按文件连续计数。
+    """
+
+    def __init__(self):
+        self._ordinals: Dict[str, int] = {}
+        self.ids_by_file: Dict[str, List[str]] = {}
+
+    def assign(self, nodes: List[BaseNode]) -> List[BaseNode]:
+        """就地重写节点ID（按节点顺序计数）
+
+        Args:
+            nodes: 分块器输出的节点（同一文件的节点须按文档顺序出现）
+
+        Returns:
+            同一节点列表
+        """
+        id_map: Dict[str, str] = {}
+        for node in nodes:
+            metadata = node.metadata or {}
+            file_path = metadata.get("file_path", "")
+            key = file_path or node.ref_doc_id or node.node_id
+            ordinal = self._ordinals.get(key, 0)
+            self._ordinals[key] = ordinal + 1
+
+            new_id = compute_node_id(
+                _repository_key(metadata),
+                key,
+                ordinal,
+                node.get_content(metadata_mode=MetadataMode.NONE),
+            )
+            id_map[node.node_id] = new_id
+            node.id_ = new_id
+            if file_path:
+                self.ids_by_file.setdefault(file_path, []).append(new_id)
+
+        for node in nodes:
+            for relation, info in node.relationships.items():
+                if relation == NodeRelationship.SOURCE:
+                    continue
+                for related in info if isinstance(info, list) else [info]:
+                    related.node_id = id_map.get(related.node_id, related.node_id)
+        return nodes
+
+    def discard(self, node_ids: Iterable[str]) -> None:
+        """移除写入失败的节点ID（不再计入 ids_by_file）"""
+        failed = set(node_ids)
+        if not failed:
+            return
+        for file_path in list(self.ids_by_file):
+            kept = [i for i in self.ids_by_file[file_path] if i not in failed]
+            if kept:
+                self.ids_by_file[file_path] = kept
+            else:
+                del self.ids_by_file[file_path]
+
+
+def create_node_parser(index_manager):
+    """按 IndexManager 的分块参数创建分块器"""
+    from llama_index.core.node_parser import SentenceSplitter
+    return SentenceSplitter(
+        chunk_size=index_manager.chunk_size,
+        chunk_overlap=index_manager.chunk_overlap,
+    )
+
+
+def expected_node_ids(index_manager, documents: List) -> Dict[str, List[str]]:
+    """计算文档分块后应写入的向量ID（只分块，不向量化）
+
+    Returns:
+        文件路径到向量ID列表的映射
+    """
+    assigner = NodeIdAssigner()
+    nodes = create_node_parser(index_manager).get_nodes_from_documents(documents)
+    assigner.assign(nodes)
+    return assigner.ids_by_file
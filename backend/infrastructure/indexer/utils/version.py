@@ -0,0 +1,95 @@
+"""
+Collection版本模块：为查询/检索缓存提供 collection 的变更版本号
+
+主要功能：
+- bump_collection_version()：向量写入/删除/清空后递增本进程内的版本号
+- get_collection_version()：获取 collection 当前版本（进程内版本号 + 节点数）
+- get_collection_generation()：获取本进程内的版本号（不读取节点数）
+
+特性：
+- 本进程内的写入/删除立即改变版本号
+- 其他进程（如后台导入）的变更通过节点数发现，节点数按 max_age 限频读取
+- 读取节点数失败时只使用进程内版本号
+"""
+
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('indexer')
+
+_lock = threading.Lock()
+_generations: Dict[str, int] = {}
+_counts: Dict[str, Tuple[int, float]] = {}
+
+
+def _collection_name(target: Any) -> str:
+    """从 IndexManager / Chroma collection / 名称中取 collection 名称"""
+    if isinstance(target, str):
+        return target
+    for attr in ('collection_name', 'name'):
+        name = getattr(target, attr, None)
+        if isinstance(name, str) and name:
+            return name
+    return ''
+
+
+def bump_collection_version(target: Any) -> int:
+    """递增 collection 的版本号
+
+    Args:
+        target: IndexManager、Chroma collection 或 collection 名称
+
+    Returns:
+        新的版本号
+    """
+    name = _collection_name(target)
+    with _lock:
+        generation = _generations.get(name, 0) + 1
+        _generations[name] = generation
+        _counts.pop(name, None)
+    return generation
+
+
+def get_collection_generation(target: Any) -> int:
+    """获取 collection 在本进程内的版本号（每次写入/删除/清空后递增）"""
+    with _lock:
+        return _generations.get(_collection_name(target), 0)
+
+
+def get_collection_version(target: Any, max_age: float = 30.0) -> str:
+    """获取 collection 当前版本
+
+    Args:
+        target: IndexManager 或 Chroma collection
+        max_age: 节点数缓存的最长时间（秒，0 表示每次读取）
+
+    Returns:
+        版本字符串（"名称:版本号:节点数"），内容变化时随之变化
+    """
+    name = _collection_name(target)
+    now = time.time()
+    with _lock:
+        generation = _generations.get(name, 0)
+        cached = _counts.get(name)
+    if cached is not None and now - cached[1] < max_age:
+        return f"{name}:{generation}:{cached[0]}"
+
+    collection = getattr(target, 'chroma_collection', target)
+    count = -1
+    try:
+        count = int(collection.count())
+    except Exception as e:
+        logger.debug(f"读取collection节点数失败，仅使用进程内版本号: {e}")
+    with _lock:
+        _counts[name] = (count, now)
+    return f"{name}:{generation}:{count}"
+
+
+def reset_collection_versions() -> None:
+    """清空版本记录（测试用）"""
+    with _lock:
+        _generations.clear()
+        _counts.clear()
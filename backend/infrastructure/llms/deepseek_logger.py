@@ -4,7 +4,7 @@ LLM 日志包装器：通用 LLM 日志记录功能
 主要功能：
 - LLMLogger 类：通用 LLM 日志记录器，支持任意 LLM 实例
 - wrap_llm()：包装 LLM 实例，添加日志记录功能
-- 支持 complete、chat、stream_complete、stream_chat 方法
+- 支持 complete、chat、stream_complete、astream_complete、stream_chat、astream_chat 方法
 - 支持推理链内容提取和记录
 
 特性：
@@ -49,7 +49,9 @@ class LLMLogger:
         self.complete = self._complete_with_logging
         self.chat = self._chat_with_logging
         self.stream_complete = self._stream_complete_with_logging
+        self.astream_complete = self._astream_complete_with_logging
         self.stream_chat = self._stream_chat_with_logging
+        self.astream_chat = self._astream_chat_with_logging
         
         # 获取模型名称（用于日志）
         model_name = getattr(llm_instance, 'model', 'unknown')
@@ -229,19 +231,7 @@ class LLMLogger:
         Yields:
             CompletionResponse: 流式完成响应
         """
-        model_name = self._get_model_name()
-        
-        # 记录请求
-        logger.info("=" * 80)
-        logger.info(f"🔵 LLM API 调用 - stream_complete")
-        logger.info("-" * 80)
-        logger.info(f"📤 请求体:")
-        logger.info(f"   模型: {model_name}")
-        logger.info(f"   提示词长度: {len(prompt)} 字符")
-        logger.info(f"   提示词内容: {prompt[:500]}{'...' if len(prompt) > 500 else ''}")
-        if kwargs:
-            logger.info(f"   其他参数: {json.dumps(kwargs, ensure_ascii=False, indent=2)}")
-        logger.info("-" * 80)
+        self._log_complete_request("stream_complete", prompt, kwargs)
         
         try:
             # 调用原始方法并收集响应
@@ -252,33 +242,72 @@ class LLMLogger:
                 yield chunk
             
             # 记录完整响应
-            logger.info(f"📥 响应体（流式）:")
-            logger.info(f"   响应长度: {len(full_response)} 字符")
-            logger.info(f"   响应内容: {full_response[:1000]}{'...' if len(full_response) > 1000 else ''}")
-            logger.info("=" * 80)
+            self._log_stream_complete_response(full_response)
             
         except Exception as e:
-            logger.error(f"❌ LLM API 调用失败:")
-            logger.error(f"   错误类型: {type(e).__name__}")
-            logger.error(f"   错误信息: {str(e)}")
-            logger.error("=" * 80)
+            self._log_failure(e)
             raise
     
-    def _stream_chat_with_logging(self, messages, **kwargs):
-        """包装 stream_chat 方法，记录请求和响应流
+    async def _astream_complete_with_logging(self, prompt: str, **kwargs):
+        """包装 astream_complete 方法，记录请求和响应流（与 LlamaIndex 一致：await 后得到异步生成器）
         
         Args:
-            messages: 消息列表
+            prompt: 提示词
             **kwargs: 其他参数
             
-        Yields:
-            ChatResponse: 流式聊天响应
+        Returns:
+            AsyncGenerator[CompletionResponse]: 异步流式完成响应
         """
+        self._log_complete_request("astream_complete", prompt, kwargs)
+        
+        try:
+            stream = await self._llm.astream_complete(prompt, **kwargs)
+        except Exception as e:
+            self._log_failure(e)
+            raise
+        
+        async def gen():
+            full_response = ""
+            try:
+                async for chunk in stream:
+                    yield chunk
+                    full_response += chunk.text if hasattr(chunk, 'text') else str(chunk)
+                self._log_stream_complete_response(full_response)
+            except Exception as e:
+                self._log_failure(e)
+                raise
+        
+        return gen()
+    
+    def _log_complete_request(self, method: str, prompt: str, kwargs: Dict[str, Any]) -> None:
+        """记录 complete 类流式方法的请求体"""
+        model_name = self._get_model_name()
+        
+        logger.info("=" * 80)
+        logger.info(f"🔵 LLM API 调用 - {method}")
+        logger.info("-" * 80)
+        logger.info(f"📤 请求体:")
+        logger.info(f"   模型: {model_name}")
+        logger.info(f"   提示词长度: {len(prompt)} 字符")
+        logger.info(f"   提示词内容: {prompt[:500]}{'...' if len(prompt) > 500 else ''}")
+        if kwargs:
+            logger.info(f"   其他参数: {json.dumps(kwargs, ensure_ascii=False, indent=2)}")
+        logger.info("-" * 80)
+    
+    @staticmethod
+    def _log_stream_complete_response(full_response: str) -> None:
+        """记录流式 complete 的完整响应"""
+        logger.info(f"📥 响应体（流式）:")
+        logger.info(f"   响应长度: {len(full_response)} 字符")
+        logger.info(f"   响应内容: {full_response[:1000]}{'...' if len(full_response) > 1000 else ''}")
+        logger.info("=" * 80)
+    
+    def _log_chat_request(self, method: str, messages, kwargs: Dict[str, Any]) -> None:
+        """记录 chat 类方法的请求体"""
         model_name = self._get_model_name()
         
-        # 记录请求
         logger.info("=" * 80)
-        logger.info(f"🔵 LLM API 调用 - stream_chat")
+        logger.info(f"🔵 LLM API 调用 - {method}")
         logger.info("-" * 80)
         logger.info(f"📤 请求体:")
         logger.info(f"   模型: {model_name}")
@@ -298,6 +327,77 @@ class LLMLogger:
         if kwargs:
             logger.info(f"   其他参数: {json.dumps(kwargs, ensure_ascii=False, indent=2)}")
         logger.info("-" * 80)
+    
+    @staticmethod
+    def _accumulate_chat_chunk(chunk, full_response: str, full_reasoning: str) -> tuple[str, str]:
+        """累积流式 chat 响应的内容与推理链
+        
+        Returns:
+            (累积的响应内容, 累积的推理链内容)
+        """
+        chunk_message = chunk.message if hasattr(chunk, 'message') else None
+        if chunk_message:
+            # 处理推理链内容（流式）
+            if hasattr(chunk_message, 'reasoning_content') and chunk_message.reasoning_content:
+                reasoning_str = str(chunk_message.reasoning_content) if chunk_message.reasoning_content else ""
+                if reasoning_str:
+                    full_reasoning += reasoning_str
+            # 处理普通内容（流式）
+            if hasattr(chunk_message, 'content') and chunk_message.content:
+                content_str = str(chunk_message.content) if chunk_message.content else ""
+                if content_str:
+                    full_response += content_str
+        else:
+            # 处理 delta（流式响应）
+            if hasattr(chunk, 'delta'):
+                delta = chunk.delta
+                if hasattr(delta, 'reasoning_content') and delta.reasoning_content:
+                    reasoning_str = str(delta.reasoning_content) if delta.reasoning_content else ""
+                    if reasoning_str:
+                        full_reasoning += reasoning_str
+                if hasattr(delta, 'content') and delta.content:
+                    content_str = str(delta.content) if delta.content else ""
+                    if content_str:
+                        full_response += content_str
+            else:
+                # 降级处理
+                chunk_text = str(chunk)
+                full_response += chunk_text
+        return full_response, full_reasoning
+    
+    @staticmethod
+    def _log_stream_chat_response(full_response: str, full_reasoning: str) -> None:
+        """记录流式 chat 的完整响应"""
+        logger.info(f"📥 响应体（流式）:")
+        logger.info(f"   响应长度: {len(full_response)} 字符")
+        logger.info(f"   响应内容: {full_response[:1000]}{'...' if len(full_response) > 1000 else ''}")
+        
+        # 记录推理链内容（如果存在）
+        if full_reasoning:
+            logger.info(f"🧠 推理链内容（流式）:")
+            logger.info(f"   推理链长度: {len(full_reasoning)} 字符")
+            logger.info(f"   推理链内容: {full_reasoning[:1000]}{'...' if len(full_reasoning) > 1000 else ''}")
+        
+        logger.info("=" * 80)
+    
+    @staticmethod
+    def _log_failure(e: Exception) -> None:
+        logger.error(f"❌ LLM API 调用失败:")
+        logger.error(f"   错误类型: {type(e).__name__}")
+        logger.error(f"   错误信息: {str(e)}")
+        logger.error("=" * 80)
+    
+    def _stream_chat_with_logging(self, messages, **kwargs):
+        """包装 stream_chat 方法，记录请求和响应流
+        
+        Args:
+            messages: 消息列表
+            **kwargs: 其他参数
+            
+        Yields:
+            ChatResponse: 流式聊天响应
+        """
+        self._log_chat_request("stream_chat", messages, kwargs)
         
         try:
             # 清理消息，确保不包含 reasoning_content（符合 DeepSeek API 要求）
@@ -321,54 +421,48 @@ class LLMLogger:
                 # 记录每个 chunk 的到达时间（仅在前几个和间隔较长时记录）
                 if chunk_count <= 5 or time_since_last > 0.1:
                     logger.debug(f"📦 Chunk #{chunk_count} 到达，间隔: {time_since_last*1000:.1f}ms")
-                chunk_message = chunk.message if hasattr(chunk, 'message') else None
-                if chunk_message:
-                    # 处理推理链内容（流式）
-                    if hasattr(chunk_message, 'reasoning_content') and chunk_message.reasoning_content:
-                        reasoning_str = str(chunk_message.reasoning_content) if chunk_message.reasoning_content else ""
-                        if reasoning_str:
-                            full_reasoning += reasoning_str
-                    # 处理普通内容（流式）
-                    if hasattr(chunk_message, 'content') and chunk_message.content:
-                        content_str = str(chunk_message.content) if chunk_message.content else ""
-                        if content_str:
-                            full_response += content_str
-                else:
-                    # 处理 delta（流式响应）
-                    if hasattr(chunk, 'delta'):
-                        delta = chunk.delta
-                        if hasattr(delta, 'reasoning_content') and delta.reasoning_content:
-                            reasoning_str = str(delta.reasoning_content) if delta.reasoning_content else ""
-                            if reasoning_str:
-                                full_reasoning += reasoning_str
-                        if hasattr(delta, 'content') and delta.content:
-                            content_str = str(delta.content) if delta.content else ""
-                            if content_str:
-                                full_response += content_str
-                    else:
-                        # 降级处理
-                        chunk_text = str(chunk)
-                        full_response += chunk_text
+                full_response, full_reasoning = self._accumulate_chat_chunk(chunk, full_response, full_reasoning)
             
             # 记录完整响应
-            logger.info(f"📥 响应体（流式）:")
-            logger.info(f"   响应长度: {len(full_response)} 字符")
-            logger.info(f"   响应内容: {full_response[:1000]}{'...' if len(full_response) > 1000 else ''}")
-            
-            # 记录推理链内容（如果存在）
-            if full_reasoning:
-                logger.info(f"🧠 推理链内容（流式）:")
-                logger.info(f"   推理链长度: {len(full_reasoning)} 字符")
-                logger.info(f"   推理链内容: {full_reasoning[:1000]}{'...' if len(full_reasoning) > 1000 else ''}")
+            self._log_stream_chat_response(full_response, full_reasoning)
             
-            logger.info("=" * 80)
+        except Exception as e:
+            self._log_failure(e)
+            raise
+    
+    async def _astream_chat_with_logging(self, messages, **kwargs):
+        """包装 astream_chat 方法，记录请求和响应流（与 LlamaIndex 一致：await 后得到异步生成器）
+        
+        Args:
+            messages: 消息列表
+            **kwargs: 其他参数
             
+        Returns:
+            AsyncGenerator[ChatResponse]: 异步流式聊天响应
+        """
+        self._log_chat_request("astream_chat", messages, kwargs)
+        
+        # 清理消息，确保不包含 reasoning_content（符合 DeepSeek API 要求）
+        cleaned_messages = clean_messages_for_api(messages)
+        try:
+            stream = await self._llm.astream_chat(cleaned_messages, **kwargs)
         except Exception as e:
-            logger.error(f"❌ LLM API 调用失败:")
-            logger.error(f"   错误类型: {type(e).__name__}")
-            logger.error(f"   错误信息: {str(e)}")
-            logger.error("=" * 80)
+            self._log_failure(e)
             raise
+        
+        async def gen():
+            full_response = ""
+            full_reasoning = ""
+            try:
+                async for chunk in stream:
+                    yield chunk
+                    full_response, full_reasoning = self._accumulate_chat_chunk(chunk, full_response, full_reasoning)
+                self._log_stream_chat_response(full_response, full_reasoning)
+            except Exception as e:
+                self._log_failure(e)
+                raise
+        
+        return gen()
 
 
 def wrap_llm(llm_instance: LLM) -> LLMLogger:
@@ -5,6 +5,7 @@
 - ObserverType枚举：观察器类型（追踪、评估、调试、指标）
 - BaseObserver类：抽象基类，定义所有观察器必须实现的接口
 - on_query_start()、on_query_end()等：查询生命周期钩子
+- on_cache_event()：缓存命中/未命中钩子
 
 执行流程：
 1. 子类实现抽象方法
@@ -102,6 +103,16 @@ class BaseObserver(ABC):
         """生成完成时回调（可选）"""
         pass
     
+    def on_cache_event(self, cache: str, hit: bool, **kwargs) -> None:
+        """缓存查找时回调（可选）
+        
+        Args:
+            cache: 缓存名称（如 query_rewrite、response）
+            hit: 是否命中
+            **kwargs: 其他信息（如命中层级）
+        """
+        pass
+    
     @abstractmethod
     def get_report(self) -> Dict[str, Any]:
         """获取观察报告
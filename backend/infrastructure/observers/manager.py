@@ -3,6 +3,7 @@
 统一管理多个观察器，协调它们的工作
 """
 
+import threading
 from typing import Any, Dict, List, Optional
 from backend.infrastructure.observers.base import BaseObserver, ObserverType
 from backend.infrastructure.logger import get_logger
@@ -19,6 +20,8 @@ class ObserverManager:
     def __init__(self):
         """初始化观察器管理器"""
         self.observers: List[BaseObserver] = []
+        self._cache_counters: Dict[str, Dict[str, int]] = {}
+        self._cache_lock = threading.Lock()
         logger.info("📊 初始化观察器管理器")
     
     def add_observer(self, observer: BaseObserver) -> None:
@@ -118,6 +121,41 @@ class ObserverManager:
                 except Exception as e:
                     logger.error(f"❌ 观察器 {observer.name} 处理失败: {e}")
     
+    def on_cache_event(self, cache: str, hit: bool, **kwargs) -> None:
+        """通知所有观察器：缓存查找结果，并累计命中率
+        
+        Args:
+            cache: 缓存名称
+            hit: 是否命中
+            **kwargs: 其他信息（如命中层级）
+        """
+        with self._cache_lock:
+            counters = self._cache_counters.setdefault(cache, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+        
+        for observer in self.observers:
+            if observer.is_enabled():
+                try:
+                    observer.on_cache_event(cache, hit, **kwargs)
+                except Exception as e:
+                    logger.error(f"❌ 观察器 {observer.name} 处理失败: {e}")
+    
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各缓存的命中统计
+        
+        Returns:
+            缓存名称到 {hits, misses, hit_rate} 的映射
+        """
+        with self._cache_lock:
+            stats = {}
+            for cache, counters in self._cache_counters.items():
+                total = counters["hits"] + counters["misses"]
+                stats[cache] = {
+                    **counters,
+                    "hit_rate": counters["hits"] / total if total > 0 else 0.0,
+                }
+            return stats
+    
     def get_callback_handlers(self) -> List[Any]:
         """获取所有观察器的回调处理器（用于LlamaIndex）
         
@@ -140,6 +178,7 @@ class ObserverManager:
             "total_observers": len(self.observers),
             "enabled_observers": len([obs for obs in self.observers if obs.is_enabled()]),
             "observers": [obs.get_report() for obs in self.observers],
+            "caches": self.get_cache_stats(),
         }
     
     def teardown_all(self) -> None:
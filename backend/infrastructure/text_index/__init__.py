@@ -0,0 +1,69 @@
+"""
+文本索引模块：为 Grep / BM25 检索提供进程内的倒排索引
+
+主要功能：
+- LineIndex类：目录级行文本索引，回答字面量/正则查询
+- BM25Index类：可增量维护的 BM25 关键词索引
+- FileIndex类：文件级元数据索引（路径/文件名/仓库/chunk ID），回答文件名子串/前缀查询
+- get_line_index()：按根目录获取共享索引
+- get_bm25_index() / get_docstore_bm25_index()：按 collection / docstore 获取共享 BM25 索引
+- notify_file_changes()：导入时增量更新行索引（其他变更在查询时与磁盘对账）
+- notify_bm25_changes()：向量写入/删除时增量更新 BM25 索引
+- get_file_index() / notify_file_index_changes()：按 collection 获取共享文件索引 / 增量更新
+- flush_text_indexes()：立即保存增量更新后尚未落盘的 BM25 / 文件索引
+
+特性：
+- 延迟导入，避免加载配置前的循环依赖
+"""
+
+from typing import Any
+
+__all__ = [
+    'LineIndex',
+    'BM25Index',
+    'FileIndex',
+    'prepare_line_index',
+    'get_line_index',
+    'notify_file_changes',
+    'reset_line_indexes',
+    'get_bm25_index',
+    'get_docstore_bm25_index',
+    'notify_bm25_changes',
+    'reset_bm25_indexes',
+    'get_file_index',
+    'notify_file_index_changes',
+    'reset_file_indexes',
+    'flush_text_indexes',
+]
+
+_REGISTRY_EXPORTS = (
+    'prepare_line_index',
+    'get_line_index',
+    'notify_file_changes',
+    'reset_line_indexes',
+    'get_bm25_index',
+    'get_docstore_bm25_index',
+    'notify_bm25_changes',
+    'reset_bm25_indexes',
+    'get_file_index',
+    'notify_file_index_changes',
+    'reset_file_indexes',
+    'flush_text_indexes',
+)
+
+
+def __getattr__(name: str) -> Any:
+    """延迟导入支持"""
+    if name == 'LineIndex':
+        from backend.infrastructure.text_index.line_index import LineIndex
+        return LineIndex
+    elif name == 'BM25Index':
+        from backend.infrastructure.text_index.bm25_index import BM25Index
+        return BM25Index
+    elif name == 'FileIndex':
+        from backend.infrastructure.text_index.file_index import FileIndex
+        return FileIndex
+    elif name in _REGISTRY_EXPORTS:
+        from backend.infrastructure.text_index import registry
+        return getattr(registry, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,354 @@
+"""
+BM25 关键词索引：可增量维护、可持久化的 BM25 倒排索引
+
+主要功能：
+- tokenize()：中文友好的分词（安装 jieba 时使用 jieba 搜索模式，否则使用 CJK 二元组）
+- BM25Index类：按节点ID增量添加/删除文档，回答 BM25 Top-K 查询
+- load_from_collection()：从 Chroma collection 分页拉取节点全量构建
+
+执行流程：
+1. 文档分词后记录词频与文档长度，写入词项 → {节点ID: 词频} 倒排表
+2. 查询时只遍历查询词项的倒排表累加 BM25 分数
+3. 添加/删除只触及该文档自身的词项，无需重算全局统计
+
+特性：
+- 持久化文件绑定 collection 名称与分词器，节点数与 collection 不一致时由注册表重建
+- 持久化词频而非原文分词结果，加载时无需重新分词
+- 持久化为 gzip 压缩的 JSON，写临时文件后原子替换
+"""
+
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('text_index')
+
+INDEX_FORMAT_VERSION = 1
+
+# 从 Chroma 分页拉取节点的批大小
+COLLECTION_PAGE_SIZE = 1000
+
+_CJK = r'㐀-䶿一-鿿豈-﫿'
+_TOKEN_RE = re.compile(rf'([{_CJK}]+)|([^\W{_CJK}]+)')
+
+
+def _bigram_tokenize(text: str) -> List[str]:
+    """CJK 连续片段切成二元组，其余按单词切分（小写）"""
+    tokens: List[str] = []
+    for cjk, word in _TOKEN_RE.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def _jieba_tokenize(text: str) -> List[str]:
+    """jieba 搜索模式分词（小写，去掉标点和空白）"""
+    import jieba
+
+    return [t for t in jieba.lcut_for_search(text.lower()) if _TOKEN_RE.match(t)]
+
+
+def resolve_tokenizer(name: str = "auto") -> str:
+    """解析分词器名称
+
+    Args:
+        name: auto / jieba / bigram（auto 在安装 jieba 时使用 jieba）
+
+    Returns:
+        实际使用的分词器名称
+    """
+    if name not in ("auto", "jieba", "bigram"):
+        raise ValueError(f"不支持的BM25分词器: {name}")
+    if name == "bigram":
+        return name
+    try:
+        import jieba  # noqa: F401
+        return "jieba"
+    except ImportError:
+        if name == "jieba":
+            logger.warning("⚠️  jieba未安装，BM25分词退化为CJK二元组")
+        return "bigram"
+
+
+def tokenize(text: str, tokenizer: str = "bigram") -> List[str]:
+    """按指定分词器分词"""
+    if tokenizer == "jieba":
+        return _jieba_tokenize(text)
+    return _bigram_tokenize(text)
+
+
+class BM25Index:
+    """可增量维护的 BM25 倒排索引"""
+
+    def __init__(
+        self,
+        name: str,
+        persist_path: Optional[Path] = None,
+        tokenizer: str = "bigram",
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """初始化BM25索引
+
+        Args:
+            name: 索引名称（一般为 collection 名称）
+            persist_path: 持久化文件路径（None 表示不持久化）
+            tokenizer: 分词器名称（bigram / jieba）
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.name = name
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.tokenizer = tokenizer
+        self.k1 = k1
+        self.b = b
+
+        self._docs: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._doc_tf: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_len = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ------------------------------------------------------------------
+    # 增量维护
+    # ------------------------------------------------------------------
+
+    def _remove_locked(self, node_id: str) -> bool:
+        tf = self._doc_tf.pop(node_id, None)
+        if tf is None:
+            return False
+        del self._docs[node_id]
+        self._total_len -= self._doc_len.pop(node_id)
+        for term in tf:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(node_id, None)
+                if not posting:
+                    del self._postings[term]
+        return True
+
+    def _add_locked(self, node_id: str, text: str, metadata: Dict[str, Any], tf: Dict[str, int]) -> None:
+        self._remove_locked(node_id)
+        self._docs[node_id] = (text, metadata)
+        self._doc_tf[node_id] = tf
+        self._doc_len[node_id] = length = sum(tf.values())
+        for term, freq in tf.items():
+            self._postings.setdefault(term, {})[node_id] = freq
+        self._total_len += length
+
+    def add(self, items: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """添加或替换文档
+
+        Args:
+            items: (节点ID, 文本, 元数据) 序列
+
+        Returns:
+            添加的文档数
+        """
+        prepared = []
+        for node_id, text, metadata in items:
+            tf: Dict[str, int] = {}
+            for token in tokenize(text or "", self.tokenizer):
+                tf[token] = tf.get(token, 0) + 1
+            prepared.append((node_id, text or "", metadata or {}, tf))
+
+        with self._lock:
+            for node_id, text, metadata, tf in prepared:
+                self._add_locked(node_id, text, metadata, tf)
+            if prepared:
+                self._dirty = True
+        return len(prepared)
+
+    def add_nodes(self, nodes: Iterable[Any]) -> int:
+        """添加 LlamaIndex 节点"""
+        return self.add((node.node_id, node.get_content(), dict(node.metadata or {})) for node in nodes)
+
+    def delete(self, node_ids: Iterable[str]) -> int:
+        """删除文档
+
+        Returns:
+            实际删除的文档数
+        """
+        with self._lock:
+            removed = sum(1 for node_id in node_ids if self._remove_locked(node_id))
+            if removed:
+                self._dirty = True
+        return removed
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock:
+            self._docs.clear()
+            self._doc_tf.clear()
+            self._doc_len.clear()
+            self._postings.clear()
+            self._total_len = 0
+            self._dirty = True
+
+    def load_from_collection(self, collection: Any) -> int:
+        """从 Chroma collection 分页拉取全部节点重建索引
+
+        Returns:
+            索引的文档数
+        """
+        self.clear()
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["documents", "metadatas"],
+                limit=COLLECTION_PAGE_SIZE,
+                offset=offset,
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            self.add(chroma_records_to_items(page))
+            offset += len(ids)
+            if len(ids) < COLLECTION_PAGE_SIZE:
+                break
+        return len(self)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float, str, Dict[str, Any]]]:
+        """BM25 Top-K 查询
+
+        Args:
+            query: 查询文本
+            top_k: 返回数量
+
+        Returns:
+            (节点ID, 分数, 文本, 元数据) 列表，按分数降序
+        """
+        terms = set(tokenize(query, self.tokenizer))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avgdl = self._total_len / n_docs or 1.0
+            k1, b = self.k1, self.b
+            doc_len = self._doc_len
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for node_id, freq in posting.items():
+                    denom = freq + k1 * (1.0 - b + b * doc_len[node_id] / avgdl)
+                    scores[node_id] = scores.get(node_id, 0.0) + idf * freq * (k1 + 1.0) / denom
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda kv: kv[1])
+            return [(node_id, score, *self._docs[node_id]) for node_id, score in best]
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """持久化索引（无变化时跳过）"""
+        if self.persist_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                "version": INDEX_FORMAT_VERSION,
+                "name": self.name,
+                "tokenizer": self.tokenizer,
+                "docs": {
+                    node_id: [text, metadata, self._doc_tf[node_id]]
+                    for node_id, (text, metadata) in self._docs.items()
+                },
+            }
+            self._dirty = False
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self) -> bool:
+        """加载持久化的索引
+
+        Returns:
+            是否成功加载（文件不存在、格式/名称/分词器不符时返回 False）
+        """
+        if self.persist_path is None or not self.persist_path.exists():
+            return False
+        try:
+            with gzip.open(self.persist_path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  BM25索引加载失败，将重建: {e}")
+            return False
+
+        if (
+            payload.get("version") != INDEX_FORMAT_VERSION
+            or payload.get("name") != self.name
+            or payload.get("tokenizer") != self.tokenizer
+        ):
+            return False
+
+        with self._lock:
+            self.clear()
+            for node_id, (text, metadata, tf) in payload["docs"].items():
+                self._add_locked(node_id, text, metadata, tf)
+            self._dirty = False
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取索引统计信息"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "tokenizer": self.tokenizer,
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "avg_doc_length": self._total_len / len(self._docs) if self._docs else 0.0,
+            }
+
+
+def chroma_records_to_items(records: Dict[str, Any]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """将 collection.get() 的结果转换为 (节点ID, 文本, 元数据)
+
+    Chroma 中的元数据包含 LlamaIndex 序列化的节点信息，这里还原出节点自身的元数据。
+    """
+    from llama_index.core.vector_stores.utils import metadata_dict_to_node
+
+    ids = records.get("ids") or []
+    documents = records.get("documents") or [None] * len(ids)
+    metadatas = records.get("metadatas") or [None] * len(ids)
+
+    items = []
+    for node_id, text, metadata in zip(ids, documents, metadatas):
+        metadata = metadata or {}
+        try:
+            node = metadata_dict_to_node(metadata, text=text)
+            node_metadata = dict(node.metadata or {})
+        except Exception:
+            node_metadata = {k: v for k, v in metadata.items() if not k.startswith('_')}
+        items.append((node_id, text or "", node_metadata))
+    return items
@@ -0,0 +1,358 @@
+"""
+文件级元数据索引：Chroma collection 的文件级旁路索引（sidecar）
+
+主要功能：
+- FileIndex类：按文件记录路径、文件名、仓库、chunk ID 与路径词项
+- match()：按子串 / 前缀 / 词项匹配文件
+- load_from_collection()：只拉取元数据，分页全量构建
+
+执行流程：
+1. 向量写入/删除时按 chunk ID 增量维护文件记录（文件的最后一个 chunk 删除时移除文件）
+2. 文件路径与文件名（小写）切成二元组写入倒排表，路径按分隔符切成词项
+3. 查询时取关键词各二元组倒排表的交集得到候选文件，再逐个校验
+
+特性：
+- 文件名查询在内存中完成，不再每次从 Chroma 拉取全部元数据
+- 索引的 chunk 数与 collection.count() 一致，由注册表据此判断是否需要重建
+- 持久化为 gzip 压缩的 JSON，写临时文件后原子替换
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('text_index')
+
+INDEX_FORMAT_VERSION = 1
+
+# 从 Chroma 分页拉取元数据的批大小
+COLLECTION_PAGE_SIZE = 1000
+
+MATCH_MODES = ("substring", "prefix", "token")
+
+_TOKEN_SPLIT_RE = re.compile(r'[/\\._\-\s]+')
+
+
+@dataclass
+class FileRecord:
+    """单个文件的索引记录"""
+    file_path: str
+    file_name: str = ""
+    repository: str = ""
+    chunk_ids: Set[str] = field(default_factory=set)
+
+    @property
+    def haystack(self) -> str:
+        """子串匹配的目标文本（小写路径与文件名，换行分隔避免跨字段匹配）"""
+        return f"{self.file_path.lower()}\n{self.file_name.lower()}"
+
+    @property
+    def tokens(self) -> Set[str]:
+        """路径与文件名按分隔符切分的词项（小写）"""
+        return {t for t in _TOKEN_SPLIT_RE.split(self.haystack) if t}
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def file_metadata(metadata: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """从 Chroma 元数据中取出 (file_path, file_name, repository)
+
+    LlamaIndex 写入 Chroma 时节点元数据平铺在顶层；缺失时从序列化的节点信息中还原。
+    """
+    metadata = metadata or {}
+    if 'file_path' not in metadata and '_node_content' in metadata:
+        try:
+            from llama_index.core.vector_stores.utils import metadata_dict_to_node
+            metadata = dict(metadata_dict_to_node(metadata).metadata or {})
+        except Exception:
+            pass
+    file_path = str(metadata.get('file_path') or '')
+    file_name = str(metadata.get('file_name') or '') or file_path.rsplit('/', 1)[-1]
+    return file_path, file_name, str(metadata.get('repository') or '')
+
+
+class FileIndex:
+    """可增量维护的文件级元数据索引"""
+
+    def __init__(self, name: str, persist_path: Optional[Path] = None):
+        """初始化文件索引
+
+        Args:
+            name: 索引名称（一般为 collection 名称）
+            persist_path: 持久化文件路径（None 表示不持久化）
+        """
+        self.name = name
+        self.persist_path = Path(persist_path) if persist_path else None
+
+        self._files: Dict[str, FileRecord] = {}
+        self._chunk_file: Dict[str, str] = {}  # chunk ID → 文件路径（没有路径的 chunk 为空串）
+        self._grams: Dict[str, Set[str]] = {}  # 二元组 → 文件路径
+        self._tokens: Dict[str, Set[str]] = {}  # 词项 → 文件路径
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """索引的 chunk 数（与 collection.count() 比对）"""
+        return len(self._chunk_file)
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
+
+    # ------------------------------------------------------------------
+    # 增量维护
+    # ------------------------------------------------------------------
+
+    def _index_file_locked(self, record: FileRecord) -> None:
+        path = record.file_path
+        self._files[path] = record
+        for gram in _bigrams(record.haystack):
+            self._grams.setdefault(gram, set()).add(path)
+        for token in record.tokens:
+            self._tokens.setdefault(token, set()).add(path)
+
+    def _unindex_file_locked(self, record: FileRecord) -> None:
+        path = record.file_path
+        del self._files[path]
+        for postings, keys in ((self._grams, _bigrams(record.haystack)), (self._tokens, record.tokens)):
+            for key in keys:
+                posting = postings.get(key)
+                if posting is not None:
+                    posting.discard(path)
+                    if not posting:
+                        del postings[key]
+
+    def _remove_chunk_locked(self, chunk_id: str) -> bool:
+        if chunk_id not in self._chunk_file:
+            return False
+        path = self._chunk_file.pop(chunk_id)
+        record = self._files.get(path)
+        if record is not None:
+            record.chunk_ids.discard(chunk_id)
+            if not record.chunk_ids:
+                self._unindex_file_locked(record)
+        return True
+
+    def _add_chunk_locked(self, chunk_id: str, file_path: str, file_name: str, repository: str) -> None:
+        if self._chunk_file.get(chunk_id, None) != file_path:
+            self._remove_chunk_locked(chunk_id)
+        self._chunk_file[chunk_id] = file_path
+        if not file_path:
+            return
+        record = self._files.get(file_path)
+        if record is None:
+            record = FileRecord(file_path, file_name, repository)
+            self._index_file_locked(record)
+        record.chunk_ids.add(chunk_id)
+
+    def add(self, items: Iterable[Tuple[str, Optional[Dict[str, Any]]]]) -> int:
+        """添加或替换 chunk
+
+        Args:
+            items: (chunk ID, Chroma 元数据) 序列
+
+        Returns:
+            添加的 chunk 数
+        """
+        prepared = [(chunk_id, *file_metadata(metadata)) for chunk_id, metadata in items]
+        with self._lock:
+            for entry in prepared:
+                self._add_chunk_locked(*entry)
+            if prepared:
+                self._dirty = True
+        return len(prepared)
+
+    def add_records(self, records: Dict[str, Any]) -> int:
+        """添加 collection.get() 的结果"""
+        ids = records.get("ids") or []
+        metadatas = records.get("metadatas") or [None] * len(ids)
+        return self.add(zip(ids, metadatas))
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        """删除 chunk
+
+        Returns:
+            实际删除的 chunk 数
+        """
+        with self._lock:
+            removed = sum(1 for chunk_id in chunk_ids if self._remove_chunk_locked(chunk_id))
+            if removed:
+                self._dirty = True
+        return removed
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock:
+            self._files.clear()
+            self._chunk_file.clear()
+            self._grams.clear()
+            self._tokens.clear()
+            self._dirty = True
+
+    def load_from_collection(self, collection: Any) -> int:
+        """从 Chroma collection 分页拉取全部元数据重建索引（不拉取文本与向量）
+
+        Returns:
+            索引的 chunk 数
+        """
+        self.clear()
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=COLLECTION_PAGE_SIZE, offset=offset)
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            self.add_records(page)
+            offset += len(ids)
+            if len(ids) < COLLECTION_PAGE_SIZE:
+                break
+        return len(self)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _candidates_locked(self, keyword: str) -> Iterable[str]:
+        """关键词各二元组倒排表的交集（单字关键词无法剪枝，返回全部文件）"""
+        grams = _bigrams(keyword)
+        if not grams:
+            return list(self._files)
+        postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+        return set.intersection(*postings) if postings[0] else set()
+
+    def match(self, keyword: str, mode: str = "substring") -> List[str]:
+        """匹配文件
+
+        Args:
+            keyword: 关键词（不区分大小写）
+            mode: substring（路径或文件名包含关键词）/ prefix（路径、文件名或某个路径词项以关键词开头）
+                  / token（关键词等于某个路径词项）
+
+        Returns:
+            匹配的文件路径列表（按路径排序）
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"不支持的匹配方式: {mode}，可选: {MATCH_MODES}")
+        keyword = keyword.lower().strip()
+        if not keyword:
+            return []
+
+        with self._lock:
+            if mode == "token":
+                return sorted(self._tokens.get(keyword, ()))
+            matched = []
+            for path in self._candidates_locked(keyword):
+                record = self._files[path]
+                if mode == "substring":
+                    hit = keyword in record.haystack
+                else:
+                    hit = any(part.startswith(keyword) for part in record.haystack.split("\n")) or any(
+                        token.startswith(keyword) for token in record.tokens
+                    )
+                if hit:
+                    matched.append(path)
+            return sorted(matched)
+
+    def match_any(self, keywords: Iterable[str], mode: str = "substring") -> List[str]:
+        """匹配任一关键词的文件（按关键词顺序，去重）"""
+        matched: Dict[str, None] = {}
+        for keyword in keywords:
+            matched.update(dict.fromkeys(self.match(keyword, mode)))
+        return list(matched)
+
+    def get(self, file_path: str) -> Optional[FileRecord]:
+        """获取文件记录"""
+        with self._lock:
+            return self._files.get(file_path)
+
+    def file_paths(self) -> Set[str]:
+        """获取所有文件路径"""
+        with self._lock:
+            return set(self._files)
+
+    def files_of(self, chunk_ids: Iterable[str]) -> Set[str]:
+        """获取 chunk 所属的文件路径（未索引或没有路径的 chunk 忽略）"""
+        with self._lock:
+            return {self._chunk_file[c] for c in chunk_ids if self._chunk_file.get(c)}
+
+    def chunk_ids(self, file_path: str) -> List[str]:
+        """获取文件的 chunk ID"""
+        with self._lock:
+            record = self._files.get(file_path)
+            return sorted(record.chunk_ids) if record else []
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """持久化索引（无变化时跳过）"""
+        if self.persist_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                "version": INDEX_FORMAT_VERSION,
+                "name": self.name,
+                "files": {
+                    path: [record.file_name, record.repository, sorted(record.chunk_ids)]
+                    for path, record in self._files.items()
+                },
+                "orphans": sorted(cid for cid, path in self._chunk_file.items() if not path),
+            }
+            self._dirty = False
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self) -> bool:
+        """加载持久化的索引
+
+        Returns:
+            是否成功加载（文件不存在、格式/名称不符时返回 False）
+        """
+        if self.persist_path is None or not self.persist_path.exists():
+            return False
+        try:
+            with gzip.open(self.persist_path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  文件索引加载失败，将重建: {e}")
+            return False
+
+        if payload.get("version") != INDEX_FORMAT_VERSION or payload.get("name") != self.name:
+            return False
+
+        with self._lock:
+            self.clear()
+            for path, (file_name, repository, chunk_ids) in payload["files"].items():
+                for chunk_id in chunk_ids:
+                    self._add_chunk_locked(chunk_id, path, file_name, repository)
+            for chunk_id in payload.get("orphans", []):
+                self._chunk_file[chunk_id] = ""
+            self._dirty = False
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取索引统计信息"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "files": len(self._files),
+                "chunks": len(self._chunk_file),
+                "bigrams": len(self._grams),
+                "tokens": len(self._tokens),
+            }
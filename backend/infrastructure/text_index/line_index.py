@@ -0,0 +1,443 @@
+"""
+行级文本索引：基于三元组（trigram）倒排索引的进程内 grep
+
+主要功能：
+- LineIndex类：对目录下的文本文件建立三元组倒排索引，回答字面量/正则查询
+- search()：返回与 grep -rn 等价的 {file, line, content, matches} 记录
+- update_files()：按文件增量更新（新增、修改、删除）
+- refresh()：按 (mtime, size) 与磁盘对账，只重建变化的文件
+
+执行流程：
+1. 从查询（字面量或正则）中提取必须出现的字面量片段，拆成三元组
+2. 求三元组倒排表的交集，得到候选文件
+3. 仅在候选文件中逐行用编译好的正则验证并计数
+
+特性：
+- 倒排表按文件粒度存储（array('I')），内存占用远小于行粒度倒排
+- 三元组按小写建立，大小写敏感查询先按小写剪枝再精确验证
+- 删除/修改的文件通过墓碑标记失效，超过阈值时整体压缩
+- 无法提取三元组的查询（过短或纯通配）退化为全量扫描，仍在进程内完成
+- 持久化为 gzip 压缩的 JSON，加载后与磁盘对账
+"""
+
+import base64
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+try:  # Python 3.11+
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # pragma: no cover
+    import sre_parse
+    import sre_constants
+
+from backend.infrastructure.logger import get_logger
+
+logger = get_logger('text_index')
+
+# 持久化格式版本（格式变化时递增，旧文件将被忽略并重建）
+INDEX_FORMAT_VERSION = 1
+
+# 二进制文件检测：前 8KB 含 NUL 视为二进制
+_BINARY_PROBE_BYTES = 8192
+
+# 墓碑比例超过该阈值时压缩倒排表
+_COMPACT_RATIO = 0.25
+
+# 建索引时跳过的目录
+_SKIP_DIRS = {'.git', '.svn', '.hg', '__pycache__', 'node_modules'}
+
+
+@dataclass
+class _FileEntry:
+    """已索引文件"""
+    file_id: int
+    mtime_ns: int
+    size: int
+
+
+def _trigrams(text: str) -> Set[str]:
+    """提取文本（已小写）中的三元组，跨行的三元组不计入"""
+    grams: Set[str] = set()
+    for line in text.split('\n'):
+        for i in range(len(line) - 2):
+            grams.add(line[i:i + 3])
+    return grams
+
+
+def _read_text(path: Path) -> Optional[str]:
+    """读取文本文件，二进制文件返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b'\x00' in data[:_BINARY_PROBE_BYTES]:
+        return None
+    return data.decode('utf-8', errors='ignore')
+
+
+def required_literals(pattern: str, regex: bool) -> List[str]:
+    """提取匹配必须包含的字面量片段
+
+    只分析正则顶层的顺序结构（及不重复的分组），遇到分支、重复等结构时截断，
+    因此结果是必要条件的子集：所有返回的片段都必须出现在匹配行中。
+
+    Args:
+        pattern: 查询模式
+        regex: 是否为正则表达式
+
+    Returns:
+        字面量片段列表（可能为空，表示无法剪枝）
+    """
+    if not regex:
+        return [pattern]
+
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return []
+
+    literals: List[str] = []
+    current: List[str] = []
+
+    def flush() -> None:
+        if current:
+            literals.append(''.join(current))
+            current.clear()
+
+    def walk(items) -> None:
+        for op, arg in items:
+            if op is sre_constants.LITERAL:
+                current.append(chr(arg))
+            elif op is sre_constants.SUBPATTERN:
+                # (group, add_flags, del_flags, pattern)
+                walk(arg[-1])
+            elif op is sre_constants.AT:
+                continue
+            else:
+                flush()
+
+    walk(parsed)
+    flush()
+    return literals
+
+
+class LineIndex:
+    """目录级行文本索引"""
+
+    def __init__(self, root: Path, persist_path: Optional[Path] = None):
+        """初始化索引（不会自动构建，调用 refresh() 或 load()）
+
+        Args:
+            root: 被索引的根目录
+            persist_path: 持久化文件路径（None 表示不持久化）
+        """
+        self.root = Path(root).resolve()
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._lock = threading.RLock()
+        self._files: Dict[str, _FileEntry] = {}
+        self._paths: Dict[int, str] = {}
+        self._postings: Dict[str, array] = {}
+        self._next_id = 0
+        self._dead_ids: Set[int] = set()
+        self._dirty = False
+
+    # ==================== 构建与更新 ====================
+
+    def _walk(self) -> Iterable[Path]:
+        """遍历根目录下的文件（跳过版本控制等目录）"""
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
+            for name in filenames:
+                yield Path(dirpath) / name
+
+    def _index_file_locked(self, path: Path, stat: os.stat_result) -> None:
+        """索引单个文件（调用方需持有锁，且已移除旧条目）
+
+        二进制文件也会登记（避免每次对账重复读取），但不产生三元组。
+        """
+        file_id = self._next_id
+        self._next_id += 1
+        key = str(path)
+        self._files[key] = _FileEntry(file_id, stat.st_mtime_ns, stat.st_size)
+        self._paths[file_id] = key
+        self._dirty = True
+
+        text = _read_text(path)
+        if text is None:
+            return
+
+        # file_id 单调递增，追加后倒排表保持有序
+        for gram in _trigrams(text.lower()):
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = array('I', (file_id,))
+            else:
+                posting.append(file_id)
+
+    def _remove_file_locked(self, key: str) -> None:
+        """移除文件（墓碑标记，调用方需持有锁）"""
+        entry = self._files.pop(key, None)
+        if entry is None:
+            return
+        self._paths.pop(entry.file_id, None)
+        self._dead_ids.add(entry.file_id)
+        self._dirty = True
+
+    def _maybe_compact_locked(self) -> None:
+        """墓碑过多时压缩倒排表"""
+        if not self._dead_ids or len(self._dead_ids) < _COMPACT_RATIO * max(1, self._next_id):
+            return
+        dead = self._dead_ids
+        compacted = {}
+        for gram, posting in self._postings.items():
+            alive = array('I', (fid for fid in posting if fid not in dead))
+            if alive:
+                compacted[gram] = alive
+        self._postings = compacted
+        self._dead_ids = set()
+        logger.debug(f"🧹 文本索引压缩完成: 移除 {len(dead)} 个失效文件")
+
+    def update_files(self, changed: Iterable[Path] = (), deleted: Iterable[Path] = ()) -> int:
+        """增量更新指定文件
+
+        Args:
+            changed: 新增或修改的文件路径
+            deleted: 删除的文件路径
+
+        Returns:
+            实际重建的文件数
+        """
+        return self._apply_changes(
+            [Path(path).resolve() for path in changed],
+            [str(Path(path).resolve()) for path in deleted],
+        )
+
+    def _apply_changes(self, changed: List[Path], deleted: List[str]) -> int:
+        """重建变化的文件并移除已删除的文件（路径已规范化）
+
+        Returns:
+            实际重建的文件数
+        """
+        updated = 0
+        with self._lock:
+            for key in deleted:
+                self._remove_file_locked(key)
+
+            for path in changed:
+                key = str(path)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    self._remove_file_locked(key)
+                    continue
+
+                entry = self._files.get(key)
+                if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                    continue
+                self._remove_file_locked(key)
+                self._index_file_locked(path, stat)
+                updated += 1
+
+            self._maybe_compact_locked()
+        return updated
+
+    def refresh(self) -> int:
+        """与磁盘对账：索引新增/变化的文件，移除已删除的文件
+
+        遍历与 stat 在锁外进行，只在重建变化文件时持有锁，对账期间查询不被阻塞。
+
+        Returns:
+            新增、修改、删除的文件总数
+        """
+        start = time.time()
+        with self._lock:
+            known = {key: (e.mtime_ns, e.size) for key, e in self._files.items()}
+
+        seen: Set[str] = set()
+        changed_paths: List[Path] = []
+        for path in self._walk():
+            key = str(path)
+            seen.add(key)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if known.get(key) != (stat.st_mtime_ns, stat.st_size):
+                changed_paths.append(path)
+        deleted = [key for key in known if key not in seen]
+
+        changed = self._apply_changes(changed_paths, deleted) + len(deleted)
+
+        if changed:
+            logger.info(
+                f"📇 文本索引已更新: {self.root} "
+                f"(变化 {changed} 个文件, 共 {len(self._files)} 个, 耗时 {time.time() - start:.2f}s)"
+            )
+        return changed
+
+    # ==================== 查询 ====================
+
+    def _candidates_locked(self, literals: List[str]) -> Optional[List[int]]:
+        """按三元组求候选文件（None 表示无法剪枝，需全量扫描）"""
+        grams: Set[str] = set()
+        for literal in literals:
+            grams |= _trigrams(literal.lower())
+        if not grams:
+            return None
+
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                return []
+        return sorted(fid for fid in result if fid not in self._dead_ids)
+
+    def search(
+        self,
+        pattern: str,
+        regex: bool = True,
+        case_sensitive: bool = False,
+        max_results: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Dict]:
+        """执行查询
+
+        Args:
+            pattern: 查询模式（字面量或正则表达式）
+            regex: 是否按正则解释（正则非法时退化为字面量）
+            case_sensitive: 是否区分大小写
+            max_results: 最多返回的行数
+            timeout: 超时时间（秒），超时返回已找到的结果
+
+        Returns:
+            [{"file": path, "line": num, "content": text, "matches": count}]
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        compiled = None
+        if regex:
+            try:
+                compiled = re.compile(pattern, flags)
+            except re.error:
+                regex = False
+        if compiled is None:
+            compiled = re.compile(re.escape(pattern), flags)
+
+        literals = required_literals(pattern, regex)
+        with self._lock:
+            candidate_ids = self._candidates_locked(literals)
+            if candidate_ids is None:
+                candidate_paths = [self._paths[e.file_id] for e in self._files.values()]
+            else:
+                candidate_paths = [self._paths[fid] for fid in candidate_ids if fid in self._paths]
+
+        deadline = time.time() + timeout if timeout else None
+        results: List[Dict] = []
+        for path in candidate_paths:
+            text = _read_text(Path(path))
+            if text is None:
+                continue
+            for line_num, line in enumerate(text.split('\n'), start=1):
+                if not compiled.search(line):
+                    continue
+                results.append({
+                    "file": path,
+                    "line": line_num,
+                    "content": line.rstrip('\r'),
+                    "matches": sum(1 for _ in compiled.finditer(line)),
+                })
+                if max_results and len(results) >= max_results:
+                    return results
+            if deadline and time.time() > deadline:
+                logger.warning("文本索引查询超时", timeout=timeout, pattern=pattern)
+                break
+
+        return results
+
+    # ==================== 持久化 ====================
+
+    def save(self) -> None:
+        """持久化索引（无变化时跳过）"""
+        if self.persist_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._maybe_compact_locked()
+            payload = {
+                "version": INDEX_FORMAT_VERSION,
+                "root": str(self.root),
+                "next_id": self._next_id,
+                "dead_ids": sorted(self._dead_ids),
+                "files": {k: [e.file_id, e.mtime_ns, e.size] for k, e in self._files.items()},
+                "postings": {
+                    gram: base64.b64encode(posting.tobytes()).decode('ascii')
+                    for gram, posting in self._postings.items()
+                },
+            }
+            self._dirty = False
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self) -> bool:
+        """加载持久化的索引
+
+        Returns:
+            是否成功加载（文件不存在、版本不符或根目录不同时返回 False）
+        """
+        if self.persist_path is None or not self.persist_path.exists():
+            return False
+        try:
+            with gzip.open(self.persist_path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  文本索引加载失败，将重建: {e}")
+            return False
+
+        if payload.get("version") != INDEX_FORMAT_VERSION or payload.get("root") != str(self.root):
+            return False
+
+        with self._lock:
+            self._files = {k: _FileEntry(*v) for k, v in payload["files"].items()}
+            self._paths = {e.file_id: k for k, e in self._files.items()}
+            self._next_id = payload["next_id"]
+            self._dead_ids = set(payload["dead_ids"])
+            self._postings = {}
+            for gram, encoded in payload["postings"].items():
+                posting = array('I')
+                posting.frombytes(base64.b64decode(encoded))
+                self._postings[gram] = posting
+            self._dirty = False
+        return True
+
+    def get_stats(self) -> Dict:
+        """获取索引统计信息"""
+        with self._lock:
+            return {
+                "root": str(self.root),
+                "files": len(self._files),
+                "trigrams": len(self._postings),
+                "postings": sum(len(p) for p in self._postings.values()),
+                "dead_files": len(self._dead_ids),
+            }
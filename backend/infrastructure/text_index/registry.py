@@ -0,0 +1,636 @@
+"""
+文本索引注册表：按根目录管理 LineIndex 单例，按 collection 管理 BM25Index / FileIndex 单例
+
+主要功能：
+- prepare_line_index()：在后台构建根目录的索引（GrepRetriever 创建时调用）
+- get_line_index()：获取根目录的就绪索引（未就绪时返回 None，过期时在后台与磁盘对账）
+- notify_file_changes()：将文件变更（GitHub 同步检测结果）分发给包含这些文件的索引
+- get_bm25_index()：获取 Chroma collection 的 BM25 索引（节点数与 collection 不一致时在锁外重建后替换）
+- get_docstore_bm25_index()：获取内存 docstore 的 BM25 索引（无 Chroma 时使用）
+- notify_bm25_changes()：向量写入/删除后增量更新 BM25 索引（可直接使用写入通知已拉取的记录）
+- get_file_index()：获取 Chroma collection 的文件级元数据索引（chunk 数与 collection 不一致时在锁外后台重建后替换）
+- notify_file_index_changes()：向量写入/删除后增量更新文件索引
+- flush_text_indexes()：立即保存有未落盘变更的 BM25 / 文件索引（构建结束与进程退出时调用）
+- reset_line_indexes() / reset_bm25_indexes() / reset_file_indexes()：清空注册表
+
+特性：
+- 每个根目录 / collection 一个索引实例，进程内共享
+- 行索引在后台构建与定期对账，查询线程只读取就绪索引，构建完成前 Grep 回退到 grep 子进程
+- 持久化文件名由根目录路径 / collection 名称哈希得到，互不干扰
+- BM25 索引与 collection 的一致性检查（count）按 version_check_seconds 限频；
+  本进程 rebuild_quiet_seconds 内有写入时不因节点数不一致重建（导入进行中）
+- 注册表锁只保护字典读写；访问 collection 与重建索引都在锁外进行，不阻塞检索
+- 文件索引只拉取元数据（构建时分页，增量时按ID），不拉取文本与向量
+- 增量更新只标记索引有变更，save_delay_seconds 后合并保存一次，不在每批写入时重写整个文件
+"""
+
+import atexit
+import hashlib
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.infrastructure.config import config
+from backend.infrastructure.logger import get_logger
+from backend.infrastructure.text_index.bm25_index import BM25Index, chroma_records_to_items, resolve_tokenizer
+from backend.infrastructure.text_index.file_index import FileIndex
+from backend.infrastructure.text_index.line_index import LineIndex
+
+logger = get_logger('text_index')
+
+_indexes: Dict[str, LineIndex] = {}  # 已就绪的索引
+_last_refresh: Dict[str, float] = {}
+_line_building: Set[str] = set()
+_line_refreshing: Set[str] = set()
+_line_pending: Dict[str, List[Tuple[List[Path], List[Path]]]] = {}  # 构建期间到达的 (变更文件, 删除文件)
+_registry_lock = threading.Lock()
+
+_bm25_indexes: Dict[str, BM25Index] = {}
+_bm25_checked: Dict[str, float] = {}
+_bm25_written: Dict[str, float] = {}  # 名称 → 本进程最近一次写入通知的时间
+_bm25_rebuilding: Set[str] = set()
+_bm25_pending: Dict[str, List[Tuple[Dict[str, Any], List[str]]]] = {}  # 重建期间到达的 (新增记录, 删除ID)
+_bm25_docstore_indexes: "weakref.WeakKeyDictionary[Any, BM25Index]" = weakref.WeakKeyDictionary()
+_bm25_lock = threading.Lock()
+
+_file_indexes: Dict[str, FileIndex] = {}
+_file_checked: Dict[str, float] = {}
+_file_rebuilding: Set[str] = set()
+_file_pending: Dict[str, List[Tuple[Dict[str, Any], List[str]]]] = {}  # 重建期间到达的 (新增记录, 删除ID)
+_file_lock = threading.Lock()
+
+# 延迟保存：(类型, collection 名称) → 计时器；触发时保存注册表中的当前索引
+_save_timers: Dict[Tuple[str, str], threading.Timer] = {}
+_save_lock = threading.Lock()
+
+
+def _registry_index(kind: str, name: str) -> Optional[Any]:
+    """注册表中的当前 BM25 / 文件索引（重建替换后保存新索引）"""
+    if kind == "bm25":
+        with _bm25_lock:
+            return _bm25_indexes.get(name)
+    with _file_lock:
+        return _file_indexes.get(name)
+
+
+def _save_index(kind: str, name: str) -> None:
+    """保存注册表中的当前索引（索引无变更时 save() 直接返回）"""
+    with _save_lock:
+        _save_timers.pop((kind, name), None)
+    index = _registry_index(kind, name)
+    if index is None:
+        return
+    try:
+        index.save()
+    except Exception as e:
+        logger.warning(f"⚠️  保存{'BM25' if kind == 'bm25' else '文件'}索引失败: {name}: {e}")
+
+
+def _schedule_save(kind: str, name: str, delay: float) -> None:
+    """延迟保存索引：delay 秒内的多次增量更新合并为一次保存（delay <= 0 时立即保存）"""
+    if delay <= 0:
+        _save_index(kind, name)
+        return
+    with _save_lock:
+        if (kind, name) in _save_timers:
+            return
+        timer = threading.Timer(delay, _save_index, args=(kind, name))
+        timer.daemon = True
+        _save_timers[(kind, name)] = timer
+    timer.start()
+
+
+def _cancel_saves(kind: str) -> None:
+    """取消某类索引尚未触发的延迟保存"""
+    with _save_lock:
+        for key in [key for key in _save_timers if key[0] == kind]:
+            _save_timers.pop(key).cancel()
+
+
+def flush_text_indexes() -> None:
+    """立即保存所有有未落盘变更的 BM25 / 文件索引"""
+    with _save_lock:
+        pending = list(_save_timers)
+        for timer in _save_timers.values():
+            timer.cancel()
+        _save_timers.clear()
+    with _bm25_lock:
+        keys = [("bm25", name) for name in _bm25_indexes]
+    with _file_lock:
+        keys += [("file", name) for name in _file_indexes]
+    for kind, name in dict.fromkeys(pending + keys):
+        _save_index(kind, name)
+
+
+atexit.register(flush_text_indexes)
+
+
+def _persist_path_for(root: Path) -> Path:
+    """根目录对应的持久化文件路径"""
+    digest = hashlib.sha1(str(root).encode('utf-8')).hexdigest()[:12]
+    return Path(config.TEXT_INDEX_PATH) / f"{root.name or 'root'}-{digest}.json.gz"
+
+
+def _run_in_background(target: Callable[..., None], name: str, *args: Any) -> None:
+    """在后台守护线程中执行（测试中可替换为同步执行）"""
+    threading.Thread(target=target, args=args, name=name, daemon=True).start()
+
+
+def _build_line_index(root: Path, key: str) -> None:
+    """在后台加载并与磁盘对账，补上构建期间的变更通知后登记为就绪索引"""
+    start = time.time()
+    try:
+        index = LineIndex(root, _persist_path_for(root))
+        loaded = index.load()
+        index.refresh()
+        while True:
+            with _registry_lock:
+                pending = _line_pending.pop(key, [])
+                if not pending:
+                    _indexes[key] = index
+                    _last_refresh[key] = time.time()
+                    break
+            for changed, deleted in pending:
+                index.update_files(changed, deleted)
+        index.save()
+        stats = index.get_stats()
+        logger.info(
+            f"📇 文本索引就绪: {root} ({'加载' if loaded else '新建'}, "
+            f"{stats['files']} 个文件, {stats['trigrams']} 个三元组, 耗时 {time.time() - start:.2f}s)"
+        )
+    except Exception as e:
+        logger.warning(f"⚠️  文本索引构建失败（继续使用 grep）: {root}: {e}")
+    finally:
+        with _registry_lock:
+            _line_building.discard(key)
+            _line_pending.pop(key, None)
+
+
+def _refresh_line_index(key: str, index: LineIndex) -> None:
+    """在后台与磁盘对账并保存（对账期间查询继续使用当前索引）"""
+    try:
+        if index.refresh():
+            index.save()
+    except Exception as e:
+        logger.warning(f"⚠️  文本索引对账失败: {index.root}: {e}")
+    finally:
+        with _registry_lock:
+            _line_refreshing.discard(key)
+
+
+def prepare_line_index(root: Path) -> None:
+    """在后台构建根目录的索引（已就绪或构建中时直接返回）
+
+    Args:
+        root: 根目录
+    """
+    root = Path(root).resolve()
+    key = str(root)
+    with _registry_lock:
+        if key in _indexes or key in _line_building:
+            return
+        _line_building.add(key)
+    _run_in_background(_build_line_index, f"line-index-build-{root.name}", root, key)
+
+
+def get_line_index(root: Path, max_age: Optional[float] = None) -> Optional[LineIndex]:
+    """获取根目录的索引
+
+    索引尚未就绪时在后台构建并返回 None（调用方回退到 grep）；距上次与磁盘对账
+    超过 max_age 秒时在后台对账，期间继续返回当前索引。查询线程不做构建、对账与保存。
+
+    Args:
+        root: 根目录
+        max_age: 距上次与磁盘对账超过该秒数时重新对账（None 或 0 表示不按时间对账）
+
+    Returns:
+        LineIndex 实例（未就绪时为 None）
+    """
+    root = Path(root).resolve()
+    key = str(root)
+
+    with _registry_lock:
+        index = _indexes.get(key)
+        stale = (
+            index is not None and bool(max_age) and key not in _line_refreshing
+            and time.time() - _last_refresh.get(key, 0.0) > max_age
+        )
+        if stale:
+            _last_refresh[key] = time.time()
+            _line_refreshing.add(key)
+
+    if index is None:
+        prepare_line_index(root)
+        with _registry_lock:
+            return _indexes.get(key)
+    if stale:
+        _run_in_background(_refresh_line_index, f"line-index-refresh-{root.name}", key, index)
+    return index
+
+
+def notify_file_changes(changed: Iterable[Path] = (), deleted: Iterable[Path] = ()) -> None:
+    """将文件变更分发给包含这些文件的索引
+
+    已就绪的索引立即增量更新；构建中的索引在登记前补上这些变更；
+    尚未构建的根目录不处理（构建时会与磁盘对账）。
+
+    Args:
+        changed: 新增或修改的文件路径
+        deleted: 删除的文件路径
+    """
+    changed = [Path(p).resolve() for p in changed]
+    deleted = [Path(p).resolve() for p in deleted]
+    if not changed and not deleted:
+        return
+
+    ready: List[Tuple[Path, LineIndex, List[Path], List[Path]]] = []
+    with _registry_lock:
+        for key in set(_indexes) | _line_building:
+            root = Path(key)
+            root_changed = [p for p in changed if p.is_relative_to(root)]
+            root_deleted = [p for p in deleted if p.is_relative_to(root)]
+            if not root_changed and not root_deleted:
+                continue
+            index = _indexes.get(key)
+            if index is None:
+                _line_pending.setdefault(key, []).append((root_changed, root_deleted))
+            else:
+                ready.append((root, index, root_changed, root_deleted))
+
+    for root, index, root_changed, root_deleted in ready:
+        try:
+            updated = index.update_files(root_changed, root_deleted)
+            index.save()
+            logger.debug(f"文本索引增量更新: {root} (重建 {updated} 个, 删除 {len(root_deleted)} 个)")
+        except Exception as e:
+            logger.warning(f"⚠️  文本索引增量更新失败 [{root}]: {e}")
+
+
+def reset_line_indexes() -> None:
+    """清空注册表（下次使用时重新加载）"""
+    with _registry_lock:
+        _indexes.clear()
+        _last_refresh.clear()
+        _line_building.clear()
+        _line_refreshing.clear()
+        _line_pending.clear()
+
+
+def _bm25_persist_path(name: str) -> Path:
+    """collection 对应的 BM25 持久化文件路径"""
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:12]
+    return Path(config.TEXT_INDEX_PATH) / f"bm25-{digest}.json.gz"
+
+
+def _new_bm25_index(name: str, persist: bool = True) -> BM25Index:
+    return BM25Index(
+        name,
+        persist_path=_bm25_persist_path(name) if persist else None,
+        tokenizer=resolve_tokenizer(config.BM25_TOKENIZER),
+    )
+
+
+def _apply_bm25_changes(index: BM25Index, records: Dict[str, Any], deleted_ids: List[str]) -> Tuple[int, int]:
+    """把增量变更应用到索引（records 为新增节点的 collection.get() 结果，不持有注册表锁）
+
+    Returns:
+        (新增数, 删除数)
+    """
+    removed = index.delete(deleted_ids)
+    added = index.add(chroma_records_to_items(records)) if records.get("ids") else 0
+    return added, removed
+
+
+def _fetch_records(collection: Any, added_ids: List[str], include: List[str]) -> Dict[str, List[Any]]:
+    """按ID拉取新增节点（不持有注册表锁）"""
+    from backend.infrastructure.indexer.utils.ids import fetch_records_by_ids
+    return fetch_records_by_ids(collection, added_ids, include)
+
+
+def _bm25_needs_rebuild(name: str, index: BM25Index, collection: Any) -> bool:
+    """节点数与 collection 不一致，且不是本进程正在写入导致的暂时不一致"""
+    if len(index) == collection.count():
+        return False
+    from backend.infrastructure.indexer.utils.version import get_collection_generation
+
+    # 本进程近期写入过（导入进行中）：节点数不一致是正常的，增量通知会跟上
+    # 版本号为 0 表示本进程未写入过，不一致来自其他进程或漏掉的增量，需要重建
+    quiet = time.time() - _bm25_written.get(name, 0.0)
+    if len(index) and get_collection_generation(collection) and quiet < config.BM25_REBUILD_QUIET_SECONDS:
+        logger.debug(f"BM25索引节点数与 collection 不一致，但 {quiet:.0f}s 前有写入，暂不重建: {name}")
+        return False
+    return True
+
+
+def _rebuild_bm25_index(name: str, collection: Any) -> None:
+    """在注册表锁外构建新索引，补上构建期间的增量后替换旧索引"""
+    start = time.time()
+    try:
+        fresh = _new_bm25_index(name)
+        fresh.load_from_collection(collection)
+        while True:
+            with _bm25_lock:
+                pending = _bm25_pending.pop(name, [])
+                if not pending:
+                    _bm25_indexes[name] = fresh
+                    _bm25_checked[name] = time.time()
+                    _bm25_rebuilding.discard(name)
+                    break
+            for records, deleted_ids in pending:
+                _apply_bm25_changes(fresh, records, deleted_ids)
+        fresh.save()
+        stats = fresh.get_stats()
+        logger.info(
+            f"📇 BM25索引已重建: {name} ({stats['documents']} 个节点, "
+            f"{stats['terms']} 个词项, 分词器 {stats['tokenizer']}, 耗时 {time.time() - start:.2f}s)"
+        )
+    except Exception as e:
+        logger.warning(f"⚠️  BM25索引重建失败（继续使用现有索引）: {name}: {e}")
+    finally:
+        with _bm25_lock:
+            _bm25_rebuilding.discard(name)
+            _bm25_pending.pop(name, None)
+
+
+def get_bm25_index(collection: Any) -> BM25Index:
+    """获取 Chroma collection 的 BM25 索引
+
+    首次使用时加载持久化文件；之后每隔 version_check_seconds 将节点数与
+    collection.count() 比对。不一致（外部重建、清空或漏掉的增量）且本进程近期
+    没有写入时，在注册表锁外构建新索引后替换：已有索引时在后台构建、期间继续使用旧索引，
+    索引为空时在当前线程构建。
+
+    Args:
+        collection: Chroma collection
+
+    Returns:
+        BM25Index 实例
+    """
+    name = collection.name
+    now = time.time()
+    with _bm25_lock:
+        index = _bm25_indexes.get(name)
+        if index is not None and (
+            name in _bm25_rebuilding or now - _bm25_checked.get(name, 0.0) < config.BM25_VERSION_CHECK_SECONDS
+        ):
+            return index
+        _bm25_checked[name] = now
+
+    if index is None:
+        loaded = _new_bm25_index(name)
+        loaded.load()
+        with _bm25_lock:
+            index = _bm25_indexes.setdefault(name, loaded)
+
+    if not _bm25_needs_rebuild(name, index, collection):
+        return index
+    with _bm25_lock:
+        if name in _bm25_rebuilding:
+            return index
+        _bm25_rebuilding.add(name)
+
+    if len(index):
+        _run_in_background(_rebuild_bm25_index, f"bm25-rebuild-{name}", name, collection)
+        return index
+    _rebuild_bm25_index(name, collection)
+    with _bm25_lock:
+        return _bm25_indexes[name]
+
+
+def get_docstore_bm25_index(docstore: Any) -> BM25Index:
+    """获取内存 docstore 的 BM25 索引（随 docstore 生命周期，不持久化）
+
+    Args:
+        docstore: LlamaIndex docstore
+
+    Returns:
+        BM25Index 实例（docstore 节点数变化时重建）
+    """
+    with _bm25_lock:
+        index = _bm25_docstore_indexes.get(docstore)
+        docs = docstore.docs
+        if index is None or len(index) != len(docs):
+            index = _new_bm25_index("docstore", persist=False)
+            index.add_nodes(docs.values())
+            _bm25_docstore_indexes[docstore] = index
+        return index
+
+
+def notify_bm25_changes(
+    collection: Any,
+    added_ids: Iterable[str] = (),
+    deleted_ids: Iterable[str] = (),
+    records: Optional[Dict[str, Any]] = None,
+) -> None:
+    """向量写入/删除后增量更新 collection 的 BM25 索引
+
+    只更新已加载或已持久化的索引；尚未构建的索引在首次使用时全量构建。
+
+    Args:
+        collection: Chroma collection
+        added_ids: 新写入的向量ID
+        deleted_ids: 已删除的向量ID
+        records: 新增节点的 collection.get() 结果（含 documents / metadatas，未提供时按ID拉取）
+    """
+    added_ids = list(dict.fromkeys(added_ids))
+    deleted_ids = list(deleted_ids)
+    if not added_ids and not deleted_ids:
+        return
+
+    name = collection.name
+    with _bm25_lock:
+        _bm25_written[name] = time.time()
+        index = _bm25_indexes.get(name)
+        rebuilding = name in _bm25_rebuilding
+    if index is None and not rebuilding:
+        loaded = _new_bm25_index(name)
+        if not loaded.load():
+            return
+        with _bm25_lock:
+            index = _bm25_indexes.setdefault(name, loaded)
+
+    if records is None:
+        records = _fetch_records(collection, added_ids, ["documents", "metadatas"])
+    with _bm25_lock:
+        if name in _bm25_rebuilding:
+            # 重建中的新索引在替换前补上这些变更
+            _bm25_pending.setdefault(name, []).append((records, deleted_ids))
+        index = _bm25_indexes.get(name, index)
+    if index is None:
+        return
+
+    added, removed = _apply_bm25_changes(index, records, deleted_ids)
+    _schedule_save("bm25", name, config.BM25_SAVE_DELAY_SECONDS)
+    logger.debug(f"BM25索引增量更新: {name} (新增 {added} 个, 删除 {removed} 个)")
+
+
+def reset_bm25_indexes() -> None:
+    """清空 BM25 注册表（下次使用时重新加载）"""
+    _cancel_saves("bm25")
+    with _bm25_lock:
+        _bm25_indexes.clear()
+        _bm25_checked.clear()
+        _bm25_written.clear()
+        _bm25_rebuilding.clear()
+        _bm25_pending.clear()
+        _bm25_docstore_indexes.clear()
+
+
+def _file_index_persist_path(name: str) -> Path:
+    """collection 对应的文件索引持久化文件路径"""
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:12]
+    return Path(config.TEXT_INDEX_PATH) / f"files-{digest}.json.gz"
+
+
+def _new_file_index(name: str) -> FileIndex:
+    return FileIndex(name, persist_path=_file_index_persist_path(name))
+
+
+def _apply_file_changes(index: FileIndex, records: Dict[str, Any], deleted_ids: List[str]) -> Tuple[Set[str], int, int]:
+    """把增量变更应用到文件索引
+
+    Returns:
+        (受影响的文件路径, 新增 chunk 数, 删除 chunk 数)
+    """
+    affected = index.files_of(deleted_ids)
+    removed = index.delete(deleted_ids)
+    added = index.add_records(records)
+    affected |= index.files_of(records.get("ids") or [])
+    return affected, added, removed
+
+
+def _rebuild_file_index(name: str, collection: Any) -> None:
+    """在注册表锁外只拉取元数据构建新索引，补上构建期间的增量后替换旧索引"""
+    start = time.time()
+    try:
+        fresh = _new_file_index(name)
+        fresh.load_from_collection(collection)
+        while True:
+            with _file_lock:
+                pending = _file_pending.pop(name, [])
+                if not pending:
+                    _file_indexes[name] = fresh
+                    _file_checked[name] = time.time()
+                    _file_rebuilding.discard(name)
+                    break
+            for records, deleted_ids in pending:
+                _apply_file_changes(fresh, records, deleted_ids)
+        fresh.save()
+        stats = fresh.get_stats()
+        logger.info(
+            f"📇 文件索引已重建: {name} ({stats['files']} 个文件, "
+            f"{stats['chunks']} 个chunk, 耗时 {time.time() - start:.2f}s)"
+        )
+    except Exception as e:
+        logger.warning(f"⚠️  文件索引重建失败（继续使用现有索引）: {name}: {e}")
+    finally:
+        with _file_lock:
+            _file_rebuilding.discard(name)
+            _file_pending.pop(name, None)
+
+
+def get_file_index(collection: Any) -> Optional[FileIndex]:
+    """获取 Chroma collection 的文件级元数据索引
+
+    首次使用时加载持久化文件；之后每隔 version_check_seconds 将 chunk 数与
+    collection.count() 比对，不一致时在后台只拉取元数据构建新索引后替换，期间继续使用现有索引。
+    查询线程不做全量构建：索引为空且需要构建时返回 None，由调用方回退到直接查询 collection。
+
+    Args:
+        collection: Chroma collection
+
+    Returns:
+        FileIndex 实例（尚无可用索引时为 None）
+    """
+    name = collection.name
+    now = time.time()
+    with _file_lock:
+        index = _file_indexes.get(name)
+        if name in _file_rebuilding:
+            return index if index is not None and len(index) else None
+        if index is not None and now - _file_checked.get(name, 0.0) < config.FILE_INDEX_VERSION_CHECK_SECONDS:
+            return index
+        _file_checked[name] = now
+
+    expected = collection.count()
+    if index is None:
+        # 没有持久化文件时不登记空索引，避免重建完成前把增量当作完整索引使用
+        loaded = _new_file_index(name)
+        if loaded.load() or not expected:
+            with _file_lock:
+                index = _file_indexes.setdefault(name, loaded)
+
+    if index is not None and len(index) == expected:
+        return index
+    with _file_lock:
+        started = name not in _file_rebuilding
+        _file_rebuilding.add(name)
+    if started:
+        _run_in_background(_rebuild_file_index, f"file-index-rebuild-{name}", name, collection)
+    with _file_lock:
+        index = _file_indexes.get(name)
+    return index if index is not None and len(index) else None
+
+
+def notify_file_index_changes(
+    collection: Any,
+    added_ids: Iterable[str] = (),
+    deleted_ids: Iterable[str] = (),
+    records: Optional[Dict[str, Any]] = None,
+) -> Dict[str, int]:
+    """向量写入/删除后增量更新 collection 的文件索引
+
+    只更新已加载、已持久化或正在重建的索引；尚未构建的索引在首次使用时全量构建。
+    元数据在注册表锁外拉取。
+
+    Args:
+        collection: Chroma collection
+        added_ids: 新写入的向量ID
+        deleted_ids: 已删除的向量ID
+        records: 新增 chunk 的 collection.get() 结果（含 metadatas，未提供时按ID拉取）
+
+    Returns:
+        受影响的文件路径 → 更新后的 chunk 数（索引未构建时为空）
+    """
+    added_ids = list(dict.fromkeys(added_ids))
+    deleted_ids = list(deleted_ids)
+    if not added_ids and not deleted_ids:
+        return {}
+
+    name = collection.name
+    with _file_lock:
+        index = _file_indexes.get(name)
+        rebuilding = name in _file_rebuilding
+    if index is None and not rebuilding:
+        loaded = _new_file_index(name)
+        if not loaded.load():
+            return {}
+        with _file_lock:
+            index = _file_indexes.setdefault(name, loaded)
+
+    if records is None:
+        records = _fetch_records(collection, added_ids, ["metadatas"])
+    with _file_lock:
+        if name in _file_rebuilding:
+            # 重建中的新索引在替换前补上这些变更
+            _file_pending.setdefault(name, []).append((records, deleted_ids))
+        index = _file_indexes.get(name, index)
+    if index is None:
+        return {}
+
+    affected, added, removed = _apply_file_changes(index, records, deleted_ids)
+    _schedule_save("file", name, config.FILE_INDEX_SAVE_DELAY_SECONDS)
+    logger.debug(f"文件索引增量更新: {name} (新增 {added} 个chunk, 删除 {removed} 个)")
+    return {path: len(index.chunk_ids(path)) for path in affected}
+
+
+def reset_file_indexes() -> None:
+    """清空文件索引注册表（下次使用时重新加载）"""
+    _cancel_saves("file")
+    with _file_lock:
+        _file_indexes.clear()
+        _file_checked.clear()
+        _file_rebuilding.clear()
+        _file_pending.clear()
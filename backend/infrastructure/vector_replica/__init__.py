@@ -0,0 +1,51 @@
+"""
+向量副本模块：Chroma collection 在本地的只读镜像，向量检索在进程内完成
+
+主要功能：
+- VectorReplica类：内存映射的分段向量副本（向量 + 精简元数据 + 节点载荷）
+- ReplicaChromaVectorStore类：先查副本、不可用时回退到 Chroma 的向量存储
+- create_vector_store()：按配置为 IndexManager 创建向量存储
+- replica_enabled()：是否启用本地副本
+- fresh_vector_replica() / notify_vector_replica_changes()：获取一致的副本 / 写入后增量同步
+- clear_vector_replica() / reset_vector_replicas()：删除副本文件 / 清空注册表
+
+特性：
+- 延迟导入，避免加载配置前的循环依赖
+"""
+
+from typing import Any
+
+__all__ = [
+    'VectorReplica',
+    'ReplicaChromaVectorStore',
+    'create_vector_store',
+    'replica_enabled',
+    'get_vector_replica',
+    'fresh_vector_replica',
+    'notify_vector_replica_changes',
+    'clear_vector_replica',
+    'reset_vector_replicas',
+]
+
+_REGISTRY_EXPORTS = (
+    'replica_enabled',
+    'get_vector_replica',
+    'fresh_vector_replica',
+    'notify_vector_replica_changes',
+    'clear_vector_replica',
+    'reset_vector_replicas',
+)
+
+
+def __getattr__(name: str) -> Any:
+    """延迟导入支持"""
+    if name == 'VectorReplica':
+        from backend.infrastructure.vector_replica.replica import VectorReplica
+        return VectorReplica
+    elif name in ('ReplicaChromaVectorStore', 'create_vector_store'):
+        from backend.infrastructure.vector_replica import vector_store
+        return getattr(vector_store, name)
+    elif name in _REGISTRY_EXPORTS:
+        from backend.infrastructure.vector_replica import registry
+        return getattr(registry, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
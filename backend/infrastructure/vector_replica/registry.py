@@ -0,0 +1,222 @@
+"""
+向量副本注册表：按 collection 管理 VectorReplica 单例，判断副本是否可用并在后台同步
+
+主要功能：
+- replica_enabled()：是否启用本地副本（vector_store.replica.enable 且使用 Chroma Cloud）
+- get_vector_replica()：获取 collection 的副本实例（不检查一致性）
+- fresh_vector_replica()：获取与 collection 一致的副本，不一致时在后台同步并返回None
+- notify_vector_replica_changes()：向量写入/删除后增量同步副本
+- clear_vector_replica() / reset_vector_replicas()：删除副本文件 / 清空注册表
+
+执行流程：
+1. 本进程写入/删除向量后递增 collection 版本号并增量同步副本
+2. 检索前，版本号未变化且距上次检查不足 version_check_seconds 时直接使用上次的结论
+3. 否则重新加载清单：最近写入方是本进程时比对清单记录的版本号，否则比对节点数与 collection.count()；
+   不一致时回退到 Chroma，后台全量重建
+4. 后台重建期间到达的增量变更排队，重建完成后补到副本上再标记为一致
+
+特性：
+- 副本目录名由 collection 名称哈希得到，多个进程共享同一份文件
+- 同一 collection 同时只有一个后台同步；多个进程同时重建时由目录锁串行，后到者发现已一致则跳过
+"""
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.infrastructure.config import config
+from backend.infrastructure.logger import get_logger
+from backend.infrastructure.vector_replica.replica import VectorReplica
+
+logger = get_logger('vector_replica')
+
+_replicas: Dict[str, VectorReplica] = {}
+_checked: Dict[str, Tuple[float, int, bool]] = {}  # 名称 → (检查时间, 版本号, 是否一致)
+_syncing: Set[str] = set()
+_pending: Dict[str, List[Tuple[List[str], List[str]]]] = {}  # 同步期间到达的 (新增ID, 删除ID)
+_lock = threading.Lock()
+
+
+def replica_enabled() -> bool:
+    """是否启用本地副本（本地后端本身即在进程内检索，不需要副本）"""
+    return bool(config.VECTOR_REPLICA_ENABLE) and config.VECTOR_STORE_BACKEND == "cloud"
+
+
+def _replica_dir(name: str) -> Path:
+    """collection 对应的副本目录"""
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:12]
+    return Path(config.VECTOR_REPLICA_PATH) / f"{name}-{digest}"
+
+
+def _generation(collection: Any) -> int:
+    from backend.infrastructure.indexer.utils.version import get_collection_generation
+    return get_collection_generation(collection)
+
+
+def get_vector_replica(collection: Any) -> VectorReplica:
+    """获取 collection 的副本实例（首次使用时加载已有的副本文件）"""
+    name = collection.name
+    with _lock:
+        replica = _replicas.get(name)
+        if replica is None:
+            replica = VectorReplica(
+                name,
+                _replica_dir(name),
+                max_segments=config.VECTOR_REPLICA_MAX_SEGMENTS,
+                dtype=config.VECTOR_REPLICA_DTYPE,
+                rescore_factor=config.VECTOR_REPLICA_RESCORE_FACTOR,
+            )
+            _replicas[name] = replica
+    replica.refresh()
+    return replica
+
+
+def _is_fresh(replica: VectorReplica, collection: Any, generation: int) -> bool:
+    """副本是否与 collection 一致
+
+    本进程写入过（版本号非 0）且最近写入副本的也是本进程时，比对清单记录的版本号，
+    节点数相同但内容不同（漏掉的增量）也能发现；否则比对节点数。
+    """
+    if not replica.exists:
+        return False
+    synced = replica.synced_generation
+    if generation and synced is not None:
+        return synced == generation
+    return len(replica) == collection.count()
+
+
+def _sync_in_background(replica: VectorReplica, collection: Any, generation: int, if_stale: bool = True) -> None:
+    name = replica.name
+    synced = False
+    try:
+        start = time.time()
+        count = replica.rebuild(collection, if_stale=if_stale, generation=generation)
+        while True:
+            with _lock:
+                pending = _pending.pop(name, [])
+                if not pending:
+                    # 与出队在同一把锁内结束同步：之后到达的变更直接增量同步
+                    _syncing.discard(name)
+                    # 以同步开始时的版本号记录：同步期间本进程的写入会递增版本号，下次检索时重新比对
+                    _checked[name] = (time.time(), generation, True)
+                    synced = True
+                    break
+            generation = _generation(collection)
+            for added_ids, deleted_ids in pending:
+                replica.apply_changes(collection, added_ids=added_ids, deleted_ids=deleted_ids, generation=generation)
+            count = len(replica)
+        logger.info(f"🪞 向量副本已同步: {name} ({count} 个节点, 耗时 {time.time() - start:.2f}s)")
+    except Exception as e:
+        logger.warning(f"⚠️  向量副本同步失败（继续使用 Chroma 检索）: {name}: {e}")
+    finally:
+        if not synced:
+            with _lock:
+                _syncing.discard(name)
+                _pending.pop(name, None)
+                _checked.pop(name, None)
+
+
+def fresh_vector_replica(collection: Any, background: bool = True) -> Optional[VectorReplica]:
+    """获取与 collection 一致的副本
+
+    Args:
+        collection: Chroma collection
+        background: 不一致时是否在后台线程同步（False 时同步完成后返回）
+
+    Returns:
+        一致的副本；不一致（正在同步）时返回None，调用方回退到 Chroma
+    """
+    name = collection.name
+    generation = _generation(collection)
+    now = time.time()
+    with _lock:
+        if name in _syncing:
+            return None
+        last = _checked.get(name)
+    replica = get_vector_replica(collection)
+    if last is not None and last[1] == generation and now - last[0] < config.VECTOR_REPLICA_VERSION_CHECK_SECONDS:
+        return replica if last[2] else None
+
+    fresh = _is_fresh(replica, collection, generation)
+    with _lock:
+        _checked[name] = (now, generation, fresh)
+        if fresh:
+            return replica
+        if name in _syncing:
+            return None
+        _syncing.add(name)
+
+    # 版本号落后时节点数可能碰巧相同，不能以节点数一致为由跳过重建
+    if_stale = not generation or replica.synced_generation is None
+    logger.info(f"🪞 向量副本与 collection 不一致，开始同步: {name}（副本 {len(replica)} 个节点）")
+    if not background:
+        _sync_in_background(replica, collection, generation, if_stale)
+        return replica if _is_fresh(replica, collection, _generation(collection)) else None
+    threading.Thread(
+        target=_sync_in_background,
+        args=(replica, collection, generation, if_stale),
+        name=f"vector-replica-{name}",
+        daemon=True,
+    ).start()
+    return None
+
+
+def notify_vector_replica_changes(
+    collection: Any,
+    added_ids: Iterable[str] = (),
+    deleted_ids: Iterable[str] = (),
+    records: Optional[Dict[str, Any]] = None,
+) -> None:
+    """向量写入/删除后增量同步 collection 的副本
+
+    只同步已构建的副本；尚未构建的副本在首次检索时于后台全量构建。
+    后台全量同步期间的变更排队，同步完成后补到副本上。
+
+    Args:
+        collection: Chroma collection
+        added_ids: 新写入的向量ID
+        deleted_ids: 已删除的向量ID
+        records: 新增节点的 collection.get() 结果（含 embeddings，未提供时按ID拉取）
+    """
+    added_ids = list(added_ids)
+    deleted_ids = list(deleted_ids)
+    if not replica_enabled() or (not added_ids and not deleted_ids):
+        return
+    name = collection.name
+    with _lock:
+        if name in _syncing:
+            # 全量同步可能已读过这些节点所在的分页，完成后再补一次
+            _pending.setdefault(name, []).append((added_ids, deleted_ids))
+            return
+    replica = get_vector_replica(collection)
+    generation = _generation(collection)
+    if not replica.apply_changes(collection, added_ids=added_ids, deleted_ids=deleted_ids,
+                                 generation=generation, records=records):
+        return
+    with _lock:
+        # 写入方已在同步前递增版本号；同步前一致的副本同步后仍一致，检索时无需再比对节点数
+        last = _checked.get(name)
+        if last is not None and last[2]:
+            _checked[name] = (time.time(), generation, True)
+    logger.debug(f"向量副本增量同步: {name} (新增 {len(added_ids)} 个, 删除 {len(deleted_ids)} 个)")
+
+
+def clear_vector_replica(collection_name: str) -> None:
+    """删除 collection 的副本文件（清空索引时调用）"""
+    with _lock:
+        replica = _replicas.pop(collection_name, None)
+        _checked.pop(collection_name, None)
+    replica = replica or VectorReplica(collection_name, _replica_dir(collection_name))
+    if replica.directory.exists():
+        replica.clear()
+
+
+def reset_vector_replicas() -> None:
+    """清空副本注册表（下次使用时重新加载）"""
+    with _lock:
+        _replicas.clear()
+        _checked.clear()
+        _syncing.clear()
+        _pending.clear()
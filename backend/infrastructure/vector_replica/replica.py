@@ -0,0 +1,652 @@
+"""
+向量只读副本：Chroma collection 的本地镜像，以内存映射文件存储、多进程共享
+
+主要功能：
+- VectorReplica类：按段（segment）存储节点向量、精简元数据与节点载荷
+- search()：在本地对全部段做内积检索（支持精简元数据的等值 / IN 过滤）
+- rebuild()：分页拉取 collection 全量重建
+- apply_changes()：按节点ID增量写入新段、标记删除行
+- refresh()：清单文件变化时重新加载（其他进程写入后生效）
+
+执行流程：
+1. 写入方持有目录锁，写入新段文件后原子替换清单（manifest.json）
+2. 读取方比对清单文件的修改时间，变化时重新打开各段的内存映射
+3. 检索时按删除标记与过滤条件得到候选行，在量化矩阵上取内积 Top-K × rescore_factor 个候选，
+   再用 float32 向量重新打分取 Top-K，最后从载荷中还原节点
+
+文件格式（每个 collection 一个目录）：
+- manifest.json：段列表、各段已删除的行号、向量维度、有效节点数，以及最近写入方进程与其 collection 版本号
+- <段>.vec：归一化后的 float32 向量矩阵（行 × 维度，无文件头），重新打分与合并时读取
+- <段>.q / <段>.scale：检索用的 float16 / int8 量化矩阵与 int8 的逐向量缩放系数（float32 段没有）
+- <段>.off / <段>.payload：每行载荷（[节点ID, 文本, Chroma 元数据] 的 JSON）的偏移与内容
+- <段>.meta.json.gz：行数、维度、节点ID与精简元数据（过滤用，常驻内存）
+
+特性：
+- 段文件写入后不再修改，读取方以只读方式映射，多个进程共享操作系统页缓存
+- 增量写入只追加新段；段数或删除行过多时合并为一个段（不访问 Chroma）
+- 读取方重新加载只打开新段并计算删除标记；节点ID → 行号的映射只在写入时按需构建
+- 相似度与 Chroma 余弦空间一致（LlamaIndex 分数为 exp(-余弦距离)）
+- 量化段的粗排只访问量化矩阵（常驻内存的部分为 float32 的 1/2 或约 1/4），float32 文件只读取候选行
+"""
+
+import gzip
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from backend.infrastructure.embeddings.quantization import check_dtype, numpy_dtype, quantize, quantized_scores
+from backend.infrastructure.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows：只做进程内互斥
+    fcntl = None
+
+logger = get_logger('vector_replica')
+
+REPLICA_FORMAT_VERSION = 1
+
+# 过滤可用的精简元数据字段
+SLIM_METADATA_KEYS = ("file_path", "file_name", "repository")
+
+# 从 Chroma 分页拉取节点的批大小
+COLLECTION_PAGE_SIZE = 1000
+
+# 增量写入时按ID拉取节点的批大小
+FETCH_BATCH_SIZE = 200
+
+# 删除行占比超过该值时合并
+COMPACT_DELETED_RATIO = 0.25
+
+_MANIFEST = "manifest.json"
+
+_PROCESS_TOKEN = uuid.uuid4().hex[:12]
+
+# 检索结果：(节点ID, 余弦相似度, 文本, Chroma 元数据)
+SearchHit = Tuple[str, float, str, Dict[str, Any]]
+
+
+def writer_token() -> str:
+    """当前进程的写入方标识（与清单中的 writer 比对，判断版本号是否为本进程的）"""
+    return f"{os.getpid()}-{_PROCESS_TOKEN}"
+
+
+def _slim_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    from backend.infrastructure.text_index.file_index import file_metadata
+    return dict(zip(SLIM_METADATA_KEYS, file_metadata(metadata)))
+
+
+@dataclass
+class _Segment:
+    """已打开的段（向量与载荷为只读内存映射）"""
+    name: str
+    ids: List[str]
+    columns: Dict[str, np.ndarray]
+    vectors: np.ndarray
+    offsets: np.ndarray
+    payload: np.ndarray
+    dtype: str = "float32"
+    codes: Optional[np.ndarray] = None  # 量化矩阵（float32 段为 None）
+    scales: Optional[np.ndarray] = None  # int8 逐向量缩放系数
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+    @property
+    def search_bytes(self) -> int:
+        """粗排访问的矩阵字节数"""
+        if self.codes is None:
+            return int(self.vectors.nbytes)
+        return int(self.codes.nbytes) + (int(self.scales.nbytes) if self.scales is not None else 0)
+
+    def top_rows(self, rows: np.ndarray, query: np.ndarray, top_k: int,
+                 rescore_factor: int) -> Tuple[np.ndarray, np.ndarray]:
+        """rows 中与 query 内积最大的 top_k 行
+
+        量化段先在量化矩阵上取 top_k × rescore_factor 个候选，再用 float32 向量重新打分。
+
+        Returns:
+            (行号, 全精度内积)
+        """
+        full = len(rows) == self.rows
+        if self.codes is None:
+            scores = self.vectors @ query if full else self.vectors[rows] @ query
+        else:
+            scores = quantized_scores(
+                self.codes if full else self.codes[rows],
+                None if self.scales is None else (self.scales if full else self.scales[rows]),
+                query,
+            )
+            candidates = top_k * rescore_factor
+            if len(rows) > candidates:
+                rows = rows[np.argpartition(-scores, candidates - 1)[:candidates]]
+            rows = np.sort(rows)  # 按行号顺序读取映射文件
+            scores = self.vectors[rows] @ query
+        if len(rows) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            rows, scores = rows[best], scores[best]
+        return rows, scores
+
+    def record(self, row: int) -> Tuple[str, str, Dict[str, Any]]:
+        """还原第 row 行的 (节点ID, 文本, Chroma 元数据)"""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        node_id, text, metadata = json.loads(self.payload[start:end].tobytes().decode('utf-8'))
+        return node_id, text or "", metadata or {}
+
+    def match(self, filters: Dict[str, Set[str]]) -> np.ndarray:
+        """精简元数据过滤（各字段之间为 AND）"""
+        mask = np.ones(self.rows, dtype=bool)
+        for key, values in filters.items():
+            mask &= np.isin(self.columns[key], list(values))
+        return mask
+
+
+@dataclass
+class _State:
+    """副本的一个只读快照（检索时整体读取，重新加载时整体替换）"""
+    signature: Tuple[int, int, int]
+    segments: List[_Segment]
+    alive: List[np.ndarray]
+    count: int
+    dim: int
+    seq: int
+    writer: str = ""  # 最近写入方进程（见 writer_token()）
+    generation: int = 0  # 最近写入方写入后的 collection 版本号
+    _locations: Optional[Dict[str, Tuple[int, int]]] = field(default=None, repr=False)
+
+    @property
+    def locations(self) -> Dict[str, Tuple[int, int]]:
+        """节点ID → (段序号, 行号)（首次访问时构建，只有写入方使用）"""
+        if self._locations is None:
+            locations: Dict[str, Tuple[int, int]] = {}
+            for i, (segment, mask) in enumerate(zip(self.segments, self.alive)):
+                rows = np.flatnonzero(mask)
+                locations.update(zip((segment.ids[row] for row in rows), ((i, int(row)) for row in rows)))
+            self._locations = locations
+        return self._locations
+
+
+_EMPTY_STATE = _State(signature=(0, 0, 0), segments=[], alive=[], count=0, dim=0, seq=0)
+
+
+class _SegmentWriter:
+    """顺序写入一个新段"""
+
+    def __init__(self, directory: Path, name: str, dtype: str = "float32"):
+        self.directory = directory
+        self.name = name
+        self.dtype = check_dtype(dtype)
+        self.dim = 0
+        self.ids: List[str] = []
+        self.columns: Dict[str, List[str]] = {key: [] for key in SLIM_METADATA_KEYS}
+        self._offset = 0
+        self._vec = open(directory / f"{name}.vec", 'wb')
+        self._off = open(directory / f"{name}.off", 'wb')
+        self._payload = open(directory / f"{name}.payload", 'wb')
+        self._files = [self._vec, self._off, self._payload]
+        self._codes = self._scales = None
+        if self.dtype != "float32":
+            self._codes = open(directory / f"{name}.q", 'wb')
+            self._files.append(self._codes)
+        if self.dtype == "int8":
+            self._scales = open(directory / f"{name}.scale", 'wb')
+            self._files.append(self._scales)
+        self._off.write(np.zeros(1, dtype=np.int64).tobytes())
+
+    def append(self, ids: Sequence[str], vectors: np.ndarray, documents: Sequence[Optional[str]],
+               metadatas: Sequence[Optional[Dict[str, Any]]]) -> None:
+        """追加节点（向量在此归一化）"""
+        if not len(ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim and vectors.shape[1] != self.dim:
+            raise ValueError(f"向量维度不一致: {vectors.shape[1]} != {self.dim}")
+        self.dim = vectors.shape[1]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.ascontiguousarray(vectors / np.where(norms > 0, norms, 1.0), dtype=np.float32)
+        self._vec.write(vectors.tobytes())
+        if self._codes is not None:
+            codes, scales = quantize(vectors, self.dtype)
+            self._codes.write(np.ascontiguousarray(codes).tobytes())
+            if self._scales is not None:
+                self._scales.write(scales.tobytes())
+
+        offsets = []
+        for node_id, text, metadata in zip(ids, documents, metadatas):
+            blob = json.dumps([node_id, text or "", metadata or {}], ensure_ascii=False).encode('utf-8')
+            self._payload.write(blob)
+            self._offset += len(blob)
+            offsets.append(self._offset)
+            self.ids.append(node_id)
+            for key, value in _slim_metadata(metadata).items():
+                self.columns[key].append(value)
+        self._off.write(np.asarray(offsets, dtype=np.int64).tobytes())
+
+    def append_records(self, records: Dict[str, Any]) -> None:
+        """追加 collection.get(include=["embeddings", "documents", "metadatas"]) 的结果"""
+        ids = records.get("ids") or []
+        embeddings = records.get("embeddings")
+        if not ids or embeddings is None or not len(embeddings):
+            return
+        documents = records.get("documents") or [None] * len(ids)
+        metadatas = records.get("metadatas") or [None] * len(ids)
+        self.append(ids, np.asarray(embeddings, dtype=np.float32), documents, metadatas)
+
+    def close(self) -> int:
+        """关闭文件并写入段元数据
+
+        Returns:
+            段的行数
+        """
+        for f in self._files:
+            f.close()
+        meta = {"rows": len(self.ids), "dim": self.dim, "dtype": self.dtype, "ids": self.ids, "columns": self.columns}
+        with gzip.open(self.directory / f"{self.name}.meta.json.gz", 'wt', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return len(self.ids)
+
+    def discard(self) -> None:
+        """放弃写入，删除段文件"""
+        for f in self._files:
+            f.close()
+        _remove_segment_files(self.directory, self.name)
+
+
+def _remove_segment_files(directory: Path, name: str) -> None:
+    for suffix in (".vec", ".q", ".scale", ".off", ".payload", ".meta.json.gz"):
+        try:
+            (directory / f"{name}{suffix}").unlink()
+        except OSError:
+            # 不存在，或（Windows）仍被其他进程映射，下次合并时再清理
+            pass
+
+
+def _open_segment(directory: Path, name: str) -> _Segment:
+    with gzip.open(directory / f"{name}.meta.json.gz", 'rt', encoding='utf-8') as f:
+        meta = json.load(f)
+    rows, dim = meta["rows"], meta["dim"]
+    dtype = check_dtype(meta.get("dtype", "float32"))
+    codes = scales = None
+    if rows:
+        vectors = np.memmap(directory / f"{name}.vec", dtype=np.float32, mode='r', shape=(rows, dim))
+        offsets = np.memmap(directory / f"{name}.off", dtype=np.int64, mode='r', shape=(rows + 1,))
+        payload = np.memmap(directory / f"{name}.payload", dtype=np.uint8, mode='r')
+        if dtype != "float32":
+            codes = np.memmap(directory / f"{name}.q", dtype=numpy_dtype(dtype), mode='r', shape=(rows, dim))
+        if dtype == "int8":
+            scales = np.memmap(directory / f"{name}.scale", dtype=np.float32, mode='r', shape=(rows,))
+    else:
+        vectors = np.zeros((0, dim), dtype=np.float32)
+        offsets = np.zeros(1, dtype=np.int64)
+        payload = np.zeros(0, dtype=np.uint8)
+        dtype = "float32"
+    columns = {key: np.asarray(meta["columns"].get(key) or [""] * rows, dtype=object) for key in SLIM_METADATA_KEYS}
+    return _Segment(name, meta["ids"], columns, vectors, offsets, payload, dtype, codes, scales)
+
+
+class VectorReplica:
+    """Chroma collection 的本地只读副本"""
+
+    def __init__(self, name: str, directory: Path, max_segments: int = 8, dtype: str = "float32",
+                 rescore_factor: int = 4):
+        """初始化副本
+
+        Args:
+            name: 副本名称（一般为 collection 名称）
+            directory: 副本目录
+            max_segments: 段数超过该值时合并
+            dtype: 新写入段的检索矩阵存储精度（float32 / float16 / int8）
+            rescore_factor: 量化段取 Top-K 的倍数作为候选，再以全精度重新打分
+        """
+        self.name = name
+        self.directory = Path(directory)
+        self.max_segments = max(1, max_segments)
+        self.dtype = check_dtype(dtype)
+        self.rescore_factor = max(1, rescore_factor)
+        self._state = _EMPTY_STATE
+        self._manifest_deleted: Dict[str, List[int]] = {}
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """有效节点数（与 collection.count() 比对）"""
+        return self._state.count
+
+    @property
+    def exists(self) -> bool:
+        """副本是否已构建"""
+        return (self.directory / _MANIFEST).exists()
+
+    @property
+    def dim(self) -> int:
+        return self._state.dim
+
+    @property
+    def synced_generation(self) -> Optional[int]:
+        """本进程最近一次写入副本时的 collection 版本号（最近写入方为其他进程时返回None）"""
+        state = self._state
+        return state.generation if state.writer == writer_token() else None
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def _signature(self) -> Tuple[int, int, int]:
+        """清单文件签名（原子替换会生成新的 inode）"""
+        try:
+            stat = (self.directory / _MANIFEST).stat()
+        except OSError:
+            return (0, 0, 0)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self) -> bool:
+        """清单文件变化时重新加载
+
+        Returns:
+            是否重新加载
+        """
+        signature = self._signature()
+        if signature == self._state.signature:
+            return False
+        with self._read_lock:
+            for attempt in range(3):
+                signature = self._signature()
+                if signature == self._state.signature:
+                    return False
+                if signature == (0, 0, 0):
+                    self._state, self._manifest_deleted = _EMPTY_STATE, {}
+                    return True
+                try:
+                    self._load_locked(signature)
+                    return True
+                except (OSError, ValueError, KeyError) as e:
+                    # 读取期间其他进程完成了合并（旧段已删除），按新清单重试
+                    logger.debug(f"副本加载失败（第 {attempt + 1} 次），重试: {self.name}: {e}")
+            logger.warning(f"⚠️  向量副本加载失败: {self.name}")
+            return False
+
+    def _load_locked(self, signature: Tuple[int, int, int]) -> None:
+        with open(self.directory / _MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") != REPLICA_FORMAT_VERSION or manifest.get("name") != self.name:
+            raise ValueError("副本格式或名称不符")
+
+        opened = {segment.name: segment for segment in self._state.segments}
+        segments = [opened.get(name) or _open_segment(self.directory, name) for name in manifest["segments"]]
+        deleted = manifest.get("deleted", {})
+        alive = []
+        for segment in segments:
+            mask = np.ones(segment.rows, dtype=bool)
+            mask[deleted.get(segment.name, [])] = False
+            alive.append(mask)
+        self._manifest_deleted = {name: list(rows) for name, rows in deleted.items()}
+        self._state = _State(
+            signature, segments, alive,
+            count=sum(int(mask.sum()) for mask in alive),
+            dim=int(manifest.get("dim", 0)),
+            seq=int(manifest.get("seq", 0)),
+            writer=str(manifest.get("writer", "")),
+            generation=int(manifest.get("generation", 0)),
+        )
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int,
+        filters: Optional[Dict[str, Set[str]]] = None,
+    ) -> List[SearchHit]:
+        """检索最相似的节点
+
+        Args:
+            query_embedding: 查询向量
+            top_k: 返回数量
+            filters: 精简元数据过滤（字段 → 允许的值），字段见 SLIM_METADATA_KEYS
+
+        Returns:
+            (节点ID, 余弦相似度, 文本, Chroma 元数据) 列表，按相似度降序
+        """
+        state = self._state
+        if top_k <= 0 or not state.count:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (state.dim,):
+            raise ValueError(f"查询向量维度不一致: {query.shape} != ({state.dim},)")
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return []
+        query = query / norm
+
+        candidates: List[Tuple[np.ndarray, int, np.ndarray]] = []
+        for i, (segment, mask) in enumerate(zip(state.segments, state.alive)):
+            if filters:
+                mask = mask & segment.match(filters)
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                continue
+            rows, scores = segment.top_rows(rows, query, top_k, self.rescore_factor)
+            candidates.append((scores, i, rows))
+
+        if not candidates:
+            return []
+        scores = np.concatenate([c[0] for c in candidates])
+        owners = np.concatenate([np.full(len(c[0]), c[1]) for c in candidates])
+        rows = np.concatenate([c[2] for c in candidates])
+        order = np.argsort(-scores, kind='stable')[:top_k]
+
+        hits = []
+        for j in order:
+            node_id, text, metadata = state.segments[owners[j]].record(int(rows[j]))
+            hits.append((node_id, float(scores[j]), text, metadata))
+        return hits
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """写入互斥（进程内线程锁 + 跨进程文件锁），进入后先加载其他进程的写入"""
+        with self._write_lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / ".lock", 'a+b') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self.refresh()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_manifest(self, segments: List[str], deleted: Dict[str, List[int]], dim: int, seq: int,
+                        count: int, generation: Optional[int] = None) -> None:
+        """原子替换清单（generation 为 None 时沿用当前的写入方与版本号，如合并）"""
+        if generation is None:
+            writer, generation = self._state.writer, self._state.generation
+        else:
+            writer = writer_token()
+        manifest = {
+            "version": REPLICA_FORMAT_VERSION,
+            "name": self.name,
+            "dim": dim,
+            "seq": seq,
+            "count": count,
+            "writer": writer,
+            "generation": generation,
+            "segments": segments,
+            "deleted": {name: sorted(rows) for name, rows in deleted.items() if rows and name in segments},
+        }
+        tmp_path = self.directory / f"{_MANIFEST}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.directory / _MANIFEST)
+
+    def _remove_unreferenced(self, keep: Iterable[str]) -> None:
+        keep = set(keep)
+        for path in self.directory.glob("*.meta.json.gz"):
+            name = path.name[:-len(".meta.json.gz")]
+            if name not in keep:
+                _remove_segment_files(self.directory, name)
+
+    def rebuild(self, collection: Any, if_stale: bool = False, generation: int = 0) -> int:
+        """分页拉取 collection 全量重建副本
+
+        Args:
+            collection: Chroma collection
+            if_stale: 为 True 时，若（其他进程已重建的）副本节点数与 collection 一致则跳过
+            generation: 重建开始时本进程的 collection 版本号（记录到清单）
+
+        Returns:
+            副本的有效节点数
+        """
+        with self._writing():
+            if if_stale and self.exists and len(self) == collection.count():
+                return len(self)
+            seq = self._state.seq + 1
+            writer = _SegmentWriter(self.directory, f"seg-{seq:06d}", self.dtype)
+            try:
+                offset = 0
+                while True:
+                    page = collection.get(
+                        include=["embeddings", "documents", "metadatas"],
+                        limit=COLLECTION_PAGE_SIZE,
+                        offset=offset,
+                    )
+                    ids = page.get("ids") or []
+                    if not ids:
+                        break
+                    writer.append_records(page)
+                    offset += len(ids)
+                    if len(ids) < COLLECTION_PAGE_SIZE:
+                        break
+                rows = writer.close()
+            except BaseException:
+                writer.discard()
+                raise
+            self._write_manifest([writer.name], {}, writer.dim, seq, rows, generation)
+            self._remove_unreferenced([writer.name])
+            self.refresh()
+            return len(self)
+
+    def apply_changes(self, collection: Any, added_ids: Iterable[str] = (), deleted_ids: Iterable[str] = (),
+                      generation: int = 0, records: Optional[Dict[str, Any]] = None) -> bool:
+        """增量同步：删除的节点标记删除行，新增（或覆盖写入）的节点写入新段
+
+        Args:
+            collection: Chroma collection
+            added_ids: 新写入的节点ID
+            deleted_ids: 已删除的节点ID
+            generation: 这些变更写入后本进程的 collection 版本号（记录到清单）
+            records: 新增节点的 collection.get() 结果（含 embeddings / documents / metadatas，未提供时按ID拉取）
+
+        Returns:
+            是否已同步（副本尚未构建时返回 False）
+        """
+        added_ids = list(dict.fromkeys(added_ids))
+        deleted_ids = list(deleted_ids)
+        with self._writing():
+            if not self.exists:
+                return False
+            state = self._state
+            deleted = {name: set(rows) for name, rows in self._manifest_deleted.items()}
+            for node_id in [*deleted_ids, *added_ids]:
+                location = state.locations.get(node_id)
+                if location is not None:
+                    segment_index, row = location
+                    deleted.setdefault(state.segments[segment_index].name, set()).add(row)
+
+            segments = [segment.name for segment in state.segments]
+            seq, dim = state.seq, state.dim
+            count = state.count - sum(1 for node_id in set(deleted_ids) | set(added_ids) if node_id in state.locations)
+            if added_ids:
+                seq += 1
+                writer = _SegmentWriter(self.directory, f"seg-{seq:06d}", self.dtype)
+                try:
+                    if records is not None:
+                        writer.append_records(records)
+                    else:
+                        for i in range(0, len(added_ids), FETCH_BATCH_SIZE):
+                            writer.append_records(collection.get(
+                                ids=added_ids[i:i + FETCH_BATCH_SIZE],
+                                include=["embeddings", "documents", "metadatas"],
+                            ))
+                    if dim and writer.dim and writer.dim != dim:
+                        raise ValueError(f"向量维度不一致: {writer.dim} != {dim}")
+                    rows = writer.close()
+                except BaseException:
+                    writer.discard()
+                    raise
+                if rows:
+                    segments.append(writer.name)
+                    dim = dim or writer.dim
+                    count += rows
+                else:
+                    _remove_segment_files(self.directory, writer.name)
+
+            self._write_manifest(segments, {k: list(v) for k, v in deleted.items()}, dim, seq, count, generation)
+            self.refresh()
+
+            total_rows = sum(segment.rows for segment in self._state.segments)
+            if len(segments) > self.max_segments or (
+                total_rows and 1 - len(self) / total_rows > COMPACT_DELETED_RATIO
+            ):
+                self._compact_locked()
+        return True
+
+    def _compact_locked(self) -> None:
+        """把所有段的有效行合并为一个新段（从本地映射读取，不访问 Chroma；按当前存储精度重新量化）"""
+        state = self._state
+        seq = state.seq + 1
+        writer = _SegmentWriter(self.directory, f"seg-{seq:06d}", self.dtype)
+        try:
+            for segment, mask in zip(state.segments, state.alive):
+                rows = np.flatnonzero(mask)
+                for start in range(0, len(rows), COLLECTION_PAGE_SIZE):
+                    batch = rows[start:start + COLLECTION_PAGE_SIZE]
+                    records = [segment.record(int(row)) for row in batch]
+                    writer.append(
+                        [r[0] for r in records],
+                        np.asarray(segment.vectors[batch]),
+                        [r[1] for r in records],
+                        [r[2] for r in records],
+                    )
+            writer.dim = writer.dim or state.dim
+            rows = writer.close()
+        except BaseException:
+            writer.discard()
+            raise
+        self._write_manifest([writer.name], {}, writer.dim, seq, rows)
+        self._remove_unreferenced([writer.name])
+        self.refresh()
+        logger.info(f"🧩 向量副本已合并: {self.name} ({len(state.segments)} 个段 → 1, {rows} 个节点)")
+
+    def clear(self) -> None:
+        """删除副本文件"""
+        with self._writing():
+            try:
+                (self.directory / _MANIFEST).unlink()
+            except OSError:
+                pass
+            self._remove_unreferenced([])
+            self.refresh()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取副本统计信息"""
+        state = self._state
+        return {
+            "name": self.name,
+            "nodes": state.count,
+            "segments": len(state.segments),
+            "rows": sum(segment.rows for segment in state.segments),
+            "dim": state.dim,
+            "dtypes": sorted({segment.dtype for segment in state.segments}),
+            "search_bytes": sum(segment.search_bytes for segment in state.segments),
+        }
@@ -0,0 +1,119 @@
+"""
+副本向量存储：先查本地只读副本、不可用时回退到 Chroma 的 ChromaVectorStore
+
+主要功能：
+- ReplicaChromaVectorStore类：query() 在副本一致且查询可在本地回答时使用副本
+- create_vector_store()：按配置为 IndexManager 创建向量存储
+
+执行流程：
+1. 检查查询是否可在本地回答（默认模式、有查询向量、过滤条件只涉及精简元数据的等值 / IN）
+2. 获取与 collection 一致的副本（不一致时注册表在后台同步）
+3. 在副本中检索并还原节点；否则调用 ChromaVectorStore.query() 访问 Chroma
+
+特性：
+- 写入、删除仍直接作用于 Chroma（系统记录），副本通过写入通知与节点数检查同步
+- VectorIndexRetriever / as_retriever() 创建的检索器无需改动即可使用副本
+"""
+
+import math
+from typing import Any, Dict, Optional, Set
+
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from backend.infrastructure.logger import get_logger
+from backend.infrastructure.vector_replica.registry import fresh_vector_replica, replica_enabled
+from backend.infrastructure.vector_replica.replica import SLIM_METADATA_KEYS
+
+logger = get_logger('vector_replica')
+
+
+def replica_filters(filters: Optional[MetadataFilters]) -> Optional[Dict[str, Set[str]]]:
+    """将 MetadataFilters 转换为副本过滤条件
+
+    Returns:
+        字段 → 允许的值；无过滤时为空字典；副本无法回答时返回None
+    """
+    if filters is None or not filters.filters:
+        return {}
+    if len(filters.filters) > 1 and filters.condition != FilterCondition.AND:
+        return None
+
+    converted: Dict[str, Set[str]] = {}
+    for item in filters.filters:
+        if isinstance(item, MetadataFilters) or item.key not in SLIM_METADATA_KEYS:
+            return None
+        if item.operator == FilterOperator.EQ:
+            values = {str(item.value)}
+        elif item.operator == FilterOperator.IN and isinstance(item.value, (list, tuple, set)):
+            values = {str(v) for v in item.value}
+        else:
+            return None
+        converted[item.key] = converted[item.key] & values if item.key in converted else values
+    return converted
+
+
+def _to_node(node_id: str, text: str, metadata: Dict[str, Any]) -> TextNode:
+    try:
+        return metadata_dict_to_node(metadata, text=text)
+    except Exception:
+        return TextNode(
+            id_=node_id,
+            text=text,
+            metadata={k: v for k, v in metadata.items() if not k.startswith('_')},
+        )
+
+
+class ReplicaChromaVectorStore(ChromaVectorStore):
+    """优先使用本地只读副本检索的 ChromaVectorStore"""
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """检索（副本可用时在本地完成，否则访问 Chroma）"""
+        result = self._query_replica(query, kwargs)
+        if result is not None:
+            return result
+        return super().query(query, **kwargs)
+
+    def _query_replica(self, query: VectorStoreQuery, kwargs: Dict[str, Any]) -> Optional[VectorStoreQueryResult]:
+        if kwargs or not query.query_embedding or query.mode != VectorStoreQueryMode.DEFAULT:
+            return None
+        if query.doc_ids or query.node_ids:
+            return None
+        filters = replica_filters(query.filters)
+        if filters is None:
+            return None
+        try:
+            replica = fresh_vector_replica(self._collection)
+            if replica is None:
+                return None
+            hits = replica.search(query.query_embedding, query.similarity_top_k, filters=filters)
+        except Exception as e:
+            logger.warning(f"⚠️  向量副本检索失败，回退到 Chroma: {e}")
+            return None
+
+        return VectorStoreQueryResult(
+            nodes=[_to_node(node_id, text, metadata) for node_id, _, text, metadata in hits],
+            # 与 ChromaVectorStore 一致：exp(-余弦距离)
+            similarities=[math.exp(similarity - 1.0) for _, similarity, _, _ in hits],
+            ids=[node_id for node_id, _, _, _ in hits],
+        )
+
+
+def create_vector_store(chroma_collection: Any) -> ChromaVectorStore:
+    """创建 IndexManager 使用的向量存储
+
+    启用副本且使用 Chroma Cloud 时返回 ReplicaChromaVectorStore；
+    本地后端（persistent / ephemeral）本身即在进程内检索，不需要副本。
+    """
+    if replica_enabled():
+        return ReplicaChromaVectorStore(chroma_collection=chroma_collection)
+    return ChromaVectorStore(chroma_collection=chroma_collection)
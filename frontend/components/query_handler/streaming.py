@@ -140,9 +140,11 @@ def handle_streaming_query(rag_service, chat_manager, prompt: str) -> bool:
         _debug_log("streaming.py:unsupported", "rag_service has no stream_chat", hypothesis_id="S")
         return False
 
+    # 单用户界面沿用当前会话（服务层未收到会话ID时会为每个请求新建会话）
     session_id = None
-    if chat_manager and chat_manager.current_session:
-        session_id = chat_manager.current_session.session_id
+    if chat_manager:
+        session = chat_manager.current_session or chat_manager.start_session()
+        session_id = session.session_id
 
     stream_state = {
         "parts": [],
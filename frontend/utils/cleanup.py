@@ -48,6 +48,14 @@ def cleanup_resources():
         except Exception as e:
             log.debug(f"清理 Hugging Face Embedding 资源时出错: {e}")
         
+        # 关闭文档解析进程池
+        try:
+            from backend.infrastructure.data_loader.utils.parse_utils import shutdown_parse_process_pool
+            shutdown_parse_process_pool()
+            log.debug("✅ 文档解析进程池已关闭")
+        except Exception as e:
+            log.debug(f"关闭文档解析进程池时出错: {e}")
+        
         log.info("✅ 应用资源清理完成")
     except Exception as e:
         # 使用 print 作为最后的备选方案
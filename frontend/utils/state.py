@@ -272,6 +272,11 @@ def rebuild_services() -> bool:
             max_tokens=max_tokens,
         )
 
+        # 继承会话，并复用配置未变的 LLM / 查询引擎
+        previous = st.session_state.get('_cached_chat_manager')
+        if previous is not None:
+            chat_manager.inherit_from(previous)
+
         rag_service = RAGService(
             collection_name=collection_name,
             enable_debug=False,
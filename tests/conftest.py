@@ -196,6 +196,53 @@ def mock_chromadb_client(monkeypatch):
         pass
 
 
+@pytest.fixture(autouse=True)
+def isolate_embedding_vector_cache():
+    """Disable the persistent embedding vector cache so tests never share vectors via disk."""
+    from backend.infrastructure.embeddings import vector_cache
+
+    vector_cache.set_vector_cache(None)
+    yield
+    vector_cache.set_vector_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def isolate_text_index(tmp_path, monkeypatch):
+    """Persist grep/BM25/file text indexes and vector replicas under tmp_path and start every test with an empty registry."""
+    from backend.infrastructure.config import config
+    from backend.infrastructure.indexer.utils.file_vectors import reset_file_vectors
+    from backend.infrastructure.text_index import registry
+    from backend.infrastructure.vector_replica import reset_vector_replicas
+
+    monkeypatch.setattr(config, 'TEXT_INDEX_PATH', tmp_path / "text_index", raising=False)
+    monkeypatch.setattr(config, 'VECTOR_REPLICA_PATH', tmp_path / "vector_replica", raising=False)
+    registry.reset_line_indexes()
+    registry.reset_bm25_indexes()
+    registry.reset_file_indexes()
+    reset_file_vectors()
+    reset_vector_replicas()
+    yield
+    registry.reset_line_indexes()
+    registry.reset_bm25_indexes()
+    registry.reset_file_indexes()
+    reset_file_vectors()
+    reset_vector_replicas()
+
+
+@pytest.fixture(autouse=True)
+def isolate_query_caches():
+    """Disable the shared query caches so repeated questions across tests always run the full query."""
+    from backend.business.rag_engine.caching import query_cache, response_cache, retrieval_cache
+
+    response_cache.set_response_cache(None)
+    retrieval_cache.set_retrieval_cache(None)
+    query_cache.set_query_cache(None)
+    yield
+    response_cache.set_response_cache(None)
+    retrieval_cache.set_retrieval_cache(None)
+    query_cache.set_query_cache(None)
+
+
 # -------------------- pytest hooks --------------------
 
 def pytest_configure(config):
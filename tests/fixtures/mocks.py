@@ -6,7 +6,7 @@ Mock 工具模块
 
 from pathlib import Path
 from unittest.mock import Mock, MagicMock
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 
 # ==================== Mock 类 ====================
@@ -35,6 +35,75 @@ class MockEmbedding:
         self.get_model_name = Mock(return_value="test-embedding")
 
 
+class InMemoryChromaCollection:
+    """按 Chroma 接口在内存中存储节点的 collection
+
+    元数据按 ChromaVectorStore 的格式序列化节点；get 只返回 include 请求的字段
+    （未指定时返回 documents 与 metadatas，与 Chroma 一致），每次 get 的 include 记录在 includes 中。
+    """
+    
+    def __init__(self, name: str = "test_collection", nodes: Optional[Iterable[Any]] = None):
+        self.name = name
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.includes: List[List[str]] = []
+        for node in nodes or []:
+            self.add_node(node)
+    
+    def add_node(self, node: Any) -> None:
+        """写入 LlamaIndex 节点（同ID覆盖）"""
+        from llama_index.core.vector_stores.utils import node_to_metadata_dict
+        
+        self.records[node.node_id] = {
+            "document": node.get_content(),
+            "metadata": node_to_metadata_dict(node, remove_text=True, flat_metadata=False),
+            "embedding": node.embedding,
+        }
+    
+    def put(self, node_id: str, text: str = "正文", metadata: Optional[Dict[str, Any]] = None,
+            embedding: Optional[List[float]] = None) -> None:
+        """按文本与元数据写入节点"""
+        from llama_index.core.schema import TextNode
+        
+        self.add_node(TextNode(id_=node_id, text=text, metadata=metadata or {}, embedding=embedding))
+    
+    @property
+    def get_calls(self) -> int:
+        return len(self.includes)
+    
+    def count(self) -> int:
+        return len(self.records)
+    
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        include = list(include) if include is not None else ["documents", "metadatas"]
+        self.includes.append(include)
+        keys = [k for k in ids if k in self.records] if ids is not None else list(self.records)
+        if where:
+            keys = [k for k in keys if self._matches(self.records[k]["metadata"], where)]
+        if ids is None:
+            keys = keys[offset:offset + limit if limit else None]
+        result: Dict[str, Any] = {"ids": keys}
+        for field, column in (("documents", "document"), ("metadatas", "metadata"), ("embeddings", "embedding")):
+            if field in include:
+                result[field] = [self.records[k][column] for k in keys]
+        return result
+    
+    def delete(self, ids=None) -> None:
+        for node_id in ids or []:
+            self.records.pop(node_id, None)
+    
+    @staticmethod
+    def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+        """支持 {key: value} 与 {key: {"$in": [...]}} 两种过滤"""
+        for key, condition in where.items():
+            value = metadata.get(key)
+            if isinstance(condition, dict):
+                if value not in condition.get("$in", []):
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+
 class MockLLM:
     """统一的LLM Mock"""
     
@@ -7,6 +7,7 @@
 2. 向量ID查询性能测试
 3. 增量更新性能测试
 4. 内存使用情况
+5. 向量ID批量查询的往返次数（每文件查询次数，2k 文件仓库）
 
 运行方式：
     python -m pytest tests/performance/test_index_build_optimization.py -v
@@ -27,8 +28,14 @@ import statistics
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import pytest
+from unittest.mock import MagicMock
+
 from llama_index.core.schema import Document as LlamaDocument
 from backend.infrastructure.indexer import IndexManager
+from backend.infrastructure.indexer.build.filter import filter_vectorized_documents
+from backend.infrastructure.indexer.utils.ids import get_vector_ids_batch, get_vector_ids_by_metadata
+from backend.infrastructure.indexer.utils.node_ids import expected_node_ids
 from backend.infrastructure.config import config
 
 
@@ -423,6 +430,96 @@ class PerformanceTestSuite:
                 f.write("\n")
 
 
+class RoundTripCountingCollection:
+    """模拟 Chroma collection：支持按 file_path 元数据过滤，统计查询往返次数"""
+    
+    def __init__(self, ids_by_file: Dict[str, List[str]]):
+        self.records = {
+            vector_id: {"file_path": file_path}
+            for file_path, vector_ids in ids_by_file.items()
+            for vector_id in vector_ids
+        }
+        self.get_calls = 0
+    
+    def count(self):
+        return len(self.records)
+    
+    def get(self, where=None, include=None, **kwargs):
+        self.get_calls += 1
+        condition = (where or {}).get("file_path")
+        if isinstance(condition, dict):
+            wanted = set(condition["$in"])
+        else:
+            wanted = {condition}
+        ids = [vid for vid, meta in self.records.items() if meta["file_path"] in wanted]
+        return {"ids": ids, "metadatas": [self.records[vid] for vid in ids]}
+    
+    def delete(self, ids):
+        for vector_id in ids:
+            self.records.pop(vector_id, None)
+
+
+REPO_FILE_COUNT = 2000
+
+
+class TestVectorIdLookupRoundTrips:
+    """向量ID查询往返次数基准（2k 文件仓库）"""
+    
+    @pytest.fixture
+    def repo_documents(self):
+        return [
+            LlamaDocument(
+                text=f"文档{i}：系统科学研究系统的结构、功能与演化规律。" * 8,
+                metadata={"file_path": f"repo/doc_{i}.md", "repository": "owner/repo", "branch": "main"},
+            )
+            for i in range(REPO_FILE_COUNT)
+        ]
+    
+    @pytest.fixture
+    def repo_index_manager(self, repo_documents):
+        index_manager = MagicMock(_index=object(), chunk_size=64, chunk_overlap=8)
+        index_manager.chroma_collection = RoundTripCountingCollection(
+            expected_node_ids(index_manager, repo_documents)
+        )
+        return index_manager
+    
+    def _report(self, label: str, calls: int, elapsed: float) -> float:
+        calls_per_file = calls / REPO_FILE_COUNT
+        print(f"\n📊 {label}: {calls} 次查询 / {REPO_FILE_COUNT} 个文件 = {calls_per_file:.3f} 次/文件 ({elapsed*1000:.1f}ms)")
+        return calls_per_file
+    
+    def test_bulk_lookup_calls_per_file(self, repo_index_manager):
+        """批量查询 vs 逐文件查询的每文件往返次数"""
+        collection = repo_index_manager.chroma_collection
+        file_paths = [f"repo/doc_{i}.md" for i in range(REPO_FILE_COUNT)]
+        
+        _, per_file_elapsed = measure_time(
+            lambda: [get_vector_ids_by_metadata(repo_index_manager, p) for p in file_paths]
+        )
+        per_file = self._report("逐文件查询", collection.get_calls, per_file_elapsed)
+        
+        collection.get_calls = 0
+        result, bulk_elapsed = measure_time(get_vector_ids_batch, repo_index_manager, file_paths)
+        bulk = self._report("批量查询", collection.get_calls, bulk_elapsed)
+        
+        assert len(result) == REPO_FILE_COUNT
+        assert per_file == 1.0
+        assert bulk <= 0.01
+    
+    def test_resume_filter_calls_per_file(self, repo_index_manager, repo_documents):
+        """断点续传过滤（确定性ID精确校验）的每文件往返次数"""
+        collection = repo_index_manager.chroma_collection
+        
+        (to_process, skipped, vector_ids_map), elapsed = measure_time(
+            filter_vectorized_documents, repo_index_manager, repo_documents
+        )
+        filtering = self._report("已向量化文档过滤", collection.get_calls, elapsed)
+        
+        assert to_process == [] and skipped == REPO_FILE_COUNT
+        assert len(vector_ids_map) == REPO_FILE_COUNT
+        assert filtering <= 0.01
+
+
 def main():
     """主函数"""
     print("="*60)
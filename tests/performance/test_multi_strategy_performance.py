@@ -11,7 +11,8 @@ from unittest.mock import patch
 
 from backend.infrastructure.indexer import IndexManager
 from backend.business.rag_engine.core.engine import ModularQueryEngine
-from llama_index.core.schema import Document as LlamaDocument
+from backend.business.rag_engine.retrieval.merger import ResultMerger
+from llama_index.core.schema import Document as LlamaDocument, NodeWithScore, TextNode
 
 
 @pytest.fixture
@@ -327,3 +328,83 @@ class TestMultiStrategyPerformanceBenchmarks:
                 assert overall_max < 15.0, f"多策略检索最大响应时间为{overall_max:.3f}s，超过15秒"
 
 
+def _candidate_results(num_retrievers: int, candidates: int, overlap: float = 0.5):
+    """构造多个检索器的候选结果（相邻检索器之间按比例重叠）"""
+    results = {}
+    offset = int(candidates * (1 - overlap))
+    for r in range(num_retrievers):
+        results[f"retriever{r}"] = [
+            NodeWithScore(
+                node=TextNode(id_=f"node-{r * offset + i}", text=f"候选{r * offset + i}"),
+                score=1.0 - i / candidates,
+            )
+            for i in range(candidates)
+        ]
+    return results
+
+
+def _reference_rrf(results, top_k: int, rrf_k: int = 60):
+    """逐节点字典累加 + 全量排序的 RRF（对照实现）"""
+    scores = {}
+    for nodes in results.values():
+        for rank, node_with_score in enumerate(nodes, start=1):
+            node_id = node_with_score.node.node_id
+            scores[node_id] = scores.get(node_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
+
+@pytest.mark.performance
+class TestResultMergerScalability:
+    """结果合并器可扩展性基准（数千候选节点）"""
+    
+    @pytest.mark.parametrize("candidates", [1000, 5000, 20000])
+    def test_rrf_scalability(self, candidates):
+        """测试RRF在大量候选下的耗时，并与对照实现结果一致"""
+        results = _candidate_results(3, candidates)
+        merger = ResultMerger(strategy="reciprocal_rank_fusion")
+        merger.merge(results, top_k=10)  # 预热
+        
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            merged = merger.merge(results, top_k=10)
+            times.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        reference = _reference_rrf(results, top_k=10)
+        reference_time = time.perf_counter() - start
+        
+        print(
+            f"\nRRF 候选数={candidates * 3}: 向量化中位耗时 {statistics.median(times) * 1000:.2f}ms, "
+            f"对照实现 {reference_time * 1000:.2f}ms"
+        )
+        assert [n.node.node_id for n in merged] == [node_id for node_id, _ in reference]
+        assert [n.score for n in merged] == pytest.approx([score for _, score in reference])
+        assert statistics.median(times) < 0.1 * candidates / 1000, "RRF合并耗时过长"
+    
+    @pytest.mark.parametrize(
+        "strategy,normalization",
+        [
+            ("weighted_score", "min_max"),
+            ("comb_sum", "min_max"),
+            ("comb_sum", "z_score"),
+            ("comb_mnz", "min_max"),
+            ("simple", "none"),
+        ],
+    )
+    def test_strategy_scalability(self, strategy, normalization):
+        """测试各合并策略在5个检索器×5000候选下的耗时"""
+        results = _candidate_results(5, 5000)
+        merger = ResultMerger(strategy=strategy, score_normalization=normalization)
+        merger.merge(results, top_k=20)  # 预热
+        
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            merged = merger.merge(results, top_k=20)
+            times.append(time.perf_counter() - start)
+        
+        print(f"\n{strategy}({normalization}) 候选数=25000: 中位耗时 {statistics.median(times) * 1000:.2f}ms")
+        assert len(merged) == 20
+        assert len({n.node.node_id for n in merged}) == 20
+        assert statistics.median(times) < 1.0, f"{strategy}合并耗时过长"
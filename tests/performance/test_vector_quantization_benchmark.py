@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+向量量化存储基准测试：各存储精度的 recall@k 与内存占用
+
+测试场景：
+1. 合成 bge-base-zh 维度（768）的聚簇向量语料，以 float32 精确内积 Top-K 为标准答案
+2. 分别以 float32 / float16 / int8 构建向量副本，比较粗排矩阵字节数、recall@k 与检索延迟
+3. int8 对比不重新打分（rescore_factor=1，只对 Top-K 本身重新排序）与默认候选倍数的召回
+
+运行方式：
+    python -m pytest tests/performance/test_vector_quantization_benchmark.py -v -s
+    或
+    python tests/performance/test_vector_quantization_benchmark.py
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+import pytest
+
+from backend.infrastructure.embeddings.quantization import bytes_per_vector
+from backend.infrastructure.vector_replica.replica import VectorReplica
+
+DIM = 768
+CORPUS_SIZE = 20000
+QUERY_COUNT = 100
+TOP_K = 10
+
+# (名称, 存储精度, 候选倍数)
+VARIANTS = [
+    ("float32", "float32", 1),
+    ("float16", "float16", 4),
+    ("int8 (不重新打分)", "int8", 1),
+    ("int8", "int8", 4),
+]
+
+
+class _ArrayCollection:
+    """以 numpy 矩阵提供 collection.get() / count() 的语料（只用于构建副本）"""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def count(self) -> int:
+        return len(self.vectors)
+
+    def get(self, include: List[str], limit: int, offset: int) -> Dict[str, Any]:
+        rows = range(offset, min(offset + limit, len(self.vectors)))
+        return {
+            "ids": [f"chunk-{i}" for i in rows],
+            "embeddings": self.vectors[offset:offset + limit],
+            "documents": [""] * len(rows),
+            "metadatas": [{"file_path": f"docs/{i % 500}.md"} for i in rows],
+        }
+
+
+def make_corpus(size: int = CORPUS_SIZE, dim: int = DIM, seed: int = 0):
+    """生成聚簇语料与查询（向量分布集中，与句向量模型的各向异性相近）"""
+    rng = np.random.default_rng(seed)
+    shared = rng.normal(size=dim)
+    centers = shared + rng.normal(size=(size // 100, dim))
+    corpus = centers[rng.integers(len(centers), size=size)] + 0.6 * rng.normal(size=(size, dim))
+    queries = corpus[rng.integers(size, size=QUERY_COUNT)] + 0.6 * rng.normal(size=(QUERY_COUNT, dim))
+    return corpus.astype(np.float32), queries.astype(np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, top_k: int) -> List[set]:
+    """float32 精确内积的 Top-K（标准答案）"""
+    normalized = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    results = []
+    for query in queries:
+        scores = normalized @ (query / np.linalg.norm(query))
+        results.append({f"chunk-{i}" for i in np.argpartition(-scores, top_k - 1)[:top_k]})
+    return results
+
+
+def run_benchmark(directory: Path, corpus_size: int = CORPUS_SIZE) -> List[Dict[str, Any]]:
+    """构建各存储精度的副本并测量 recall@k、内存与延迟"""
+    corpus, queries = make_corpus(corpus_size)
+    truth = exact_top_k(corpus, queries, TOP_K)
+    collection = _ArrayCollection(corpus)
+
+    results = []
+    for label, dtype, rescore_factor in VARIANTS:
+        replica = VectorReplica(label, directory / f"{dtype}-{rescore_factor}", dtype=dtype,
+                                rescore_factor=rescore_factor)
+        replica.rebuild(collection)
+
+        latencies, recalls = [], []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            hits = replica.search(query, top_k=TOP_K)
+            latencies.append(time.perf_counter() - start)
+            recalls.append(len({hit[0] for hit in hits} & expected) / TOP_K)
+
+        stats = replica.get_stats()
+        results.append({
+            "label": label,
+            "dtype": dtype,
+            "rescore_factor": rescore_factor,
+            "bytes_per_vector": bytes_per_vector(DIM, dtype),
+            "search_bytes": stats["search_bytes"],
+            "recall": statistics.mean(recalls),
+            "latency_ms": statistics.median(latencies) * 1000,
+        })
+    return results
+
+
+def print_report(results: List[Dict[str, Any]], corpus_size: int = CORPUS_SIZE) -> None:
+    print("\n" + "=" * 72)
+    print(f"📊 向量量化基准: {corpus_size} 个 {DIM} 维向量, {QUERY_COUNT} 个查询, recall@{TOP_K}")
+    print("=" * 72)
+    print(f"{'存储精度':<18}{'字节/向量':>10}{'粗排矩阵':>12}{'百万分块':>12}{'recall':>10}{'延迟':>10}")
+    for r in results:
+        print(
+            f"{r['label']:<18}{r['bytes_per_vector']:>10}"
+            f"{r['search_bytes'] / 1024 / 1024:>10.1f}MB"
+            f"{r['bytes_per_vector'] * 1_000_000 / 1024 ** 3:>10.2f}GB"
+            f"{r['recall']:>10.3f}{r['latency_ms']:>8.2f}ms"
+        )
+
+
+@pytest.mark.performance
+class TestVectorQuantizationBenchmark:
+    """向量量化存储基准测试"""
+
+    def test_recall_vs_memory(self, tmp_path):
+        """测试量化存储在减小粗排矩阵的同时保持召回"""
+        results = {r["label"]: r for r in run_benchmark(tmp_path)}
+        print_report(list(results.values()))
+
+        float32 = results["float32"]
+        assert float32["recall"] == 1.0
+        assert results["float16"]["search_bytes"] * 2 == float32["search_bytes"]
+        assert results["int8"]["search_bytes"] < float32["search_bytes"] / 3.9
+        assert results["float16"]["recall"] >= 0.99
+        assert results["int8"]["recall"] >= 0.99
+        assert results["int8"]["recall"] >= results["int8 (不重新打分)"]["recall"]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print_report(run_benchmark(Path(tmp)))
@@ -0,0 +1,224 @@
+"""
+按文件精确解析测试
+
+测试只读取请求的文件、读取器缓存、元数据映射以及进程池解析。
+"""
+
+import pytest
+from pathlib import Path
+
+from backend.infrastructure.data_loader.utils import parse_utils
+from backend.infrastructure.data_loader.utils.parse_utils import (
+    load_file,
+    parse_directory_files,
+    parse_file_list,
+    parse_single_file,
+)
+
+
+@pytest.fixture
+def large_dir(tmp_path):
+    """包含多个文件的目录"""
+    for i in range(20):
+        (tmp_path / f"doc_{i}.md").write_text(f"# 文档{i}\n\n系统科学内容{i}", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.mark.fast
+class TestTargetedParsing:
+    """按文件精确解析测试"""
+
+    def test_single_file_reads_only_that_file(self, large_dir, mocker):
+        """测试解析单个文件时不读取同目录其他文件"""
+        spy = mocker.spy(parse_utils, 'default_file_metadata_func')
+        target = large_dir / "doc_3.md"
+
+        docs = parse_single_file(target, {target: {"repository": "owner/repo"}})
+
+        assert len(docs) == 1
+        assert docs[0].id_ == str(target)
+        assert "系统科学内容3" in docs[0].text
+        assert docs[0].metadata["repository"] == "owner/repo"
+        assert "file_size" in docs[0].excluded_embed_metadata_keys
+        assert spy.call_count == 1
+
+    def test_directory_files_preserve_order(self, large_dir):
+        """测试只解析给定文件并保持输入顺序"""
+        files = [large_dir / "doc_7.md", large_dir / "doc_2.md"]
+
+        docs = parse_directory_files(large_dir, files)
+
+        assert [d.metadata["file_name"] for d in docs] == ["doc_7.md", "doc_2.md"]
+
+    def test_missing_file_is_skipped(self, large_dir):
+        """测试解析失败的文件返回空列表"""
+        assert parse_single_file(large_dir / "missing.md") == []
+
+    def test_readers_are_cached_per_extension(self, tmp_path, mocker):
+        """测试同一扩展名的读取器只实例化一次"""
+        from llama_index.core.readers.base import BaseReader
+        from llama_index.core.schema import Document
+
+        created = []
+
+        class FakePdfReader(BaseReader):
+            def __init__(self):
+                created.append(self)
+
+            def load_data(self, file, extra_info=None):
+                return [Document(text=f"pdf {Path(file).name}", metadata=extra_info or {})]
+
+        mocker.patch.dict(parse_utils._file_extractor, clear=True)
+        mocker.patch.object(parse_utils, '_default_reader_classes', return_value={'.pdf': FakePdfReader})
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"paper_{i}.pdf"
+            path.write_bytes(b"%PDF-1.4")
+            paths.append(path)
+
+        docs = parse_file_list(paths, use_process_pool=False)
+
+        assert [d.text for d in docs] == ["pdf paper_0.pdf", "pdf paper_1.pdf", "pdf paper_2.pdf"]
+        assert len(created) == 1
+
+    def test_process_pool_results_match_in_process(self, tmp_path, mocker):
+        """测试进程池解析与进程内解析结果一致，元数据在主进程应用"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        mocker.patch.object(parse_utils, 'PROCESS_POOL_EXTENSIONS', frozenset({'.md'}))
+        mocker.patch.object(parse_utils, 'get_parse_process_workers', return_value=2)
+        executor = ThreadPoolExecutor(max_workers=2)
+        mocker.patch.object(parse_utils, 'get_parse_process_pool', return_value=executor)
+        files = []
+        for i in range(4):
+            path = tmp_path / f"note_{i}.md"
+            path.write_text(f"内容{i}", encoding="utf-8")
+            files.append(path)
+        metadata_map = {path: {"ordinal": i} for i, path in enumerate(files)}
+
+        pooled = parse_file_list(files, metadata_map)
+        in_process = parse_file_list(files, metadata_map, use_process_pool=False)
+        executor.shutdown()
+
+        assert [d.text for d in pooled] == [d.text for d in in_process]
+        assert [d.metadata["ordinal"] for d in pooled] == [0, 1, 2, 3]
+
+    def test_load_file_matches_directory_reader(self, large_dir):
+        """测试读取结果与 SimpleDirectoryReader 一致"""
+        from llama_index.core import SimpleDirectoryReader
+
+        target = large_dir / "doc_5.md"
+        expected = SimpleDirectoryReader(input_files=[target], filename_as_id=True).load_data()[0]
+        doc = load_file(target)[0]
+
+        assert doc.id_ == expected.id_
+        assert doc.text == expected.text
+        assert doc.metadata == expected.metadata
+
+
+@pytest.mark.fast
+class TestParallelParsing:
+    """DocumentParser 并行解析测试"""
+
+    def test_parallel_matches_sequential(self, large_dir, mocker):
+        """测试并行解析与顺序解析得到相同文档，进度回调覆盖全部文件"""
+        from backend.infrastructure.config import config
+        from backend.infrastructure.data_loader.parser import DocumentParser
+
+        files = sorted(large_dir.glob("*.md"))
+        metadata_map = {path: {"source_type": "local"} for path in files}
+        progress = []
+
+        mocker.patch.object(config, 'PARSE_PARALLEL_ENABLE', True, create=True)
+        parallel = DocumentParser().parse_files(
+            files, metadata_map, progress_callback=lambda c, t, n: progress.append((c, t, n))
+        )
+        mocker.patch.object(config, 'PARSE_PARALLEL_ENABLE', False, create=True)
+        sequential = DocumentParser().parse_files(files, metadata_map)
+
+        assert [d.id_ for d in parallel] == [d.id_ for d in sequential]
+        assert all(d.metadata["source_type"] == "local" for d in parallel)
+        assert [c for c, _, _ in progress] == list(range(1, len(files) + 1))
+        assert {n for _, _, n in progress} == {f.name for f in files}
+
+    def test_streams_documents_as_files_finish(self, large_dir, mocker):
+        """测试解析完成的文件先返回，不等待慢文件"""
+        import threading
+        from backend.infrastructure.data_loader import parser as parser_module
+
+        release = threading.Event()
+        real_load = parser_module.load_file
+
+        def load(path):
+            if path.name == "doc_0.md":
+                release.wait(5)
+            return real_load(path)
+
+        mocker.patch.object(parser_module, 'load_file', side_effect=load)
+        files = [large_dir / "doc_0.md", large_dir / "doc_1.md"]
+
+        stream = parser_module.DocumentParser().iter_parse_files(files)
+        first = next(stream)
+        release.set()
+        rest = list(stream)
+
+        assert first.metadata["file_name"] == "doc_1.md"
+        assert [d.metadata["file_name"] for d in rest] == ["doc_0.md"]
+
+    def test_parse_files_keeps_input_order(self, large_dir, mocker):
+        """测试并行解析按输入顺序返回，与文件完成顺序无关"""
+        import threading
+        from backend.infrastructure.config import config
+        from backend.infrastructure.data_loader import parser as parser_module
+
+        release = threading.Event()
+        real_load = parser_module.load_file
+
+        def load(path):
+            if path.name == "doc_0.md":
+                release.wait(5)
+            elif path.name == "doc_2.md":
+                release.set()
+            return real_load(path)
+
+        mocker.patch.object(parser_module, 'load_file', side_effect=load)
+        mocker.patch.object(config, 'PARSE_PARALLEL_ENABLE', True, create=True)
+        files = [large_dir / f"doc_{i}.md" for i in range(3)]
+
+        docs = parser_module.DocumentParser().parse_files(files)
+
+        assert [d.metadata["file_name"] for d in docs] == ["doc_0.md", "doc_1.md", "doc_2.md"]
+
+    def test_parse_files_cancel_returns_no_partial_result(self, large_dir, mocker):
+        """测试并行解析被取消时设置 cancelled，不返回部分文档"""
+        from backend.infrastructure.config import config
+        from backend.infrastructure.data_loader.parser import DocumentParser
+
+        mocker.patch.object(config, 'PARSE_PARALLEL_ENABLE', True, create=True)
+        cancelled = {"value": False}
+        parser = DocumentParser()
+
+        docs = parser.parse_files(
+            sorted(large_dir.glob("*.md")),
+            progress_callback=lambda c, t, n: cancelled.update(value=True),
+            cancel_check=lambda: cancelled["value"],
+        )
+
+        assert docs == [] and parser.cancelled is True
+
+    def test_cancel_stops_parsing(self, large_dir):
+        """测试取消后不再返回后续文件的文档"""
+        from backend.infrastructure.data_loader.parser import DocumentParser
+
+        cancelled = {"value": False}
+
+        def on_progress(current, total, name):
+            cancelled["value"] = True
+
+        docs = list(DocumentParser().iter_parse_files(
+            sorted(large_dir.glob("*.md")),
+            progress_callback=on_progress,
+            cancel_check=lambda: cancelled["value"],
+        ))
+
+        assert len(docs) == 1
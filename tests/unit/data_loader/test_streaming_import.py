@@ -0,0 +1,171 @@
+"""
+流式导入流水线测试
+
+测试按批写入、有界缓冲、进度上报、取消以及同步状态更新。
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.infrastructure.data_loader.github_sync.manager import GitHubSyncManager
+from backend.infrastructure.data_loader.progress import ImportProgressManager, ImportStage
+from backend.infrastructure.data_loader.source import LocalFileSource
+from backend.infrastructure.data_loader.streaming import (
+    StreamingImportPipeline,
+    delete_file_vectors,
+)
+
+
+class RecordingIndexManager:
+    """记录每批写入的索引服务"""
+
+    def __init__(self, delay=0.0, on_batch=None):
+        self.batches = []
+        self.sync_managers = []
+        self.delay = delay
+        self.on_batch = on_batch
+
+    def build_index(self, documents, show_progress=False, github_sync_manager=None):
+        time.sleep(self.delay)
+        self.batches.append([d.metadata["file_path"] for d in documents])
+        self.sync_managers.append(github_sync_manager)
+        if self.on_batch:
+            self.on_batch(len(self.batches))
+        return None, {d.metadata["file_path"]: [f"id-{d.metadata['file_path']}"] for d in documents}
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    """包含 12 个 Markdown 文件的目录"""
+    for i in range(12):
+        (tmp_path / f"doc_{i:02d}.md").write_text(f"# 标题{i}\n\n系统科学内容 {i}", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.mark.fast
+class TestStreamingImportPipeline:
+    """StreamingImportPipeline测试"""
+
+    def test_indexes_in_bounded_batches(self, repo_dir):
+        """测试按批写入，结果只保留文件记录和向量ID"""
+        index_manager = RecordingIndexManager()
+        pipeline = StreamingImportPipeline(index_manager, batch_files=5, queue_size=1)
+
+        result = pipeline.run(LocalFileSource(repo_dir))
+
+        assert [len(b) for b in index_manager.batches] == [5, 5, 2]
+        assert result.file_count == 12
+        assert result.batch_count == 3
+        assert set(result.file_hashes) == {f"doc_{i:02d}.md" for i in range(12)}
+        assert result.vector_ids_map["doc_03.md"] == ["id-doc_03.md"]
+
+    def test_parsing_is_bounded_by_queue(self, repo_dir, mocker):
+        """测试解析领先写入的批次数不超过队列容量"""
+        parsed = []
+        lead = []
+        index_manager = RecordingIndexManager(
+            delay=0.05, on_batch=lambda n: lead.append(len(parsed) - n)
+        )
+        pipeline = StreamingImportPipeline(index_manager, batch_files=1, queue_size=2)
+        real_parse = pipeline._parse_batch
+        mocker.patch.object(
+            pipeline, '_parse_batch',
+            side_effect=lambda files: parsed.append(files) or real_parse(files),
+        )
+
+        pipeline.run(LocalFileSource(repo_dir))
+
+        # 队列中最多 2 批，加上生产者手中正在等待放入的 1 批
+        assert max(lead) <= 3
+        assert len(index_manager.batches) == 12
+
+    def test_reports_progress(self, repo_dir):
+        """测试进度写入 VECTORIZE 阶段，总数为扫描到的文件数"""
+        pm = ImportProgressManager("owner", "repo")
+        pipeline = StreamingImportPipeline(RecordingIndexManager(), progress_manager=pm, batch_files=4)
+
+        pipeline.run(LocalFileSource(repo_dir))
+
+        progress = pm.get_stage_progress(ImportStage.VECTORIZE)
+        assert progress.total == 12
+        assert progress.current == 12
+        assert progress.end_time is not None
+
+    def test_cancel_stops_after_current_batch(self, repo_dir):
+        """测试取消后不再写入后续批次"""
+        pm = ImportProgressManager("owner", "repo")
+        index_manager = RecordingIndexManager(on_batch=lambda n: pm.request_cancel())
+        pipeline = StreamingImportPipeline(index_manager, progress_manager=pm, batch_files=3)
+
+        result = pipeline.run(LocalFileSource(repo_dir))
+
+        assert result.cancelled is True
+        assert len(index_manager.batches) == 1
+
+    def test_parse_error_propagates(self, repo_dir, mocker):
+        """测试扫描/解析异常传播到调用方且后台线程退出"""
+        pipeline = StreamingImportPipeline(RecordingIndexManager(), batch_files=3)
+        mocker.patch.object(pipeline, '_parse_batch', side_effect=RuntimeError("boom"))
+        before = threading.active_count()
+
+        with pytest.raises(RuntimeError, match="boom"):
+            pipeline.run(LocalFileSource(repo_dir))
+
+        time.sleep(0.1)
+        assert threading.active_count() <= before
+
+
+@pytest.mark.fast
+class TestStreamingSyncState:
+    """流式导入同步状态测试"""
+
+    def test_sync_state_from_records_and_deleted_vectors(self, tmp_path):
+        """测试用文件记录更新同步状态，并删除已移除文件的向量"""
+        manager = GitHubSyncManager(tmp_path / "sync_state.json")
+        manager.update_repository_sync_state(
+            "owner", "repo", "main", documents=[],
+            vector_ids_map={"a.md": ["a1"], "b.md": ["b1", "b2"]},
+            file_records={"a.md": {"hash": "h1", "size": 1}, "b.md": {"hash": "h2", "size": 2}},
+        )
+
+        changes = manager.detect_changes_from_hashes("owner", "repo", "main", {"a.md": "h1-new"})
+        assert changes.modified == ["a.md"]
+        assert changes.deleted == ["b.md"]
+
+        index_manager = MagicMock(spec=["chroma_collection"])
+        deleted = delete_file_vectors(index_manager, manager, "owner", "repo", "main", changes.deleted)
+
+        assert deleted == 2
+        index_manager.chroma_collection.delete.assert_called_once_with(ids=["b1", "b2"])
+
+    def test_unchanged_files_skipped_before_chunking(self, tmp_path, mocker):
+        """测试内容哈希与同步状态一致的文件沿用已记录的向量ID，其余文件连同同步管理器交给 build_index"""
+        from llama_index.core.schema import Document as LlamaDocument
+
+        metadata = {"repository": "owner/repo", "branch": "main"}
+        manager = GitHubSyncManager(tmp_path / "sync_state.json")
+        manager.update_repository_sync_state(
+            "owner", "repo", "main",
+            documents=[
+                LlamaDocument(text="不变", metadata={"file_path": "a.md"}),
+                LlamaDocument(text="修改前", metadata={"file_path": "b.md"}),
+            ],
+            vector_ids_map={"a.md": ["a1"], "b.md": ["b1"]},
+        )
+        documents = [
+            LlamaDocument(text="不变", metadata={"file_path": "a.md", **metadata}),
+            LlamaDocument(text="修改后", metadata={"file_path": "b.md", **metadata}),
+        ]
+        index_manager = RecordingIndexManager()
+        pipeline = StreamingImportPipeline(index_manager, github_sync_manager=manager)
+        mocker.patch.object(pipeline, 'iter_document_batches', return_value=iter([documents]))
+
+        result = pipeline.run(LocalFileSource(tmp_path))
+
+        assert index_manager.batches == [["b.md"]]
+        assert index_manager.sync_managers == [manager]
+        assert result.vector_ids_map == {"a.md": ["a1"], "b.md": ["id-b.md"]}
+        assert set(result.file_hashes) == {"a.md", "b.md"}
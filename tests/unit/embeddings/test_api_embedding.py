@@ -10,14 +10,21 @@ from backend.infrastructure.embeddings.base import BaseEmbedding
 from backend.infrastructure.embeddings.hf_inference_embedding import HFInferenceEmbedding
 
 
+@pytest.fixture(autouse=True)
+def per_text_request_mode(monkeypatch):
+    """本文件覆盖逐条请求模式（批量模式见 test_hf_api_client.py）"""
+    from backend.infrastructure.config import config
+    monkeypatch.setattr(config, 'HF_REQUEST_BATCH_SIZE', 1, raising=False)
+
+
 @pytest.mark.fast
 class TestAPIEmbedding:
     """APIEmbedding测试"""
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_api_embedding_init(self, mock_post):
         """测试HFInferenceEmbedding初始化"""
-        # Mock requests.post 返回测试向量
+        # Mock requests.Session.post 返回测试向量
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 768
         mock_response.raise_for_status = Mock()
@@ -36,7 +43,7 @@ class TestAPIEmbedding:
         assert embedding.get_model_name() == model_name
         assert embedding.get_embedding_dimension() == 768
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_api_embedding_get_query_embedding(self, mock_post):
         """测试API查询向量化（Mock）"""
         mock_response = Mock()
@@ -57,7 +64,7 @@ class TestAPIEmbedding:
         
         assert mock_post.call_count == 1
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_api_embedding_get_text_embeddings_batch(self, mock_post):
         """测试API批量向量化（Mock）"""
         # 为每个文本返回不同的向量
@@ -81,7 +88,7 @@ class TestAPIEmbedding:
         assert len(vectors) == len(texts)
         assert all(len(v) == 768 for v in vectors)
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_api_embedding_with_api_key(self, mock_post):
         """测试带API密钥的API调用"""
         mock_response = Mock()
@@ -96,19 +103,17 @@ class TestAPIEmbedding:
         
         embedding.get_query_embedding("test")
         
-        # 验证 requests.post 使用正确的 headers（包含 API key）
+        # 验证请求经由连接池 Session 发送，Session 带有正确的 headers（包含 API key）
         assert mock_post.call_count == 1
-        call_kwargs = mock_post.call_args[1]
-        assert 'headers' in call_kwargs
-        assert 'Authorization' in call_kwargs['headers']
-        assert 'Bearer test-key-123' in call_kwargs['headers']['Authorization']
+        headers = embedding._api_client._get_session().headers
+        assert 'Bearer test-key-123' in headers['Authorization']
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_api_embedding_error_handling(self, mock_post):
         """测试API错误处理"""
         from requests.exceptions import ConnectionError
         
-        # Mock requests.post 抛出网络错误
+        # Mock requests.Session.post 抛出网络错误
         mock_post.side_effect = ConnectionError("Network error")
         
         embedding = HFInferenceEmbedding(
@@ -0,0 +1,224 @@
+"""
+HFAPIClient 批量模式测试
+
+测试批量请求、异步请求、413 拆分、429 退避和吞吐统计。
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+import requests
+from unittest.mock import Mock
+
+from backend.infrastructure.embeddings.hf_api_client import AdaptiveBatchSizer, HFAPIClient
+
+
+def _ok_response(texts):
+    """构造批量成功响应"""
+    response = Mock()
+    response.status_code = 200
+    response.raise_for_status = Mock()
+    response.json.return_value = [[float(len(t)), 0.0] for t in texts]
+    return response
+
+
+def _error_response(status_code, headers=None):
+    """构造 HTTP 错误响应"""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.text = "error"
+    response.raise_for_status = Mock(side_effect=requests.HTTPError(response=response))
+    return response
+
+
+@pytest.fixture
+def client():
+    """批量模式客户端"""
+    instance = HFAPIClient(
+        api_url="https://example.com/feature-extraction",
+        headers={"Authorization": "Bearer hf_test"},
+        model_name="BAAI/bge-base-zh-v1.5",
+        closed=False,
+        active_requests=set(),
+        request_batch_size=4,
+    )
+    yield instance
+    instance.close()
+
+
+@pytest.mark.fast
+class TestAdaptiveBatchSizer:
+    """AdaptiveBatchSizer测试"""
+
+    def test_plan_respects_batch_size_and_payload(self):
+        """测试按批次大小和负载字节数切分"""
+        sizer = AdaptiveBatchSizer(max_batch_size=3, max_payload_bytes=20)
+
+        assert sizer.plan(["a", "b", "c", "d"]) == [["a", "b", "c"], ["d"]]
+        assert sizer.plan(["x" * 12, "y" * 12]) == [["x" * 12], ["y" * 12]]
+
+    def test_shrink_and_recover(self):
+        """测试减半后在连续成功时恢复"""
+        sizer = AdaptiveBatchSizer(max_batch_size=8)
+        sizer.shrink()
+        sizer.shrink()
+        assert sizer.batch_size == 2
+
+        for _ in range(30):
+            sizer.record_success()
+        assert sizer.batch_size == 8
+
+    def test_shrink_tightens_payload_cap(self):
+        """测试减半时同时收紧负载上限（413 时按字节拆得更小），恢复后回到上限"""
+        sizer = AdaptiveBatchSizer(max_batch_size=100, max_payload_bytes=64 * 1024)
+        texts = ["x" * 1020] * 60  # 每个 1KB
+
+        assert len(sizer.plan(texts)) == 1
+        sizer.shrink()
+        assert sizer.payload_bytes == 32 * 1024
+        assert all(sum(len(t) + 4 for t in batch) <= 32 * 1024 for batch in sizer.plan(texts))
+        for _ in range(3):
+            sizer.shrink()
+        assert sizer.payload_bytes == 16 * 1024
+
+        for _ in range(60):
+            sizer.record_success()
+        assert sizer.payload_bytes == 64 * 1024 and sizer.batch_size == 100
+
+
+@pytest.mark.fast
+class TestHFAPIClientBatchMode:
+    """HFAPIClient批量模式测试"""
+
+    def test_batches_texts_into_single_requests(self, client, mocker):
+        """测试多个文本合并为批量请求，且结果顺序与输入一致"""
+        mock_post = mocker.patch.object(
+            requests.Session, 'post',
+            side_effect=lambda url, json, timeout: _ok_response(json["inputs"]),
+        )
+        mocker.patch('backend.infrastructure.embeddings.hf_api_client.record_api_call')
+
+        texts = [f"文本{'x' * i}" for i in range(10)]
+        results = client.make_request(texts)
+
+        assert mock_post.call_count == 3  # 4 + 4 + 2
+        assert [r[0] for r in results] == [float(len(t)) for t in texts]
+
+    def test_413_splits_batch(self, client, mocker):
+        """测试负载过大时拆分批次并缩小批次大小"""
+        def fake_post(url, json, timeout):
+            if len(json["inputs"]) > 2:
+                return _error_response(413)
+            return _ok_response(json["inputs"])
+
+        mocker.patch.object(requests.Session, 'post', side_effect=fake_post)
+        mocker.patch('backend.infrastructure.embeddings.hf_api_client.record_api_call')
+
+        results = client.make_request(["a", "bb", "ccc", "dddd"])
+
+        assert [r[0] for r in results] == [1.0, 2.0, 3.0, 4.0]
+        assert client._batch_sizer.batch_size < 4
+
+    def test_429_honors_retry_after(self, client, mocker):
+        """测试被限流时按 Retry-After 等待后重试"""
+        responses = [_error_response(429, {"Retry-After": "2"})]
+        mocker.patch.object(
+            requests.Session, 'post',
+            side_effect=lambda url, json, timeout: responses.pop() if responses else _ok_response(json["inputs"]),
+        )
+        mock_sleep = mocker.patch('backend.infrastructure.embeddings.hf_api_client.time.sleep')
+        mocker.patch('backend.infrastructure.embeddings.hf_api_client.record_api_call')
+
+        results = client.make_request(["a", "bb"])
+
+        assert len(results) == 2
+        mock_sleep.assert_called_once_with(2.0)
+        assert client._batch_sizer.batch_size == 2
+
+    def test_records_request_count_and_payload(self, client, mocker):
+        """测试统计中记录实际请求数和负载字节数"""
+        mocker.patch.object(
+            requests.Session, 'post',
+            side_effect=lambda url, json, timeout: _ok_response(json["inputs"]),
+        )
+        mock_record = mocker.patch('backend.infrastructure.embeddings.hf_api_client.record_api_call')
+
+        client.make_request(["ab", "cd", "ef", "gh", "ij"])
+
+        kwargs = mock_record.call_args.kwargs
+        assert kwargs["text_count"] == 5
+        assert kwargs["request_count"] == 2
+        assert kwargs["payload_bytes"] == 10
+
+
+@pytest.mark.fast
+class TestHFAPIClientAsync:
+    """HFAPIClient异步模式测试"""
+
+    @pytest.mark.asyncio
+    async def test_amake_request_batches_and_preserves_order(self, client, mocker):
+        """测试异步批量请求：按批次发送，结果顺序与输入一致"""
+        requests_seen = []
+
+        def handler(request):
+            inputs = json.loads(request.content)["inputs"]
+            requests_seen.append(inputs)
+            return httpx.Response(200, json=[[float(len(t)), 0.0] for t in inputs])
+
+        mocker.patch.object(
+            client, '_create_async_client',
+            return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        mocker.patch('backend.infrastructure.embeddings.hf_api_client.record_api_call')
+
+        texts = ["a" * i for i in range(1, 10)]
+        results = await client.amake_request(texts)
+        await client.aclose()
+
+        assert len(requests_seen) == 3  # 4 + 4 + 1
+        assert [r[0] for r in results] == [float(len(t)) for t in texts]
+
+    @pytest.mark.asyncio
+    async def test_amake_request_splits_on_413(self, client, mocker):
+        """测试异步模式下 413 拆分批次"""
+        def handler(request):
+            inputs = json.loads(request.content)["inputs"]
+            if len(inputs) > 1:
+                return httpx.Response(413, text="too large")
+            return httpx.Response(200, json=[[1.0, 2.0]])
+
+        mocker.patch.object(
+            client, '_create_async_client',
+            return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        mocker.patch('backend.infrastructure.embeddings.hf_api_client.record_api_call')
+
+        results = await client.amake_request(["a", "b", "c"])
+        await client.aclose()
+
+        assert results == [[1.0, 2.0]] * 3
+        assert client._batch_sizer.batch_size == 1
+
+    def test_async_client_closed_when_loop_ends(self, client, mocker):
+        """测试每次 asyncio.run() 结束时关闭该事件循环上的客户端，不遗留连接"""
+        created = []
+
+        def create():
+            instance = httpx.AsyncClient(transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json=[[1.0, 2.0]] * len(json.loads(request.content)["inputs"]))
+            ))
+            created.append(instance)
+            return instance
+
+        mocker.patch.object(client, '_create_async_client', side_effect=create)
+        mocker.patch('backend.infrastructure.embeddings.hf_api_client.record_api_call')
+
+        for _ in range(2):
+            assert asyncio.run(client.amake_request(["a", "b"])) == [[1.0, 2.0]] * 2
+
+        assert len(created) == 2
+        assert all(instance.is_closed for instance in created)
+        assert len(client._async_clients) == 0
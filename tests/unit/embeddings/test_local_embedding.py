@@ -5,6 +5,8 @@ LocalEmbedding 测试
 """
 
 import pytest
+from unittest.mock import MagicMock
+
 from backend.infrastructure.embeddings.base import BaseEmbedding
 from backend.infrastructure.embeddings.local_embedding import LocalEmbedding
 
@@ -86,3 +88,36 @@ class TestLocalEmbedding:
                 assert len(vector) == dimension
         except Exception as e:
             pytest.skip(f"LocalEmbedding维度一致性测试失败: {e}")
+
+
+@pytest.mark.fast
+class TestLocalEmbeddingQueryBatch:
+    """批量查询向量化测试（不加载模型）"""
+
+    def _embedding(self, model):
+        embedding = LocalEmbedding.__new__(LocalEmbedding)
+        embedding.model_name = "fake-model"
+        embedding.max_length = 512
+        embedding._model = model
+        return embedding
+
+    def test_queries_encoded_in_one_call(self):
+        """测试多个查询一次模型调用编码"""
+        model = MagicMock()
+        model._embed.side_effect = lambda texts, prompt_name: [[float(len(t)), 1.0] for t in texts]
+        embedding = self._embedding(model)
+
+        vectors = embedding.get_query_embeddings(["一", "二二", "三三三"])
+
+        assert vectors == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+        model._embed.assert_called_once_with(["一", "二二", "三三三"], prompt_name="query")
+        model.get_query_embedding.assert_not_called()
+
+    def test_falls_back_to_single_queries(self):
+        """测试模型不支持批量查询接口时逐条编码"""
+        model = MagicMock(spec=["get_query_embedding"])
+        model.get_query_embedding.side_effect = lambda t: [float(len(t))]
+        embedding = self._embedding(model)
+
+        assert embedding.get_query_embeddings(["一", "二二"]) == [[1.0], [2.0]]
+        assert model.get_query_embedding.call_count == 2
@@ -0,0 +1,73 @@
+"""
+向量量化测试
+
+测试 float16 / int8 量化误差、量化内积与单向量编解码。
+"""
+
+import numpy as np
+import pytest
+
+from backend.infrastructure.embeddings.quantization import (
+    bytes_per_vector,
+    check_dtype,
+    decode_vector,
+    dequantize,
+    encode_vector,
+    quantize,
+    quantized_scores,
+)
+
+
+def _vectors(rows=200, dim=64):
+    vectors = np.random.default_rng(0).normal(size=(rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.fast
+class TestQuantization:
+    """量化测试"""
+
+    @pytest.mark.parametrize("dtype,tolerance", [("float32", 0.0), ("float16", 1e-3), ("int8", 1e-2)])
+    def test_round_trip_error(self, dtype, tolerance):
+        """测试量化后还原的误差"""
+        vectors = _vectors()
+
+        codes, scales = quantize(vectors, dtype)
+
+        assert codes.dtype == np.dtype(dtype)
+        assert (scales is not None) == (dtype == "int8")
+        assert np.abs(dequantize(codes, scales) - vectors).max() <= tolerance
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+    def test_quantized_scores_close_to_exact(self, dtype):
+        """测试量化内积与全精度内积接近"""
+        vectors = _vectors()
+        query = vectors[0]
+
+        scores = quantized_scores(*quantize(vectors, dtype), query)
+
+        assert scores.dtype == np.float32
+        assert np.allclose(scores, vectors @ query, atol=2e-2)
+        assert int(np.argmax(scores)) == 0
+
+    def test_int8_zero_vector(self):
+        """测试零向量量化不产生 NaN"""
+        codes, scales = quantize(np.zeros((1, 4), dtype=np.float32), "int8")
+
+        assert np.all(codes == 0) and np.all(np.isfinite(scales))
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+    def test_encode_decode_vector(self, dtype):
+        """测试单向量编解码与字节数"""
+        vector = _vectors(1, 32)[0]
+
+        blob = encode_vector(vector.tolist(), dtype)
+
+        assert len(blob) == bytes_per_vector(32, dtype)
+        assert np.allclose(decode_vector(blob, dtype), vector, atol=1e-2)
+
+    def test_check_dtype(self):
+        """测试存储精度名称校验"""
+        assert check_dtype("Float16") == "float16"
+        with pytest.raises(ValueError):
+            check_dtype("int4")
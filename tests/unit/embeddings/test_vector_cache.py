@@ -0,0 +1,145 @@
+"""
+EmbeddingVectorCache 测试
+
+测试持久化向量缓存的命中、LRU 淘汰和透明包装。
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from backend.infrastructure.embeddings import vector_cache
+from backend.infrastructure.embeddings.vector_cache import (
+    EmbeddingVectorCache,
+    cached_embed,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """临时目录中的向量缓存"""
+    instance = EmbeddingVectorCache(db_path=tmp_path / "embeddings.sqlite3", max_size_mb=1)
+    yield instance
+    instance.close()
+
+
+@pytest.mark.fast
+class TestEmbeddingVectorCache:
+    """EmbeddingVectorCache测试"""
+
+    def test_put_and_get(self, cache):
+        """测试写入后命中"""
+        cache.put_many("model-a", 512, ["文本1", "文本2"], [[0.5, 1.0], [0.25, 2.0]])
+
+        results = cache.get_many("model-a", 512, ["文本1", "未缓存", "文本2"])
+
+        assert results[0] == [0.5, 1.0]
+        assert results[1] is None
+        assert results[2] == [0.25, 2.0]
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_key_includes_model_and_max_length(self, cache):
+        """测试模型名和max_length不同的向量互不命中"""
+        cache.put_many("model-a", 512, ["文本"], [[1.0]])
+
+        assert cache.get_many("model-b", 512, ["文本"]) == [None]
+        assert cache.get_many("model-a", 256, ["文本"]) == [None]
+        assert cache.get_many("model-a", 512, ["文本"], namespace="query") == [None]
+
+    def test_persists_across_instances(self, tmp_path):
+        """测试缓存持久化到磁盘"""
+        db_path = tmp_path / "embeddings.sqlite3"
+        first = EmbeddingVectorCache(db_path=db_path)
+        first.put_many("model-a", 512, ["文本"], [[1.0, 2.0]])
+        first.close()
+
+        second = EmbeddingVectorCache(db_path=db_path)
+        try:
+            assert second.get_many("model-a", 512, ["文本"]) == [[1.0, 2.0]]
+        finally:
+            second.close()
+
+    def test_quantized_storage(self, tmp_path):
+        """测试 float16 / int8 存储减小体积，切换精度后旧条目仍可读取"""
+        db_path = tmp_path / "embeddings.sqlite3"
+        vector = [0.1 * i - 1.5 for i in range(32)]
+        sizes = {}
+        for dtype in ("float32", "float16", "int8"):
+            instance = EmbeddingVectorCache(db_path=db_path, dtype=dtype)
+            instance.put_many("model-a", 512, [dtype], [vector])
+            sizes[dtype] = instance.get_stats()["size_bytes"] - sum(sizes.values())
+            instance.close()
+
+        reader = EmbeddingVectorCache(db_path=db_path, dtype="float16")
+        try:
+            results = reader.get_many("model-a", 512, ["float32", "float16", "int8"])
+        finally:
+            reader.close()
+
+        assert sizes == {"float32": 128, "float16": 64, "int8": 36}
+        assert results[0] == pytest.approx(vector, abs=1e-6)
+        assert results[1] == pytest.approx(vector, abs=2e-3)
+        assert results[2] == pytest.approx(vector, abs=1e-2)
+
+    def test_lru_eviction(self, cache):
+        """测试超出容量后淘汰最久未访问的条目"""
+        dim = 1024  # 每条 4KB，1MB 上限约 256 条
+        cache.put_many("model-a", 512, ["keep"], [[1.0] * dim])
+        for i in range(300):
+            cache.put_many("model-a", 512, [f"text-{i}"], [[0.0] * dim])
+            # 持续访问 keep，使其保持最近使用
+            cache.get_many("model-a", 512, ["keep"])
+
+        stats = cache.get_stats()
+        assert stats["size_bytes"] <= stats["max_bytes"]
+        assert cache.get_many("model-a", 512, ["keep"])[0] is not None
+        assert cache.get_many("model-a", 512, ["text-0"])[0] is None
+
+
+@pytest.mark.fast
+class TestCachedEmbed:
+    """cached_embed测试"""
+
+    def test_only_missing_texts_are_computed(self, cache):
+        """测试仅对未命中且去重后的文本调用模型"""
+        vector_cache.set_vector_cache(cache)
+        compute = Mock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+
+        first = cached_embed("model-a", 512, ["a", "bb", "a"], compute)
+        second = cached_embed("model-a", 512, ["bb", "ccc"], compute)
+
+        assert first == [[1.0], [2.0], [1.0]]
+        assert second == [[2.0], [3.0]]
+        assert compute.call_count == 2
+        assert compute.call_args_list[0].args[0] == ["a", "bb"]
+        assert compute.call_args_list[1].args[0] == ["ccc"]
+
+    def test_disabled_cache_calls_through(self):
+        """测试未启用缓存时直接调用模型"""
+        vector_cache.set_vector_cache(None)
+        compute = Mock(return_value=[[1.0]])
+
+        assert cached_embed("model-a", 512, ["a"], compute) == [[1.0]]
+        assert cached_embed("model-a", 512, ["a"], compute) == [[1.0]]
+        assert compute.call_count == 2
+
+    def test_hf_inference_embedding_uses_cache(self, cache, mocker):
+        """测试HFInferenceEmbedding重复文本不重复请求API"""
+        from backend.infrastructure.embeddings.hf_inference_embedding import HFInferenceEmbedding
+
+        vector_cache.set_vector_cache(cache)
+        mock_response = Mock()
+        mock_response.json.return_value = [0.5] * 768
+        mock_response.raise_for_status = Mock()
+        mock_post = mocker.patch('requests.Session.post', return_value=mock_response)
+
+        embedding = HFInferenceEmbedding(
+            model_name="BAAI/bge-base-zh-v1.5", api_key="hf_test", request_batch_size=1
+        )
+        embedding.get_text_embeddings(["文本1", "文本2"])
+        embedding.get_text_embeddings(["文本1", "文本2"])
+        vector = embedding.get_query_embedding("文本1")
+
+        assert mock_post.call_count == 2
+        assert len(vector) == 768
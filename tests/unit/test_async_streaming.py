@@ -0,0 +1,165 @@
+"""
+异步流式查询单元测试
+
+测试流式查询的检索、后处理与生成都不阻塞事件循环，多个流式请求可以并发执行。
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from backend.business.rag_engine.core.engine_speculative import PrefetchedRetriever
+from backend.business.rag_engine.core.engine_streaming import execute_stream_query
+from backend.business.rag_engine.retrieval.async_retrieve import aretrieve_nodes, is_native_async
+from backend.infrastructure.llms.deepseek_logger import LLMLogger
+
+
+def _nodes(*ids):
+    return [NodeWithScore(node=TextNode(id_=node_id, text=f"内容{node_id}"), score=0.9) for node_id in ids]
+
+
+class _Chunk:
+    def __init__(self, delta):
+        self.delta = delta
+
+
+class _AsyncLLM:
+    """只提供 astream_chat 的LLM（调用 stream_chat 视为阻塞）"""
+
+    def __init__(self, tokens, delay=0.05):
+        self.tokens = tokens
+        self.delay = delay
+        self.messages = None
+
+    def stream_chat(self, messages):
+        raise AssertionError("流式查询不应调用同步 stream_chat")
+
+    async def astream_chat(self, messages, **kwargs):
+        self.messages = messages
+
+        async def gen():
+            for token in self.tokens:
+                await asyncio.sleep(self.delay)
+                yield _Chunk(token)
+
+        return gen()
+
+
+class _BlockingRetriever:
+    """同步检索（阻塞）"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def retrieve(self, query):
+        time.sleep(self.delay)
+        return _nodes("a", "b")
+
+
+class _BlockingReranker:
+    """CPU密集的后处理器（阻塞）"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def postprocess_nodes(self, nodes, query_str=None):
+        time.sleep(self.delay)
+        return nodes[:1]
+
+
+async def _collect(retriever, postprocessors, llm):
+    formatter = MagicMock()
+    formatter.format.side_effect = lambda answer, _: answer
+    return [
+        chunk
+        async for chunk in execute_stream_query(
+            llm, formatter, None, retriever, postprocessors, None, False, "vector", 3, "什么是系统科学"
+        )
+    ]
+
+
+@pytest.mark.fast
+class TestAsyncStreaming:
+    """异步流式查询测试"""
+
+    def test_blocking_stages_do_not_block_event_loop(self):
+        """测试同步检索与重排序在线程中执行，并发流式请求互不阻塞"""
+        async def run():
+            gaps = []
+
+            async def heartbeat():
+                last = time.perf_counter()
+                while True:
+                    await asyncio.sleep(0.01)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            ticker = asyncio.create_task(heartbeat())
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                _collect(_BlockingRetriever(0.2), [_BlockingReranker(0.2)], _AsyncLLM(["系统", "科学"]))
+                for _ in range(4)
+            ])
+            elapsed = time.perf_counter() - start
+            ticker.cancel()
+            return results, elapsed, gaps
+
+        results, elapsed, gaps = asyncio.run(run())
+
+        for chunks in results:
+            assert [c["data"] for c in chunks if c["type"] == "token"] == ["系统", "科学"]
+            assert chunks[-1]["type"] == "done"
+            assert chunks[-1]["data"]["answer"] == "系统科学"
+            assert len(chunks[-1]["data"]["sources"]) == 1
+        # 串行执行需要 4 × (0.2 + 0.2 + 0.1) = 2 秒
+        assert elapsed < 1.5
+        assert max(gaps) < 0.15
+
+    def test_native_async_retriever_is_awaited(self, mocker):
+        """测试声明 native_async 的检索器直接 await，不占用线程"""
+        to_thread = mocker.patch('asyncio.to_thread')
+        retriever = PrefetchedRetriever(_nodes("a"))
+
+        nodes = asyncio.run(aretrieve_nodes(retriever, "q"))
+
+        assert is_native_async(retriever)
+        assert not is_native_async(_BlockingRetriever(0))
+        assert [n.node.node_id for n in nodes] == ["a"]
+        to_thread.assert_not_called()
+
+    def test_llm_logger_astream_chat(self):
+        """测试日志包装器的 astream_chat 清理消息并逐个返回 chunk"""
+        llm = _AsyncLLM(["答", "案"], delay=0)
+        wrapper = LLMLogger(llm)
+
+        async def run():
+            return [chunk.delta async for chunk in await wrapper.astream_chat([{"role": "user", "content": "问题"}])]
+
+        assert asyncio.run(run()) == ["答", "案"]
+        assert llm.messages is not None
+
+    def test_llm_logger_astream_complete(self, mocker):
+        """测试日志包装器拦截 astream_complete，记录请求与完整响应"""
+        async def astream_complete(prompt, **kwargs):
+            async def gen():
+                for token in ["答", "案"]:
+                    yield MagicMock(text=token)
+            return gen()
+
+        llm = MagicMock(model="deepseek-chat")
+        llm.astream_complete.side_effect = astream_complete
+        info = mocker.patch('backend.infrastructure.llms.deepseek_logger.logger.info')
+        wrapper = LLMLogger(llm)
+
+        async def run():
+            return [chunk.text async for chunk in await wrapper.astream_complete("问题")]
+
+        assert asyncio.run(run()) == ["答", "案"]
+        llm.astream_complete.assert_called_once_with("问题")
+        logged = [call.args[0] for call in info.call_args_list]
+        assert any("astream_complete" in line for line in logged)
+        assert any("响应内容: 答案" in line for line in logged)
@@ -0,0 +1,269 @@
+"""
+BM25索引单元测试
+
+测试中文分词、增量维护、持久化、按 collection 共享以及检索器工厂接入。
+"""
+
+import pytest
+from llama_index.core.schema import TextNode
+
+from backend.infrastructure.text_index import registry
+from backend.infrastructure.text_index.bm25_index import BM25Index, tokenize
+from tests.fixtures.mocks import InMemoryChromaCollection
+
+
+DOCS = {
+    "n1": "钱学森提出了系统工程的方法论",
+    "n2": "控制论研究反馈与调节",
+    "n3": "系统科学的体系结构包括系统论和系统工程",
+}
+
+
+def _put(collection, node_id, text):
+    collection.put(node_id, text, metadata={"file_path": f"{node_id}.md"})
+
+
+def _collection(docs=DOCS, name="test_collection"):
+    collection = InMemoryChromaCollection(name)
+    for node_id, text in docs.items():
+        _put(collection, node_id, text)
+    return collection
+
+
+@pytest.mark.fast
+class TestBM25Index:
+    """BM25Index测试"""
+
+    def test_bigram_tokenizer(self):
+        """测试中文二元组与英文单词分词"""
+        assert tokenize("系统工程 Feedback", "bigram") == ["系统", "统工", "工程", "feedback"]
+
+    def test_search_ranks_relevant_first(self):
+        """测试相关文档排在前面"""
+        index = BM25Index("t")
+        index.add((k, v, {}) for k, v in DOCS.items())
+
+        hits = index.search("系统工程", top_k=3)
+
+        assert {h[0] for h in hits} == {"n1", "n3"}
+
+    def test_incremental_matches_rebuild(self):
+        """测试增量添加/删除后与全量构建的分数一致"""
+        incremental = BM25Index("t")
+        incremental.add((k, v, {}) for k, v in DOCS.items())
+        incremental.add([("n4", "反馈控制系统", {})])
+        incremental.delete(["n1"])
+
+        rebuilt = BM25Index("t")
+        rebuilt.add([("n2", DOCS["n2"], {}), ("n3", DOCS["n3"], {}), ("n4", "反馈控制系统", {})])
+
+        assert incremental.search("反馈系统", top_k=5) == rebuilt.search("反馈系统", top_k=5)
+
+    def test_persistence_round_trip(self, tmp_path):
+        """测试持久化后加载结果一致"""
+        index = BM25Index("t", persist_path=tmp_path / "bm25.json.gz")
+        index.add((k, v, {"k": k}) for k, v in DOCS.items())
+        index.save()
+
+        loaded = BM25Index("t", persist_path=tmp_path / "bm25.json.gz")
+        assert loaded.load() is True
+        assert loaded.search("控制论", top_k=2) == index.search("控制论", top_k=2)
+
+        other = BM25Index("t", persist_path=tmp_path / "bm25.json.gz", tokenizer="jieba")
+        assert other.load() is False
+
+
+@pytest.mark.fast
+class TestBM25Registry:
+    """BM25注册表测试"""
+
+    def test_shared_per_collection_and_persisted(self):
+        """测试同一 collection 共享索引，重启后从磁盘加载而不重新拉取"""
+        collection = _collection()
+
+        first = registry.get_bm25_index(collection)
+        second = registry.get_bm25_index(collection)
+        assert first is second
+        assert first.search("反馈", top_k=1)[0][3]["file_path"] == "n2.md"
+
+        registry.reset_bm25_indexes()
+        calls = collection.get_calls
+        reloaded = registry.get_bm25_index(collection)
+        assert len(reloaded) == 3
+        assert collection.get_calls == calls
+
+    @pytest.fixture
+    def inline_rebuild(self, monkeypatch):
+        """后台重建改为同步执行，并记录调用"""
+        from backend.infrastructure.config import config
+        from backend.infrastructure.indexer.utils.version import reset_collection_versions
+
+        monkeypatch.setattr(config, 'BM25_VERSION_CHECK_SECONDS', 0, raising=False)
+        reset_collection_versions()
+        started = []
+
+        def run(target, name, *args):
+            started.append(name)
+            target(*args)
+
+        monkeypatch.setattr(registry, '_run_in_background', run)
+        yield started
+        reset_collection_versions()
+
+    def test_rebuild_when_collection_count_changes(self, inline_rebuild):
+        """测试节点数与 collection 不一致时构建新索引后替换"""
+        collection = _collection()
+        index = registry.get_bm25_index(collection)
+
+        _put(collection, "n4", "涌现是系统整体的性质")
+        assert registry.get_bm25_index(collection) is index
+        assert len(inline_rebuild) == 1
+
+        rebuilt = registry.get_bm25_index(collection)
+        assert rebuilt is not index and len(index) == 3
+        assert rebuilt.search("涌现", top_k=1)[0][0] == "n4"
+
+    def test_no_rebuild_while_writing(self, inline_rebuild):
+        """测试本进程近期写入过时，节点数不一致不触发重建"""
+        from backend.infrastructure.indexer.utils.version import bump_collection_version
+
+        collection = _collection()
+        index = registry.get_bm25_index(collection)
+        _put(collection, "n4", "涌现是系统整体的性质")
+        bump_collection_version(collection)
+        registry.notify_bm25_changes(collection, added_ids=["n4"])
+        _put(collection, "n5", "反馈调节维持稳态")  # 导入进行中，通知尚未到达
+
+        assert registry.get_bm25_index(collection) is index
+        assert inline_rebuild == []
+
+    def test_changes_during_rebuild_replayed(self, inline_rebuild, monkeypatch):
+        """测试重建期间到达的增量变更在替换前补到新索引"""
+        collection = _collection()
+        registry.get_bm25_index(collection)
+        _put(collection, "n4", "涌现是系统整体的性质")
+        load = BM25Index.load_from_collection
+
+        def load_then_write(self, coll):
+            result = load(self, coll)
+            _put(coll, "n5", "反馈调节维持稳态")
+            del coll.records["n1"]
+            registry.notify_bm25_changes(coll, added_ids=["n5"], deleted_ids=["n1"])
+            return result
+
+        monkeypatch.setattr(BM25Index, 'load_from_collection', load_then_write)
+        registry.get_bm25_index(collection)
+
+        rebuilt = registry.get_bm25_index(collection)
+        assert len(rebuilt) == collection.count() == 4
+        assert rebuilt.search("稳态", top_k=1)[0][0] == "n5"
+        assert rebuilt.search("钱学森", top_k=1) == []
+
+    def test_notify_changes_updates_incrementally(self):
+        """测试向量写入/删除通知增量更新索引"""
+        collection = _collection()
+        index = registry.get_bm25_index(collection)
+
+        _put(collection, "n4", "涌现是系统整体的性质")
+        del collection.records["n2"]
+        registry.notify_bm25_changes(collection, added_ids=["n4"], deleted_ids=["n2"])
+
+        assert len(index) == 3
+        assert index.search("涌现", top_k=1)[0][0] == "n4"
+        assert index.search("控制论", top_k=1) == []
+
+    def test_delete_vectors_notifies_bm25(self):
+        """测试删除向量时同步删除BM25条目"""
+        from unittest.mock import MagicMock
+        from backend.infrastructure.indexer.utils.ids import delete_vectors_by_ids
+
+        collection = _collection()
+        collection.delete = MagicMock()
+        index = registry.get_bm25_index(collection)
+        index_manager = MagicMock(chroma_collection=collection)
+
+        delete_vectors_by_ids(index_manager, ["n1"])
+
+        collection.delete.assert_called_once_with(ids=["n1"])
+        assert len(index) == 2
+
+    def test_vector_changes_fetched_once_for_all_sinks(self, monkeypatch):
+        """测试写入通知只拉取一次新增节点，BM25 与文件索引共用同一份结果"""
+        from unittest.mock import MagicMock
+        from backend.infrastructure.config import config
+        from backend.infrastructure.indexer.utils.ids import notify_vector_changes
+
+        monkeypatch.setattr(config, 'FILE_VECTORS_ENABLE', False, raising=False)
+        monkeypatch.setattr(config, 'VECTOR_REPLICA_ENABLE', False, raising=False)
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: target(*args))
+        collection = _collection()
+        index = registry.get_bm25_index(collection)
+        file_index = registry.get_file_index(collection)
+        _put(collection, "n4", "涌现是系统整体的性质")
+        collection.includes.clear()
+
+        notify_vector_changes(MagicMock(chroma_collection=collection), added_ids=["n4"])
+
+        assert collection.get_calls == 1
+        assert index.search("涌现", top_k=1)[0][0] == "n4"
+        assert file_index.chunk_ids("n4.md") == ["n4"]
+
+    def test_vector_changes_reach_every_sink(self, monkeypatch):
+        """测试写入通知把新增/删除ID与同一份记录（含向量）交给副本与文件向量"""
+        from unittest.mock import MagicMock
+        from backend.infrastructure.config import config
+        from backend.infrastructure.indexer.utils import file_vectors
+        from backend.infrastructure.indexer.utils.ids import notify_vector_changes
+        from backend.infrastructure.vector_replica import registry as replica_registry
+
+        monkeypatch.setattr(config, 'FILE_VECTORS_ENABLE', True, raising=False)
+        monkeypatch.setattr(config, 'VECTOR_REPLICA_ENABLE', False, raising=False)
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: target(*args))
+        replica_calls, file_vector_calls = [], []
+        monkeypatch.setattr(
+            replica_registry, 'notify_vector_replica_changes',
+            lambda coll, added_ids=(), deleted_ids=(), records=None: replica_calls.append(
+                (list(added_ids), list(deleted_ids), records)
+            ),
+        )
+        monkeypatch.setattr(
+            file_vectors, 'sync_file_vectors',
+            lambda manager, paths, records=None, chunk_counts=None: file_vector_calls.append(
+                (sorted(paths), chunk_counts)
+            ),
+        )
+        collection = _collection()
+        registry.get_bm25_index(collection)
+        registry.get_file_index(collection)
+        collection.put("n4", "涌现是系统整体的性质", metadata={"file_path": "n4.md"}, embedding=[1.0, 0.0])
+        del collection.records["n1"]
+        collection.includes.clear()
+
+        notify_vector_changes(MagicMock(chroma_collection=collection), added_ids=["n4"], deleted_ids=["n1"])
+
+        added_ids, deleted_ids, records = replica_calls[0]
+        assert (added_ids, deleted_ids) == (["n4"], ["n1"])
+        assert records["embeddings"] == [[1.0, 0.0]]
+        assert file_vector_calls == [(["n1.md", "n4.md"], {"n1.md": 0, "n4.md": 1})]
+        assert collection.includes == [["documents", "metadatas", "embeddings"]]
+
+
+@pytest.mark.fast
+class TestBM25RetrieverFactory:
+    """检索器工厂接入测试"""
+
+    def test_create_bm25_retriever_reuses_index(self):
+        """测试多次创建BM25检索器复用同一索引"""
+        from llama_index.core import VectorStoreIndex
+        from llama_index.core.embeddings import MockEmbedding
+        from backend.business.rag_engine.retrieval.factory import create_retriever
+
+        nodes = [TextNode(id_=k, text=v) for k, v in DOCS.items()]
+        index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+
+        first = create_retriever(index, "bm25", similarity_top_k=2)
+        second = create_retriever(index, "bm25", similarity_top_k=2)
+
+        assert first.bm25_index is second.bm25_index
+        results = first.retrieve("控制论")
+        assert results[0].node.node_id == "n2"
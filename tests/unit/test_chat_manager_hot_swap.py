@@ -0,0 +1,67 @@
+"""
+对话管理器热替换单元测试
+
+测试配置变更重建 ChatManager 时继承会话、复用配置未变的 LLM 与查询引擎。
+"""
+
+import pytest
+
+from backend.business.chat import ChatManager
+
+
+def _manager(index_manager, **kwargs):
+    kwargs.setdefault("api_key", "test-key")
+    return ChatManager(index_manager=index_manager, enable_markdown_formatting=False, **kwargs)
+
+
+@pytest.mark.fast
+class TestChatManagerHotSwap:
+    """ChatManager 热替换测试"""
+
+    def test_inherits_sessions(self):
+        """测试新管理器继承会话池与当前会话"""
+        old = _manager(None)
+        session = old.start_session("current")
+        old.sessions.get("user_a").session.add_turn("问", "答", [])
+
+        new = _manager(None, retrieval_strategy="bm25")
+        new.inherit_from(old)
+
+        assert new.get_current_session() is session
+        assert new.sessions is old.sessions
+        assert len(new.sessions.get("user_a").session.history) == 1
+
+    def test_reuses_components_when_config_unchanged(self):
+        """测试配置相同时复用查询引擎与 LLM 客户端"""
+        index_manager = object()
+        old = _manager(index_manager, retrieval_strategy="vector", temperature=0.3)
+        old._query_engine = engine = object()
+        old._llm = llm = object()
+
+        new = _manager(index_manager, retrieval_strategy="vector", temperature=0.3)
+        new.inherit_from(old)
+
+        assert new._query_engine is engine
+        assert new._llm is llm
+        assert new.warm_up()
+
+    def test_rebuilds_components_when_config_changed(self):
+        """测试配置变化的组件不复用，其余组件仍复用"""
+        index_manager = object()
+        old = _manager(index_manager, retrieval_strategy="vector", temperature=0.3)
+        old._query_engine = engine = object()
+        old._llm = object()
+
+        # 只改生成参数：查询引擎复用，LLM 重建
+        new = _manager(index_manager, retrieval_strategy="vector", temperature=0.9)
+        new.inherit_from(old)
+        assert new._query_engine is engine
+        assert new._llm is None
+
+        # 改检索策略或索引管理器：查询引擎重建
+        for other in (
+            _manager(index_manager, retrieval_strategy="bm25", temperature=0.3),
+            _manager(object(), retrieval_strategy="vector", temperature=0.3),
+        ):
+            other.inherit_from(old)
+            assert other._query_engine is None
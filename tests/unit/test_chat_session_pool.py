@@ -0,0 +1,250 @@
+"""
+对话会话池单元测试
+
+测试按会话ID索引的会话上下文池（LRU/空闲超时淘汰、会话锁），
+以及 ChatManager 多个会话并发对话时互不干扰。
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.business.chat import ChatContext, ChatManager, ChatSessionPool
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _EchoLLM:
+    """逐字返回 prompt 中问题的异步LLM，并记录收到的 prompt"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.prompts = []
+
+    async def astream_complete(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        question = prompt.split("用户问题：")[1].split("\n")[0]
+
+        async def gen():
+            for char in f"答{question}":
+                await asyncio.sleep(self.delay)
+                yield _Chunk(char)
+
+        return gen()
+
+
+def _manager(llm):
+    manager = ChatManager(index_manager=None, enable_markdown_formatting=False)
+    manager._llm = llm
+    return manager
+
+
+async def _answer(manager, message, session_id=None):
+    chunks = [chunk async for chunk in manager.stream_chat(message, session_id=session_id)]
+    return chunks[-1]["data"]
+
+
+@pytest.mark.fast
+class TestChatSessionPool:
+    """会话上下文池测试"""
+
+    def test_get_creates_and_reuses_context(self):
+        """测试按会话ID创建并复用上下文"""
+        pool = ChatSessionPool(max_sessions=4)
+
+        context = pool.get("s1")
+
+        assert context.session_id == "s1"
+        assert pool.get("s1") is context
+        assert pool.get("missing", create=False) is None
+        assert len(pool) == 1
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未使用的会话"""
+        pool = ChatSessionPool(max_sessions=2, idle_ttl_seconds=0)
+        pool.get("a")
+        pool.get("b")
+        pool.get("a")  # a 变为最近使用
+
+        pool.get("c")
+
+        assert pool.session_ids() == ["a", "c"]
+        assert pool.stats()["evictions"] == 1
+
+    def test_in_use_context_not_evicted(self):
+        """测试正在对话的会话不被淘汰"""
+        pool = ChatSessionPool(max_sessions=1, idle_ttl_seconds=0)
+        busy = pool.get("busy")
+
+        with busy.locked():
+            pool.get("other")
+            assert "busy" in pool
+            assert pool.stats()["in_use"] == 1
+
+        pool.get("third")
+        assert pool.session_ids() == ["third"]
+
+    def test_pinned_context_not_evicted(self):
+        """测试已取出、尚未获得会话锁的会话不被淘汰"""
+        pool = ChatSessionPool(max_sessions=1, idle_ttl_seconds=0)
+        waiting = pool.get("waiting", pin=True)
+
+        pool.get("other")
+        assert "waiting" in pool and waiting.in_use
+
+        waiting.unpin()
+        pool.get("third")
+        assert pool.session_ids() == ["third"]
+
+    def test_idle_ttl_eviction(self):
+        """测试空闲超时的会话被淘汰"""
+        pool = ChatSessionPool(max_sessions=10, idle_ttl_seconds=60)
+        pool.get("old").last_used = time.monotonic() - 120
+
+        pool.get("new")
+
+        assert pool.session_ids() == ["new"]
+
+    def test_new_replaces_existing_context(self):
+        """测试 new() 以同ID的空上下文替换旧上下文"""
+        pool = ChatSessionPool()
+        old = pool.get("s1")
+        old.session.add_turn("问", "答", [])
+
+        new = pool.new("s1")
+
+        assert new is not old
+        assert new.session.history == []
+        assert pool.get("s1") is new
+
+    def test_alocked_serializes_same_session(self):
+        """测试同一会话的异步持锁串行执行"""
+        context = ChatContext()
+        events = []
+
+        async def turn(name):
+            async with context.alocked():
+                events.append(f"{name}-start")
+                await asyncio.sleep(0.02)
+                events.append(f"{name}-end")
+
+        async def run():
+            await asyncio.gather(turn("a"), turn("b"))
+
+        asyncio.run(run())
+
+        assert events in (
+            ["a-start", "a-end", "b-start", "b-end"],
+            ["b-start", "b-end", "a-start", "a-end"],
+        )
+        assert not context.in_use
+
+
+@pytest.mark.fast
+class TestChatManagerSessions:
+    """ChatManager 多会话测试"""
+
+    def test_concurrent_sessions_keep_separate_history(self):
+        """测试不同会话并发对话，历史互不干扰且不切换当前会话"""
+        llm = _EchoLLM()
+        manager = _manager(llm)
+        current = manager.start_session("current")
+
+        async def run():
+            return await asyncio.gather(
+                _answer(manager, "甲一", "user_a"),
+                _answer(manager, "乙一", "user_b"),
+            )
+
+        done_a, done_b = asyncio.run(run())
+
+        assert done_a["session_id"] == "user_a" and done_a["answer"] == "答甲一"
+        assert done_b["session_id"] == "user_b" and done_b["answer"] == "答乙一"
+        assert manager.get_current_session() is current
+        assert current.history == []
+
+        asyncio.run(_answer(manager, "甲二", "user_a"))
+
+        history_a = manager.sessions.get("user_a").session.history
+        assert [turn.question for turn in history_a] == ["甲一", "甲二"]
+        assert [turn.question for turn in manager.sessions.get("user_b").session.history] == ["乙一"]
+        # 第二轮的 prompt 只包含本会话的历史
+        assert "甲一" in llm.prompts[-1] and "乙一" not in llm.prompts[-1]
+
+    def test_same_session_turns_are_serialized(self):
+        """测试同一会话的并发对话按轮次串行写入历史"""
+        manager = _manager(_EchoLLM())
+
+        async def run():
+            return await asyncio.gather(
+                _answer(manager, "一", "s"),
+                _answer(manager, "二", "s"),
+            )
+
+        results = asyncio.run(run())
+
+        assert sorted(r["turn_count"] for r in results) == [1, 2]
+        history = manager.sessions.get("s").session.history
+        assert [turn.answer for turn in history] == [f"答{turn.question}" for turn in history]
+
+    def test_waiting_turn_keeps_session_pooled(self):
+        """测试等待会话锁期间会话不被淘汰，本轮写入池中的会话"""
+        manager = _manager(_EchoLLM(delay=0))
+        manager.sessions.max_sessions = 1
+        busy = manager.sessions.get("s")
+        busy.session.add_turn("一", "答一", [])
+
+        async def run():
+            busy._lock.acquire()  # 模拟同一会话正在进行的上一轮
+            waiting = asyncio.ensure_future(_answer(manager, "二", "s"))
+            await asyncio.sleep(0.03)
+            busy._lock.release()
+            manager.sessions.get("other")  # 会话锁空闲、本轮尚未获得锁时触发淘汰
+            return await waiting
+
+        done = asyncio.run(run())
+
+        assert done["turn_count"] == 2
+        assert manager.sessions.get("s", create=False) is busy
+
+    def test_service_creates_session_per_request(self):
+        """测试服务层未指定会话ID时每个请求新建会话，并返回会话ID"""
+        from types import SimpleNamespace
+
+        from backend.business.rag_api.models import ChatRequest
+        from backend.business.rag_api.rag_service import RAGService
+        from backend.business.rag_api.rag_service_chat import execute_chat
+
+        manager = _manager(_EchoLLM(delay=0))
+        service = SimpleNamespace(chat_manager=manager)
+
+        async def stream(message):
+            chunks = [c async for c in RAGService.stream_chat(service, message)]
+            return chunks[-1]["data"]
+
+        first, second = asyncio.run(stream("一")), asyncio.run(stream("二"))
+        response = execute_chat(manager, ChatRequest(message="三"))
+
+        ids = {first["session_id"], second["session_id"], response.session_id}
+        assert len(ids) == 3 and all(ids)
+        assert first["turn_count"] == second["turn_count"] == response.turn_count == 1
+        assert manager.get_current_session() is None
+
+    def test_default_uses_current_session(self):
+        """测试未指定会话ID时使用当前会话"""
+        manager = _manager(_EchoLLM(delay=0))
+
+        done = asyncio.run(_answer(manager, "问题"))
+
+        session = manager.get_current_session()
+        assert done["session_id"] == session.session_id
+        assert len(session.history) == 1
+        assert len(manager.memory.get_all()) == 2
+
+        manager.reset_session()
+        assert session.history == []
+        assert manager.memory.get_all() == []
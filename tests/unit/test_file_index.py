@@ -0,0 +1,228 @@
+"""
+文件级元数据索引单元测试
+
+测试文件名子串/前缀/词项匹配、增量维护、持久化、按 collection 共享以及文件名检索器接入。
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.infrastructure.text_index import registry
+from backend.infrastructure.text_index.file_index import FileIndex
+from tests.fixtures.mocks import InMemoryChromaCollection
+
+
+CHUNKS = {
+    "c1": "docs/系统科学/钱学森论系统工程.md",
+    "c2": "docs/系统科学/钱学森论系统工程.md",
+    "c3": "docs/control/feedback_loop.py",
+    "c4": "README.md",
+}
+
+
+def _metadata(file_path):
+    return {
+        "file_path": file_path,
+        "file_name": file_path.rsplit("/", 1)[-1],
+        "repository": "qiao/rag",
+    }
+
+
+def _put(collection, chunk_id, file_path):
+    collection.put(chunk_id, metadata=_metadata(file_path))
+
+
+def _collection(chunks=CHUNKS, name="test_collection"):
+    collection = InMemoryChromaCollection(name)
+    for chunk_id, file_path in chunks.items():
+        _put(collection, chunk_id, file_path)
+    return collection
+
+
+def _index():
+    index = FileIndex("t")
+    index.add_records(_collection().get(include=["metadatas"]))
+    return index
+
+
+@pytest.mark.fast
+class TestFileIndex:
+    """FileIndex测试"""
+
+    def test_substring_match(self):
+        """测试路径/文件名子串匹配（不区分大小写）"""
+        index = _index()
+
+        assert index.match("钱学森") == ["docs/系统科学/钱学森论系统工程.md"]
+        assert index.match("FEEDBACK") == ["docs/control/feedback_loop.py"]
+        assert index.match("md") == ["README.md", "docs/系统科学/钱学森论系统工程.md"]
+        assert index.match("不存在") == []
+
+    def test_prefix_and_token_match(self):
+        """测试前缀匹配与词项匹配"""
+        index = _index()
+
+        assert index.match("feed", mode="prefix") == ["docs/control/feedback_loop.py"]
+        assert index.match("ack", mode="prefix") == []
+        assert index.match("loop", mode="token") == ["docs/control/feedback_loop.py"]
+        assert index.match("loo", mode="token") == []
+        with pytest.raises(ValueError):
+            index.match("x", mode="regex")
+
+    def test_file_records_and_incremental_delete(self):
+        """测试文件记录随 chunk 增删维护"""
+        index = _index()
+        path = "docs/系统科学/钱学森论系统工程.md"
+
+        assert index.chunk_ids(path) == ["c1", "c2"]
+        assert index.get(path).repository == "qiao/rag"
+
+        index.delete(["c1"])
+        assert index.chunk_ids(path) == ["c2"]
+        index.delete(["c2"])
+        assert index.get(path) is None
+        assert index.match("钱学森") == []
+        assert len(index) == 2 and index.file_count == 2
+
+    def test_persistence_round_trip(self, tmp_path):
+        """测试持久化后加载结果一致"""
+        index = FileIndex("t", persist_path=tmp_path / "files.json.gz")
+        index.add_records(_collection().get(include=["metadatas"]))
+        index.add([("orphan", {})])
+        index.save()
+
+        loaded = FileIndex("t", persist_path=tmp_path / "files.json.gz")
+        assert loaded.load() is True
+        assert len(loaded) == len(index) == 5
+        assert loaded.match("control") == index.match("control")
+        assert FileIndex("other", persist_path=tmp_path / "files.json.gz").load() is False
+
+
+@pytest.mark.fast
+class TestFileIndexRegistry:
+    """文件索引注册表测试"""
+
+    @pytest.fixture(autouse=True)
+    def background(self, monkeypatch):
+        """后台重建改为同步执行，并记录调用"""
+        started = []
+
+        def run(target, name, *args):
+            started.append(name)
+            target(*args)
+
+        monkeypatch.setattr(registry, '_run_in_background', run)
+        return started
+
+    def test_built_from_metadata_only_and_shared(self, background):
+        """测试只拉取元数据构建，同一 collection 共享索引"""
+        collection = _collection()
+
+        index = registry.get_file_index(collection)
+
+        assert registry.get_file_index(collection) is index
+        assert index.file_count == 3
+        assert collection.includes == [["metadatas"]]
+        assert len(background) == 1
+
+    def test_first_build_falls_back_until_ready(self, monkeypatch):
+        """测试首次构建在后台进行，完成前返回 None 且不重复启动"""
+        tasks = []
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: tasks.append((target, args)))
+        collection = _collection()
+
+        assert registry.get_file_index(collection) is None
+        assert registry.get_file_index(collection) is None
+        assert len(tasks) == 1 and collection.includes == []
+
+        target, args = tasks.pop()
+        target(*args)
+        assert registry.get_file_index(collection).file_count == 3
+
+    def test_rebuild_serves_current_index_and_replays_changes(self, monkeypatch):
+        """测试 chunk 数不一致时在后台重建，期间使用现有索引，重建前到达的变更补到新索引"""
+        from backend.infrastructure.config import config
+
+        monkeypatch.setattr(config, 'FILE_INDEX_VERSION_CHECK_SECONDS', 0, raising=False)
+        collection = _collection()
+        index = registry.get_file_index(collection)
+        tasks = []
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: tasks.append((target, args)))
+
+        _put(collection, "x1", "external/外部写入.md")
+        assert registry.get_file_index(collection) is index
+        assert len(tasks) == 1
+
+        target, args = tasks.pop()
+        _put(collection, "c5", "notes/涌现.md")
+        registry.notify_file_index_changes(collection, added_ids=["c5"])
+        target(*args)
+
+        rebuilt = registry.get_file_index(collection)
+        assert rebuilt is not index
+        assert rebuilt.match("外部") == ["external/外部写入.md"]
+        assert rebuilt.match("涌现") == ["notes/涌现.md"]
+
+    def test_notify_changes_updates_incrementally(self):
+        """测试向量写入/删除通知增量更新索引"""
+        collection = _collection()
+        index = registry.get_file_index(collection)
+
+        _put(collection, "c5", "notes/涌现.md")
+        del collection.records["c4"]
+        registry.notify_file_index_changes(collection, added_ids=["c5"], deleted_ids=["c4"])
+
+        assert index.match("涌现") == ["notes/涌现.md"]
+        assert index.match("readme") == []
+        assert len(index) == collection.count()
+
+    def test_incremental_saves_deferred_and_flushed(self, monkeypatch):
+        """测试增量更新不逐批写盘，延迟保存合并为一次，flush 时立即落盘"""
+        from backend.infrastructure.config import config
+
+        monkeypatch.setattr(config, 'FILE_INDEX_SAVE_DELAY_SECONDS', 60, raising=False)
+        collection = _collection()
+        registry.get_file_index(collection)
+        saves = []
+        monkeypatch.setattr(FileIndex, 'save', lambda self: saves.append(self.name))
+
+        for i in range(3):
+            _put(collection, f"n{i}", f"notes/{i}.md")
+            registry.notify_file_index_changes(collection, added_ids=[f"n{i}"])
+
+        assert saves == [] and len(registry._save_timers) == 1
+        registry.flush_text_indexes()
+        assert saves == [collection.name] and registry._save_timers == {}
+
+
+@pytest.mark.fast
+class TestFilesViaMetadataRetriever:
+    """文件名检索器接入测试"""
+
+    def test_match_files_uses_file_index(self, monkeypatch):
+        """测试文件名匹配走文件索引，不再全量拉取 collection"""
+        from backend.business.rag_engine.retrieval.strategies.file_level import FilesViaMetadataRetriever
+
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: target(*args))
+        collection = _collection()
+        retriever = FilesViaMetadataRetriever(MagicMock(chroma_collection=collection))
+
+        assert retriever._match_files_by_metadata(["钱学森", "feedback"]) == [
+            "docs/系统科学/钱学森论系统工程.md",
+            "docs/control/feedback_loop.py",
+        ]
+        assert retriever._match_files_by_metadata(["README.md"], fuzzy_match=False) == ["README.md"]
+        assert retriever._file_chunk_ids("README.md") == ["c4"]
+        assert all(include == ["metadatas"] for include in collection.includes)
+
+    def test_match_files_falls_back_while_index_builds(self, monkeypatch):
+        """测试文件索引构建完成前直接分页查询 collection 元数据"""
+        from backend.business.rag_engine.retrieval.strategies.file_level import FilesViaMetadataRetriever
+
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: None)
+        collection = _collection()
+        retriever = FilesViaMetadataRetriever(MagicMock(chroma_collection=collection))
+
+        assert retriever._match_files_by_metadata(["feedback"]) == ["docs/control/feedback_loop.py"]
+        assert registry.get_file_index(collection) is None
@@ -0,0 +1,213 @@
+"""
+文件级向量单元测试
+
+测试 chunk 向量池化、按文件增量更新/删除、全量重建、文件检索，
+以及文件级别内容检索器先检索文件再只拉取候选文件的 chunks。
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import chromadb
+import numpy as np
+import pytest
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+from backend.infrastructure.config import config
+from backend.infrastructure.indexer.utils import file_vectors
+from backend.infrastructure.indexer.utils.file_vectors import (
+    file_vector_id,
+    pool_embeddings,
+    rebuild_file_vectors,
+    reconcile_file_vectors,
+    search_files,
+    update_file_vectors,
+)
+
+
+# 三个文件的 chunk 向量：a 指向 x 轴，b 指向 y 轴，c 指向 z 轴
+CHUNKS = {
+    "a1": ("docs/a.md", [1.0, 0.1, 0.0]),
+    "a2": ("docs/a.md", [2.0, -0.2, 0.0]),
+    "b1": ("docs/b.md", [0.0, 1.0, 0.1]),
+    "c1": ("notes/c.md", [0.0, 0.0, 3.0]),
+}
+
+
+def _client():
+    return chromadb.EphemeralClient()
+
+
+def _collections(client, chunks=CHUNKS):
+    suffix = uuid.uuid4().hex[:8]
+    chunk_collection = client.create_collection(f"chunks_{suffix}", metadata={"hnsw:space": "cosine"})
+    files = client.create_collection(f"chunks_{suffix}__files", metadata={"hnsw:space": "cosine"})
+    if chunks:
+        chunk_collection.add(
+            ids=list(chunks),
+            embeddings=[vector for _, vector in chunks.values()],
+            metadatas=[{"file_path": path, "file_name": path.rsplit("/", 1)[-1]} for path, _ in chunks.values()],
+        )
+    return chunk_collection, files
+
+
+def _stored(files):
+    records = files.get(include=["metadatas"])
+    return {m["file_path"]: m["chunk_count"] for m in records["metadatas"]}
+
+
+@pytest.mark.fast
+class TestPoolEmbeddings:
+    """向量池化测试"""
+
+    def test_pooled_vector_is_normalized_mean_direction(self):
+        """测试逐个归一化后取平均再归一化（长向量不主导方向）"""
+        pooled = pool_embeddings([[10.0, 0.0], [0.0, 1.0]])
+
+        assert np.allclose(pooled, [np.sqrt(0.5), np.sqrt(0.5)])
+        assert pool_embeddings([]) is None
+        assert pool_embeddings([[0.0, 0.0]]) is None
+
+
+@pytest.mark.fast
+class TestFileVectors:
+    """文件向量维护与检索测试"""
+
+    def test_rebuild_and_search(self):
+        """测试全量重建后按查询向量检索文件"""
+        chunks, files = _collections(_client())
+
+        assert rebuild_file_vectors(chunks, files) == 3
+        assert _stored(files) == {"docs/a.md": 2, "docs/b.md": 1, "notes/c.md": 1}
+
+        results = search_files(files, [1.0, 0.5, 0.0], top_k=2)
+        assert [path for path, _ in results] == ["docs/a.md", "docs/b.md"]
+        assert results[0][1] > results[1][1] > 0.3
+
+    def test_incremental_update_and_delete(self):
+        """测试按文件增量更新，文件的 chunk 全部删除后移除文件向量"""
+        chunks, files = _collections(_client())
+        rebuild_file_vectors(chunks, files)
+
+        chunks.add(ids=["b2"], embeddings=[[0.0, 1.0, -0.1]], metadatas=[{"file_path": "docs/b.md"}])
+        chunks.delete(ids=["c1"])
+        update_file_vectors(chunks, files, ["docs/b.md", "notes/c.md"])
+
+        assert _stored(files) == {"docs/a.md": 2, "docs/b.md": 2}
+
+    def test_rebuild_removes_stale_files(self):
+        """测试全量重建删除已不存在的文件向量"""
+        chunks, files = _collections(_client())
+        files.add(ids=[file_vector_id("gone.md")], embeddings=[[1.0, 0.0, 0.0]], metadatas=[{"file_path": "gone.md"}])
+
+        rebuild_file_vectors(chunks, files)
+
+        assert "gone.md" not in _stored(files)
+        assert files.count() == 3
+
+    def test_rebuild_pages_stale_scan(self, monkeypatch):
+        """测试扫描已有文件向量时分页读取"""
+        monkeypatch.setattr(file_vectors, 'COLLECTION_PAGE_SIZE', 2)
+        chunks, files = _collections(_client())
+        stale = [f"gone{i}.md" for i in range(5)]
+        files.add(
+            ids=[file_vector_id(p) for p in stale],
+            embeddings=[[1.0, 0.0, 0.0]] * len(stale),
+            metadatas=[{"file_path": p} for p in stale],
+        )
+
+        rebuild_file_vectors(chunks, files)
+
+        assert set(_stored(files)) == {"docs/a.md", "docs/b.md", "notes/c.md"}
+
+    def test_reconcile_only_recomputes_missing_and_extra(self, monkeypatch):
+        """测试对账只重算缺失或多余的文件，不重新拉取其余文件的 chunk 向量"""
+        chunks, files = _collections(_client())
+        rebuild_file_vectors(chunks, files)
+        chunks.add(ids=["d1"], embeddings=[[1.0, 1.0, 0.0]], metadatas=[{"file_path": "new/d.md"}])
+        chunks.delete(ids=["c1"])
+        updated = []
+        update = file_vectors.update_file_vectors
+        monkeypatch.setattr(
+            file_vectors, 'update_file_vectors',
+            lambda c, f, paths: updated.append(set(paths)) or update(c, f, paths),
+        )
+
+        changed = reconcile_file_vectors(chunks, files, ["docs/a.md", "docs/b.md", "new/d.md"])
+
+        assert changed == 2 and updated == [{"new/d.md", "notes/c.md"}]
+        assert _stored(files) == {"docs/a.md": 2, "docs/b.md": 1, "new/d.md": 1}
+
+    def test_reconcile_recomputes_files_modified_without_notify(self):
+        """测试对账比对 chunk 签名，重算内容已变但文件数未变的文件"""
+        chunks, files = _collections(_client())
+        rebuild_file_vectors(chunks, files)
+        chunks.delete(ids=["b1"])
+        chunks.add(ids=["b9"], embeddings=[[0.0, -1.0, 0.0]], metadatas=[{"file_path": "docs/b.md"}])
+        expected = {"docs/a.md": ["a1", "a2"], "docs/b.md": ["b9"], "notes/c.md": ["c1"]}
+
+        assert reconcile_file_vectors(chunks, files, list(expected)) == 0
+        changed = reconcile_file_vectors(chunks, files, list(expected), expected)
+
+        assert changed == 1
+        assert search_files(files, [0.0, -1.0, 0.0], top_k=1)[0][0] == "docs/b.md"
+        assert reconcile_file_vectors(chunks, files, list(expected), expected) == 0
+
+
+@pytest.mark.fast
+class TestFilesViaContentRetrieverWithFileVectors:
+    """文件级别内容检索器接入文件向量测试"""
+
+    def _index_manager(self, client, chunks):
+        retriever = MagicMock()
+        retriever.retrieve.return_value = [
+            NodeWithScore(node=TextNode(text="a", metadata={"file_path": "docs/a.md"}), score=0.9),
+            NodeWithScore(node=TextNode(text="b", metadata={"file_path": "docs/b.md"}), score=0.5),
+        ]
+        index = MagicMock()
+        index.as_retriever.return_value = retriever
+        manager = SimpleNamespace(
+            collection_name=chunks.name,
+            chroma_client=client,
+            chroma_collection=chunks,
+            embed_model=None,
+            get_index=lambda: index,
+        )
+        return manager, index, retriever
+
+    def test_searches_files_then_fetches_their_chunks(self, monkeypatch):
+        """测试先检索文件向量，再只检索候选文件的 chunks"""
+        from backend.business.rag_engine.retrieval.strategies.file_level import FilesViaContentRetriever
+
+        from backend.infrastructure.text_index import registry
+
+        monkeypatch.setattr(config, 'FILE_VECTORS_ENABLE', True, raising=False)
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: target(*args))
+        client = _client()
+        chunks, _ = _collections(client)
+        manager, index, retriever = self._index_manager(client, chunks)
+        assert file_vectors.ensure_file_vectors(manager, background=False) is not None
+
+        content_retriever = FilesViaContentRetriever(manager, top_k_files=2, top_k_per_file=3)
+        nodes = content_retriever.retrieve(QueryBundle(query_str="x", embedding=[1.0, 0.05, 0.0]))
+
+        assert [n.node.metadata["file_path"] for n in nodes] == ["docs/a.md", "docs/b.md"]
+        kwargs = index.as_retriever.call_args.kwargs
+        assert kwargs["similarity_top_k"] == 12
+        assert kwargs["filters"].filters[0].value == ["docs/a.md", "docs/b.md"]
+        assert retriever.retrieve.call_args.args[0].embedding == [1.0, 0.05, 0.0]
+
+    def test_falls_back_while_file_vectors_missing(self, monkeypatch):
+        """测试文件向量尚未构建时回退为检索 similarity_top_k 个 chunks"""
+        from backend.business.rag_engine.retrieval.strategies.file_level import FilesViaContentRetriever
+
+        monkeypatch.setattr(config, 'FILE_VECTORS_ENABLE', True, raising=False)
+        monkeypatch.setattr(file_vectors, 'ensure_file_vectors', lambda index_manager: None)
+        client = _client()
+        chunks, _ = _collections(client)
+        manager, index, _ = self._index_manager(client, chunks)
+
+        FilesViaContentRetriever(manager, similarity_top_k=50).retrieve("x")
+
+        assert index.as_retriever.call_args.kwargs == {"similarity_top_k": 50}
@@ -12,6 +12,13 @@ from backend.infrastructure.embeddings.base import BaseEmbedding
 from backend.infrastructure.embeddings.hf_inference_embedding import HFInferenceEmbedding
 
 
+@pytest.fixture(autouse=True)
+def per_text_request_mode(monkeypatch):
+    """本文件覆盖逐条请求模式（批量模式见 test_hf_api_client.py）"""
+    from backend.infrastructure.config import config
+    monkeypatch.setattr(config, 'HF_REQUEST_BATCH_SIZE', 1, raising=False)
+
+
 class TestHFInferenceEmbedding:
     """HFInferenceEmbedding 测试"""
     
@@ -27,10 +34,10 @@ class TestHFInferenceEmbedding:
                         api_key=None
                     )
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_init_with_token(self, mock_post):
         """测试使用 Token 初始化"""
-        # Mock requests.post 返回测试向量
+        # Mock requests.Session.post 返回测试向量
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 1024  # Qwen3-Embedding-0.6B 是 1024 维
         mock_response.raise_for_status = Mock()
@@ -47,10 +54,10 @@ class TestHFInferenceEmbedding:
             assert embedding.get_model_name() == "Qwen/Qwen3-Embedding-0.6B"
             assert embedding.get_embedding_dimension() == 1024
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_get_query_embedding(self, mock_post):
         """测试查询向量化"""
-        # Mock requests.post 返回测试向量
+        # Mock requests.Session.post 返回测试向量
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 1024
         mock_response.raise_for_status = Mock()
@@ -77,10 +84,10 @@ class TestHFInferenceEmbedding:
         assert call_args[1]['json']['inputs'] == "测试查询"
         assert "Qwen/Qwen3-Embedding-0.6B" in call_args[0][0]  # URL 包含模型名
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_get_text_embeddings_batch(self, mock_post):
         """测试批量向量化"""
-        # Mock requests.post 返回测试向量
+        # Mock requests.Session.post 返回测试向量
         mock_responses = []
         for i in range(3):
             mock_response = Mock()
@@ -114,10 +121,10 @@ class TestHFInferenceEmbedding:
         # 验证 API 调用（每个文本调用一次）
         assert mock_post.call_count == 3
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_batch_splitting(self, mock_post):
         """测试大批量自动分批处理"""
-        # Mock requests.post 返回测试向量
+        # Mock requests.Session.post 返回测试向量
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 1024
         mock_response.raise_for_status = Mock()
@@ -140,7 +147,7 @@ class TestHFInferenceEmbedding:
         # 验证被调用了 250 次（每个文本一次）
         assert mock_post.call_count == 250
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_503_retry(self, mock_post):
         """测试 503 状态（模型加载中）的重试机制"""
         from requests.exceptions import HTTPError
@@ -180,7 +187,7 @@ class TestHFInferenceEmbedding:
         # 验证被调用了 2 次（503 + 成功）
         assert mock_post.call_count == 2
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_network_error_retry(self, mock_post):
         """测试网络错误的重试机制"""
         from requests.exceptions import ConnectionError
@@ -219,7 +226,7 @@ class TestHFInferenceEmbedding:
         # 验证被调用了 3 次（2 次失败 + 1 次成功）
         assert mock_post.call_count == 3
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_max_retries_exceeded(self, mock_post):
         """测试超过最大重试次数后抛出异常"""
         from requests.exceptions import ConnectionError
@@ -243,10 +250,10 @@ class TestHFInferenceEmbedding:
         # 验证被调用了 max_retries + 1 次（初始 + 重试）
         assert mock_post.call_count == 4  # 1 次初始 + 3 次重试
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_empty_texts(self, mock_post):
         """测试空文本列表"""
-        # Mock requests.post
+        # Mock requests.Session.post
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 1024
         mock_response.raise_for_status = Mock()
@@ -266,10 +273,10 @@ class TestHFInferenceEmbedding:
         # 验证没有调用 API（空列表直接返回）
         assert mock_post.call_count == 0
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_single_text_response_format(self, mock_post):
         """测试单个文本时 API 返回单个向量的格式"""
-        # Mock requests.post 返回单个向量
+        # Mock requests.Session.post 返回单个向量
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 1024
         mock_response.raise_for_status = Mock()
@@ -286,10 +293,10 @@ class TestHFInferenceEmbedding:
         assert len(vectors) == 1
         assert len(vectors[0]) == 1024
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_dimension_detection(self, mock_post):
         """测试自动维度检测"""
-        # Mock requests.post 返回测试向量
+        # Mock requests.Session.post 返回测试向量
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 1024
         mock_response.raise_for_status = Mock()
@@ -303,12 +310,12 @@ class TestHFInferenceEmbedding:
         
         assert embedding.get_embedding_dimension() == 1024
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_dimension_fallback(self, mock_post):
         """测试维度检测失败时的默认值"""
         from requests.exceptions import RequestException
         
-        # Mock requests.post - 验证时失败
+        # Mock requests.Session.post - 验证时失败
         mock_post.side_effect = RequestException("API error")
         
         with patch('src.infrastructure.embeddings.hf_inference_embedding.logger'):
@@ -321,10 +328,10 @@ class TestHFInferenceEmbedding:
             # Qwen3-Embedding-0.6B 应该使用 1024 作为默认值
             assert embedding.get_embedding_dimension() == 1024
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_custom_timeout(self, mock_post):
         """测试自定义超时时间（requests 支持 timeout 参数）"""
-        # Mock requests.post 返回测试向量
+        # Mock requests.Session.post 返回测试向量
         mock_response = Mock()
         mock_response.json.return_value = [0.1] * 1024
         mock_response.raise_for_status = Mock()
@@ -337,13 +344,13 @@ class TestHFInferenceEmbedding:
         
         embedding.get_query_embedding("test")
         
-        # 验证 requests.post 被调用，且包含 timeout 参数
+        # 验证 requests.Session.post 被调用，且包含 timeout 参数
         assert mock_post.call_count == 1
         call_kwargs = mock_post.call_args[1]
         assert 'timeout' in call_kwargs
         assert call_kwargs['timeout'] == 30  # 默认超时时间
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_get_model_name(self, mock_post):
         """测试获取模型名称"""
         mock_response = Mock()
@@ -358,10 +365,10 @@ class TestHFInferenceEmbedding:
         
         assert embedding.get_model_name() == "custom-model"
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_hf_inference_embedding_invalid_response_format(self, mock_post):
         """测试无效的 API 响应格式"""
-        # Mock requests.post - 返回无效格式
+        # Mock requests.Session.post - 返回无效格式
         mock_response = Mock()
         mock_response.json.return_value = {"error": "invalid format"}
         mock_response.raise_for_status = Mock()
@@ -0,0 +1,118 @@
+"""
+索引构建流水线测试
+
+测试分块 / 向量化 / 写入三阶段流水线的正确性、进度回调和错误传播。
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from llama_index.core import Settings, StorageContext
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import Document as LlamaDocument
+
+from backend.infrastructure.config import config
+from backend.infrastructure.indexer.build.pipeline import run_pipelined_build
+
+
+@pytest.fixture
+def documents():
+    """测试文档"""
+    return [
+        LlamaDocument(text=f"文档{i}。" + "系统科学的内容。" * 40, metadata={"file_path": f"doc_{i}.md"})
+        for i in range(20)
+    ]
+
+
+@pytest.fixture
+def node_parser():
+    """按字符计数的分块器（不依赖全局 tokenizer）"""
+    return SentenceSplitter(chunk_size=64, chunk_overlap=8, tokenizer=list)
+
+
+@pytest.fixture
+def small_pipeline(monkeypatch):
+    """小批次、小队列，确保多个批次在流水线中流动"""
+    monkeypatch.setattr(config, 'EMBED_BATCH_SIZE', 1)
+    monkeypatch.setattr(config, 'INDEX_PIPELINE_QUEUE_SIZE', 1)
+    monkeypatch.setattr(config, 'INDEX_PIPELINE_EMBED_CONCURRENCY', 2)
+
+
+@pytest.mark.fast
+class TestPipelinedBuild:
+    """run_pipelined_build测试"""
+
+    def test_creates_index_with_embedded_nodes(self, documents, node_parser, small_pipeline, monkeypatch):
+        """测试创建新索引：所有节点都带向量写入"""
+        monkeypatch.setattr(Settings, '_node_parser', node_parser)
+        index_manager = Mock()
+        index_manager._index = None
+        index_manager.storage_context = StorageContext.from_defaults()
+        expected = len(node_parser.get_nodes_from_documents(documents))
+
+        total = run_pipelined_build(
+            index_manager, documents, node_parser, MockEmbedding(embed_dim=8),
+            create_new=True, show_progress=False,
+        )
+
+        assert total == expected
+        vector_store = index_manager.storage_context.vector_store
+        assert len(vector_store.data.embedding_dict) == expected
+
+    def test_incremental_insert_and_progress(self, documents, node_parser, small_pipeline):
+        """测试增量写入：节点预先向量化，进度单调递增并以 100% 结束"""
+        index_manager = Mock()
+        inserted = []
+        index_manager._index.insert_nodes.side_effect = lambda nodes: inserted.extend(nodes)
+        progress = []
+
+        total = run_pipelined_build(
+            index_manager, documents, node_parser,
+            MockEmbedding(embed_dim=8), create_new=False, show_progress=False,
+            progress_callback=lambda current, total: progress.append((current, total)),
+        )
+
+        assert len(inserted) == total
+        assert all(node.embedding is not None for node in inserted)
+        currents = [current for current, _ in progress]
+        assert currents == sorted(currents)
+        assert progress[-1] == (total, total)
+
+    def test_failed_nodes_not_counted(self, documents, node_parser, small_pipeline):
+        """测试批次写入失败后逐个重试，仍失败的节点不计入写入数"""
+        index_manager = Mock()
+        inserted = []
+        rejected = set()
+
+        def insert_nodes(nodes):
+            # 批次写入失败，逐个重试时每批的第一个节点仍失败
+            if len(nodes) > 1:
+                rejected.add(nodes[0].node_id)
+            if len(nodes) > 1 or nodes[0].node_id in rejected:
+                raise RuntimeError("写入失败")
+            inserted.extend(nodes)
+
+        index_manager._index.insert_nodes.side_effect = insert_nodes
+        progress = []
+
+        total = run_pipelined_build(
+            index_manager, documents, node_parser,
+            MockEmbedding(embed_dim=8), create_new=False, show_progress=False,
+            progress_callback=lambda current, total: progress.append((current, total)),
+        )
+
+        expected = len(node_parser.get_nodes_from_documents(documents))
+        assert total == len(inserted) == expected - len(rejected)
+        assert rejected and progress[-1] == (expected, expected)
+
+    def test_embedding_error_propagates(self, documents, node_parser, small_pipeline):
+        """测试向量化失败时流水线终止并抛出异常"""
+        embed_model = MockEmbedding(embed_dim=8)
+        object.__setattr__(embed_model, 'aget_text_embedding_batch', Mock(side_effect=RuntimeError("boom")))
+
+        with pytest.raises(RuntimeError, match="boom"):
+            run_pipelined_build(
+                Mock(), documents, node_parser,
+                embed_model, create_new=False, show_progress=False,
+            )
@@ -40,6 +40,17 @@ class TestIndexManager:
         assert stats['document_count'] > 0
         assert stats['collection_name'] == 'test_collection'
     
+    def test_build_index_notifies_new_vector_ids(self, temp_index_manager, sample_documents, mocker):
+        """测试构建后通过统一入口通知新写入的向量ID（BM25/文件索引不再因数量不一致全量重建）"""
+        from backend.infrastructure.indexer.build import builder
+        
+        notify = mocker.spy(builder, 'notify_vector_changes')
+        temp_index_manager.build_index(sample_documents, show_progress=False)
+        
+        assert notify.call_count == 1
+        added_ids = notify.call_args.kwargs['added_ids']
+        assert len(added_ids) == temp_index_manager.get_stats()['document_count']
+    
     def test_build_index_empty_documents(self, temp_index_manager):
         """测试使用空文档列表"""
         index = temp_index_manager.build_index([], show_progress=False)
@@ -147,3 +158,31 @@ def test_different_chunk_parameters(chunk_size, chunk_overlap, temp_vector_store
     assert manager.chunk_size == chunk_size
     assert manager.chunk_overlap == chunk_overlap
 
+
+
+@pytest.mark.fast
+class TestVectorIdBatchLookup:
+    """向量ID批量查询测试"""
+    
+    def test_chunked_in_filter_and_retry_missing(self, mocker):
+        """测试按块 $in 查询，仅对未查到的路径整体重试"""
+        from unittest.mock import MagicMock
+        from backend.infrastructure.indexer.utils import ids
+        
+        mocker.patch.object(ids, 'VECTOR_ID_QUERY_CHUNK_SIZE', 2)
+        mocker.patch.object(ids.time, 'sleep')
+        collection = MagicMock()
+        collection.get.side_effect = [
+            {"ids": ["a1", "a2", "b1"], "metadatas": [{"file_path": "a"}, {"file_path": "a"}, {"file_path": "b"}]},
+            {"ids": [], "metadatas": []},
+            {"ids": ["c1"], "metadatas": [{"file_path": "c"}]},
+        ]
+        
+        result = ids.get_vector_ids_batch(MagicMock(chroma_collection=collection), ["a", "b", "c", "a"], retries=2)
+        
+        assert result == {"a": ["a1", "a2"], "b": ["b1"], "c": ["c1"]}
+        assert [c.kwargs["where"] for c in collection.get.call_args_list] == [
+            {"file_path": {"$in": ["a", "b"]}},
+            {"file_path": "c"},
+            {"file_path": "c"},
+        ]
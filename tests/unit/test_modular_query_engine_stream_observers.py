@@ -50,6 +50,7 @@ def test_stream_query_calls_observers(monkeypatch):
     engine.postprocessors = []
     engine.query_router = None
     engine.enable_auto_routing = False
+    engine.enable_speculative_retrieval = False
     engine.retrieval_strategy = "vector"
     engine.similarity_top_k = 3
     engine.observer_manager = _DummyObserverManager()
@@ -111,6 +112,7 @@ def test_stream_query_error_still_calls_observer_end(monkeypatch):
     engine.postprocessors = []
     engine.query_router = None
     engine.enable_auto_routing = False
+    engine.enable_speculative_retrieval = False
     engine.retrieval_strategy = "vector"
     engine.similarity_top_k = 3
     engine.observer_manager = _DummyObserverManager()
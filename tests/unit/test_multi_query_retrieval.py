@@ -0,0 +1,148 @@
+"""
+多查询并行检索单元测试
+
+测试改写查询去重、批量计算查询向量、并行检索、RRF 融合去重以及 ModularQueryEngine 接入。
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from backend.business.rag_engine.retrieval.merger import ResultMerger
+from backend.business.rag_engine.retrieval.multi_query import (
+    multi_query_retrieve,
+    rewrite_queries,
+    unique_queries,
+)
+
+
+def _nodes(*items):
+    return [NodeWithScore(node=TextNode(id_=node_id, text=node_id), score=score) for node_id, score in items]
+
+
+RESULTS = {
+    "系统科学 定义": _nodes(("a", 0.8), ("b", 0.6)),
+    "系统科学 概念": _nodes(("b", 0.7), ("c", 0.5)),
+    "系统论 内涵": _nodes(("d", 0.9)),
+}
+
+
+class _RecordingRetriever:
+    """记录收到的 QueryBundle 的检索器"""
+
+    def __init__(self, results, barrier=None):
+        self.results = results
+        self.barrier = barrier
+        self.bundles = []
+
+    def retrieve(self, query_bundle):
+        self.bundles.append(query_bundle)
+        if self.barrier is not None:
+            self.barrier.wait()
+        result = self.results[query_bundle.query_str]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.mark.fast
+class TestMultiQueryRetrieval:
+    """多查询并行检索测试"""
+
+    def test_rewrite_queries_dedup_and_limit(self):
+        """测试 final_query 在前、标准化去重、按上限截断"""
+        processed = {
+            "final_query": "系统科学 定义",
+            "rewritten_queries": ["系统科学 定义？", "系统科学 概念", "系统论 内涵", "控制论"],
+        }
+        assert rewrite_queries(processed, 3) == ["系统科学 定义", "系统科学 概念", "系统论 内涵"]
+        assert unique_queries(["q", " ", "Q"]) == ["q"]
+
+    def test_batched_embeddings_parallel_retrieval_and_fusion(self):
+        """测试一次批量计算向量、并行检索，RRF 融合按节点ID去重并保留最高分数"""
+        queries = list(RESULTS)
+        retriever = _RecordingRetriever(RESULTS, barrier=threading.Barrier(len(queries), timeout=5))
+        embed_model = MagicMock()
+        embed_model.get_query_embeddings.return_value = [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]]
+
+        merged = multi_query_retrieve(retriever, queries, similarity_top_k=10, embed_model=embed_model)
+
+        embed_model.get_query_embeddings.assert_called_once_with(queries)
+        embed_model.get_query_embedding.assert_not_called()
+        assert {b.query_str: b.embedding for b in retriever.bundles}["系统论 内涵"] == [0.5, 0.5]
+        assert [n.node.node_id for n in merged][0] == "b"
+        assert sorted(n.node.node_id for n in merged) == ["a", "b", "c", "d"]
+        assert {n.node.node_id: n.score for n in merged}["b"] == 0.7
+
+    def test_precomputed_results_are_fused_not_retrieved(self):
+        """测试已有结果参与融合但不再检索，top_k 截断融合结果"""
+        retriever = _RecordingRetriever(RESULTS)
+        merged = multi_query_retrieve(
+            retriever, ["系统科学 概念"], similarity_top_k=2, precomputed={"原问题": _nodes(("c", 0.9))}
+        )
+        assert [b.query_str for b in retriever.bundles] == ["系统科学 概念"]
+        assert [n.node.node_id for n in merged] == ["c", "b"]
+
+    def test_failed_query_is_skipped(self):
+        """测试单个查询失败时使用其他查询的结果，全部失败时抛出异常"""
+        retriever = _RecordingRetriever({"q1": RuntimeError("timeout"), "q2": _nodes(("a", 0.8))})
+        assert [n.node.node_id for n in multi_query_retrieve(retriever, ["q1", "q2"], 3)] == ["a"]
+
+        retriever = _RecordingRetriever({"q1": RuntimeError("timeout"), "q2": RuntimeError("timeout")})
+        with pytest.raises(RuntimeError):
+            multi_query_retrieve(retriever, ["q1", "q2"], 3)
+
+    def test_rrf_keep_original_scores(self):
+        """测试 RRF 按融合排名排序，可保留原始分数"""
+        results = {"r1": _nodes(("a", 0.5), ("b", 0.9)), "r2": _nodes(("a", 0.6))}
+        rrf = ResultMerger(strategy="reciprocal_rank_fusion").merge(results, top_k=2)
+        kept = ResultMerger(strategy="reciprocal_rank_fusion", keep_original_scores=True).merge(results, top_k=2)
+
+        assert [n.node.node_id for n in kept] == [n.node.node_id for n in rrf] == ["a", "b"]
+        assert rrf[0].score < 0.1
+        assert [n.score for n in kept] == [0.6, 0.9]
+
+
+@pytest.mark.fast
+class TestEngineMultiQuery:
+    """ModularQueryEngine 接入多查询检索测试"""
+
+    def test_query_retrieves_all_rewrites(self, mocker):
+        """测试未启用推测检索时对全部改写查询检索并交给查询引擎"""
+        from backend.business.rag_engine.core.engine import ModularQueryEngine
+        from backend.business.rag_engine.core.engine_speculative import PrefetchedRetriever
+
+        engine = ModularQueryEngine.__new__(ModularQueryEngine)
+        engine.index_manager = MagicMock(embed_model=None)
+        engine.query_processor = MagicMock()
+        engine.query_processor.process.return_value = {
+            "final_query": "系统科学 定义",
+            "rewritten_queries": list(RESULTS),
+            "understanding": None,
+            "processing_method": "llm",
+        }
+        engine.retriever = _RecordingRetriever(RESULTS)
+        engine.query_router = None
+        engine.enable_auto_routing = False
+        engine.enable_speculative_retrieval = False
+        engine.retrieval_strategy = "vector"
+        engine.similarity_top_k = 3
+        engine.similarity_cutoff = 0.4
+        engine.llm = object()
+        create = mocker.patch.object(engine, '_create_query_engine_from_retriever', return_value=MagicMock())
+        mocker.patch.object(
+            engine, '_execute_with_query_engine', return_value=("答案", [], None, {"query": "q"})
+        )
+        mocker.patch(
+            'backend.business.rag_engine.core.engine.handle_fallback', side_effect=lambda a, *args: (a, None)
+        )
+
+        _, _, _, trace_info = engine.query("什么是系统科学", collect_trace=True)
+
+        assert sorted(b.query_str for b in engine.retriever.bundles) == sorted(RESULTS)
+        prefetched = create.call_args[0][0]
+        assert isinstance(prefetched, PrefetchedRetriever)
+        assert len(prefetched.retrieve("q")) == 3
+        assert trace_info["prefetched_retrieval"]["mode"] == "multi_query"
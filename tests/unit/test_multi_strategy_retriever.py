@@ -86,6 +86,11 @@ class TestMultiStrategyRetriever:
         with pytest.raises(ValueError, match="必须至少提供一个检索器"):
             MultiStrategyRetriever(retrievers=[])
     
+    def test_max_workers_deprecated(self):
+        """测试 max_workers 已废弃：传入时发出 DeprecationWarning"""
+        with pytest.warns(DeprecationWarning, match="max_workers"):
+            MultiStrategyRetriever(retrievers=[MockRetriever("retriever1")], max_workers=3)
+    
     def test_retrieve_rrf(self):
         """测试RRF合并策略"""
         retrievers = [
@@ -219,7 +224,6 @@ class TestMultiStrategyRetriever:
         multi_retriever = MultiStrategyRetriever(
             retrievers=retrievers,
             merge_strategy="reciprocal_rank_fusion",
-            max_workers=3,
         )
         
         # 并行执行应该比串行快
@@ -263,3 +267,83 @@ class TestMultiStrategyRetriever:
         results_simple = multi_retriever_simple.retrieve("query", top_k=5)
         assert isinstance(results_simple, list)
 
+
+
+class _DelayedRetriever(BaseRetriever):
+    """按延迟返回单个结果的检索器"""
+    
+    def __init__(self, name: str, delay: float = 0.0, error: Exception = None):
+        super().__init__(name)
+        self.delay = delay
+        self.error = error
+    
+    def retrieve(self, query: str, top_k: int = 10) -> List[NodeWithScore]:
+        import time
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [NodeWithScore(node=TextNode(id_=self.name, text=f"{self.name} result"), score=0.9)]
+
+
+@pytest.mark.fast
+class TestMultiStrategyTimeouts:
+    """多策略检索延迟预算与延迟统计测试"""
+    
+    @pytest.fixture(autouse=True)
+    def _reset_stats(self):
+        from backend.business.rag_engine.retrieval.latency import reset_latency_stats
+        reset_latency_stats()
+        yield
+        reset_latency_stats()
+    
+    def test_slow_strategy_is_dropped_and_partial_results_merged(self):
+        """测试超过延迟预算的策略不再等待，只合并按时完成的策略"""
+        import time
+        
+        multi_retriever = MultiStrategyRetriever(
+            retrievers=[_DelayedRetriever("vector"), _DelayedRetriever("grep", delay=1.0)],
+            timeout=2.0,
+            strategy_timeouts={"grep": 0.05},
+        )
+        
+        start = time.perf_counter()
+        results = multi_retriever.retrieve("query", top_k=5)
+        
+        assert time.perf_counter() - start < 0.5
+        assert [n.node.node_id for n in results] == ["vector"]
+        stats = multi_retriever.get_latency_stats()
+        assert stats["grep"]["timeouts"] == 1
+        assert stats["grep"]["max_ms"] == pytest.approx(50.0)
+        assert stats["vector"]["count"] == 1 and stats["vector"]["timeouts"] == 0
+    
+    def test_no_budget_waits_for_all_strategies(self):
+        """测试未配置延迟预算时等待全部策略，失败记入统计"""
+        multi_retriever = MultiStrategyRetriever(
+            retrievers=[
+                _DelayedRetriever("vector", delay=0.06),
+                _DelayedRetriever("bm25", error=RuntimeError("索引损坏")),
+            ],
+        )
+        
+        results = multi_retriever.retrieve("query", top_k=5)
+        
+        assert [n.node.node_id for n in results] == ["vector"]
+        stats = multi_retriever.get_latency_stats()
+        assert stats["bm25"]["errors"] == 1
+        assert stats["vector"]["p50_ms"] == 100.0
+    
+    def test_executor_is_reused_across_queries(self):
+        """测试多次检索复用同一个全局线程池"""
+        from backend.business.rag_engine.retrieval.strategies import multi_strategy
+        from backend.business.rag_engine.utils.executor import get_retrieval_executor
+        
+        multi_retriever = MultiStrategyRetriever(retrievers=[_DelayedRetriever("vector")])
+        with patch.object(
+            multi_strategy, 'get_retrieval_executor', wraps=get_retrieval_executor
+        ) as get_executor:
+            multi_retriever.retrieve("q1")
+            multi_retriever.retrieve("q2")
+        
+        executors = {id(get_retrieval_executor(call.args[0])) for call in get_executor.call_args_list}
+        assert len(executors) == 1
+        assert get_executor.call_args_list[0].args == (multi_strategy.EXECUTOR_NAME,)
@@ -0,0 +1,115 @@
+"""
+确定性节点ID单元测试
+
+测试节点ID计算、分配器、add_documents 直接返回向量ID以及断点续传的精确判断。
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import Document as LlamaDocument, NodeRelationship
+
+from backend.infrastructure.indexer.utils.node_ids import (
+    NodeIdAssigner,
+    compute_node_id,
+    expected_node_ids,
+)
+
+
+def _documents():
+    return [
+        LlamaDocument(
+            text="系统科学研究系统的结构与功能。" * 30,
+            metadata={"file_path": f"docs/{name}.md", "repository": "owner/repo", "branch": "main"},
+        )
+        for name in ("a", "b")
+    ]
+
+
+def _index_manager():
+    return MagicMock(chunk_size=64, chunk_overlap=8)
+
+
+def _splitter():
+    return SentenceSplitter(chunk_size=64, chunk_overlap=8, tokenizer=list)
+
+
+@pytest.mark.fast
+class TestNodeIdAssigner:
+    """NodeIdAssigner测试"""
+
+    def test_compute_node_id_is_deterministic(self):
+        """测试相同输入得到相同ID，内容变化得到不同ID"""
+        first = compute_node_id("owner/repo@main", "a.md", 0, "内容")
+        assert first == compute_node_id("owner/repo@main", "a.md", 0, "内容")
+        assert first != compute_node_id("owner/repo@main", "a.md", 0, "内容已改")
+        assert first != compute_node_id("owner/repo@main", "a.md", 1, "内容")
+
+    def test_assign_is_repeatable_and_fixes_relationships(self):
+        """测试两次分块得到相同ID，并修正前后节点关系"""
+        nodes = NodeIdAssigner().assign(_splitter().get_nodes_from_documents(_documents()))
+        again = NodeIdAssigner().assign(_splitter().get_nodes_from_documents(_documents()))
+
+        assert [n.node_id for n in nodes] == [n.node_id for n in again]
+        assert nodes[1].relationships[NodeRelationship.PREVIOUS].node_id == nodes[0].node_id
+        assert nodes[0].relationships[NodeRelationship.NEXT].node_id == nodes[1].node_id
+
+    def test_ordinals_continue_across_calls_and_discard(self):
+        """测试分批分配时序号按文件连续，写入失败的ID被剔除"""
+        nodes = _splitter().get_nodes_from_documents(_documents())
+        whole = NodeIdAssigner()
+        whole.assign([n.model_copy(deep=True) for n in nodes])
+
+        batched = NodeIdAssigner()
+        batched.assign(nodes[:3])
+        batched.assign(nodes[3:])
+        assert batched.ids_by_file == whole.ids_by_file
+
+        failed = batched.ids_by_file["docs/a.md"][0]
+        batched.discard([failed])
+        assert failed not in batched.ids_by_file["docs/a.md"]
+
+
+@pytest.mark.fast
+class TestInsertTimeVectorIds:
+    """写入时确定向量ID测试"""
+
+    def test_add_documents_returns_ids_without_querying(self, mocker):
+        """测试 add_documents 直接返回分块时的向量ID，不回查 Chroma"""
+        from backend.infrastructure.indexer.utils import documents as documents_module
+
+        mocker.patch.object(documents_module, 'create_node_parser', return_value=_splitter())
+        index_manager = _index_manager()
+
+        count, vector_ids_map = documents_module.add_documents(index_manager, _documents())
+
+        inserted = index_manager._index.insert_nodes.call_args.args[0]
+        assert count == 2
+        assert sum(len(v) for v in vector_ids_map.values()) == len(inserted)
+        assert vector_ids_map["docs/a.md"][0] == inserted[0].node_id
+        index_manager.chroma_collection.get.assert_not_called()
+
+    def test_filter_skips_complete_and_reprocesses_partial_files(self, mocker):
+        """测试断点续传：完整文件跳过，写了一半的文件清理后重新处理"""
+        from backend.infrastructure.indexer.build import filter as filter_module
+        from backend.infrastructure.indexer.utils import node_ids
+
+        mocker.patch.object(node_ids, 'create_node_parser', return_value=_splitter())
+        documents = _documents()
+        expected = expected_node_ids(_index_manager(), documents)
+        partial = expected["docs/b.md"][:1]
+
+        index_manager = _index_manager()
+        index_manager.chroma_collection.count.return_value = 10
+        index_manager.chroma_collection.get.return_value = {
+            "ids": expected["docs/a.md"] + partial,
+            "metadatas": [{"file_path": "docs/a.md"}] * len(expected["docs/a.md"]) + [{"file_path": "docs/b.md"}],
+        }
+
+        to_process, skipped, vectorized = filter_module.filter_vectorized_documents(index_manager, documents)
+
+        assert [d.metadata["file_path"] for d in to_process] == ["docs/b.md"]
+        assert skipped == 1
+        assert vectorized == {"docs/a.md": expected["docs/a.md"]}
+        index_manager.chroma_collection.delete.assert_called_once_with(ids=partial)
@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 import json
 
+from backend.business.rag_engine.caching.query_cache import QueryRewriteCache
 from backend.business.rag_engine.processing.query_processor import QueryProcessor, reset_query_processor
 
 
@@ -48,8 +49,8 @@ class TestQueryProcessor:
     def test_init(self):
         """测试初始化"""
         processor = QueryProcessor()
-        assert processor._cache == {}
-        assert processor._cache_size == 100
+        assert len(processor._cache) == 0
+        assert processor._cache.max_entries == 100
         assert processor._llm_initialized is False
     
     def test_assess_complexity_simple(self, query_processor):
@@ -166,7 +167,7 @@ class TestQueryProcessor:
     def test_cache_lru_eviction(self, query_processor):
         """测试缓存LRU淘汰"""
         # 设置小缓存大小
-        query_processor._cache_size = 2
+        query_processor._cache = QueryRewriteCache(max_entries=2)
         
         # 添加3个查询
         query_processor.process("query1", use_cache=True)
@@ -174,9 +175,9 @@ class TestQueryProcessor:
         query_processor.process("query3", use_cache=True)
         
         # 第一个应该被淘汰
-        assert "query1" not in query_processor._cache
-        assert "query2" in query_processor._cache
-        assert "query3" in query_processor._cache
+        assert query_processor._cache.get(query_processor._cache_key("query1")) is None
+        assert query_processor._cache.get(query_processor._cache_key("query2")) is not None
+        assert query_processor._cache.get(query_processor._cache_key("query3")) is not None
     
     def test_clear_cache(self, query_processor):
         """测试清空缓存"""
@@ -185,6 +186,19 @@ class TestQueryProcessor:
         
         query_processor.clear_cache()
         assert len(query_processor._cache) == 0
+
+    def test_clear_cache_keeps_shared_entries(self, mock_llm):
+        """测试共享缓存上的清空只切换本实例的命名空间，其他实例的结果保留"""
+        shared = QueryRewriteCache(max_entries=10)
+        processor = QueryProcessor(llm=mock_llm, cache=shared)
+        other = QueryProcessor(llm=mock_llm, cache=shared)
+        processor.process("test", use_cache=True)
+
+        processor.clear_cache()
+
+        assert len(shared) == 1
+        assert other.process("test", use_cache=True)["from_cache"] is True
+        assert processor.process("test", use_cache=True)["from_cache"] is False
     
     def test_rewritten_queries_limit(self, query_processor, mock_llm):
         """测试改写查询数量限制（最多3个）"""
@@ -251,3 +265,71 @@ class TestQueryProcessorIntegration:
         
         assert processor1 is not processor2
 
+
+
+class TestQueryRewriteCache:
+    """共享查询改写缓存测试"""
+    
+    @pytest.fixture
+    def template_path(self, tmp_path):
+        path = tmp_path / "rewrite.txt"
+        path.write_text("改写查询：{query}", encoding="utf-8")
+        return str(path)
+    
+    def _llm(self, sample_understanding_response):
+        llm = Mock()
+        llm.model = "deepseek-chat"
+        llm.complete.return_value = Mock(text=json.dumps(sample_understanding_response))
+        return llm
+    
+    def test_shared_across_processors_and_persisted(self, tmp_path, template_path, sample_understanding_response):
+        """测试不同实例共享缓存（按标准化问题），重新打开缓存文件后仍命中"""
+        db_path = tmp_path / "query_rewrite.sqlite3"
+        cache = QueryRewriteCache(db_path=db_path)
+        first_llm = self._llm(sample_understanding_response)
+        second_llm = self._llm(sample_understanding_response)
+        
+        QueryProcessor(llm=first_llm, cache=cache, template_path=template_path).process("系统科学和复杂性理论的关系是什么？", force_llm=True)
+        result = QueryProcessor(llm=second_llm, cache=cache, template_path=template_path).process("系统科学和复杂性理论的关系是什么", force_llm=True)
+        
+        assert result["from_cache"] is True
+        assert result["original_query"] == "系统科学和复杂性理论的关系是什么"
+        second_llm.complete.assert_not_called()
+        cache.close()
+        
+        reopened = QueryRewriteCache(db_path=db_path)
+        third_llm = self._llm(sample_understanding_response)
+        result = QueryProcessor(llm=third_llm, cache=reopened, template_path=template_path).process("系统科学和复杂性理论的关系是什么", force_llm=True)
+        assert result["from_cache"] is True
+        assert reopened.get_stats()["disk_hits"] == 1
+        third_llm.complete.assert_not_called()
+        reopened.close()
+    
+    def test_ttl_and_failures_not_cached(self, mock_llm, template_path):
+        """测试过期条目不命中，LLM失败的降级结果不缓存"""
+        cache = QueryRewriteCache(ttl_seconds=0.05)
+        cache.put("k", {"final_query": "q"})
+        assert cache.get("k") == {"final_query": "q"}
+        import time
+        time.sleep(0.06)
+        assert cache.get("k") is None
+        
+        mock_llm.complete.side_effect = Exception("API Error")
+        processor = QueryProcessor(llm=mock_llm, cache=QueryRewriteCache(), template_path=template_path)
+        processor._llm_initialized = True
+        processor.process("复杂查询", force_llm=True)
+        processor.process("复杂查询", force_llm=True)
+        assert mock_llm.complete.call_count == 2
+    
+    def test_cache_events_reported_to_observers(self):
+        """测试缓存命中情况通过观察器管理器上报"""
+        from backend.infrastructure.observers.manager import ObserverManager
+        
+        observer_manager = ObserverManager()
+        processor = QueryProcessor(llm=Mock(), cache=QueryRewriteCache(), observer_manager=observer_manager)
+        processor.process("测试查询")
+        processor.process("测试查询")
+        
+        stats = observer_manager.get_summary()["caches"]["query_rewrite"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
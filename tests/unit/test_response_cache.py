@@ -0,0 +1,279 @@
+"""
+查询回答缓存单元测试
+
+测试问题标准化、精确/语义命中、TTL、collection 版本失效、ModularQueryEngine 接入以及检索结果缓存。
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.business.rag_engine.caching import response_cache
+from backend.business.rag_engine.caching.response_cache import QueryResponseCache, normalize_query
+from backend.infrastructure.indexer.utils import version
+
+
+SCOPE = QueryResponseCache.make_scope(strategy="vector", top_k=3, model="deepseek-chat")
+
+VECTORS = {
+    "什么是系统工程": [1.0, 0.0, 0.0],
+    "系统工程是什么": [0.99, 0.05, 0.0],
+    "控制论的核心概念": [0.0, 1.0, 0.0],
+}
+
+
+def _embed(text):
+    return VECTORS[text]
+
+
+@pytest.mark.fast
+class TestQueryResponseCache:
+    """QueryResponseCache测试"""
+
+    def test_normalize_query(self):
+        """测试全角半角、大小写、空白与结尾标点标准化"""
+        assert normalize_query("  什么是  ＲＡＧ？ ") == "什么是 rag"
+        assert normalize_query("What is RAG?") == normalize_query("what is rag")
+
+    def test_exact_hit_and_scope_isolation(self):
+        """测试标准化后精确命中，配置不同不命中"""
+        cache = QueryResponseCache()
+        lookup = cache.lookup("什么是系统工程？", SCOPE, "v1")
+        assert not lookup.hit
+        cache.store(lookup, "答案", [{"text": "ctx"}], "推理")
+
+        hit = cache.lookup("什么是系统工程", SCOPE, "v1")
+        assert hit.hit and hit.tier == "exact"
+        assert hit.response.answer == "答案"
+        assert hit.response.reasoning_content == "推理"
+
+        other_scope = QueryResponseCache.make_scope(strategy="hybrid", top_k=3, model="deepseek-chat")
+        assert not cache.lookup("什么是系统工程", other_scope, "v1").hit
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_semantic_tier(self):
+        """测试语义层：相近问题命中，不相关问题不命中"""
+        cache = QueryResponseCache(semantic_enable=True, semantic_max_distance=0.05)
+        cache.store(cache.lookup("什么是系统工程", SCOPE, "v1", _embed), "答案", [])
+
+        hit = cache.lookup("系统工程是什么", SCOPE, "v1", _embed)
+        assert hit.hit and hit.tier == "semantic"
+        assert hit.similarity > 0.95
+        assert not cache.lookup("控制论的核心概念", SCOPE, "v1", _embed).hit
+        assert cache.get_stats()["semantic_hits"] == 1
+
+    def test_ttl_and_lru(self):
+        """测试过期条目不命中，超出容量按LRU淘汰"""
+        cache = QueryResponseCache(max_entries=2, ttl_seconds=0.05)
+        cache.store(cache.lookup("q1", SCOPE, "v1"), "a1", [])
+        time.sleep(0.06)
+        assert not cache.lookup("q1", SCOPE, "v1").hit
+
+        cache = QueryResponseCache(max_entries=2)
+        for q in ("q1", "q2"):
+            cache.store(cache.lookup(q, SCOPE, "v1"), q, [])
+        cache.lookup("q1", SCOPE, "v1")
+        cache.store(cache.lookup("q3", SCOPE, "v1"), "q3", [])
+
+        assert cache.lookup("q1", SCOPE, "v1").hit
+        assert not cache.lookup("q2", SCOPE, "v1").hit
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_collection_version_invalidates(self):
+        """测试 collection 版本变化时条目失效，查询期间版本变化的结果不写入"""
+        cache = QueryResponseCache()
+        cache.store(cache.lookup("q1", SCOPE, "v1"), "a1", [])
+
+        stale_lookup = cache.lookup("q2", SCOPE, "v1")
+        assert not cache.lookup("q1", SCOPE, "v2").hit
+        assert cache.get_stats()["invalidations"] == 1
+
+        cache.store(stale_lookup, "a2", [])
+        assert not cache.lookup("q2", SCOPE, "v2").hit
+
+
+@pytest.mark.fast
+class TestCollectionVersion:
+    """collection版本测试"""
+
+    def test_version_changes_on_bump_and_count(self):
+        """测试写入通知与节点数变化都会改变版本"""
+        version.reset_collection_versions()
+        index_manager = MagicMock(collection_name="c")
+        index_manager.chroma_collection.count.return_value = 5
+
+        first = version.get_collection_version(index_manager)
+        assert version.get_collection_version(index_manager) == first
+
+        version.bump_collection_version(index_manager)
+        second = version.get_collection_version(index_manager)
+        assert second != first
+
+        index_manager.chroma_collection.count.return_value = 6
+        assert version.get_collection_version(index_manager, max_age=0) != second
+
+
+@pytest.mark.fast
+class TestEngineResponseCache:
+    """ModularQueryEngine 接入回答缓存测试"""
+
+    def _engine(self, mocker):
+        from backend.business.rag_engine.core import engine as engine_module
+
+        engine = engine_module.ModularQueryEngine.__new__(engine_module.ModularQueryEngine)
+        engine.index_manager = MagicMock(collection_name="c")
+        engine.index_manager.chroma_collection.count.return_value = 10
+        engine.query_processor = MagicMock()
+        engine.query_processor.process.return_value = {
+            "final_query": "什么是系统工程",
+            "understanding": None,
+            "processing_method": "simple",
+        }
+        engine.llm = object()
+        engine.retrieval_strategy = "vector"
+        engine.similarity_top_k = 3
+        engine.similarity_cutoff = 0.4
+        engine.enable_rerank = False
+        engine.rerank_top_n = 3
+        engine.reranker_type = None
+        engine.enable_auto_routing = False
+        engine.enable_speculative_retrieval = False
+        engine.model_name = "deepseek-chat"
+        engine.enable_markdown_formatting = True
+        mocker.patch.object(engine, '_get_or_create_query_engine', return_value=(MagicMock(), "vector"))
+        execute = mocker.patch.object(
+            engine, '_execute_with_query_engine',
+            return_value=("答案", [{"text": "ctx", "score": 0.9}], None, None),
+        )
+        mocker.patch.object(engine_module, 'handle_fallback', side_effect=lambda a, *args: (a, None))
+        return engine, execute
+
+    def test_repeated_question_skips_pipeline(self, mocker):
+        """测试重复问题直接返回缓存，collection 变化后重新查询"""
+        version.reset_collection_versions()
+        response_cache.set_response_cache(QueryResponseCache())
+        engine, execute = self._engine(mocker)
+
+        first = engine.query("什么是系统工程？")
+        second = engine.query("什么是系统工程")
+
+        assert second[:2] == first[:2]
+        assert execute.call_count == 1
+        assert engine.query_processor.process.call_count == 1
+
+        version.bump_collection_version(engine.index_manager)
+        engine.query("什么是系统工程")
+        assert execute.call_count == 2
+
+    def test_fallback_answer_not_cached(self, mocker):
+        """测试降级回答不写入缓存，相同问题再次查询时重新执行"""
+        from backend.business.rag_engine.core import engine as engine_module
+
+        version.reset_collection_versions()
+        response_cache.set_response_cache(QueryResponseCache())
+        engine, execute = self._engine(mocker)
+        mocker.patch.object(engine_module, 'handle_fallback', return_value=("降级回答", "no_sources"))
+
+        first = engine.query("什么是系统工程？")
+        second = engine.query("什么是系统工程？")
+
+        assert first[0] == second[0] == "降级回答"
+        assert execute.call_count == 2
+
+
+@pytest.mark.fast
+class TestRetrievalCache:
+    """检索结果缓存测试"""
+
+    def _index(self):
+        from llama_index.core import VectorStoreIndex
+        from llama_index.core.embeddings import MockEmbedding
+        from llama_index.core.schema import TextNode
+
+        nodes = [TextNode(id_=f"n{i}", text=f"系统科学片段 {i}") for i in range(4)]
+        return VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+
+    def test_lru_ttl_cache(self):
+        """测试LRU淘汰、过期与命中统计"""
+        from backend.business.rag_engine.caching import LRUTTLCache
+
+        cache = LRUTTLCache(max_entries=2, ttl_seconds=0.05)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        time.sleep(0.06)
+        assert cache.get("a") is None
+        assert cache.get_stats()["hits"] == 1
+
+    def test_repeated_subquery_hits_cache_across_retrievers(self, mocker):
+        """测试每次新建检索器时相同子查询也只检索一次，返回节点副本"""
+        from llama_index.core.retrievers import VectorIndexRetriever
+        from backend.business.rag_engine.caching import LRUTTLCache, retrieval_cache
+        from backend.business.rag_engine.retrieval.factory import create_retriever
+
+        retrieval_cache.set_retrieval_cache(LRUTTLCache())
+        index = self._index()
+        spy = mocker.spy(VectorIndexRetriever, '_retrieve')
+
+        first = create_retriever(index, "vector", similarity_top_k=2).retrieve("系统科学")
+        first[0].score = -1.0
+        second = create_retriever(index, "vector", similarity_top_k=2).retrieve("系统科学")
+
+        assert spy.call_count == 1
+        assert [n.node.node_id for n in second] == [n.node.node_id for n in first]
+        assert second[0].score != -1.0
+
+        create_retriever(index, "vector", similarity_top_k=3).retrieve("系统科学")
+        assert spy.call_count == 2
+
+    def test_multi_caches_members_not_fused_result(self, mocker, monkeypatch):
+        """测试多策略检索只缓存成员检索结果，每次都重新合并"""
+        from llama_index.core.retrievers import VectorIndexRetriever
+        from backend.business.rag_engine.caching import LRUTTLCache, retrieval_cache
+        from backend.business.rag_engine.caching.retrieval_cache import CachedRetriever
+        from backend.business.rag_engine.retrieval import factory
+        from backend.business.rag_engine.retrieval.merger import ResultMerger
+
+        retrieval_cache.set_retrieval_cache(LRUTTLCache())
+        monkeypatch.setattr(factory.config, 'ENABLED_RETRIEVAL_STRATEGIES', ["vector"], raising=False)
+        index = self._index()
+        spy = mocker.spy(VectorIndexRetriever, '_retrieve')
+        merge = mocker.spy(ResultMerger, 'merge')
+
+        multi = factory.create_retriever(index, "multi", similarity_top_k=2)
+        assert not isinstance(multi, CachedRetriever)
+        multi.retrieve("系统科学")
+        factory.create_retriever(index, "multi", similarity_top_k=2).retrieve("系统科学")
+        factory.create_retriever(index, "vector", similarity_top_k=2).retrieve("系统科学")
+
+        assert spy.call_count == 1
+        assert merge.call_count == 2
+
+    def test_collection_version_change_misses(self, mocker):
+        """测试 collection 版本变化后重新检索"""
+        from backend.business.rag_engine.caching import LRUTTLCache, retrieval_cache
+        from backend.business.rag_engine.caching.retrieval_cache import CachedRetriever
+
+        version.reset_collection_versions()
+        collection = MagicMock()
+        collection.name = "c"
+        collection.count.return_value = 4
+        index = MagicMock()
+        index.docstore.docs = {}
+        index.vector_store.client = collection
+        inner = MagicMock()
+        inner.retrieve.return_value = []
+        retriever = CachedRetriever(inner, index, "vector", 3, LRUTTLCache())
+
+        retriever.retrieve("q")
+        retriever.retrieve("q")
+        assert inner.retrieve.call_count == 1
+
+        version.bump_collection_version("c")
+        retriever.retrieve("q")
+        assert inner.retrieve.call_count == 2
@@ -206,3 +206,68 @@ class TestResultMerger:
             assert hasattr(result.node, 'node_id')
             assert result.node.node_id is not None
 
+
+
+def _nodes(*items):
+    return [NodeWithScore(node=TextNode(id_=node_id, text=node_id), score=score) for node_id, score in items]
+
+
+@pytest.mark.fast
+class TestVectorizedFusion:
+    """向量化融合测试"""
+    
+    RESULTS = {
+        "vector": _nodes(("a", 0.9), ("b", 0.6), ("c", 0.3)),
+        "bm25": _nodes(("c", 12.0), ("d", 8.0), ("a", 4.0)),
+    }
+    
+    def test_rrf_matches_reference_formula(self):
+        """测试RRF分数与公式一致，节点按ID去重"""
+        merger = ResultMerger(strategy="reciprocal_rank_fusion", weights={"bm25": 0.5})
+        merged = merger.merge(self.RESULTS, top_k=10)
+        
+        scores = {n.node.node_id: n.score for n in merged}
+        assert scores["a"] == pytest.approx(1 / 61 + 0.5 / 63)
+        assert scores["c"] == pytest.approx(1 / 63 + 0.5 / 61)
+        assert [n.node.node_id for n in merged] == ["a", "c", "b", "d"]
+    
+    def test_top_k_ties_keep_first_seen_order(self):
+        """测试部分排序截断Top-K，同分按首次出现顺序"""
+        results = {"r1": _nodes(*[(f"n{i}", 0.5) for i in range(2000)])}
+        merged = ResultMerger(strategy="weighted_score").merge(results, top_k=3)
+        assert [n.node.node_id for n in merged] == ["n0", "n1", "n2"]
+    
+    def test_comb_sum_and_comb_mnz_min_max(self):
+        """测试min-max归一化后的CombSUM与CombMNZ"""
+        comb_sum = ResultMerger(strategy="comb_sum").merge(self.RESULTS, top_k=10)
+        comb_mnz = ResultMerger(strategy="comb_mnz").merge(self.RESULTS, top_k=10)
+        
+        sum_scores = {n.node.node_id: n.score for n in comb_sum}
+        assert sum_scores == pytest.approx({"a": 1.0, "b": 0.5, "c": 1.0, "d": 0.5})
+        assert [n.node.node_id for n in comb_sum][:2] == ["a", "c"]
+        mnz_scores = {n.node.node_id: n.score for n in comb_mnz}
+        assert mnz_scores == pytest.approx({"a": 2.0, "b": 0.5, "c": 2.0, "d": 0.5})
+    
+    def test_comb_sum_z_score(self):
+        """测试z-score归一化，单一分数的结果归零"""
+        results = {"r1": _nodes(("a", 3.0), ("b", 1.0)), "r2": _nodes(("b", 0.7))}
+        merged = ResultMerger(strategy="comb_sum", score_normalization="z_score").merge(results, top_k=10)
+        assert {n.node.node_id: n.score for n in merged} == pytest.approx({"a": 1.0, "b": -1.0})
+        
+        with pytest.raises(ValueError):
+            ResultMerger(score_normalization="rank")
+    
+    def test_nodes_without_id_are_hashed_once(self, mocker):
+        """测试同一节点对象只计算一次哈希键"""
+        merger = ResultMerger(strategy="simple")
+        node = TextNode(text="相同内容", metadata={"file_path": "a.md"})
+        node.id_ = ""
+        get_node_id = mocker.spy(merger, '_get_node_id')
+        
+        merged = merger.merge(
+            {"r1": [NodeWithScore(node=node, score=0.9)], "r2": [NodeWithScore(node=node, score=0.8)]},
+            top_k=5,
+        )
+        
+        assert len(merged) == 1
+        assert get_node_id.call_count == 1
@@ -0,0 +1,172 @@
+"""
+推测检索单元测试
+
+测试查询改写与原始问题检索并行执行，以及推测结果的直接使用、融合与丢弃。
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from backend.business.rag_engine.core.engine_speculative import (
+    PrefetchedRetriever,
+    is_near_identical,
+    speculative_process_and_retrieve,
+)
+
+
+def _nodes(*items):
+    return [NodeWithScore(node=TextNode(id_=node_id, text=node_id), score=score) for node_id, score in items]
+
+
+def _processor(final_query, understanding=None):
+    processor = MagicMock()
+    processor.process.return_value = {
+        "original_query": "q",
+        "final_query": final_query,
+        "understanding": understanding,
+        "processing_method": "llm",
+    }
+    return processor
+
+
+def _retriever(results):
+    retriever = MagicMock()
+    retriever.retrieve.side_effect = lambda query: results[getattr(query, 'query_str', query)]
+    return retriever
+
+
+@pytest.mark.fast
+class TestSpeculativeRetrieval:
+    """推测检索测试"""
+
+    def test_near_identical(self):
+        """测试标准化后相同或字符相似度足够高时视为几乎相同"""
+        assert is_near_identical("什么是系统工程？", "什么是系统工程", 0.9) == (True, 1.0)
+        near, similarity = is_near_identical("系统科学的定义", "系统科学 定义 概念 内涵", 0.9)
+        assert not near and 0 < similarity < 0.9
+
+    def test_reuse_speculative_nodes(self):
+        """测试改写几乎相同时直接使用推测结果，只检索一次"""
+        retriever = _retriever({"什么是系统工程？": _nodes(("a", 0.9))})
+        result = speculative_process_and_retrieve(
+            _processor("什么是系统工程"), "什么是系统工程？", lambda q, u: (retriever, "vector"), 3
+        )
+
+        assert result.mode == "reused"
+        assert [n.node.node_id for n in result.nodes] == ["a"]
+        assert retriever.retrieve.call_count == 1
+
+    def test_fuse_with_rewritten_nodes(self):
+        """测试改写不同时与改写后的检索结果 RRF 融合，保留最高相似度分数"""
+        retriever = _retriever({
+            "系统科学": _nodes(("a", 0.6), ("b", 0.5)),
+            "系统科学 定义 概念": _nodes(("c", 0.8), ("a", 0.7)),
+        })
+        result = speculative_process_and_retrieve(
+            _processor("系统科学 定义 概念"), "系统科学", lambda q, u: (retriever, "vector"), 3
+        )
+
+        assert result.mode == "fused"
+        assert [(n.node.node_id, n.score) for n in result.nodes] == [("a", 0.7), ("c", 0.8), ("b", 0.5)]
+        assert result.to_trace()["queries"] == ["系统科学 定义 概念"]
+
+    def test_discard_when_routing_changes(self):
+        """测试改写后路由到不同检索器时丢弃推测结果"""
+        chunk = _retriever({"介绍系统论": _nodes(("a", 0.9))})
+        files = _retriever({"系统论 概述": _nodes(("f", 0.7))})
+
+        def resolve(query, understanding):
+            return (files, "files_via_content") if understanding else (chunk, "chunk")
+
+        result = speculative_process_and_retrieve(
+            _processor("系统论 概述", understanding={"query_type": "exploratory"}), "介绍系统论", resolve, 3
+        )
+
+        assert result.mode == "discarded"
+        assert result.strategy == "files_via_content"
+        assert [n.node.node_id for n in result.nodes] == ["f"]
+
+    def test_retrieval_runs_while_rewriting(self):
+        """测试原始问题检索在查询改写期间执行（改写等待检索开始也不会死锁）"""
+        started = threading.Event()
+        retriever = MagicMock()
+
+        def retrieve(query):
+            started.set()
+            return _nodes(("a", 0.9))
+
+        retriever.retrieve.side_effect = retrieve
+        processor = _processor("q")
+        processed = processor.process.return_value
+
+        def process(query):
+            assert started.wait(5)
+            return processed
+
+        processor.process.side_effect = process
+
+        result = speculative_process_and_retrieve(processor, "q", lambda q, u: (retriever, "vector"), 3)
+        assert result.mode == "reused"
+
+    def test_speculative_failure_falls_back(self):
+        """测试推测检索失败时只检索改写后的查询"""
+        calls = []
+
+        def retrieve(query):
+            calls.append(query)
+            if len(calls) == 1:
+                raise RuntimeError("timeout")
+            return _nodes(("a", 0.9))
+
+        retriever = MagicMock()
+        retriever.retrieve.side_effect = retrieve
+        result = speculative_process_and_retrieve(_processor("q"), "q", lambda q, u: (retriever, "vector"), 3)
+
+        assert result.mode == "fallback"
+        assert [n.node.node_id for n in result.nodes] == ["a"]
+
+    def test_prefetched_retriever_returns_copies(self):
+        """测试预取检索器返回节点副本"""
+        nodes = _nodes(("a", 0.9))
+        retriever = PrefetchedRetriever(nodes)
+        retrieved = retriever.retrieve("任意查询")
+        retrieved[0].score = 0.0
+        assert retriever.retrieve("任意查询")[0].score == 0.9
+
+
+@pytest.mark.fast
+class TestEngineSpeculativeRetrieval:
+    """ModularQueryEngine 接入推测检索测试"""
+
+    def test_query_uses_speculative_nodes(self, mocker):
+        """测试 query() 把推测检索得到的节点交给查询引擎，并记录追踪信息"""
+        from backend.business.rag_engine.core.engine import ModularQueryEngine
+
+        engine = ModularQueryEngine.__new__(ModularQueryEngine)
+        engine.index_manager = MagicMock(embed_model=None)
+        engine.query_processor = _processor("什么是系统工程")
+        engine.retriever = _retriever({"什么是系统工程？": _nodes(("a", 0.9))})
+        engine.query_router = None
+        engine.enable_auto_routing = False
+        engine.enable_speculative_retrieval = True
+        engine.retrieval_strategy = "vector"
+        engine.similarity_top_k = 3
+        engine.similarity_cutoff = 0.4
+        engine.llm = object()
+        create = mocker.patch.object(engine, '_create_query_engine_from_retriever', return_value=MagicMock())
+        mocker.patch.object(
+            engine, '_execute_with_query_engine', return_value=("答案", [], None, {"query": "q"})
+        )
+        mocker.patch(
+            'backend.business.rag_engine.core.engine.handle_fallback', side_effect=lambda a, *args: (a, None)
+        )
+
+        _, _, _, trace_info = engine.query("什么是系统工程？", collect_trace=True)
+
+        prefetched = create.call_args[0][0]
+        assert isinstance(prefetched, PrefetchedRetriever)
+        assert [n.node.node_id for n in prefetched.retrieve("q")] == ["a"]
+        assert trace_info["prefetched_retrieval"]["mode"] == "reused"
@@ -0,0 +1,220 @@
+"""
+文本索引（LineIndex）单元测试
+
+测试三元组剪枝查询、增量更新、持久化以及 GrepRetriever 接入。
+"""
+
+import os
+import time
+
+import pytest
+
+from backend.infrastructure.text_index import registry
+from backend.infrastructure.text_index.line_index import LineIndex, required_literals
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """测试语料目录"""
+    root = tmp_path / "corpus"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.md").write_text("系统科学是研究系统的科学。\n钱学森是系统科学的奠基人。\n", encoding="utf-8")
+    (root / "sub" / "b.md").write_text("Control Theory\ncontrol and feedback\n", encoding="utf-8")
+    (root / "bin.dat").write_bytes(b"\x00\x01" + "系统科学".encode("utf-8"))
+    (root / ".git").mkdir()
+    (root / ".git" / "HEAD").write_text("系统科学", encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def index(corpus, tmp_path):
+    """已构建的索引"""
+    instance = LineIndex(corpus, persist_path=tmp_path / "index.json.gz")
+    instance.refresh()
+    return instance
+
+
+@pytest.mark.fast
+class TestRequiredLiterals:
+    """required_literals测试"""
+
+    def test_literal_query(self):
+        """测试字面量查询整体作为必需片段"""
+        assert required_literals("a.b", regex=False) == ["a.b"]
+
+    def test_regex_sequence(self):
+        """测试正则顶层顺序结构按非字面量截断"""
+        assert required_literals("系统.*科学", regex=True) == ["系统", "科学"]
+        assert required_literals("^foo(bar)baz$", regex=True) == ["foobarbaz"]
+
+    def test_alternation_yields_nothing(self):
+        """测试顶层分支无法剪枝"""
+        assert required_literals("foo|bar", regex=True) == []
+
+
+@pytest.mark.fast
+class TestLineIndex:
+    """LineIndex测试"""
+
+    def test_literal_search_returns_grep_records(self, index, corpus):
+        """测试字面量查询返回 {file,line,content,matches}"""
+        results = index.search("系统科学", regex=False)
+
+        assert {(r["file"], r["line"]) for r in results} == {
+            (str(corpus / "a.md"), 1),
+            (str(corpus / "a.md"), 2),
+        }
+        first = next(r for r in results if r["line"] == 1)
+        assert first["content"] == "系统科学是研究系统的科学。"
+        assert first["matches"] == 1
+
+    def test_skips_binary_and_vcs_files(self, index, corpus):
+        """测试跳过二进制文件和 .git 目录"""
+        files = {r["file"] for r in index.search("系统科学", regex=False)}
+
+        assert str(corpus / "bin.dat") not in files
+        assert str(corpus / ".git" / "HEAD") not in files
+
+    def test_case_sensitivity(self, index):
+        """测试大小写敏感与不敏感"""
+        assert len(index.search("control", regex=False)) == 2
+        assert len(index.search("control", regex=False, case_sensitive=True)) == 1
+
+    def test_regex_and_invalid_regex(self, index):
+        """测试正则查询，非法正则按字面量处理"""
+        assert len(index.search("钱.*奠基", regex=True)) == 1
+        assert len(index.search("feedback|Theory", regex=True)) == 2
+        assert index.search("C++(", regex=True) == []
+
+    def test_incremental_update_and_delete(self, index, corpus):
+        """测试增量更新与删除"""
+        new_file = corpus / "c.md"
+        new_file.write_text("新增的系统科学文档\n", encoding="utf-8")
+        os.utime(corpus / "a.md", ns=(time.time_ns(), time.time_ns() + 10**9))
+        (corpus / "a.md").write_text("内容已修改\n", encoding="utf-8")
+
+        index.update_files(changed=[new_file, corpus / "a.md"])
+        index.update_files(deleted=[corpus / "sub" / "b.md"])
+
+        assert [r["file"] for r in index.search("系统科学", regex=False)] == [str(new_file)]
+        assert index.search("feedback", regex=False) == []
+
+    def test_refresh_detects_disk_changes(self, index, corpus):
+        """测试与磁盘对账"""
+        (corpus / "sub" / "b.md").unlink()
+        (corpus / "d.md").write_text("feedback loop\n", encoding="utf-8")
+
+        assert index.refresh() == 2
+        assert [r["file"] for r in index.search("feedback", regex=False)] == [str(corpus / "d.md")]
+
+    def test_persistence_round_trip(self, index, corpus, tmp_path):
+        """测试持久化后加载结果一致"""
+        index.save()
+
+        loaded = LineIndex(corpus, persist_path=tmp_path / "index.json.gz")
+        assert loaded.load() is True
+        assert loaded.refresh() == 0
+        assert loaded.search("奠基人", regex=False) == index.search("奠基人", regex=False)
+
+
+@pytest.mark.fast
+class TestRegistryAndRetriever:
+    """注册表与GrepRetriever接入测试"""
+
+    @pytest.fixture
+    def background(self, monkeypatch):
+        """记录后台任务而不执行，由测试决定何时运行"""
+        tasks = []
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: tasks.append((target, args)))
+        return tasks
+
+    @pytest.fixture
+    def inline_background(self, monkeypatch):
+        """后台构建与对账改为同步执行"""
+        monkeypatch.setattr(registry, '_run_in_background', lambda target, name, *args: target(*args))
+
+    def test_index_builds_in_background(self, corpus, background):
+        """测试索引未就绪时返回 None，构建在后台进行且只启动一次"""
+        assert registry.get_line_index(corpus) is None
+        assert registry.get_line_index(corpus) is None
+        assert len(background) == 1
+
+        target, args = background.pop()
+        target(*args)
+
+        index = registry.get_line_index(corpus)
+        assert index is not None
+        assert len(index.search("奠基人", regex=False)) == 1
+
+    def test_refresh_runs_in_background(self, corpus, background):
+        """测试过期对账在后台进行，期间返回当前索引"""
+        registry.prepare_line_index(corpus)
+        target, args = background.pop()
+        target(*args)
+        (corpus / "e.md").write_text("负反馈调节\n", encoding="utf-8")
+
+        index = registry.get_line_index(corpus, max_age=1e-9)
+        assert index is not None and index.search("负反馈", regex=False) == []
+        assert registry.get_line_index(corpus, max_age=1e-9) is index
+        assert len(background) == 1
+
+        target, args = background.pop()
+        target(*args)
+        assert len(index.search("负反馈", regex=False)) == 1
+
+    def test_changes_during_build_are_applied(self, corpus, background, monkeypatch):
+        """测试构建期间到达的变更通知在索引登记前补上"""
+        registry.prepare_line_index(corpus)
+        target, args = background.pop()
+        (corpus / "e.md").write_text("负反馈调节\n", encoding="utf-8")
+        registry.notify_file_changes(changed=[corpus / "e.md"])
+
+        # 模拟对账先于文件写入完成
+        monkeypatch.setattr(LineIndex, 'refresh', lambda self: 0)
+        target(*args)
+
+        assert len(registry.get_line_index(corpus).search("负反馈", regex=False)) == 1
+
+    def test_notify_file_changes_updates_loaded_index(self, corpus, inline_background):
+        """测试变更通知分发到包含该文件的索引"""
+        index = registry.get_line_index(corpus)
+        (corpus / "e.md").write_text("负反馈调节\n", encoding="utf-8")
+
+        registry.notify_file_changes(changed=[corpus / "e.md"])
+
+        assert len(index.search("负反馈", regex=False)) == 1
+
+    def test_notify_file_changes_skips_unbuilt_roots(self, corpus, background):
+        """测试尚未构建的根目录不因变更通知而同步构建"""
+        registry.notify_file_changes(changed=[corpus / "a.md"])
+
+        assert background == []
+        assert registry.get_line_index(corpus) is None
+
+    def test_grep_retriever_uses_index(self, corpus, mocker, inline_background):
+        """测试GrepRetriever走索引，不再启动grep子进程"""
+        from backend.business.rag_engine.retrieval.strategies.grep import GrepRetriever
+
+        mock_run = mocker.patch('backend.business.rag_engine.retrieval.strategies.grep.subprocess.run')
+        retriever = GrepRetriever(data_source_path=str(corpus), enable_regex=True, use_index=True)
+
+        results = retriever.retrieve("系统科学", top_k=5)
+
+        assert len(results) == 2
+        assert results[0].node.metadata["retrieval_method"] == "grep"
+        mock_run.assert_not_called()
+
+    def test_grep_retriever_falls_back_while_building(self, corpus, mocker, background):
+        """测试索引构建完成前GrepRetriever回退到grep"""
+        from backend.business.rag_engine.retrieval.strategies.grep import GrepRetriever
+
+        mocker.patch('platform.system', return_value='Linux')
+        mock_run = mocker.patch(
+            'backend.business.rag_engine.retrieval.strategies.grep.subprocess.run',
+            return_value=mocker.Mock(stdout=""),
+        )
+        retriever = GrepRetriever(data_source_path=str(corpus), enable_regex=True, use_index=True)
+
+        assert retriever.retrieve("系统科学", top_k=5) == []
+        mock_run.assert_called_once()
+        assert len(background) == 1
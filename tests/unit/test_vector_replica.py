@@ -0,0 +1,286 @@
+"""
+向量只读副本单元测试
+
+测试副本全量重建、增量同步（新增/删除/覆盖写入）与段合并、多进程共享同一份映射文件，
+以及 ReplicaChromaVectorStore 在本地回答查询、副本不一致或查询不受支持时回退到 Chroma。
+"""
+
+import uuid
+
+import chromadb
+import numpy as np
+import pytest
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import (
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+)
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from backend.infrastructure.config import config
+from backend.infrastructure.vector_replica import registry
+from backend.infrastructure.vector_replica.replica import VectorReplica
+from backend.infrastructure.vector_replica.vector_store import ReplicaChromaVectorStore, replica_filters
+from tests.fixtures.mocks import InMemoryChromaCollection
+
+DIM = 8
+
+
+def _node(i, file_path):
+    rng = np.random.default_rng(i)
+    return TextNode(
+        id_=f"n{i}",
+        text=f"第{i}段正文",
+        metadata={"file_path": file_path, "file_name": file_path.rsplit("/", 1)[-1]},
+        embedding=rng.normal(size=DIM).tolist(),
+    )
+
+
+def _nodes(count):
+    return [_node(i, f"docs/{i % 5}.md") for i in range(count)]
+
+
+def _collection(count=30):
+    """内存 collection（只需要按ID/分页读取的测试使用）"""
+    return InMemoryChromaCollection(f"replica_{uuid.uuid4().hex[:8]}", _nodes(count))
+
+
+def _chroma_collection(count=30):
+    """写入 count 个节点的 Chroma collection（需要与 Chroma 的查询结果比对或回退到 Chroma 时使用）"""
+    collection = chromadb.EphemeralClient().create_collection(
+        f"replica_{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+    )
+    ChromaVectorStore(chroma_collection=collection).add(_nodes(count))
+    return collection
+
+
+def _query(seed=99):
+    return np.random.default_rng(seed).normal(size=DIM).tolist()
+
+
+@pytest.mark.fast
+class TestVectorReplica:
+    """副本存储测试"""
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+    def test_rebuild_and_search_match_chroma(self, tmp_path, dtype):
+        """测试全量重建后的检索结果与 Chroma 一致（量化段经全精度重新打分）"""
+        collection = _chroma_collection()
+        replica = VectorReplica(collection.name, tmp_path / "r", dtype=dtype)
+
+        assert replica.rebuild(collection) == 30
+
+        hits = replica.search(_query(), top_k=5)
+        expected = collection.query(query_embeddings=[_query()], n_results=5)
+        assert [h[0] for h in hits] == expected["ids"][0]
+        assert np.allclose([1 - h[1] for h in hits], expected["distances"][0], atol=1e-4)
+        node_id, _, text, metadata = hits[0]
+        assert text == f"第{node_id[1:]}段正文" and metadata["file_path"].startswith("docs/")
+
+    def test_filters(self, tmp_path):
+        """测试精简元数据过滤"""
+        collection = _collection()
+        replica = VectorReplica(collection.name, tmp_path / "r")
+        replica.rebuild(collection)
+
+        hits = replica.search(_query(), top_k=50, filters={"file_path": {"docs/1.md", "docs/2.md"}})
+
+        assert len(hits) == 12
+        assert {h[3]["file_path"] for h in hits} == {"docs/1.md", "docs/2.md"}
+
+    def test_apply_changes_and_compaction(self, tmp_path):
+        """测试增量新增/删除/覆盖写入，段数超限时合并"""
+        collection = _collection(10)
+        replica = VectorReplica(collection.name, tmp_path / "r", max_segments=2)
+        replica.rebuild(collection)
+        for i in (100, 101):
+            collection.add_node(_node(i, "new.md"))
+        collection.delete(ids=["n0"])
+        assert replica.apply_changes(collection, added_ids=["n100", "n101"], deleted_ids=["n0"])
+        assert len(replica) == 11 and replica.get_stats()["segments"] == 2
+
+        updated = _node(1, "moved.md")
+        collection.delete(ids=["n1"])
+        collection.add_node(updated)
+        replica.apply_changes(collection, added_ids=["n1"])
+
+        stats = replica.get_stats()
+        assert stats["segments"] == 1 and stats["rows"] == stats["nodes"] == len(replica) == collection.count()
+        top = replica.search(updated.embedding, top_k=1)[0]
+        assert top[0] == "n1" and top[3]["file_path"] == "moved.md"
+        assert "n0" not in {h[0] for h in replica.search(_query(), top_k=20)}
+
+    def test_dtype_change_applied_on_compaction(self, tmp_path):
+        """测试修改存储精度后新段按新精度写入，合并时转换旧段"""
+        collection = _collection(10)
+        VectorReplica(collection.name, tmp_path / "r").rebuild(collection)
+        replica = VectorReplica(collection.name, tmp_path / "r", max_segments=1, dtype="int8")
+        replica.refresh()
+        float32_bytes = replica.get_stats()["search_bytes"]
+
+        collection.add_node(_node(100, "new.md"))
+        replica.apply_changes(collection, added_ids=["n100"])
+
+        stats = replica.get_stats()
+        assert stats["dtypes"] == ["int8"] and stats["segments"] == 1
+        assert stats["search_bytes"] == 11 * (DIM + 4) < float32_bytes
+        assert replica.search(_node(100, "new.md").embedding, top_k=1)[0][0] == "n100"
+
+    def test_apply_changes_skipped_before_build(self, tmp_path):
+        """测试副本尚未构建时不做增量同步"""
+        collection = _collection(3)
+        replica = VectorReplica(collection.name, tmp_path / "r")
+
+        assert replica.apply_changes(collection, added_ids=["n0"]) is False
+        assert not replica.exists
+
+    def test_other_process_sees_writes_via_shared_files(self, tmp_path):
+        """测试另一实例（模拟其他进程）只读映射同一份文件，清单变化后重新加载"""
+        collection = _collection(10)
+        writer = VectorReplica(collection.name, tmp_path / "r")
+        writer.rebuild(collection)
+        reader = VectorReplica(collection.name, tmp_path / "r")
+
+        assert reader.refresh() is True and len(reader) == 10
+        assert isinstance(reader._state.segments[0].vectors, np.memmap)
+        assert reader._state.segments[0].vectors.mode == 'r'
+        assert reader.refresh() is False
+
+        collection.delete(ids=["n3"])
+        writer.apply_changes(collection, deleted_ids=["n3"])
+
+        assert reader.refresh() is True and len(reader) == 9
+
+    def test_reader_reload_skips_location_map(self, tmp_path):
+        """测试读取方重新加载不构建节点ID映射，写入时按需构建"""
+        collection = _collection(10)
+        writer = VectorReplica(collection.name, tmp_path / "r")
+        writer.rebuild(collection)
+        reader = VectorReplica(collection.name, tmp_path / "r")
+        reader.refresh()
+
+        assert reader._state._locations is None and len(reader) == 10
+        assert reader.search(_query(), top_k=3)
+        assert reader._state._locations is None
+
+        collection.delete(ids=["n3"])
+        writer.apply_changes(collection, deleted_ids=["n3"])
+        assert len(writer) == 9 and "n3" not in writer._state.locations
+
+
+@pytest.mark.fast
+class TestReplicaChromaVectorStore:
+    """副本向量存储测试"""
+
+    def test_replica_filters(self):
+        """测试过滤条件转换"""
+        in_filter = MetadataFilters(filters=[
+            MetadataFilter(key="file_path", value=["a.md", "b.md"], operator=FilterOperator.IN),
+        ])
+        other_key = MetadataFilters(filters=[MetadataFilter(key="author", value="x")])
+        range_filter = MetadataFilters(filters=[MetadataFilter(key="file_path", value="a", operator=FilterOperator.GT)])
+
+        assert replica_filters(None) == {}
+        assert replica_filters(in_filter) == {"file_path": {"a.md", "b.md"}}
+        assert replica_filters(other_key) is None
+        assert replica_filters(range_filter) is None
+
+    def test_query_served_locally(self, monkeypatch):
+        """测试副本一致时在本地回答查询，结果与 Chroma 一致"""
+        collection = _chroma_collection()
+        chroma_result = ChromaVectorStore(chroma_collection=collection).query(
+            VectorStoreQuery(query_embedding=_query(), similarity_top_k=5)
+        )
+        registry.fresh_vector_replica(collection, background=False)
+        store = ReplicaChromaVectorStore(chroma_collection=collection)
+        monkeypatch.setattr(type(collection), 'query', lambda *a, **k: pytest.fail("不应访问 Chroma"))
+
+        result = store.query(VectorStoreQuery(query_embedding=_query(), similarity_top_k=5))
+
+        assert result.ids == chroma_result.ids
+        assert np.allclose(result.similarities, chroma_result.similarities, atol=1e-4)
+        assert [n.get_content() for n in result.nodes] == [n.get_content() for n in chroma_result.nodes]
+        assert result.nodes[0].metadata["file_path"] == chroma_result.nodes[0].metadata["file_path"]
+
+    def test_falls_back_to_chroma_while_stale(self, monkeypatch):
+        """测试副本未构建时回退到 Chroma，并在后台同步"""
+        collection = _chroma_collection(5)
+        store = ReplicaChromaVectorStore(chroma_collection=collection)
+        synced = []
+        monkeypatch.setattr(registry, '_sync_in_background', lambda replica, coll, *args: synced.append(coll.name))
+
+        result = store.query(VectorStoreQuery(query_embedding=_query(), similarity_top_k=3))
+
+        assert len(result.ids) == 3
+        assert synced == [collection.name]
+
+    def test_unsupported_query_uses_chroma(self):
+        """测试副本无法回答的过滤条件直接访问 Chroma"""
+        collection = _chroma_collection(5)
+        registry.fresh_vector_replica(collection, background=False)
+        store = ReplicaChromaVectorStore(chroma_collection=collection)
+        filters = MetadataFilters(filters=[MetadataFilter(key="file_name", value="1.md", operator=FilterOperator.NE)])
+
+        result = store.query(VectorStoreQuery(query_embedding=_query(), similarity_top_k=10, filters=filters))
+
+        assert len(result.ids) == 4
+        assert all(n.metadata["file_name"] != "1.md" for n in result.nodes)
+
+    def test_write_notification_keeps_replica_fresh(self, monkeypatch):
+        """测试写入通知后副本增量同步，检索无需再比对节点数"""
+        monkeypatch.setattr(config, 'VECTOR_REPLICA_ENABLE', True, raising=False)
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "cloud")
+        from backend.infrastructure.indexer.utils.version import bump_collection_version
+
+        collection = _collection(5)
+        registry.fresh_vector_replica(collection, background=False)
+        collection.add_node(_node(50, "new.md"))
+        bump_collection_version(collection)
+        registry.notify_vector_replica_changes(collection, added_ids=["n50"])
+        monkeypatch.setattr(type(collection), 'count', lambda self: pytest.fail("不应比对节点数"))
+
+        replica = registry.fresh_vector_replica(collection)
+
+        assert replica is not None and len(replica) == 6
+
+    def test_changes_during_sync_applied_after_rebuild(self, monkeypatch):
+        """测试全量同步期间到达的写入通知排队，同步完成后补到副本上"""
+        monkeypatch.setattr(config, 'VECTOR_REPLICA_ENABLE', True, raising=False)
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "cloud")
+        from backend.infrastructure.indexer.utils.version import bump_collection_version
+
+        collection = _collection(5)
+        rebuild = VectorReplica.rebuild
+
+        def rebuild_then_write(replica, coll, *args, **kwargs):
+            count = rebuild(replica, coll, *args, **kwargs)
+            coll.add_node(_node(50, "new.md"))
+            bump_collection_version(coll)
+            registry.notify_vector_replica_changes(coll, added_ids=["n50"])
+            return count
+
+        monkeypatch.setattr(VectorReplica, 'rebuild', rebuild_then_write)
+        replica = registry.fresh_vector_replica(collection, background=False)
+
+        assert replica is not None and len(replica) == 6 == collection.count()
+        assert replica.search(_node(50, "new.md").embedding, top_k=1)[0][0] == "n50"
+
+    def test_missed_change_detected_by_generation(self, monkeypatch):
+        """测试节点数相同但漏掉增量时，按清单版本号发现不一致并重建"""
+        monkeypatch.setattr(config, 'VECTOR_REPLICA_ENABLE', True, raising=False)
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "cloud")
+        from backend.infrastructure.indexer.utils.version import bump_collection_version
+
+        collection = _collection(5)
+        bump_collection_version(collection)
+        registry.fresh_vector_replica(collection, background=False)
+        collection.delete(ids=["n0"])
+        collection.add_node(_node(60, "new.md"))
+        bump_collection_version(collection)  # 写入通知丢失，节点数不变
+
+        replica = registry.fresh_vector_replica(collection, background=False)
+
+        assert replica is not None and len(replica) == 5
+        assert replica.search(_node(60, "new.md").embedding, top_k=1)[0][0] == "n60"
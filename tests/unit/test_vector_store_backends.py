@@ -0,0 +1,111 @@
+"""
+向量库后端单元测试
+
+测试 ChromaClientManager 按 vector_store.backend 选择本地嵌入式 / 内存后端、
+注册自定义后端，以及关闭索引管理器不会关闭共享的全局客户端。
+"""
+
+from types import SimpleNamespace
+
+import chromadb
+import pytest
+
+from backend.infrastructure.config import config
+from backend.infrastructure.indexer.core.chroma_client import ChromaClientManager
+
+
+@pytest.fixture
+def reset_client_manager():
+    """每个测试前后重置全局客户端，避免影响其他测试"""
+    ChromaClientManager.reset()
+    yield
+    ChromaClientManager.reset()
+
+
+@pytest.mark.fast
+@pytest.mark.usefixtures("reset_client_manager")
+class TestChromaBackends:
+    """向量库后端选择测试"""
+
+    def test_backend_from_env_override(self, monkeypatch):
+        """测试环境变量 VECTOR_STORE_BACKEND 覆盖配置"""
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "Ephemeral")
+
+        assert config.VECTOR_STORE_BACKEND == "ephemeral"
+
+    def test_persistent_backend_uses_vector_store_path(self, monkeypatch, tmp_path):
+        """测试本地嵌入式后端使用 paths.vector_store 目录"""
+        calls = []
+        monkeypatch.setattr(chromadb, 'PersistentClient', lambda path: calls.append(path) or chromadb.EphemeralClient())
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "persistent")
+        monkeypatch.setattr(config, 'VECTOR_STORE_PATH', tmp_path / "vector_store", raising=False)
+
+        ChromaClientManager.get_client()
+
+        assert calls == [str(tmp_path / "vector_store")]
+        assert (tmp_path / "vector_store").is_dir()
+        assert ChromaClientManager.get_backend() == "persistent"
+
+    def test_local_backend_supports_indexer_operations(self, monkeypatch):
+        """测试本地后端支持索引器使用的元数据过滤与按ID删除"""
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "ephemeral")
+
+        collection = ChromaClientManager.get_collection("local_ops")
+        collection.add(
+            ids=["a", "b", "c"],
+            embeddings=[[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+            metadatas=[{"file_path": "a.md"}, {"file_path": "b.md"}, {"file_path": "c.md"}],
+        )
+        collection.delete(ids=["b"])
+
+        assert collection.metadata == {"hnsw:space": "cosine"}
+        assert sorted(collection.get(where={"file_path": {"$in": ["a.md", "b.md", "c.md"]}})["ids"]) == ["a", "c"]
+        result = collection.query(query_embeddings=[[1.0, 0.1]], n_results=1, where={"file_path": "c.md"})
+        assert result["ids"] == [["c"]]
+
+    def test_client_is_shared_singleton(self, monkeypatch):
+        """测试客户端与 Collection 实例全局复用"""
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "ephemeral")
+
+        client = ChromaClientManager.get_client()
+
+        assert ChromaClientManager.get_client() is client
+        assert ChromaClientManager.get_collection("shared") is ChromaClientManager.get_collection("shared")
+        assert ChromaClientManager.is_shared_client(client)
+
+    def test_register_custom_backend(self, monkeypatch):
+        """测试注册自定义后端"""
+        created = []
+
+        def factory():
+            client = chromadb.EphemeralClient()
+            created.append(client)
+            return client
+
+        monkeypatch.setitem(ChromaClientManager._backends, "custom", ChromaClientManager._backends["ephemeral"])
+        ChromaClientManager.register_backend("custom", factory)
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "custom")
+
+        assert ChromaClientManager.get_client() is created[0]
+        assert "custom" in ChromaClientManager.available_backends()
+
+    def test_unknown_backend_raises(self, monkeypatch):
+        """测试未知后端报错"""
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "faiss")
+
+        with pytest.raises(ValueError, match="未知的向量库后端"):
+            ChromaClientManager.get_client()
+
+    def test_close_keeps_shared_client_open(self, monkeypatch):
+        """测试关闭索引管理器只释放引用，不关闭其他索引管理器共享的客户端"""
+        from backend.infrastructure.indexer.utils.lifecycle import close
+
+        monkeypatch.setenv("VECTOR_STORE_BACKEND", "ephemeral")
+        collection = ChromaClientManager.get_collection("lifecycle")
+        manager = SimpleNamespace(chroma_client=ChromaClientManager.get_client(), chroma_collection=collection)
+
+        close(manager)
+
+        assert manager.chroma_client is None
+        collection.add(ids=["x"], embeddings=[[1.0, 0.0]])
+        assert collection.count() == 1